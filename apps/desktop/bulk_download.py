@@ -7,12 +7,21 @@ Designed for reliability - retries failed downloads and tracks progress.
 
 Usage:
     python bulk_download.py [--output-dir PATH] [--retry-count N]
+    python bulk_download.py --all-devices [--output-dir PATH]
+    python bulk_download.py --emulate 10000 [--emulate-bandwidth BYTES_PER_S] [--emulate-latency-ms MS]
+
+--all-devices offloads every docked HiDock at once, each into a subfolder named
+after its serial number, and reports per-device and aggregate throughput.
+--emulate runs against an in-process device emulator with a synthetic catalog
+instead of a USB device, for end-to-end benchmarks without hardware;
+--emulate-devices N docks N such emulators.
 """
 
 import os
 import sys
 import time
 import argparse
+import threading
 import platform
 from pathlib import Path
 from datetime import datetime
@@ -24,7 +33,10 @@ sys.path.insert(0, src_dir)
 
 import usb.backend.libusb1
 from hidock_device import HiDockJensen
+from resumable_download import ResumableDownloader, discard_checkpoint, has_checkpoint
 from constants import DEFAULT_VENDOR_ID, HIDOCK_PRODUCT_IDS
+from device_emulator import EmulatedUSBBackend, JensenDeviceEmulator, LinkProfile, generate_catalog
+from multi_device import BatchDownloadPlanner, DevicePool
 
 
 def init_usb_backend():
@@ -93,10 +105,14 @@ def format_duration(seconds: float) -> str:
     return f"{minutes}:{secs:02d}"
 
 
-def download_file(device: HiDockJensen, file_info: dict, output_dir: Path, retry_count: int = 3) -> tuple[bool, str]:
+def download_file(device: HiDockJensen, file_info: dict, output_dir: Path, retry_count: int = 3,
+                  preallocate: bool = False) -> tuple[bool, str]:
     """
     Download a single file with retry logic.
 
+    Failed attempts keep the partial file and a resume checkpoint, so the
+    next attempt (or the next run) continues where the transfer stopped.
+
     Returns: (success: bool, error_message: str or None)
     """
     filename = file_info["name"]
@@ -104,7 +120,7 @@ def download_file(device: HiDockJensen, file_info: dict, output_dir: Path, retry
     output_path = output_dir / filename
 
     # Skip if already downloaded and correct size
-    if output_path.exists():
+    if output_path.exists() and not has_checkpoint(output_path):
         existing_size = output_path.stat().st_size
         if existing_size == file_size:
             return True, "already_exists"
@@ -112,35 +128,36 @@ def download_file(device: HiDockJensen, file_info: dict, output_dir: Path, retry
             print(f"    Removing incomplete file ({format_size(existing_size)} vs {format_size(file_size)})")
             output_path.unlink()
 
+    downloader = ResumableDownloader(device)
+
     for attempt in range(1, retry_count + 1):
         try:
-            bytes_received = [0]
             last_progress = [0]
 
-            # Open file for writing
-            with open(output_path, 'wb') as f:
-                def data_callback(chunk: bytes):
-                    f.write(chunk)
-                    bytes_received[0] += len(chunk)
-
-                def progress_callback(received: int, total: int):
-                    progress = int((received / total) * 100) if total > 0 else 0
-                    if progress >= last_progress[0] + 10:  # Update every 10%
-                        print(f"    Progress: {progress}% ({format_size(received)} / {format_size(total)})")
-                        last_progress[0] = progress
-
-                status = device.stream_file(
-                    filename=filename,
-                    file_length=file_size,
-                    data_callback=data_callback,
-                    progress_callback=progress_callback,
-                    timeout_s=300,  # 5 minutes per file max
-                )
+            def progress_callback(received: int, total: int):
+                progress = int((received / total) * 100) if total > 0 else 0
+                if progress >= last_progress[0] + 10:  # Update every 10%
+                    print(f"    Progress: {progress}% ({format_size(received)} / {format_size(total)})")
+                    last_progress[0] = progress
+
+            status = downloader.download(
+                filename=filename,
+                file_length=file_size,
+                output_path=str(output_path),
+                progress_callback=progress_callback,
+                timeout_s=300,  # 5 minutes per file max
+                signature=file_info.get("signature"),
+                preallocate=preallocate,
+            )
+            stats = downloader.last_stats
+            if stats["resumed_from"]:
+                print(f"    Resumed at {format_size(stats['resumed_from'])}")
 
             if status == "OK":
                 # Verify file size
                 actual_size = output_path.stat().st_size
                 if actual_size == file_size:
+                    print(f"    Sustained throughput: {stats['mb_per_s']:.2f} MB/s ({stats['mode']})")
                     return True, None
                 else:
                     print(f"    Size mismatch: expected {file_size}, got {actual_size}")
@@ -151,9 +168,9 @@ def download_file(device: HiDockJensen, file_info: dict, output_dir: Path, retry
                         continue
                     return False, f"Size mismatch after {retry_count} attempts"
             else:
-                print(f"    Transfer failed with status: {status}")
-                if output_path.exists():
-                    output_path.unlink()
+                # Keep the partial file: its checkpoint lets the next attempt resume
+                print(f"    Transfer failed with status: {status} "
+                      f"({format_size(stats.get('bytes_on_disk', 0))} kept for resume)")
                 if attempt < retry_count:
                     print(f"    Retrying... (attempt {attempt + 1}/{retry_count})")
                     time.sleep(2)
@@ -167,6 +184,7 @@ def download_file(device: HiDockJensen, file_info: dict, output_dir: Path, retry
                     output_path.unlink()
                 except:
                     pass
+            discard_checkpoint(output_path)
             if attempt < retry_count:
                 print(f"    Retrying... (attempt {attempt + 1}/{retry_count})")
                 time.sleep(2)
@@ -176,6 +194,70 @@ def download_file(device: HiDockJensen, file_info: dict, output_dir: Path, retry
     return False, "Max retries exceeded"
 
 
+def download_all_devices(backend, output_dir: Path, retry_count: int, skip_existing: bool) -> int:
+    """Offload every docked device concurrently, one I/O worker per device."""
+    with DevicePool(backend) as pool:
+        errors = pool.connect_all(auto_retry=True)
+        for location, error in errors.items():
+            print(f"  Could not connect device at {location}: {error}")
+        if not pool.workers:
+            print("\nERROR: No HiDock devices could be connected.")
+            return 1
+        print(f"  Connected {len(pool.workers)} devices: {', '.join(w.label for w in pool.workers)}")
+
+        print("\nFetching file lists...")
+        file_lists = {}
+        for label, result in pool.run_on_all(lambda jensen: jensen.list_files(timeout_s=60)).items():
+            if isinstance(result, Exception) or result.get("error"):
+                print(f"  {label}: failed to list files ({result})")
+                continue
+            files = [f for f in result.get("files", []) if f["name"].lower().endswith((".wav", ".hda"))]
+            file_lists[label] = files
+            print(f"  {label}: {len(files)} files ({format_size(sum(f['length'] for f in files))})")
+
+        planner = BatchDownloadPlanner(pool, output_dir, retry_count=retry_count)
+        plan = planner.plan(file_lists, skip_existing=skip_existing)
+        planned = sum(len(jobs) for jobs in plan.values())
+        print(f"\nTo download: {planned} files across {len(plan)} devices")
+        if not planned:
+            print("\nAll files already downloaded!")
+            return 0
+
+        done = threading.Event()
+
+        def report_progress():
+            while not done.wait(5.0):
+                stats = planner.get_throughput()
+                per_device = ", ".join(
+                    f"{label} {d['files_done']}/{d['files_total']} {d['mb_per_s']:.2f} MB/s"
+                    for label, d in stats["devices"].items()
+                )
+                print(f"  {stats['mb_per_s']:.2f} MB/s aggregate | {per_device}")
+
+        reporter = threading.Thread(target=report_progress, daemon=True)
+        reporter.start()
+        try:
+            report = planner.run(plan)
+        finally:
+            done.set()
+            reporter.join()
+
+    print("\n" + "=" * 60)
+    print("Download Summary")
+    print("=" * 60)
+    failed = 0
+    for label, device in report["devices"].items():
+        failed += len(device["failed"])
+        print(f"{label}: {device['files_done']}/{device['files_total']} files, "
+              f"{format_size(device['bytes_done'])} in {format_duration(device['elapsed_s'])} "
+              f"({device['mb_per_s']:.2f} MB/s)")
+        for filename, status in device["failed"]:
+            print(f"  - FAILED {filename}: {status}")
+    print(f"Aggregate: {format_size(report['bytes'])} in {format_duration(report['elapsed_s'])} "
+          f"({report['mb_per_s']:.2f} MB/s, {report['parallelism']:.1f} devices busy on average)")
+    return 1 if failed else 0
+
+
 def main():
     parser = argparse.ArgumentParser(description="Download all recordings from HiDock device")
     parser.add_argument("--output-dir", "-o", default=DEFAULT_DOWNLOAD_DIR,
@@ -184,6 +266,18 @@ def main():
                         help="Number of retries per file (default: 3)")
     parser.add_argument("--skip-existing", "-s", action="store_true",
                         help="Skip files that already exist with correct size")
+    parser.add_argument("--preallocate", action="store_true",
+                        help="Reserve each file's full size on disk before downloading")
+    parser.add_argument("--all-devices", action="store_true",
+                        help="Download from every connected HiDock concurrently")
+    parser.add_argument("--emulate", type=int, metavar="COUNT",
+                        help="Use an emulated device with COUNT synthetic recordings")
+    parser.add_argument("--emulate-bandwidth", type=float, default=None, metavar="BYTES_PER_S",
+                        help="Emulated link bandwidth (default: unlimited)")
+    parser.add_argument("--emulate-latency-ms", type=float, default=2.0,
+                        help="Emulated command latency in milliseconds (default: 2)")
+    parser.add_argument("--emulate-devices", type=int, default=1, metavar="N",
+                        help="Number of emulated devices (default: 1)")
     args = parser.parse_args()
 
     output_dir = Path(args.output_dir)
@@ -199,11 +293,25 @@ def main():
     # Initialize USB backend
     print("Initializing USB backend...")
     try:
-        backend = init_usb_backend()
+        if args.emulate is not None:
+            profile = LinkProfile(latency_s=args.emulate_latency_ms / 1000.0,
+                                  bandwidth_bytes_per_s=args.emulate_bandwidth)
+            backend = EmulatedUSBBackend([
+                JensenDeviceEmulator(generate_catalog(args.emulate, seed=index), profile,
+                                     serial=f"EMU{index + 1:010d}", md5_signatures=True)
+                for index in range(args.emulate_devices)
+            ])
+            print(f"  Using {args.emulate_devices} emulated device(s) with {args.emulate} recordings each")
+        else:
+            backend = init_usb_backend()
     except Exception as e:
         print(f"ERROR: {e}")
         return 1
 
+    if args.all_devices:
+        print("Connecting all devices...")
+        return download_all_devices(backend, output_dir, args.retry_count, args.skip_existing)
+
     # Initialize device
     print("Initializing device connection...")
     device = HiDockJensen(backend)
@@ -308,7 +416,7 @@ def main():
         print(f"\n[{i+1}/{len(to_download)}] {filename}")
         print(f"    Size: {format_size(file_size)}, Duration: {format_duration(duration)}")
 
-        success, error = download_file(device, file_info, output_dir, args.retry_count)
+        success, error = download_file(device, file_info, output_dir, args.retry_count, args.preallocate)
 
         if success:
             if error == "already_exists":
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+HiDock File List Parser Benchmark
+
+Compares the serial file list parser with the parallel one on synthetic
+CMD_GET_FILE_LIST data and checks that both produce identical results.
+
+Usage:
+    python scripts/benchmark_file_list_parser.py [--sizes 1000 10000 50000] [--repeat N]
+"""
+
+import argparse
+import os
+import struct
+import sys
+import time
+from datetime import datetime, timedelta
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.join(os.path.dirname(script_dir), "src")
+sys.path.insert(0, src_dir)
+
+from file_list_parallel import parse_file_list_parallel, shutdown_pool, worker_count  # noqa: E402
+from hidock_device import HiDockJensen  # noqa: E402
+
+CHUNK_SIZE = 4096
+
+
+def build_file_list(count: int) -> list:
+    """Build file list response bodies for ``count`` recordings, split into USB-sized chunks."""
+    data = bytearray(b"\xff\xff" + struct.pack(">I", count))
+    start = datetime(2024, 1, 1, 8, 0, 0)
+    for i in range(count):
+        stamp = start + timedelta(minutes=37 * i)
+        name = f"{stamp:%Y%b%d-%H%M%S}-Rec{i % 100:02d}.hda".encode()
+        version = 1 + (i % 3)
+        data.append(version)
+        data += struct.pack(">I", len(name))[1:]
+        data += name
+        data += struct.pack(">I", 32000 + i * 17)
+        data += b"\x00" * 6
+        data += i.to_bytes(16, "big")
+    return [bytes(data[pos : pos + CHUNK_SIZE]) for pos in range(0, len(data), CHUNK_SIZE)]
+
+
+def best_of(repeat: int, func):
+    """Return (best wall time in seconds, last result)."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark serial vs parallel file list parsing")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    jensen = HiDockJensen(None)
+    print(f"{'entries':>8} {'serial s':>10} {'parallel s':>11} {'workers':>8} {'speedup':>8}")
+    try:
+        for size in args.sizes:
+            chunks = build_file_list(size)
+            # Warm the pool so worker start-up is not counted against a single run
+            parse_file_list_parallel(chunks, decoder=jensen)
+
+            serial_time, serial_files = best_of(args.repeat, lambda: jensen._parse_file_list_chunks(chunks))
+            parallel_time, parallel_files = best_of(
+                args.repeat, lambda: parse_file_list_parallel(chunks, decoder=jensen)
+            )
+            if serial_files != parallel_files:
+                print(f"MISMATCH at {size} entries")
+                return 1
+            print(
+                f"{size:>8} {serial_time:>10.3f} {parallel_time:>11.3f} {worker_count(size):>8} "
+                f"{serial_time / parallel_time:>7.2f}x"
+            )
+    finally:
+        shutdown_pool()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
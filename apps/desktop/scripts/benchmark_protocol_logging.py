@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+HiDock Protocol Logging Benchmark
+
+Streams a synthetic file through HiDockJensen.stream_file against an in-memory
+endpoint pair and reports throughput with DEBUG logging disabled, so the cost
+of per-packet debug message formatting in _send_command/_receive_response
+shows up directly.
+
+Usage:
+    python scripts/benchmark_protocol_logging.py [--size-mb 64] [--body 8192] [--repeat N]
+"""
+
+import argparse
+import os
+import struct
+import sys
+import time
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.join(os.path.dirname(script_dir), "src")
+sys.path.insert(0, src_dir)
+
+from config_and_logger import logger  # noqa: E402
+from constants import CMD_TRANSFER_FILE  # noqa: E402
+from hidock_device import HiDockJensen  # noqa: E402
+
+
+class _Endpoint:
+    def __init__(self, address, max_packet_size=512):
+        self.bEndpointAddress = address
+        self.wMaxPacketSize = max_packet_size
+
+    def write(self, data, timeout=None):
+        return len(data)
+
+
+class _StreamingDevice:
+    """Serves a prebuilt CMD_TRANSFER_FILE response stream in USB-sized reads."""
+
+    def __init__(self, stream: bytes):
+        self._stream = memoryview(stream)
+        self._pos = 0
+
+    def rewind(self):
+        self._pos = 0
+
+    def read(self, endpoint, size, timeout=None):
+        chunk = self._stream[self._pos : self._pos + size]
+        self._pos += len(chunk)
+        return chunk
+
+
+def build_stream(size: int, body_size: int) -> bytes:
+    """Build CMD_TRANSFER_FILE packets carrying ``size`` bytes of file data."""
+    body = bytes(range(256)) * (body_size // 256) + bytes(body_size % 256)
+    packets = []
+    for sequence, offset in enumerate(range(0, size, body_size), start=1):
+        part = body[: min(body_size, size - offset)]
+        packets.append(struct.pack(">HHII", 0x1234, CMD_TRANSFER_FILE, sequence, len(part)) + part)
+    return b"".join(packets)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark stream_file throughput with DEBUG logging off")
+    parser.add_argument("--size-mb", type=int, default=64)
+    parser.add_argument("--body", type=int, default=8192, help="File bytes per response packet")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    logger.update_config(
+        {"log_level": "INFO", "console_log_level": "WARNING", "gui_log_level": "INFO", "file_log_level": "INFO"}
+    )
+    size = args.size_mb * 1024 * 1024
+    device = _StreamingDevice(build_stream(size, args.body))
+
+    jensen = HiDockJensen(None)
+    jensen.device = device
+    jensen.ep_in = _Endpoint(0x82)
+    jensen.ep_out = _Endpoint(0x01)
+    jensen.is_connected_flag = True
+    jensen._last_health_check = time.time() + 3600  # No liveness probes during the run
+
+    best = float("inf")
+    for _ in range(args.repeat):
+        device.rewind()
+        jensen._clear_receive_buffer()
+        started = time.perf_counter()
+        status = jensen.stream_file("bench.hda", size, lambda chunk: None)
+        elapsed = time.perf_counter() - started
+        if status != "OK":
+            print(f"stream_file returned {status}")
+            return 1
+        best = min(best, elapsed)
+
+    packets = (size + args.body - 1) // args.body
+    print(f"{args.size_mb} MB in {packets} packets: {best:.3f} s, {args.size_mb / best:.1f} MB/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
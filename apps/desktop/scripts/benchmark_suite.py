@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+HiDock Hot Path Benchmark Suite
+
+Times the protocol, parsing, conversion and metadata hot paths on synthetic
+datasets of 100, 1k and 10k recordings and compares the results with stored
+baselines. A case regresses when its best time exceeds the baseline by more
+than the case's threshold (a fraction; ``--threshold`` sets the default).
+
+Dataset tiers are recording counts. Audio cases (HTA conversion, waveform
+extraction) work on a single recording instead, ``tier / 10`` seconds long,
+so the tiers cover 10 s to 17 min of 16 kHz mono audio.
+
+Baselines are machine specific: record them with ``--update-baseline`` on the
+machine that runs the checks. Without ffmpeg, pydub cannot decode MPEG and
+HTAConverter takes its fallback path, so the baseline records whether ffmpeg
+was available and hta_convert is only compared when that matches.
+
+Usage:
+    python scripts/benchmark_suite.py [--tiers 100 1000 10000] [--cases NAME ...] [--repeat N]
+    python scripts/benchmark_suite.py --update-baseline
+    python scripts/benchmark_suite.py --list
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import struct
+import sys
+import tempfile
+import time
+import warnings
+import wave
+from datetime import datetime, timedelta
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+src_dir = os.path.join(os.path.dirname(script_dir), "src")
+sys.path.insert(0, src_dir)
+sys.path.insert(0, script_dir)
+
+from benchmark_file_list_parser import build_file_list  # noqa: E402
+from benchmark_protocol_logging import build_stream  # noqa: E402
+from config_and_logger import logger  # noqa: E402
+from constants import CMD_TRANSFER_FILE  # noqa: E402
+from device_emulator import generate_catalog  # noqa: E402
+from hidock_device import HiDockJensen  # noqa: E402
+
+DEFAULT_TIERS = [100, 1000, 10000]
+DEFAULT_THRESHOLD = 0.5
+DEFAULT_BASELINE_PATH = os.path.join(script_dir, "benchmark_baselines.json")
+MIN_MEASURE_S = 0.2  # Keep repeating short cases until this much time was measured
+
+SAMPLE_RATE = 16000
+# MPEG-2 Layer II, 64 kbit/s, 16 kHz, mono: the H1E recording format
+_MPEG_FRAME_HEADER = bytes([0xFF, 0xF5, 0x88, 0xC0])
+_MPEG_FRAME_SIZE = 144 * 64000 // SAMPLE_RATE
+_MPEG_FRAME_SAMPLES = 1152
+
+
+# --- Synthetic data ---
+
+
+def build_mpeg_audio(seconds: float) -> bytes:
+    """MPEG Layer II frames with no allocated subbands (decodes as silence)."""
+    frames = int(seconds * SAMPLE_RATE / _MPEG_FRAME_SAMPLES) + 1
+    frame = _MPEG_FRAME_HEADER + bytes(_MPEG_FRAME_SIZE - len(_MPEG_FRAME_HEADER))
+    return frame * frames
+
+
+def write_wav(path: str, seconds: float) -> None:
+    """Write a 16-bit mono WAV file with a repeating sawtooth."""
+    period = bytes(struct.pack("<100h", *range(-5000, 5000, 100)))
+    samples = int(seconds * SAMPLE_RATE)
+    with wave.open(path, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(SAMPLE_RATE)
+        wav_file.writeframes((period * (samples // 100 + 1))[: samples * 2])
+
+
+def build_meetings(count: int) -> list:
+    """File list entries enriched with calendar meeting fields, as the GUI holds them."""
+    subjects = ["Weekly standup", "Design review", "1:1 with Alice", "Customer call", "Sprint planning"]
+    people = ["alice@example.com", "bob@example.com", "carol@example.com", "dave@example.com"]
+    start = datetime(2024, 1, 1, 8, 0, 0)
+    files = []
+    for i, recording in enumerate(generate_catalog(count)):
+        stamp = start + timedelta(minutes=37 * i)
+        has_meeting = i % 3 != 0
+        files.append(
+            {
+                "name": recording.name,
+                "time": stamp,
+                "length": recording.length,
+                "has_meeting": has_meeting,
+                "meeting_subject": f"{subjects[i % len(subjects)]} #{i}" if has_meeting else "",
+                "meeting_organizer": people[i % len(people)] if has_meeting else "",
+                "meeting_attendees_display": ", ".join(people[: 1 + i % len(people)]) if has_meeting else "",
+                "meeting_type": "teams" if i % 2 else "in_person",
+                "meeting_start_time": stamp if has_meeting else None,
+            }
+        )
+    return files
+
+
+# --- Cases ---
+#
+# Each case takes (tier, workdir), does its setup and returns a callable that
+# performs one measured run. The callable returns a value that is checked
+# against the tier so a broken case cannot pass as a fast one.
+
+
+class _Endpoint:
+    def __init__(self, address, max_packet_size=512):
+        self.bEndpointAddress = address
+        self.wMaxPacketSize = max_packet_size
+
+
+class _StreamDevice:
+    def __init__(self, stream: bytes):
+        self.stream = memoryview(stream)
+        self.pos = 0
+
+    def read(self, endpoint, size, timeout=None):
+        chunk = self.stream[self.pos : self.pos + size]
+        self.pos += len(chunk)
+        return chunk
+
+
+def case_receive_response(tier, workdir):
+    """_receive_response framing: ``tier`` packets of 4 KB from an in-memory stream."""
+    stream = build_stream(tier * 4096, 4096)
+    jensen = HiDockJensen(None)
+    jensen.ep_in = _Endpoint(0x82)
+    jensen.ep_out = _Endpoint(0x01)
+    jensen.is_connected_flag = True
+    jensen._last_health_check = time.time() + 3600
+
+    def run():
+        jensen.device = _StreamDevice(stream)
+        jensen._clear_receive_buffer()
+        received = 0
+        for _ in range(tier):
+            response = jensen._receive_response(0, streaming_cmd_id=CMD_TRANSFER_FILE, zero_copy=True)
+            received += len(response["body"])
+        return received // 4096
+
+    return run
+
+
+def case_parse_file_list_chunks(tier, workdir):
+    """_parse_file_list_chunks on a ``tier`` entry CMD_GET_FILE_LIST transfer."""
+    chunks = build_file_list(tier)
+    jensen = HiDockJensen(None)
+    return lambda: len(jensen._parse_file_list_chunks(chunks))
+
+
+def case_parse_filename_datetime(tier, workdir):
+    """_parse_filename_datetime on ``tier`` device file names."""
+    names = [recording.name for recording in generate_catalog(tier)]
+    jensen = HiDockJensen(None)
+
+    def run():
+        return sum(1 for name in names if jensen._parse_filename_datetime(name)[2] is not None)
+
+    return run
+
+
+def case_hta_convert(tier, workdir):
+    """HTAConverter.convert_hta_to_wav on one ``tier / 10`` second MPEG Layer II recording."""
+    from hta_converter import HTAConverter
+
+    source = os.path.join(workdir, "2024Jan01-080000-Rec00.hda")
+    with open(source, "wb") as f:
+        f.write(build_mpeg_audio(tier / 10))
+    output = os.path.join(workdir, "converted.wav")
+    converter = HTAConverter()
+
+    def run():
+        return tier if converter.convert_hta_to_wav(source, output) == output else 0
+
+    return run
+
+
+def case_extract_waveform(tier, workdir):
+    """AudioProcessor.extract_waveform_data on one ``tier / 10`` second WAV recording."""
+    from audio_player_enhanced import AudioProcessor
+
+    path = os.path.join(workdir, "recording.wav")
+    write_wav(path, tier / 10)
+
+    def run():
+        data, sample_rate = AudioProcessor.extract_waveform_data(path, max_points=2000)
+        return tier if sample_rate == SAMPLE_RATE and len(data) else 0
+
+    return run
+
+
+def _audio_metadata_db(tier, workdir, populate):
+    from audio_metadata_db import AudioMetadataDB
+
+    catalog = generate_catalog(tier)
+    db = AudioMetadataDB(os.path.join(workdir, f"audio_metadata_{time.perf_counter_ns()}.db"))
+    if populate:
+        for recording in catalog:
+            db.create_file_entry(recording.name, recording.name, recording.length, 60.0, datetime(2024, 1, 1))
+    return db, catalog
+
+
+def case_audio_metadata_db_write(tier, workdir):
+    """AudioMetadataDB.create_file_entry for ``tier`` recordings into an empty database."""
+
+    def run():
+        db, catalog = _audio_metadata_db(tier, workdir, populate=False)
+        created = sum(
+            db.create_file_entry(rec.name, rec.name, rec.length, 60.0, datetime(2024, 1, 1)) for rec in catalog
+        )
+        db.close()
+        return created
+
+    return run
+
+
+def case_audio_metadata_db_read(tier, workdir):
+    """AudioMetadataDB.get_all_metadata over ``tier`` stored recordings."""
+    db, _ = _audio_metadata_db(tier, workdir, populate=True)
+    return lambda: len(db.get_all_metadata())
+
+
+def case_file_metadata_cache_upsert(tier, workdir):
+    """FileMetadataCache.set_metadata for ``tier`` recordings (insert, then update)."""
+    from file_operations_manager import FileMetadata, FileMetadataCache
+
+    cache = FileMetadataCache(workdir)
+    entries = [
+        FileMetadata(rec.name, rec.length, 60.0, datetime(2024, 1, 1), f"/{rec.name}") for rec in generate_catalog(tier)
+    ]
+
+    def run():
+        for metadata in entries:
+            metadata.download_count += 1
+            cache.set_metadata(metadata)
+        return len(entries)
+
+    return run
+
+
+def case_calendar_apply_filters(tier, workdir):
+    """CalendarFilterEngine.apply_filters with fuzzy subject and participant filters on ``tier`` files."""
+    from calendar_filter_engine import CalendarFilterEngine
+
+    files = build_meetings(tier)
+    engine = CalendarFilterEngine()
+    filters = {"subject": "standup", "fuzzy_match": True, "participant": "alice"}
+
+    def run():
+        engine.apply_filters(files, filters)
+        return tier
+
+    return run
+
+
+CASES = {
+    "receive_response": case_receive_response,
+    "parse_file_list_chunks": case_parse_file_list_chunks,
+    "parse_filename_datetime": case_parse_filename_datetime,
+    "hta_convert": case_hta_convert,
+    "extract_waveform": case_extract_waveform,
+    "audio_metadata_db_write": case_audio_metadata_db_write,
+    "audio_metadata_db_read": case_audio_metadata_db_read,
+    "file_metadata_cache_upsert": case_file_metadata_cache_upsert,
+    "calendar_apply_filters": case_calendar_apply_filters,
+}
+
+
+# --- Runner ---
+
+
+def measure(case, tier: int, repeat: int, min_time_s: float = MIN_MEASURE_S) -> float:
+    """
+    Best wall time in seconds of one run of ``case`` at ``tier``.
+
+    Runs at least ``repeat`` times and keeps going while less than
+    ``min_time_s`` has been measured, up to 50 runs.
+
+    Raises:
+        AssertionError: If a run does not process the whole dataset.
+    """
+    workdir = tempfile.mkdtemp(prefix="hidock_bench_")
+    try:
+        run = case(tier, workdir)
+        best, total, runs = float("inf"), 0.0, 0
+        while runs < repeat or (total < min_time_s and runs < 50):
+            started = time.perf_counter()
+            processed = run()
+            elapsed = time.perf_counter() - started
+            if processed != tier:
+                raise AssertionError(f"processed {processed} of {tier}")
+            best, total, runs = min(best, elapsed), total + elapsed, runs + 1
+        return best
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def result_key(name: str, tier: int) -> str:
+    return f"{name}[{tier}]"
+
+
+def environment() -> dict:
+    return {
+        "machine": f"{platform.system()} {platform.machine()}, Python {platform.python_version()}",
+        "ffmpeg": shutil.which("ffmpeg") is not None,
+    }
+
+
+def compare(results: dict, baseline: dict, default_threshold: float) -> list:
+    """
+    Regressions of ``results`` against ``baseline``.
+
+    Returns:
+        list: (key, seconds, baseline seconds, threshold) for each case slower
+        than its baseline by more than its threshold.
+    """
+    regressions = []
+    ffmpeg_matches = baseline.get("ffmpeg") == environment()["ffmpeg"]
+    for key, seconds in results.items():
+        entry = baseline.get("cases", {}).get(key)
+        if not entry or (key.startswith("hta_convert[") and not ffmpeg_matches):
+            continue
+        threshold = entry.get("threshold", baseline.get("threshold", default_threshold))
+        if seconds > entry["seconds"] * (1 + threshold):
+            regressions.append((key, seconds, entry["seconds"], threshold))
+    return regressions
+
+
+def load_baseline(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(path: str, results: dict, previous: dict, threshold: float) -> None:
+    cases = dict(previous.get("cases", {}))
+    for key, seconds in results.items():
+        entry = dict(cases.get(key, {}))
+        entry["seconds"] = round(seconds, 6)
+        cases[key] = entry
+    data = {
+        "recorded": datetime.now().isoformat(timespec="seconds"),
+        **environment(),
+        "threshold": previous.get("threshold", threshold),
+        "cases": dict(sorted(cases.items())),
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HiDock hot paths against stored baselines")
+    parser.add_argument("--tiers", type=int, nargs="+", default=DEFAULT_TIERS)
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), default=list(CASES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Allowed slowdown as a fraction when the baseline sets none (default: 0.5)",
+    )
+    parser.add_argument("--update-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--list", action="store_true", help="List the cases and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for name in CASES:
+            print(f"{name:<28} {CASES[name].__doc__}")
+        return 0
+
+    logger.update_config(
+        {"log_level": "INFO", "console_log_level": "CRITICAL", "gui_log_level": "INFO", "file_log_level": "INFO"}
+    )
+    warnings.filterwarnings("ignore", module="pydub")  # Missing ffmpeg is reported once below
+    if not environment()["ffmpeg"]:
+        print("ffmpeg not found: hta_convert times HTAConverter's fallback path\n")
+    baseline = load_baseline(args.baseline)
+    results = {}
+    print(f"{'case':<36} {'best ms':>10} {'baseline ms':>12} {'change':>8}")
+    for name in args.cases:
+        for tier in args.tiers:
+            key = result_key(name, tier)
+            seconds = measure(CASES[name], tier, args.repeat)
+            results[key] = seconds
+            entry = baseline.get("cases", {}).get(key)
+            if entry:
+                change = f"{(seconds / entry['seconds'] - 1) * 100:+.0f}%"
+                print(f"{key:<36} {seconds * 1000:>10.2f} {entry['seconds'] * 1000:>12.2f} {change:>8}")
+            else:
+                print(f"{key:<36} {seconds * 1000:>10.2f} {'-':>12} {'':>8}")
+
+    if args.update_baseline:
+        save_baseline(args.baseline, results, baseline, args.threshold)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    for key, seconds, base, threshold in regressions:
+        print(f"REGRESSION {key}: {seconds * 1000:.2f} ms vs {base * 1000:.2f} ms (allowed +{threshold:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
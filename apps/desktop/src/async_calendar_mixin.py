@@ -693,13 +693,17 @@ class AsyncCalendarMixin:
         
         return best_match
     
-    def enhance_files_with_meeting_data_async(self, files_dict: List[Dict], callback: Optional[Callable] = None) -> List[Dict]:
+    def enhance_files_with_meeting_data_async(
+        self, files_dict: List[Dict], callback: Optional[Callable] = None, delta=None
+    ) -> List[Dict]:
         """
         NON-BLOCKING calendar enhancement - returns immediately, processes in background.
         
         Args:
             files_dict: List of file dictionaries from the device
             callback: Optional callback function to call when enhancement is complete
+            delta: Optional FileListDelta from the device listing. When given, only
+                new or changed files and files without cached meeting data are synced.
             
         Returns:
             Enhanced list with meeting metadata (initially empty meeting fields, updated later)
@@ -716,21 +720,39 @@ class AsyncCalendarMixin:
         
         # Queue background work to enhance with real calendar data
         if SIMPLE_CALENDAR_AVAILABLE and self._calendar_cache_manager:
+            files_to_sync = files_dict
+            if delta is not None:
+                updated_names = delta.updated_names
+                files_to_sync = [
+                    f for f in files_dict if f.get('name') in updated_names or self._needs_calendar_sync(f)
+                ]
+                if not files_to_sync:
+                    logger.debug("AsyncCalendar", "enhance_files_async",
+                                 "No new or unsynced files in delta, skipping background calendar sync")
+                    return immediate_files
+
             work_item = {
                 'type': 'sync_files',
-                'files': files_dict,
+                'files': files_to_sync,
                 'callback': callback
             }
             self._calendar_work_queue.put(work_item)
             
             logger.info("AsyncCalendar", "enhance_files_async", 
-                       f"Queued {len(files_dict)} files for background calendar sync")
+                       f"Queued {len(files_to_sync)} of {len(files_dict)} files for background calendar sync")
         else:
             logger.debug("AsyncCalendar", "enhance_files_async", 
                         "Calendar integration not available, returning files without meeting data")
         
         return immediate_files
     
+    def _needs_calendar_sync(self, file_data: Dict[str, Any]) -> bool:
+        """True if a file has a recording time but no cached meeting lookup yet."""
+        file_datetime = self._parse_file_datetime(file_data)
+        if not file_datetime:
+            return False
+        return self._calendar_cache_manager.get_cached_meeting_for_file(file_data['name'], file_datetime) is None
+    
     def _update_calendar_sync_gui_status(self, status_text: str, progress: float):
         """Update GUI with calendar sync status."""
         try:
@@ -25,6 +25,8 @@ class AudioMetadataMixin:
         if not hasattr(self, "_audio_metadata_initialized"):
             self._audio_metadata_initialized = False
             self._audio_metadata_db = None
+            # Display fields from the last refresh, reused for files a delta reports as unchanged
+            self._audio_metadata_fields = {}
 
             # Initialize database
             self._audio_metadata_db = get_audio_metadata_db()
@@ -32,27 +34,52 @@ class AudioMetadataMixin:
 
             logger.info("AudioMetadata", "init", "Audio metadata system initialized")
 
-    def enhance_files_with_audio_metadata(self, files_dict: List[Dict]) -> List[Dict]:
-        """Enhance file list with audio metadata and processing status."""
+    def enhance_files_with_audio_metadata(self, files_dict: List[Dict], delta=None) -> List[Dict]:
+        """
+        Enhance file list with audio metadata and processing status.
+
+        Args:
+            files_dict: List of file dictionaries from the device.
+            delta: Optional FileListDelta from the device listing. Files it does not
+                report as new or changed reuse the display fields of the last refresh
+                instead of being looked up in the database again.
+        """
         self._ensure_audio_metadata_initialized()
 
+        fields_cache = self._audio_metadata_fields
+        if delta is None:
+            fields_cache.clear()
+            updated_names = set()
+        else:
+            for entry in delta.removed:
+                fields_cache.pop(entry["name"], None)
+            updated_names = delta.updated_names
+
         enhanced_files = []
 
         for file_data in files_dict:
             enhanced_file = file_data.copy()
             filename = file_data["name"]
 
+            cached_fields = fields_cache.get(filename) if filename not in updated_names else None
+            if cached_fields is not None:
+                enhanced_file.update(cached_fields)
+                enhanced_files.append(enhanced_file)
+                continue
+
             try:
                 # Get metadata from database
                 metadata = self._audio_metadata_db.get_metadata(filename)
 
                 if metadata:
                     # File has metadata - use it
-                    enhanced_file.update(self._create_metadata_display_fields(metadata))
+                    fields = self._create_metadata_display_fields(metadata)
                 else:
                     # File not in database - create entry and use defaults
                     self._create_metadata_entry_for_file(file_data)
-                    enhanced_file.update(self._create_empty_metadata_fields())
+                    fields = self._create_empty_metadata_fields()
+                enhanced_file.update(fields)
+                fields_cache[filename] = fields
 
             except Exception as e:
                 logger.warning("AudioMetadata", "enhance_files", f"Error enhancing {filename} with metadata: {e}")
@@ -232,6 +259,7 @@ class AudioMetadataMixin:
                 self._audio_metadata_db.update_processing_status(
                     filename, ProcessingStatus.ERROR, "Local file not found"
                 )
+                self.after(0, self._refresh_file_display_for_metadata_change, filename)
                 return
 
             # Transcribe audio
@@ -433,6 +461,7 @@ class AudioMetadataMixin:
 
     def _refresh_file_display_for_metadata_change(self, filename: str):
         """Refresh the display for a specific file when its metadata changes."""
+        getattr(self, "_audio_metadata_fields", {}).pop(filename, None)
         try:
             # Find the file in displayed_files_details and update it
             if hasattr(self, "displayed_files_details"):
@@ -442,7 +471,9 @@ class AudioMetadataMixin:
                         metadata = self._audio_metadata_db.get_metadata(filename)
                         if metadata:
                             # Update the file detail with new metadata
-                            file_detail.update(self._create_metadata_display_fields(metadata))
+                            fields = self._create_metadata_display_fields(metadata)
+                            file_detail.update(fields)
+                            self._audio_metadata_fields[filename] = fields
 
                             # Update the TreeView item directly
                             if hasattr(self, "file_tree") and self.file_tree.winfo_exists():
@@ -794,6 +825,7 @@ class AudioMetadataMixin:
             # Delete from database
             self._ensure_audio_metadata_initialized()
             success = self._audio_metadata_db.delete_metadata(filename)
+            self._audio_metadata_fields.pop(filename, None)
 
             if success:
                 logger.info("AudioMetadata", "delete_transcription", f"Deleted transcription for {filename}")
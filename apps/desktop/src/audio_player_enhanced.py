@@ -40,6 +40,10 @@ except ImportError:
     PYDUB_AVAILABLE = False
 
 from config_and_logger import logger
+from waveform_peaks import reduce_waveform
+
+# Files from this size on are reduced block by block instead of being decoded whole
+STREAMING_WAVEFORM_MIN_BYTES = 64 * 1024 * 1024
 
 
 class PlaybackState(Enum):
@@ -210,6 +214,11 @@ class AudioProcessor:
     def extract_waveform_data(filepath: str, max_points: int = 1000) -> Tuple[np.ndarray, int]:
         """Extract waveform data for visualization"""
         try:
+            if AudioProcessor._is_large_file(filepath):
+                waveform = AudioProcessor.extract_waveform_peaks(filepath, max_points)
+                if waveform is not None:
+                    return waveform
+
             if filepath.lower().endswith(".wav"):
                 try:
                     # Use wave module first (more reliable)
@@ -303,6 +312,29 @@ class AudioProcessor:
             )
             return np.array([]), 0
 
+    @staticmethod
+    def _is_large_file(filepath: str) -> bool:
+        try:
+            return os.path.getsize(filepath) >= STREAMING_WAVEFORM_MIN_BYTES
+        except OSError:
+            return False
+
+    @staticmethod
+    def extract_waveform_peaks(filepath: str, max_points: int = 1000) -> Optional[Tuple[np.ndarray, int]]:
+        """
+        Extract waveform data in one pass over fixed-size blocks.
+
+        Each point is the sample of largest magnitude in its stretch of the
+        recording, so short peaks survive the reduction, and memory use does
+        not depend on the length of the file. Returns None if the file cannot
+        be decoded block by block.
+        """
+        reduced = reduce_waveform(filepath, max_points)
+        if reduced is None:
+            return None
+        mins, maxs, _, sample_rate = reduced
+        return np.where(maxs >= -mins, maxs, mins), sample_rate
+
 
 class AudioPlaylist:
     """Manages a playlist of audio tracks"""
@@ -27,6 +27,11 @@ from scipy.fft import fftfreq
 
 from audio_player_enhanced import AudioProcessor, PlaybackPosition
 from config_and_logger import logger
+from mapped_audio import MappedWavAudio, open_mapped_wav
+from spectrogram_cache import get_spectrogram
+from waveform_peaks import PeakPyramid, get_peak_pyramid
+
+WAVEFORM_POINTS = 2000  # Buckets drawn across the visible window
 
 
 class WaveformVisualizer:
@@ -39,6 +44,7 @@ class WaveformVisualizer:
 
         # Visualization data
         self.waveform_data: Optional[np.ndarray] = None
+        self.peaks: Optional[PeakPyramid] = None  # Min/max pyramid; drawn instead of waveform_data when set
         self.sample_rate: int = 0
         self.current_position: float = 0.0
         self.total_duration: float = 0.0
@@ -147,8 +153,16 @@ class WaveformVisualizer:
         try:
             logger.info("WaveformVisualizer", "load_audio", f"Loading waveform for {filepath}")
 
+            # The peak pyramid comes from the file's peak file after the first load
+            peaks = get_peak_pyramid(filepath)
+            if peaks is not None and peaks.frame_count:
+                self.show_peaks(peaks)
+                logger.info("WaveformVisualizer", "load_audio", "Waveform loaded from peak pyramid")
+                return True
+            self.peaks = None
+
             # Extract waveform data
-            waveform_data, sample_rate = AudioProcessor.extract_waveform_data(filepath, max_points=2000)
+            waveform_data, sample_rate = AudioProcessor.extract_waveform_data(filepath, max_points=WAVEFORM_POINTS)
 
             if len(waveform_data) == 0:
                 logger.warning(
@@ -175,6 +189,49 @@ class WaveformVisualizer:
             logger.error("WaveformVisualizer", "load_audio", f"Error loading waveform: {e}")
             return False
 
+    def show_peaks(self, peaks: PeakPyramid):
+        """Display a recording from its peak pyramid."""
+        self.peaks = peaks
+        self.sample_rate = peaks.sample_rate
+        self.total_duration = peaks.duration
+        _, _, self.waveform_data, _ = peaks.window(max_points=WAVEFORM_POINTS)
+        self._update_waveform_display()
+
+    def _zoom_window(self):
+        """Start and end in seconds of the visible part of the recording."""
+        if self.zoom_level <= 1.0:
+            return 0, self.total_duration
+
+        # Calculate zoom window
+        zoom_duration = self.total_duration / self.zoom_level
+        zoom_start = max(0, self.zoom_center * self.total_duration - zoom_duration / 2)
+        zoom_end = min(self.total_duration, zoom_start + zoom_duration)
+
+        # Adjust if we're at the edges
+        if zoom_end >= self.total_duration:
+            zoom_end = self.total_duration
+            zoom_start = max(0, zoom_end - zoom_duration)
+        elif zoom_start <= 0:
+            zoom_start = 0
+            zoom_end = min(self.total_duration, zoom_duration)
+        return zoom_start, zoom_end
+
+    def _draw_peaks(self):
+        """Plot the min/max envelope and RMS band of the zoomed window from the matching pyramid level."""
+        times, mins, maxs, rms = self.peaks.window(*self._zoom_window(), max_points=WAVEFORM_POINTS)
+        if not len(times):
+            return
+
+        # Same scaling as the sample plot: normalize with headroom, then compress quiet parts
+        peak = self.peaks.peak
+        scale = 0.9 / peak if peak > 0 else 1.0
+
+        def shape(values):
+            return np.sign(values) * np.power(np.abs(values) * scale, 0.7)
+
+        self.ax.fill_between(times, shape(mins), shape(maxs), color=self.waveform_color, alpha=0.6, linewidth=0)
+        self.ax.fill_between(times, -shape(rms), shape(rms), color=self.waveform_color, alpha=0.9, linewidth=0)
+
     def _update_waveform_display(self):
         """Update the waveform display with improved normalization and scaling"""
         if self.waveform_data is None:
@@ -184,6 +241,11 @@ class WaveformVisualizer:
             self.ax.clear()
             self.ax.set_facecolor(self.background_color)
 
+            if self.peaks is not None:
+                self._draw_peaks()
+                self._finish_waveform_axes()
+                return
+
             # Create time axis
             time_axis = np.linspace(0, self.total_duration, len(self.waveform_data))
 
@@ -210,25 +272,20 @@ class WaveformVisualizer:
 
             # Fill under the curve for better visual effect
             self.ax.fill_between(time_axis, waveform_display, alpha=0.4, color=self.waveform_color)
+            self._finish_waveform_axes()
+
+        except Exception as e:
+            logger.error(
+                "WaveformVisualizer",
+                "_update_waveform_display",
+                f"Error updating display: {e}",
+            )
 
+    def _finish_waveform_axes(self):
+        """Apply zoom limits, grid, styling and the position indicator, then redraw."""
+        try:
             # Apply zoom to time axis
-            if self.zoom_level > 1.0:
-                # Calculate zoom window
-                zoom_duration = self.total_duration / self.zoom_level
-                zoom_start = max(0, self.zoom_center * self.total_duration - zoom_duration / 2)
-                zoom_end = min(self.total_duration, zoom_start + zoom_duration)
-
-                # Adjust if we're at the edges
-                if zoom_end >= self.total_duration:
-                    zoom_end = self.total_duration
-                    zoom_start = max(0, zoom_end - zoom_duration)
-                elif zoom_start <= 0:
-                    zoom_start = 0
-                    zoom_end = min(self.total_duration, zoom_duration)
-
-                self.ax.set_xlim(zoom_start, zoom_end)
-            else:
-                self.ax.set_xlim(0, self.total_duration)
+            self.ax.set_xlim(*self._zoom_window())
             self.ax.set_ylim(-1.0, 1.0)
 
             # Add subtle grid for better readability
@@ -252,7 +309,7 @@ class WaveformVisualizer:
         except Exception as e:
             logger.error(
                 "WaveformVisualizer",
-                "_update_waveform_display",
+                "_finish_waveform_axes",
                 f"Error updating display: {e}",
             )
 
@@ -328,6 +385,7 @@ class WaveformVisualizer:
     def clear(self):
         """Clear the visualization"""
         self.waveform_data = None
+        self.peaks = None
         self.sample_rate = 0
         self.current_position = 0.0
         self.total_duration = 0.0
@@ -357,10 +415,12 @@ class SpectrumAnalyzer:
         self.frequency_bins = None
         self.magnitude_data = None
 
-        # Audio data for analysis
+        # Audio data for analysis: an ndarray or a MappedWavAudio paged in around the playhead
         self.audio_data = None
         self.current_position = 0.0
         self.total_duration = 0.0
+        # Precomputed spectrum frames of the audio data, filled in by a background pass
+        self.spectrogram = None
 
         # Matplotlib setup
         self.figure = Figure(figsize=(width / 100, height / 100), dpi=100, facecolor="#2b2b2b")
@@ -456,6 +516,11 @@ class SpectrumAnalyzer:
                 logger.warning("SpectrumAnalyzer", "start_analysis", "No audio data provided")
                 return
 
+            # The animation looks frames up once the background pass has reached them
+            self.spectrogram = get_spectrogram(
+                audio_data, sample_rate, self.fft_size, source_path=getattr(audio_data, "filepath", None)
+            )
+
             # Start animation with explicit settings to ensure it runs
             logger.info(
                 "SpectrumAnalyzer",
@@ -504,6 +569,14 @@ class SpectrumAnalyzer:
             if self.animation:
                 self.animation.event_source.stop()
                 self.animation = None
+            if self.spectrogram is not None:
+                # Stop the background pass before the audio it reads is released
+                self.spectrogram.cancel()
+                self.spectrogram = None
+            if isinstance(self.audio_data, MappedWavAudio):
+                # An open mapping keeps the file from being deleted on Windows
+                self.audio_data.close()
+                self.audio_data = None
 
             logger.info("SpectrumAnalyzer", "stop_analysis", "Spectrum analysis stopped")
 
@@ -530,11 +603,17 @@ class SpectrumAnalyzer:
             chunk_start = max(0, sample_position)
             chunk_end = min(len(self.audio_data), chunk_start + self.fft_size)
 
-            if chunk_end - chunk_start < self.fft_size // 2:
+            spectrogram = getattr(self, "spectrogram", None)
+            precomputed = spectrogram.lookup(self.current_position) if spectrogram is not None else None
+            if precomputed is not None:
+                freqs = spectrogram.log_freqs
+                spectrum = precomputed
+            elif chunk_end - chunk_start < self.fft_size // 2:
                 # Not enough data for meaningful analysis
                 freqs = np.logspace(1, 4, 50)
                 spectrum = np.full_like(freqs, -80.0)
             else:
+                # Computed live until the background pass reaches this position
                 # Get audio chunk and pad if necessary
                 audio_chunk = self.audio_data[chunk_start:chunk_end]
                 if len(audio_chunk) < self.fft_size:
@@ -778,6 +857,17 @@ class AudioVisualizationWidget(ctk.CTkFrame):
                 f"Error starting spectrum analysis: {e}",
             )
 
+    def start_spectrum_analysis_for_file(self, filepath: str):
+        """Start spectrum analysis of a file, mapping WAV files instead of loading them"""
+        mapped = open_mapped_wav(filepath)
+        if mapped is not None and len(mapped) > 0:
+            self.start_spectrum_analysis(mapped, mapped.sample_rate)
+            return
+
+        waveform_data, sample_rate = AudioProcessor.extract_waveform_data(filepath, max_points=1024)
+        if len(waveform_data) > 0:
+            self.start_spectrum_analysis(waveform_data, sample_rate)
+
     def stop_spectrum_analysis(self):
         """Stop spectrum analysis"""
         self.spectrum_analyzer.stop_analysis()
@@ -892,14 +982,7 @@ class AudioVisualizationWidget(ctk.CTkFrame):
                     current_track = main_window.audio_player.get_current_track()
                     if current_track:
                         try:
-                            from audio_player_enhanced import AudioProcessor
-
-                            (
-                                waveform_data,
-                                sample_rate,
-                            ) = AudioProcessor.extract_waveform_data(current_track.filepath, max_points=1024)
-                            if len(waveform_data) > 0:
-                                self.start_spectrum_analysis(waveform_data, sample_rate)
+                            self.start_spectrum_analysis_for_file(current_track.filepath)
                         except Exception:
                             pass  # Ignore errors, spectrum will show default animation
             else:
@@ -0,0 +1,205 @@
+"""
+Back-to-back batch downloads from one HiDock device.
+
+Queued downloads run as independent operations: each waits for the device
+lock, builds an event loop for ``download_recording``, looks up the file size
+and validates the result before the next transfer can start, and the USB link
+sits idle meanwhile. ``PipelinedBatchDownloader`` keeps the device busy
+instead:
+
+* the device is held for the whole batch; more urgent requests still get in
+  between two files through the scheduler's ``yield_point()``,
+* sizes and signatures are resolved before the first transfer,
+* the next ``CMD_TRANSFER_FILE`` is issued as soon as the previous stream
+  completes, while validation and cache updates for the finished file run
+  on a separate finalizer thread.
+
+Every run produces a report with the link utilization of the batch: time
+spent transferring against the wall-clock time the batch held the device.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from config_and_logger import logger
+from device_scheduler import CommandPriority, command_priority
+from resumable_download import ResumableDownloader
+
+
+@dataclass
+class BatchDownloadItem:
+    """One file of a pipelined batch."""
+
+    filename: str
+    size: int
+    output_path: str
+    signature: Optional[str] = None
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+
+
+class PipelinedBatchDownloader:
+    """Downloads a list of files from one device back to back."""
+
+    def __init__(
+        self,
+        jensen_device,
+        device_lock=None,
+        timeout_s: float = 180,
+        priority: CommandPriority = CommandPriority.BATCH_DOWNLOAD,
+    ):
+        """
+        Args:
+            jensen_device: Connected HiDockJensen instance.
+            device_lock: Lock held for the batch; the device's command scheduler if None.
+            timeout_s: Timeout for each file transfer.
+            priority: Scheduling class the batch runs at.
+        """
+        self.jensen = jensen_device
+        self.device_lock = device_lock if device_lock is not None else getattr(jensen_device, "command_scheduler", None)
+        self.timeout_s = timeout_s
+        self.priority = priority
+        self.last_report: Dict[str, Any] = {}
+
+    def run(
+        self,
+        items: List[BatchDownloadItem],
+        start_callback: Optional[Callable[[BatchDownloadItem], None]] = None,
+        progress_callback: Optional[Callable[[BatchDownloadItem, int, int], None]] = None,
+        finalize_callback: Optional[Callable[[BatchDownloadItem, str, Dict[str, Any]], None]] = None,
+        stop_event: Optional[threading.Event] = None,
+    ) -> Dict[str, Any]:
+        """
+        Download ``items`` in order.
+
+        Args:
+            items: Files to download.
+            start_callback: Called on the transfer thread before a file's transfer starts.
+            progress_callback: Called with (item, bytes_received, total) during a transfer.
+            finalize_callback: Called on the finalizer thread with (item, status, transfer
+                stats) once per item, including items that were cancelled or never
+                started; ``status`` is a ``stream_file`` status string.
+            stop_event: Set to stop the batch after the current file.
+
+        Returns:
+            dict: The batch report, also kept in ``last_report``.
+        """
+        transfer_s = yielded_s = 0.0
+        gaps: List[float] = []
+        statuses: Dict[str, str] = {}
+        byte_count = 0
+        downloader = ResumableDownloader(self.jensen)
+        finalizer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="BatchFinalize")
+        finalize_times: List[float] = []
+
+        def finalize(item, status, stats):
+            started = time.perf_counter()
+            try:
+                if finalize_callback:
+                    finalize_callback(item, status, stats)
+            except Exception as e:  # A failing callback must not stop the batch
+                logger.error("BatchTransfer", "finalize", "Finalizing %s failed: %s", item.filename, e)
+            finally:
+                finalize_times.append(time.perf_counter() - started)
+
+        with command_priority(self.priority), self.device_lock or nullcontext():
+            batch_start = time.perf_counter()
+            previous_end = None
+            for item in items:
+                if stop_event is not None and stop_event.is_set():
+                    status = "cancelled"
+                elif not self.jensen.is_connected():
+                    status = "fail_disconnected"
+                elif item.cancel_event.is_set():
+                    status = "cancelled"
+                else:
+                    status = None
+                if status is not None:
+                    statuses[item.filename] = status
+                    finalizer.submit(finalize, item, status, {})
+                    continue
+
+                if previous_end is not None:
+                    yield_started = time.perf_counter()
+                    if self._yield_between_files():
+                        yielded_s += time.perf_counter() - yield_started
+                        previous_end = time.perf_counter()
+
+                if start_callback:
+                    start_callback(item)
+                started = time.perf_counter()
+                if previous_end is not None:
+                    gaps.append(started - previous_end)
+                try:
+                    status = downloader.download(
+                        filename=item.filename,
+                        file_length=item.size,
+                        output_path=item.output_path,
+                        progress_callback=(
+                            (lambda received, total, item=item: progress_callback(item, received, total))
+                            if progress_callback
+                            else None
+                        ),
+                        timeout_s=self.timeout_s,
+                        cancel_event=item.cancel_event,
+                        signature=item.signature,
+                    )
+                except Exception as e:
+                    logger.error("BatchTransfer", "run", "Transfer of %s failed: %s", item.filename, e)
+                    status = "fail_exception"
+                previous_end = time.perf_counter()
+                transfer_s += previous_end - started
+                stats = dict(downloader.last_stats)
+                byte_count += stats.get("bytes_transferred", 0)
+                statuses[item.filename] = status
+                # Validation and cache updates happen while the next file is streaming
+                finalizer.submit(finalize, item, status, stats)
+            batch_end = previous_end or time.perf_counter()
+
+        finalizer.shutdown(wait=True)
+        self.last_report = self._report(
+            statuses, byte_count, batch_end - batch_start, transfer_s, yielded_s, gaps, sum(finalize_times)
+        )
+        logger.info(
+            "BatchTransfer",
+            "run",
+            "Batch of %d files: %d bytes in %.2f s, %.2f MB/s, link utilization %.1f%%, max gap %.1f ms",
+            len(items),
+            byte_count,
+            self.last_report["elapsed_s"],
+            self.last_report["mb_per_s"],
+            self.last_report["link_utilization"] * 100,
+            self.last_report["max_gap_ms"],
+        )
+        return self.last_report
+
+    def _yield_between_files(self) -> bool:
+        """Hand the device to a more urgent waiter, if the lock supports it."""
+        yield_point = getattr(self.device_lock, "yield_point", None)
+        return bool(yield_point()) if callable(yield_point) else False
+
+    @staticmethod
+    def _report(statuses, byte_count, elapsed_s, transfer_s, yielded_s, gaps, finalize_s) -> Dict[str, Any]:
+        """
+        Link utilization is transfer time over the time the batch held the
+        device; time yielded to other requests is left out of both.
+        """
+        held_s = max(elapsed_s - yielded_s, 0.0)
+        return {
+            "files": len(statuses),
+            "files_ok": sum(1 for status in statuses.values() if status == "OK"),
+            "statuses": statuses,
+            "bytes": byte_count,
+            "elapsed_s": round(elapsed_s, 3),
+            "transfer_s": round(transfer_s, 3),
+            "idle_s": round(max(held_s - transfer_s, 0.0), 3),
+            "yielded_s": round(yielded_s, 3),
+            "finalize_s": round(finalize_s, 3),
+            "link_utilization": round(min(transfer_s / held_s, 1.0), 4) if held_s > 0 else 0.0,
+            "max_gap_ms": round(max(gaps) * 1000, 2) if gaps else 0.0,
+            "mean_gap_ms": round(sum(gaps) / len(gaps) * 1000, 2) if gaps else 0.0,
+            "mb_per_s": round(byte_count / (1024 * 1024) / elapsed_s, 3) if elapsed_s > 0 else 0.0,
+        }
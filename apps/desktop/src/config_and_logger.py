@@ -46,6 +46,7 @@ def get_default_config() -> dict:
         "file_stream_timeout_s": 180,
         "auto_refresh_files": False,
         "auto_refresh_interval_s": 30,
+        "live_tail_recordings": False,
         "quit_without_prompt_if_connected": False,
         "appearance_mode": "System",
         "color_theme": "blue",
@@ -101,6 +102,7 @@ def _validate_and_merge_config(defaults, loaded_config):
     type_validators = {
         "autoconnect": bool,
         "auto_refresh_files": bool,
+        "live_tail_recordings": bool,
         "quit_without_prompt_if_connected": bool,
         "suppress_console_output": bool,
         "suppress_gui_log_output": bool,
@@ -441,18 +443,63 @@ class Logger:
         if file_logging_settings_changed or old_file_logging_enabled != new_file_logging_enabled:
             self._setup_file_logging()
 
-    def _log(self, level_str, module, procedure, message, force_level=None):
+    def _output_states(self, msg_level_val, force_level=None):
+        """
+        Decides which outputs accept a message of the given level.
+
+        Returns:
+            tuple: (console, gui, file) booleans.
+        """
+        console_threshold = force_level if force_level is not None else getattr(self, 'console_level', self.level)
+        console_enabled = self.config.get(
+            "enable_console_logging", not self.config.get("suppress_console_output", False)
+        )
+        gui_threshold = force_level if force_level is not None else getattr(self, 'gui_level', self.level)
+        gui_enabled = self.config.get("enable_gui_logging", not self.config.get("suppress_gui_log_output", False))
+        file_threshold = force_level if force_level is not None else getattr(self, 'file_level', self.level)
+        return (
+            console_enabled and msg_level_val >= console_threshold,
+            gui_enabled and msg_level_val >= gui_threshold and bool(self.gui_log_callback or self.gui_callbacks),
+            bool(self.log_file) and self.config.get("enable_file_logging", False) and msg_level_val >= file_threshold,
+        )
+
+    def is_enabled_for(self, level):
+        """
+        Checks whether a message of the given level would reach any output.
+
+        Use this to skip building expensive log messages (hex dumps, large
+        reprs) in hot paths:
+
+            if logger.is_enabled_for("DEBUG"):
+                logger.debug("Module", "proc", f"Data: {data.hex()}")
+
+        Args:
+            level (str or int): Level name (e.g. "DEBUG") or numeric value.
+
+        Returns:
+            bool: True if at least one output would write the message.
+        """
+        msg_level_val = level if isinstance(level, int) else self.LEVELS.get(str(level).upper())
+        if msg_level_val is None:
+            return False
+        return any(self._output_states(msg_level_val))
+
+    def _log(self, level_str, module, procedure, message, *args, force_level=None):
         """
         Internal logging method that handles message formatting and output.
         
         Now supports independent log levels for console, GUI, and file outputs.
         Each output type has its own threshold level that is checked independently.
+        The message is only formatted once at least one output accepts it.
 
         Args:
             level_str (str): The string representation of the log level (e.g., "info").
             module (str): The name of the module originating the log.
             procedure (str): The name of the function/method originating the log.
-            message (str): The log message.
+            message (str or callable): The log message. A callable is called with
+                no arguments to build the message; otherwise, if ``args`` are given,
+                the message is %-formatted with them.
+            *args: Arguments for %-style formatting of ``message``.
             force_level (int, optional): If provided, this level is used for the
                 check instead of individual output levels. Useful for internal logger messages.
         """
@@ -460,13 +507,23 @@ class Logger:
         if msg_level_val is None:
             return
 
+        console_output, gui_output, file_output = self._output_states(msg_level_val, force_level)
+        if not (console_output or gui_output or file_output):
+            return
+
+        if callable(message):
+            message = message()
+        elif args:
+            try:
+                message = message % args
+            except (TypeError, ValueError):
+                message = f"{message} {args}"
+
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
         base_log_message = f"[{timestamp}][{level_str.upper()}] {str(module)}::{str(procedure)} - {message}"
 
         # Console output - check if enabled and meets level threshold
-        console_threshold = force_level if force_level is not None else getattr(self, 'console_level', self.level)
-        console_enabled = self.config.get("enable_console_logging", not self.config.get("suppress_console_output", False))
-        if console_enabled and msg_level_val >= console_threshold:
+        if console_output:
             level_upper = level_str.upper()
             color_map = {
                 "ERROR": self.COLOR_RED,
@@ -484,9 +541,7 @@ class Logger:
                 print(console_message)
 
         # GUI output - check if enabled and meets level threshold
-        gui_threshold = force_level if force_level is not None else getattr(self, 'gui_level', self.level)
-        gui_enabled = self.config.get("enable_gui_logging", not self.config.get("suppress_gui_log_output", False))
-        if gui_enabled and msg_level_val >= gui_threshold:
+        if gui_output:
             # Call the original GUI callback if set
             if self.gui_log_callback:
                 self.gui_log_callback(base_log_message + "\n", level_str.upper())
@@ -500,10 +555,7 @@ class Logger:
                     print(f"[WARNING] Logger::_log - Error in GUI callback: {e}")
         
         # File output - check individual file level or force_level
-        file_threshold = force_level if force_level is not None else getattr(self, 'file_level', self.level)
-        if (self.log_file and 
-            self.config.get("enable_file_logging", False) and 
-            msg_level_val >= file_threshold):
+        if file_output:
             try:
                 self.log_file.write(base_log_message + "\n")
                 self.log_file.flush()
@@ -514,25 +566,28 @@ class Logger:
                     self.log_file.close()
                     self.log_file = None
 
-    def info(self, module, procedure, message):
+    # The level methods accept %-style args or a callable message, both of
+    # which are only formatted if the message is actually written.
+
+    def info(self, module, procedure, message, *args):
         """Logs a message with INFO level."""
-        self._log("info", module, procedure, message)
+        self._log("info", module, procedure, message, *args)
 
-    def debug(self, module, procedure, message):
+    def debug(self, module, procedure, message, *args):
         """Logs a message with DEBUG level."""
-        self._log("debug", module, procedure, message)
+        self._log("debug", module, procedure, message, *args)
 
-    def error(self, module, procedure, message):
+    def error(self, module, procedure, message, *args):
         """Logs a message with ERROR level."""
-        self._log("error", module, procedure, message)
+        self._log("error", module, procedure, message, *args)
 
-    def warning(self, module, procedure, message):
+    def warning(self, module, procedure, message, *args):
         """Logs a message with WARNING level."""
-        self._log("warning", module, procedure, message)
+        self._log("warning", module, procedure, message, *args)
 
-    def critical(self, module, procedure, message):
+    def critical(self, module, procedure, message, *args):
         """Logs a message with CRITICAL level."""
-        self._log("critical", module, procedure, message)
+        self._log("critical", module, procedure, message, *args)
 
     def close(self):
         """
@@ -7,11 +7,15 @@ IDeviceInterface, providing consistent API across platforms.
 
 # import asyncio  # Commented out - async functions use async/await but don't use asyncio directly
 # import threading  # Commented out - not used in current implementation
+import os
+import threading
 import time
 from datetime import datetime
 
 # from pathlib import Path  # Commented out - not used, may be needed for future file operations
-from typing import Callable, Dict, List, Optional  # Removed Any - not used
+from typing import Any, Callable, Dict, List, Optional
+
+import usb.core
 
 from config_and_logger import logger
 from constants import ALL_VENDOR_IDS, DEFAULT_PRODUCT_ID, DEFAULT_VENDOR_ID, HIDOCK_PRODUCT_IDS
@@ -28,7 +32,14 @@ from device_interface import (  # DeviceModel,  # Commented out - not used direc
     detect_device_model,
     get_model_capabilities,
 )
+from device_monitor import DEFAULT_POLL_INTERVAL_S, DeviceMonitor
+from file_list_snapshot import FileListSnapshotStore
 from hidock_device import HiDockJensen
+from resumable_download import ResumableDownloader
+from transfer_tuning import TransferProfileStore
+
+DEFAULT_SNAPSHOT_DIR = os.path.join(os.path.expanduser("~"), ".hidock", "cache", "file_lists")
+DEFAULT_TRANSFER_PROFILES_PATH = os.path.join(os.path.expanduser("~"), ".hidock", "cache", "transfer_profiles.json")
 
 
 class DesktopDeviceAdapter(IDeviceInterface):
@@ -36,17 +47,88 @@ class DesktopDeviceAdapter(IDeviceInterface):
     Desktop implementation of the unified device interface using HiDockJensen.
     """
 
-    def __init__(self, usb_backend=None):
+    def __init__(
+        self,
+        usb_backend=None,
+        snapshot_dir: Optional[str] = None,
+        transfer_profiles_path: Optional[str] = None,
+    ):
         """
         Initialize the desktop device adapter.
 
         Args:
             usb_backend: USB backend instance for HiDockJensen
+            snapshot_dir: Directory for per-device file list snapshots
+            transfer_profiles_path: JSON file holding the tuned transfer profile per device serial
         """
         self.jensen_device = HiDockJensen(usb_backend)
+        self.jensen_device.transfer_profile_store = TransferProfileStore(
+            transfer_profiles_path or DEFAULT_TRANSFER_PROFILES_PATH
+        )
+        self.snapshot_store = FileListSnapshotStore(snapshot_dir or DEFAULT_SNAPSHOT_DIR)
+        # FileListDelta of the last complete get_recordings call against the stored
+        # snapshot, or None when the whole list has to be treated as new
+        self.last_file_list_delta = None
+        # True when the last get_recordings call returned every file on the device
+        self.last_file_list_complete = False
         self.progress_callbacks: Dict[str, Callable[[OperationProgress], None]] = {}
         self._current_device_info: Optional[DeviceInfo] = None
         self._connection_start_time: Optional[datetime] = None
+        # Registry of attached units kept by hotplug events; see start_device_monitor
+        self.device_monitor: Optional[DeviceMonitor] = None
+        self.last_connect_latency_ms: Optional[float] = None
+        # Device signature per recording name from the latest file list, used to verify downloads
+        self._recording_signatures: Dict[str, Optional[str]] = {}
+        # One downloader per connection, so whether the device answers ranged reads is probed once
+        self._downloader: Optional[ResumableDownloader] = None
+        self._download_lock = threading.Lock()
+
+    def start_device_monitor(self, poll_interval_s: float = DEFAULT_POLL_INTERVAL_S) -> DeviceMonitor:
+        """
+        Track attached devices by hotplug events, or by polling where hotplug is
+        unavailable. Discovery and connects then use the monitor's registry
+        instead of scanning the USB bus.
+
+        Returns:
+            DeviceMonitor: The running monitor.
+        """
+        if self.device_monitor is None:
+            self.device_monitor = DeviceMonitor(self.jensen_device.usb_backend, poll_interval_s=poll_interval_s)
+            self.jensen_device.device_monitor = self.device_monitor
+        self.device_monitor.start()
+        return self.device_monitor
+
+    def stop_device_monitor(self) -> None:
+        """Stop hotplug tracking; discovery and connects scan the bus again."""
+        if self.device_monitor is not None:
+            self.device_monitor.stop()
+            self.jensen_device.device_monitor = None
+            self.device_monitor = None
+
+    def _discover_from_monitor(self) -> List[DeviceInfo]:
+        """Devices from the hotplug registry, with "vvvv:pppp@bus-address" ids."""
+        devices = []
+        for found_device in self.device_monitor.devices():
+            vid, pid = found_device.idVendor, found_device.idProduct
+            model = detect_device_model(vid, pid)
+            try:
+                serial_number = found_device.serial_number or "Unknown"
+            except (ValueError, NotImplementedError, usb.core.USBError):
+                serial_number = "Unknown"  # Busy devices cannot answer string descriptor requests
+            devices.append(
+                DeviceInfo(
+                    id=f"{vid:04x}:{pid:04x}@{found_device.bus}-{found_device.address}",
+                    name=f"HiDock {model.value}",
+                    model=model,
+                    serial_number=serial_number,
+                    firmware_version="1.0.0",  # Would need to be queried
+                    vendor_id=vid,
+                    product_id=pid,
+                    connected=False,
+                    last_seen=datetime.now(),
+                )
+            )
+        return devices
 
     async def discover_devices(self) -> List[DeviceInfo]:
         """
@@ -56,6 +138,9 @@ class DesktopDeviceAdapter(IDeviceInterface):
             List[DeviceInfo]: List of discovered devices
         """
         try:
+            if self.device_monitor is not None and self.device_monitor.mode is not None:
+                return self._discover_from_monitor()
+
             # For desktop, we can try to find devices by attempting connection
             # This is a simplified implementation - in practice, you might want
             # to scan USB devices more systematically
@@ -112,7 +197,9 @@ class DesktopDeviceAdapter(IDeviceInterface):
         Connect to a HiDock device.
 
         Args:
-            device_id: Specific device ID to connect to, or None for first available
+            device_id: Specific device ID to connect to, or None for first available.
+                "vvvv:pppp" selects a model; "vvvv:pppp@bus-address" selects one unit
+                when several of the same model are docked.
             auto_retry: Whether to automatically retry on connection failure
             force_reset: Whether to force a device state reset before connecting
 
@@ -122,8 +209,18 @@ class DesktopDeviceAdapter(IDeviceInterface):
         try:
             self._connection_start_time = datetime.now()
 
-            # Extract VID/PID from device_id if provided
+            # Extract VID/PID and an optional bus-address location from device_id
             vid, pid = DEFAULT_VENDOR_ID, DEFAULT_PRODUCT_ID
+            location_kwargs = {}
+            if device_id and "@" in device_id:
+                device_id, location_str = device_id.split("@", 1)
+                try:
+                    bus_str, address_str = location_str.split("-")
+                    location_kwargs["location"] = (int(bus_str), int(address_str))
+                except ValueError:
+                    logger.warning(
+                        "DesktopDeviceAdapter", "connect", f"Invalid device location: {location_str}, ignoring it"
+                    )
             if device_id and ":" in device_id:
                 try:
                     vid_str, pid_str = device_id.split(":")
@@ -135,7 +232,12 @@ class DesktopDeviceAdapter(IDeviceInterface):
 
             # Connect using the Jensen device with optional force reset
             success, error_msg = self.jensen_device.connect(
-                target_interface_number=0, vid=vid, pid=pid, auto_retry=auto_retry, force_reset=force_reset
+                target_interface_number=0,
+                vid=vid,
+                pid=pid,
+                auto_retry=auto_retry,
+                force_reset=force_reset,
+                **location_kwargs,
             )
 
             if not success:
@@ -147,7 +249,12 @@ class DesktopDeviceAdapter(IDeviceInterface):
                         "Connection failed with timeout, retrying with device reset",
                     )
                     success, error_msg = self.jensen_device.connect(
-                        target_interface_number=0, vid=vid, pid=pid, auto_retry=False, force_reset=True
+                        target_interface_number=0,
+                        vid=vid,
+                        pid=pid,
+                        auto_retry=False,
+                        force_reset=True,
+                        **location_kwargs,
                     )
 
                 if not success:
@@ -157,8 +264,11 @@ class DesktopDeviceAdapter(IDeviceInterface):
             device_info_raw = self.jensen_device.get_device_info() or {}
             model = detect_device_model(vid, pid)
 
+            device_key = f"{vid:04x}:{pid:04x}"
+            if location_kwargs:
+                device_key += "@%d-%d" % location_kwargs["location"]
             self._current_device_info = DeviceInfo(
-                id=f"{vid:04x}:{pid:04x}",
+                id=device_key,
                 name=f"HiDock {model.value}",
                 model=model,
                 serial_number=device_info_raw.get("sn", "Unknown"),
@@ -168,12 +278,14 @@ class DesktopDeviceAdapter(IDeviceInterface):
                 connected=True,
                 connection_time=self._connection_start_time,
             )
+            self._downloader = ResumableDownloader(self.jensen_device)
 
             logger.info(
                 "DesktopDeviceAdapter",
                 "connect",
                 f"Successfully connected to {self._current_device_info.name}",
             )
+            self._log_connect_latency()
             return self._current_device_info
 
         except Exception as e:
@@ -185,12 +297,31 @@ class DesktopDeviceAdapter(IDeviceInterface):
                 logger.error("DesktopDeviceAdapter", "connect", f"Connection failed: {e}")
             raise ConnectionError(f"Failed to connect to device: {e}")
 
+    def _log_connect_latency(self) -> None:
+        """Log how long after the device appeared (or the monitor started) the connection was up."""
+        location = getattr(self.jensen_device, "usb_location", None)
+        if self.device_monitor is None or not location:
+            return
+        arrived = self.device_monitor.arrival_time(location)
+        if arrived is None:
+            return
+        self.last_connect_latency_ms = (time.monotonic() - arrived) * 1000
+        logger.info(
+            "DesktopDeviceAdapter",
+            "connect",
+            "Connected %.0f ms after the device was detected (%s; %d bus scans by HiDockJensen so far)",
+            self.last_connect_latency_ms,
+            self.device_monitor.mode,
+            self.jensen_device._operation_stats.get("bus_scans", 0),
+        )
+
     async def disconnect(self) -> None:
         """Disconnect from the current device."""
         try:
             self.jensen_device.disconnect()
             self._current_device_info = None
             self._connection_start_time = None
+            self._downloader = None
             logger.info("DesktopDeviceAdapter", "disconnect", "Device disconnected successfully")
         except Exception as e:
             logger.error("DesktopDeviceAdapter", "disconnect", f"Disconnect failed: {e}")
@@ -275,16 +406,32 @@ class DesktopDeviceAdapter(IDeviceInterface):
             )
             raise
 
-    async def get_recordings(self) -> List[AudioRecording]:
-        """Get list of audio recordings on the device."""
+    async def get_recordings(
+        self, entries_callback: Optional[Callable[[List[Dict], int, Optional[int]], None]] = None
+    ) -> List[AudioRecording]:
+        """
+        Get list of audio recordings on the device.
+
+        Args:
+            entries_callback: Optional callback receiving (new_entries, parsed_count, expected_count)
+                while the list is still being transferred, for progressive display.
+        """
         if not self.is_connected():
             raise ConnectionError("No device connected")
 
+        self.last_file_list_delta = None
+        self.last_file_list_complete = False
         try:
-            # Use retry mechanism to handle incomplete transfers more robustly
-            files_info = self.jensen_device.list_files_with_retry(timeout_s=20, max_retries=2)
+            # Reuse the on-disk snapshot when the card is unchanged; otherwise fetch
+            # with the retry mechanism to handle incomplete transfers more robustly
+            files_info = self.jensen_device.list_files_with_snapshot(
+                self.snapshot_store, timeout_s=20, max_retries=2, entries_callback=entries_callback
+            )
             if not files_info or "files" not in files_info:
                 return []
+            self._recording_signatures.update(
+                (entry.get("name"), entry.get("signature")) for entry in files_info["files"]
+            )
 
             # Check for errors in the response
             if "error" in files_info:
@@ -332,6 +479,10 @@ class DesktopDeviceAdapter(IDeviceInterface):
                     f"Incomplete file list: {len(files_info['files'])}/{files_info.get('expected', '?')} files"
                 )
 
+            if files_info.get("complete"):
+                self.last_file_list_complete = True
+                self.last_file_list_delta = files_info.get("delta")
+
             # Return the raw file info dictionaries directly, as the GUI expects this format.
             return files_info["files"]
 
@@ -363,8 +514,9 @@ class DesktopDeviceAdapter(IDeviceInterface):
                 # Return None during streaming to avoid collisions
                 return None
 
-            # This is a lightweight command to check for an active recording
-            recording_info = self.jensen_device.get_recording_file()
+            # This is a lightweight command to check for an active recording. It always
+            # asks the device: a changed answer is what invalidates the cached card state.
+            recording_info = self.jensen_device.get_recording_file(use_cache=False)
             if not recording_info or not recording_info.get("name"):
                 return None
 
@@ -385,8 +537,14 @@ class DesktopDeviceAdapter(IDeviceInterface):
         output_path: str,
         progress_callback: Optional[Callable[[OperationProgress], None]] = None,
         file_size: Optional[int] = None,
-    ) -> None:
-        """Download an audio recording from the device directly to a file."""
+    ) -> Dict[str, Any]:
+        """
+        Download an audio recording from the device directly to a file.
+
+        Returns:
+            dict: ResumableDownloader stats of this transfer, including the MD5
+            computed while writing and whether it matched the device signature.
+        """
         if not self.is_connected():
             raise ConnectionError("No device connected")
 
@@ -413,45 +571,50 @@ class DesktopDeviceAdapter(IDeviceInterface):
                     raise FileNotFoundError(f"Recording {recording_id} not found")
                 recording_filename = recording['name']
                 recording_size = recording['length']
+            signature = self._recording_signatures.get(recording_filename)
 
             # Set up progress tracking
             if progress_callback:
                 self.add_progress_listener(f"download_{recording_id}", progress_callback)
 
-            # Open output file for streaming write
-            bytes_written = 0
-
-            with open(output_path, "wb") as output_file:
-
-                def data_callback(chunk: bytes):
-                    nonlocal bytes_written
-                    output_file.write(chunk)
-                    bytes_written += len(chunk)
-
-                def progress_update(bytes_received: int, total_bytes: int):
-                    if progress_callback:
-                        progress = OperationProgress(
-                            operation_id=f"download_{recording_id}",
-                            operation_name=f"Downloading {recording_filename}",
-                            progress=(bytes_received / total_bytes if total_bytes > 0 else 0.0),
-                            status=OperationStatus.IN_PROGRESS,
-                            bytes_processed=bytes_received,
-                            total_bytes=total_bytes,
-                            start_time=datetime.now(),
-                        )
-                        progress_callback(progress)
-
-                # Use Jensen device to stream the file directly to disk
-                result = self.jensen_device.stream_file(
+            def progress_update(bytes_received: int, total_bytes: int):
+                if progress_callback:
+                    progress = OperationProgress(
+                        operation_id=f"download_{recording_id}",
+                        operation_name=f"Downloading {recording_filename}",
+                        progress=(bytes_received / total_bytes if total_bytes > 0 else 0.0),
+                        status=OperationStatus.IN_PROGRESS,
+                        bytes_processed=bytes_received,
+                        total_bytes=total_bytes,
+                        start_time=datetime.now(),
+                    )
+                    progress_callback(progress)
+
+            # Stream to disk through a background writer so slow disk writes never
+            # stall the USB reader. An interrupted transfer leaves a checkpoint next
+            # to the partial file, and the next attempt resumes with ranged reads.
+            with self._download_lock:
+                if self._downloader is None:  # Device connected without connect()
+                    self._downloader = ResumableDownloader(self.jensen_device)
+                result = self._downloader.download(
                     filename=recording_filename,
                     file_length=recording_size,
-                    data_callback=data_callback,
+                    output_path=str(output_path),
                     progress_callback=progress_update,
                     timeout_s=180,
+                    signature=signature,
                 )
+                transfer_stats = dict(self._downloader.last_stats)
 
-                if result != "OK":
-                    raise RuntimeError(f"Download failed: {result}")
+            if result != "OK":
+                raise RuntimeError(f"Download failed: {result}")
+            logger.info(
+                "DesktopDeviceAdapter",
+                "download_recording",
+                f"Downloaded {recording_filename}: {transfer_stats['bytes_transferred']} bytes transferred at "
+                f"{transfer_stats['mb_per_s']:.2f} MB/s ({transfer_stats['mode']}, "
+                f"resumed from byte {transfer_stats['resumed_from']})",
+            )
 
             # Final progress update
             if progress_callback:
@@ -460,10 +623,12 @@ class DesktopDeviceAdapter(IDeviceInterface):
                     operation_name=f"Downloaded {recording_filename}",
                     progress=1.0,
                     status=OperationStatus.COMPLETED,
-                    bytes_processed=bytes_written,
+                    message=f"{transfer_stats['mb_per_s']:.2f} MB/s",
+                    bytes_processed=transfer_stats["bytes_on_disk"],
                     total_bytes=recording_size,
                 )
                 progress_callback(final_progress)
+            return transfer_stats
 
         except Exception as e:
             logger.error("DesktopDeviceAdapter", "download_recording", f"Download failed: {e}")
@@ -506,6 +671,7 @@ class DesktopDeviceAdapter(IDeviceInterface):
 
             # Delete using Jensen device - pass filename directly
             result = self.jensen_device.delete_file(filename)
+            self._invalidate_file_list_snapshot()
 
             if result.get("result") != "success":
                 raise RuntimeError(f"Delete failed: {result.get('result', 'unknown error')}")
@@ -551,6 +717,7 @@ class DesktopDeviceAdapter(IDeviceInterface):
                 )
 
             result = self.jensen_device.format_card()
+            self._invalidate_file_list_snapshot()
 
             if result.get("result") != "success":
                 raise RuntimeError(f"Format failed: {result.get('result', 'unknown error')}")
@@ -579,6 +746,12 @@ class DesktopDeviceAdapter(IDeviceInterface):
                 )
             raise
 
+    def _invalidate_file_list_snapshot(self) -> None:
+        """Drop the stored file list of the connected device after it was modified."""
+        device_info = getattr(self.jensen_device, "device_info", None)
+        if isinstance(device_info, dict):
+            self.snapshot_store.invalidate(device_info.get("sn"))
+
     async def sync_time(self, target_time: Optional[datetime] = None) -> None:
         """Synchronize device time."""
         if not self.is_connected():
@@ -0,0 +1,769 @@
+"""
+In-process emulator of a HiDock device speaking the Jensen protocol.
+
+Throughput and load testing should not depend on real hardware being
+attached. ``JensenDeviceEmulator`` answers Jensen commands the way the
+firmware does: 0x1234 framed packets, responses echo the request's
+sequence ID, ``CMD_GET_FILE_LIST`` is sent in chunks behind a 0xFFFF count
+header and closed by an empty packet, and ``CMD_TRANSFER_FILE`` streams the
+recording in data packets. File blocks, card info, recording status, device
+time and settings are emulated too.
+
+``EmulatedUSBBackend`` is a PyUSB backend that exposes emulators as USB
+devices, so ``HiDockJensen`` and everything above it run unmodified through
+the existing ``usb_backend_instance_ref`` seam::
+
+    emulator = JensenDeviceEmulator(generate_catalog(10000), LinkProfile(bandwidth_bytes_per_s=4e6))
+    jensen = HiDockJensen(EmulatedUSBBackend([emulator]))
+    jensen.connect()
+
+``LinkProfile`` shapes the link: response latency, bandwidth, USB packet
+size, device stalls and dropped response packets. Recordings have synthetic
+content generated on demand, so catalogs of 10k+ files cost no memory.
+
+``bulk_download.py --emulate N`` and the desktop app (``HIDOCK_EMULATOR=N``
+environment variable, see ``backend_from_environment``) use the emulator for
+end-to-end benchmarks.
+"""
+
+import hashlib
+import os
+import random
+import struct
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import usb.backend
+import usb.core
+
+from config_and_logger import logger
+from constants import (
+    CMD_DELETE_FILE,
+    CMD_FORMAT_CARD,
+    CMD_GET_CARD_INFO,
+    CMD_GET_DEVICE_INFO,
+    CMD_GET_DEVICE_TIME,
+    CMD_GET_FILE_BLOCK,
+    CMD_GET_FILE_COUNT,
+    CMD_GET_FILE_LIST,
+    CMD_GET_RECORDING_FILE,
+    CMD_GET_SETTINGS,
+    CMD_SET_DEVICE_TIME,
+    CMD_SET_SETTINGS,
+    CMD_TRANSFER_FILE,
+    DEFAULT_PRODUCT_ID,
+    DEFAULT_VENDOR_ID,
+    EP_IN_ADDR,
+    EP_OUT_ADDR,
+)
+
+_PACKET_HEADER = struct.Struct(">HHII")
+_SYNC_WORD = 0x1234
+_SYNC_MARKER = b"\x12\x34"
+_PATTERN_SIZE = 4096
+
+EMULATOR_ENV_VAR = "HIDOCK_EMULATOR"
+
+
+@dataclass
+class LinkProfile:
+    """Timing and fault behaviour of the emulated USB link."""
+
+    latency_s: float = 0.002  # Delay between a command and its first response packet
+    bandwidth_bytes_per_s: Optional[float] = None  # None for an unthrottled link
+    max_packet_size: int = 512  # wMaxPacketSize of the bulk endpoints
+    transfer_chunk_size: int = 4096  # File bytes per CMD_TRANSFER_FILE response packet
+    file_list_chunk_size: int = 4096  # Bytes per CMD_GET_FILE_LIST response packet
+    stall_probability: float = 0.0  # Chance the device pauses before a response packet
+    stall_s: float = 0.5
+    drop_probability: float = 0.0  # Chance a response packet is lost
+    seed: Optional[int] = None
+
+
+@dataclass
+class EmulatedRecording:
+    """A recording stored on the emulated device."""
+
+    name: str
+    length: int
+    version: int = 1
+    data: Optional[bytes] = None  # Explicit content; synthetic content derived from the name otherwise
+    signature: Optional[bytes] = None  # 16-byte list signature; derived when None
+    recording_since: Optional[float] = None  # Set while the recording is still growing
+    bytes_per_s: int = 0
+    _pattern: Optional[bytes] = field(default=None, repr=False, compare=False)
+
+    def current_length(self) -> int:
+        """Length in bytes; grows with time while the recording is in progress."""
+        if self.recording_since is None:
+            return self.length
+        return self.length + int((time.monotonic() - self.recording_since) * self.bytes_per_s)
+
+    def read(self, offset: int, length: int) -> bytes:
+        """Content bytes in ``[offset, offset + length)``, clipped to the current length."""
+        end = min(offset + length, self.current_length())
+        if end <= offset:
+            return b""
+        if self.data is not None:
+            return self.data[offset:end]
+        if self._pattern is None:
+            self._pattern = hashlib.sha256(self.name.encode()).digest() * (_PATTERN_SIZE // 32)
+        start = offset % _PATTERN_SIZE
+        repeats = (start + end - offset) // _PATTERN_SIZE + 1
+        return (self._pattern * repeats)[start : start + end - offset]
+
+    def content_md5(self) -> bytes:
+        """MD5 digest of the full content."""
+        digest = hashlib.md5()
+        length = self.current_length()
+        for offset in range(0, length, 1024 * 1024):
+            digest.update(self.read(offset, 1024 * 1024))
+        return digest.digest()
+
+
+def generate_catalog(
+    count: int,
+    start: datetime = datetime(2024, 1, 1, 8, 0, 0),
+    min_size: int = 32_000,
+    max_size: int = 2_000_000,
+    seed: int = 0,
+) -> List[EmulatedRecording]:
+    """
+    Build a synthetic catalog of ``count`` recordings with device-style names.
+
+    Names follow the firmware's ``2024Jan01-080000-Rec00.hda`` pattern and are
+    spaced 37 minutes apart, oldest first.
+    """
+    rng = random.Random(seed)
+    recordings = []
+    for i in range(count):
+        stamp = start + timedelta(minutes=37 * i)
+        recordings.append(
+            EmulatedRecording(
+                name=f"{stamp:%Y%b%d-%H%M%S}-Rec{i % 100:02d}.hda",
+                length=rng.randint(min_size, max_size),
+                version=1,
+            )
+        )
+    return recordings
+
+
+def _frame(command_id: int, sequence_id: int, body: bytes) -> bytes:
+    return _PACKET_HEADER.pack(_SYNC_WORD, command_id, sequence_id, len(body)) + body
+
+
+def _to_bcd(value: int) -> int:
+    return (value // 10 << 4) | (value % 10)
+
+
+def _from_bcd(value: int) -> int:
+    return (value >> 4) * 10 + (value & 0x0F)
+
+
+class _PendingResponse:
+    __slots__ = ("packets", "ready_at")
+
+    def __init__(self, packets: Iterator[bytes], ready_at: float):
+        self.packets = packets
+        self.ready_at = ready_at
+
+
+class JensenDeviceEmulator:
+    """
+    Emulates the device side of the Jensen protocol.
+
+    The host writes command packets with ``write`` and reads response bytes
+    with ``read``, which behaves like a bulk IN transfer: it returns at most
+    ``size`` bytes, ends early on a short USB packet and raises
+    ``usb.core.USBTimeoutError`` when nothing arrives in time.
+    """
+
+    def __init__(
+        self,
+        recordings: Optional[Iterable[EmulatedRecording]] = None,
+        profile: Optional[LinkProfile] = None,
+        serial: str = "EMU0000000001",
+        firmware: bytes = bytes([0x00, 0x06, 0x02, 0x04]),
+        vendor_id: int = DEFAULT_VENDOR_ID,
+        product_id: int = DEFAULT_PRODUCT_ID,
+        card_capacity_mb: int = 30_000,
+        md5_signatures: bool = False,
+    ):
+        """
+        Args:
+            recordings: Initial recordings, oldest first.
+            profile: Link behaviour; defaults to a fast, fault-free link.
+            serial: Serial number reported by CMD_GET_DEVICE_INFO.
+            firmware: Four version bytes reported by CMD_GET_DEVICE_INFO.
+            vendor_id: USB vendor ID of the emulated device.
+            product_id: USB product ID of the emulated device.
+            card_capacity_mb: Capacity reported by CMD_GET_CARD_INFO.
+            md5_signatures: Report the MD5 of each recording's content as its
+                list signature (costs a pass over the content on first listing);
+                otherwise a cheap digest of name and length is used.
+        """
+        self.profile = profile or LinkProfile()
+        self.serial = serial
+        self.firmware = bytes(firmware)
+        self.vendor_id = vendor_id
+        self.product_id = product_id
+        self.card_capacity_mb = card_capacity_mb
+        self.md5_signatures = md5_signatures
+        self.settings = bytearray([0, 0, 1, 1])  # autoRecord, autoPlay, bluetoothTone, notificationSound
+        self.attached = True
+
+        self._recordings: Dict[str, EmulatedRecording] = {rec.name: rec for rec in recordings or ()}
+        self._live_recording: Optional[EmulatedRecording] = None
+        self._time_offset = timedelta(0)
+        self._rng = random.Random(self.profile.seed)
+        self._lock = threading.RLock()
+
+        self._rx = bytearray()
+        self._responses: deque = deque()
+        self._packet: Optional[memoryview] = None
+        self._packet_pos = 0
+        self._packet_ready_at = 0.0
+        self._link_free_at = 0.0
+
+        self.stats = Counter()
+        self.commands = Counter()
+
+    # --- Catalog ---
+
+    @property
+    def recordings(self) -> List[EmulatedRecording]:
+        """Recordings in device order (oldest first)."""
+        with self._lock:
+            return list(self._recordings.values())
+
+    def add_recording(self, recording: EmulatedRecording) -> None:
+        with self._lock:
+            self._recordings[recording.name] = recording
+
+    def remove_recording(self, name: str) -> bool:
+        with self._lock:
+            return self._recordings.pop(name, None) is not None
+
+    def start_recording(self, name: Optional[str] = None, bytes_per_s: int = 16_000) -> EmulatedRecording:
+        """Start a recording whose length grows by ``bytes_per_s`` until stopped."""
+        with self._lock:
+            if self._live_recording is not None:
+                self.stop_recording()
+            now = datetime.now() + self._time_offset
+            recording = EmulatedRecording(
+                name=name or f"{now:%Y%b%d-%H%M%S}-Rec{len(self._recordings) % 100:02d}.hda",
+                length=0,
+                recording_since=time.monotonic(),
+                bytes_per_s=bytes_per_s,
+            )
+            self._recordings[recording.name] = recording
+            self._live_recording = recording
+            return recording
+
+    def stop_recording(self) -> Optional[EmulatedRecording]:
+        """Finish the recording in progress at its current length."""
+        with self._lock:
+            recording = self._live_recording
+            if recording is not None:
+                recording.length = recording.current_length()
+                recording.recording_since = None
+                recording.signature = None
+                self._live_recording = None
+            return recording
+
+    # --- Host side I/O ---
+
+    def reset(self) -> None:
+        """Drop partially received commands and all queued responses."""
+        with self._lock:
+            self._rx.clear()
+            self._responses.clear()
+            self._packet = None
+
+    def write(self, data) -> int:
+        """Accept command bytes from the host (bulk OUT)."""
+        with self._lock:
+            self._check_attached()
+            self._rx.extend(data)
+            self.stats["bytes_in"] += len(data)
+            self._process_commands()
+            return len(data)
+
+    def read(self, size: int, timeout_ms: Optional[int] = None) -> bytes:
+        """
+        Return response bytes for the host (bulk IN).
+
+        Raises:
+            usb.core.USBTimeoutError: If no data becomes ready within ``timeout_ms``.
+            usb.core.USBError: If the device has been detached.
+        """
+        deadline = time.monotonic() + timeout_ms / 1000.0 if timeout_ms else None
+        while True:
+            with self._lock:
+                self._check_attached()
+                out, wait_s = self._collect(size, time.monotonic())
+            if out:
+                break
+            if wait_s is None:
+                wait_s = 0.001  # Nothing queued; poll until the deadline
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.stats["read_timeouts"] += 1
+                    raise usb.core.USBTimeoutError("Operation timed out", -7, 110)
+                wait_s = min(wait_s, remaining)
+            time.sleep(wait_s)
+
+        bandwidth = self.profile.bandwidth_bytes_per_s
+        if bandwidth:
+            now = time.monotonic()
+            with self._lock:
+                self._link_free_at = max(self._link_free_at, now) + len(out) / bandwidth
+                delay = self._link_free_at - now
+            if delay > 0.0005:
+                time.sleep(delay)
+        self.stats["bytes_out"] += len(out)
+        return bytes(out)
+
+    def _check_attached(self):
+        if not self.attached:
+            raise usb.core.USBError("No such device (it may have been disconnected)", -4, 19)
+
+    def _collect(self, size: int, now: float):
+        """Gather up to ``size`` ready bytes; returns (bytes, seconds until more data is ready)."""
+        out = bytearray()
+        max_packet = self.profile.max_packet_size
+        while len(out) < size:
+            if self._packet is None and not self._next_packet(now):
+                return out, None
+            if self._packet_ready_at > now:
+                return out, self._packet_ready_at - now
+            packet = self._packet
+            take = min(size - len(out), len(packet) - self._packet_pos)
+            out += packet[self._packet_pos : self._packet_pos + take]
+            self._packet_pos += take
+            if self._packet_pos >= len(packet):
+                self._packet = None
+                if len(packet) % max_packet:
+                    break  # A short USB packet ends the bulk transfer
+        return out, None
+
+    def _next_packet(self, now: float) -> bool:
+        """Move the next response packet into place, applying drops and stalls."""
+        profile = self.profile
+        while self._responses:
+            response = self._responses[0]
+            packet = next(response.packets, None)
+            if packet is None:
+                self._responses.popleft()
+                continue
+            ready_at = response.ready_at
+            response.ready_at = 0.0  # Latency applies to the first packet only
+            if profile.drop_probability and self._rng.random() < profile.drop_probability:
+                self.stats["dropped_packets"] += 1
+                continue
+            if profile.stall_probability and self._rng.random() < profile.stall_probability:
+                self.stats["stalls"] += 1
+                ready_at = max(ready_at, now) + profile.stall_s
+            self._packet = memoryview(packet)
+            self._packet_pos = 0
+            self._packet_ready_at = ready_at
+            return True
+        return False
+
+    # --- Command handling ---
+
+    def _process_commands(self):
+        rx = self._rx
+        while True:
+            start = rx.find(_SYNC_MARKER)
+            if start == -1:
+                rx.clear()
+                return
+            if start:
+                del rx[:start]
+            if len(rx) < _PACKET_HEADER.size:
+                return
+            _, command_id, sequence_id, body_len = _PACKET_HEADER.unpack_from(rx)
+            body_len &= 0x00FFFFFF
+            end = _PACKET_HEADER.size + body_len
+            if len(rx) < end:
+                return
+            body = bytes(rx[_PACKET_HEADER.size : end])
+            del rx[:end]
+            self.commands[command_id] += 1
+            bodies = self._handle(command_id, body)
+            packets = (_frame(command_id, sequence_id, chunk) for chunk in bodies)
+            self._responses.append(_PendingResponse(packets, time.monotonic() + self.profile.latency_s))
+
+    def _handle(self, command_id: int, body: bytes) -> Iterator[bytes]:
+        handler = self._HANDLERS.get(command_id)
+        if handler is None:
+            logger.debug("DeviceEmulator", "_handle", "Unsupported command %s, sending empty response", command_id)
+            return iter((b"",))
+        return handler(self, body)
+
+    def _signature(self, recording: EmulatedRecording) -> bytes:
+        if recording.signature is None or recording.recording_since is not None:
+            if self.md5_signatures:
+                signature = recording.content_md5()
+            else:
+                signature = hashlib.md5(f"{recording.name}:{recording.current_length()}".encode()).digest()
+            if recording.recording_since is not None:
+                return signature
+            recording.signature = signature
+        return recording.signature
+
+    def _handle_device_info(self, body: bytes) -> Iterator[bytes]:
+        yield self.firmware + self.serial.encode("ascii")[:16].ljust(16, b"\x00")
+
+    def _handle_file_count(self, body: bytes) -> Iterator[bytes]:
+        yield struct.pack(">I", len(self._recordings))
+
+    def _handle_file_list(self, body: bytes) -> Iterator[bytes]:
+        recordings = list(self._recordings.values())
+        data = bytearray(b"\xff\xff" + struct.pack(">I", len(recordings)))
+        for recording in recordings:
+            name = recording.name.encode("ascii", errors="ignore")
+            data.append(recording.version)
+            data += struct.pack(">I", len(name))[1:]
+            data += name
+            data += struct.pack(">I", recording.current_length())
+            data += bytes(6)
+            data += self._signature(recording)
+        chunk_size = self.profile.file_list_chunk_size
+        view = memoryview(bytes(data))
+        for pos in range(0, len(view), chunk_size):
+            yield bytes(view[pos : pos + chunk_size])
+        yield b""  # Terminator
+
+    def _handle_transfer_file(self, body: bytes) -> Iterator[bytes]:
+        recording = self._recordings.get(body.decode("ascii", errors="ignore"))
+        if recording is None:
+            yield b""
+            return
+        chunk_size = self.profile.transfer_chunk_size
+        length = recording.current_length()
+        for offset in range(0, length, chunk_size):
+            yield recording.read(offset, min(chunk_size, length - offset))
+
+    def _handle_file_block(self, body: bytes) -> Iterator[bytes]:
+        offset, length = struct.unpack_from(">II", body)
+        recording = self._recordings.get(body[8:].decode("ascii", errors="ignore"))
+        yield recording.read(offset, length) if recording else b""
+
+    def _handle_delete(self, body: bytes) -> Iterator[bytes]:
+        name = body.decode("ascii", errors="ignore")
+        if self._live_recording is not None and self._live_recording.name == name:
+            yield b"\x02"  # The recording in progress cannot be deleted
+            return
+        yield b"\x00" if self._recordings.pop(name, None) else b"\x01"
+
+    def _handle_format(self, body: bytes) -> Iterator[bytes]:
+        self.stop_recording()
+        self._recordings.clear()
+        yield b"\x00"
+
+    def _handle_card_info(self, body: bytes) -> Iterator[bytes]:
+        used_mb = sum(rec.current_length() for rec in self._recordings.values()) // (1024 * 1024)
+        yield struct.pack(">III", used_mb, self.card_capacity_mb, 0)
+
+    def _handle_recording_file(self, body: bytes) -> Iterator[bytes]:
+        if self._live_recording is not None:
+            yield self._live_recording.name.encode("ascii")
+        elif self._recordings:
+            yield next(reversed(self._recordings)).encode("ascii")  # Last recorded file
+        else:
+            yield b""
+
+    def _handle_get_time(self, body: bytes) -> Iterator[bytes]:
+        now = datetime.now() + self._time_offset
+        yield bytes(
+            _to_bcd(value)
+            for value in (now.year // 100, now.year % 100, now.month, now.day, now.hour, now.minute, now.second)
+        )
+
+    def _handle_set_time(self, body: bytes) -> Iterator[bytes]:
+        try:
+            digits = [_from_bcd(b) for b in body[:7]]
+            target = datetime(digits[0] * 100 + digits[1], *digits[2:7])
+        except (IndexError, TypeError, ValueError):
+            yield b"\x01"
+            return
+        self._time_offset = target - datetime.now()
+        yield b"\x00"
+
+    def _handle_get_settings(self, body: bytes) -> Iterator[bytes]:
+        yield bytes(self.settings)
+
+    def _handle_set_settings(self, body: bytes) -> Iterator[bytes]:
+        self.settings[: len(body[:4])] = body[:4]
+        yield b"\x00"
+
+    _HANDLERS = {
+        CMD_GET_DEVICE_INFO: _handle_device_info,
+        CMD_GET_FILE_COUNT: _handle_file_count,
+        CMD_GET_FILE_LIST: _handle_file_list,
+        CMD_TRANSFER_FILE: _handle_transfer_file,
+        CMD_GET_FILE_BLOCK: _handle_file_block,
+        CMD_DELETE_FILE: _handle_delete,
+        CMD_FORMAT_CARD: _handle_format,
+        CMD_GET_CARD_INFO: _handle_card_info,
+        CMD_GET_RECORDING_FILE: _handle_recording_file,
+        CMD_GET_DEVICE_TIME: _handle_get_time,
+        CMD_SET_DEVICE_TIME: _handle_set_time,
+        CMD_GET_SETTINGS: _handle_get_settings,
+        CMD_SET_SETTINGS: _handle_set_settings,
+    }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Byte counts, command counts and injected faults."""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["commands"] = dict(self.commands)
+            stats["recordings"] = len(self._recordings)
+            return stats
+
+
+# --- PyUSB backend ---
+
+
+_HOTPLUG_ARRIVED = 0x01  # LIBUSB_HOTPLUG_EVENT_DEVICE_ARRIVED
+_HOTPLUG_LEFT = 0x02  # LIBUSB_HOTPLUG_EVENT_DEVICE_LEFT
+
+
+class _Descriptor:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+class _EmulatedUSBDevice:
+    """Backend-side identity of one attached emulator."""
+
+    def __init__(self, emulator: JensenDeviceEmulator, address: int):
+        self.emulator = emulator
+        self.address = address
+        self.strings = {1: "HiDock", 2: "HiDock (emulated)", 3: emulator.serial}
+
+
+class _DeviceHandle:
+    def __init__(self, device: _EmulatedUSBDevice):
+        self.device = device
+        self.emulator = device.emulator
+        self.configuration = 1
+
+
+class EmulatedUSBBackend(usb.backend.IBackend):
+    """PyUSB backend whose devices are ``JensenDeviceEmulator`` instances."""
+
+    def __init__(self, emulators: Iterable[JensenDeviceEmulator] = ()):
+        self._lock = threading.Lock()
+        self._devices: List[_EmulatedUSBDevice] = []
+        self._next_address = 1
+        self._hotplug_callbacks: Dict[int, Callable[[int, _EmulatedUSBDevice], None]] = {}
+        self._next_hotplug_handle = 1
+        self.enumerations = 0  # Bus scans made through this backend
+        for emulator in emulators:
+            self.attach(emulator)
+
+    def attach(self, emulator: JensenDeviceEmulator) -> None:
+        """Plug an emulator in; it shows up in the next enumeration and hotplug callbacks."""
+        with self._lock:
+            emulator.attached = True
+            device = _EmulatedUSBDevice(emulator, self._next_address)
+            self._devices.append(device)
+            self._next_address += 1
+            callbacks = list(self._hotplug_callbacks.values())
+        for callback in callbacks:
+            callback(_HOTPLUG_ARRIVED, device)
+
+    def detach(self, emulator: JensenDeviceEmulator) -> None:
+        """Unplug an emulator; open handles fail with ENODEV from now on."""
+        with self._lock:
+            emulator.attached = False
+            gone = [device for device in self._devices if device.emulator is emulator]
+            self._devices = [device for device in self._devices if device.emulator is not emulator]
+            callbacks = list(self._hotplug_callbacks.values())
+        for device in gone:
+            for callback in callbacks:
+                callback(_HOTPLUG_LEFT, device)
+
+    def register_hotplug_callback(self, callback: Callable[[int, _EmulatedUSBDevice], None]) -> int:
+        """
+        Call ``callback(event, dev)`` with libusb's event codes (1 arrived, 2 left) on
+        attach and detach, starting with the attached devices like LIBUSB_HOTPLUG_ENUMERATE.
+        """
+        with self._lock:
+            handle = self._next_hotplug_handle
+            self._next_hotplug_handle += 1
+            self._hotplug_callbacks[handle] = callback
+            attached = list(self._devices)
+        for device in attached:
+            callback(_HOTPLUG_ARRIVED, device)
+        return handle
+
+    def deregister_hotplug_callback(self, handle: int) -> None:
+        with self._lock:
+            self._hotplug_callbacks.pop(handle, None)
+
+    def enumerate_devices(self):
+        with self._lock:
+            self.enumerations += 1
+            return list(self._devices)
+
+    def get_device_descriptor(self, dev):
+        emulator = dev.emulator
+        return _Descriptor(
+            bLength=18,
+            bDescriptorType=1,
+            bcdUSB=0x0200,
+            bDeviceClass=0,
+            bDeviceSubClass=0,
+            bDeviceProtocol=0,
+            bMaxPacketSize0=64,
+            idVendor=emulator.vendor_id,
+            idProduct=emulator.product_id,
+            bcdDevice=0x0100,
+            iManufacturer=1,
+            iProduct=2,
+            iSerialNumber=3,
+            bNumConfigurations=1,
+            address=dev.address,
+            bus=1,
+            port_number=dev.address,
+            port_numbers=(dev.address,),
+            speed=3,  # High speed
+        )
+
+    def get_configuration_descriptor(self, dev, config):
+        if config != 0:
+            raise IndexError("Invalid configuration index " + str(config))
+        return _Descriptor(
+            bLength=9,
+            bDescriptorType=2,
+            wTotalLength=32,
+            bNumInterfaces=1,
+            bConfigurationValue=1,
+            iConfiguration=0,
+            bmAttributes=0x80,
+            bMaxPower=50,
+            extra_descriptors=[],
+        )
+
+    def get_interface_descriptor(self, dev, intf, alt, config):
+        if intf != 0 or alt != 0 or config != 0:
+            raise IndexError("Invalid interface index " + str(intf))
+        return _Descriptor(
+            bLength=9,
+            bDescriptorType=4,
+            bInterfaceNumber=0,
+            bAlternateSetting=0,
+            bNumEndpoints=2,
+            bInterfaceClass=0xFF,
+            bInterfaceSubClass=0,
+            bInterfaceProtocol=0,
+            iInterface=0,
+            extra_descriptors=[],
+        )
+
+    def get_endpoint_descriptor(self, dev, ep, intf, alt, config):
+        if ep not in (0, 1) or intf != 0 or alt != 0 or config != 0:
+            raise IndexError("Invalid endpoint index " + str(ep))
+        return _Descriptor(
+            bLength=7,
+            bDescriptorType=5,
+            bEndpointAddress=EP_OUT_ADDR if ep == 0 else EP_IN_ADDR,
+            bmAttributes=0x02,  # Bulk
+            wMaxPacketSize=dev.emulator.profile.max_packet_size,
+            bInterval=0,
+            bRefresh=0,
+            bSynchAddress=0,
+            extra_descriptors=[],
+        )
+
+    def open_device(self, dev):
+        dev.emulator._check_attached()
+        return _DeviceHandle(dev)
+
+    def close_device(self, dev_handle):
+        pass
+
+    def set_configuration(self, dev_handle, config_value):
+        dev_handle.configuration = config_value
+
+    def get_configuration(self, dev_handle):
+        return dev_handle.configuration
+
+    def set_interface_altsetting(self, dev_handle, intf, altsetting):
+        pass
+
+    def claim_interface(self, dev_handle, intf):
+        dev_handle.emulator._check_attached()
+
+    def release_interface(self, dev_handle, intf):
+        pass
+
+    def bulk_write(self, dev_handle, ep, intf, data, timeout):
+        return dev_handle.emulator.write(data)
+
+    def bulk_read(self, dev_handle, ep, intf, buff, timeout):
+        data = dev_handle.emulator.read(len(buff), timeout)
+        memoryview(buff)[: len(data)] = data
+        return len(data)
+
+    def ctrl_transfer(self, dev_handle, bmRequestType, bRequest, wValue, wIndex, data, timeout):
+        if bRequest != 0x06 or (wValue >> 8) != 0x03:
+            return 0  # Only string descriptors are emulated
+        index = wValue & 0xFF
+        if index == 0:
+            descriptor = bytes([4, 3, 0x09, 0x04])  # English (US)
+        else:
+            text = dev_handle.device.strings.get(index, "").encode("utf-16-le")
+            descriptor = bytes([2 + len(text), 3]) + text
+        count = min(len(descriptor), len(data))
+        memoryview(data)[:count] = descriptor[:count]
+        return count
+
+    def clear_halt(self, dev_handle, ep):
+        pass
+
+    def reset_device(self, dev_handle):
+        dev_handle.emulator.reset()
+
+    def is_kernel_driver_active(self, dev_handle, intf):
+        return False
+
+    def detach_kernel_driver(self, dev_handle, intf):
+        pass
+
+    def attach_kernel_driver(self, dev_handle, intf):
+        pass
+
+
+def backend_from_environment() -> Optional[EmulatedUSBBackend]:
+    """
+    Backend with one emulated device if ``HIDOCK_EMULATOR`` is set.
+
+    The variable holds the catalog size; ``HIDOCK_EMULATOR_BANDWIDTH`` (bytes
+    per second) and ``HIDOCK_EMULATOR_LATENCY_MS`` optionally shape the link.
+
+    Returns:
+        EmulatedUSBBackend or None if the variable is unset or invalid.
+    """
+    value = os.environ.get(EMULATOR_ENV_VAR)
+    if not value:
+        return None
+    try:
+        count = int(value)
+        bandwidth = float(os.environ.get(f"{EMULATOR_ENV_VAR}_BANDWIDTH", 0)) or None
+        latency_s = float(os.environ.get(f"{EMULATOR_ENV_VAR}_LATENCY_MS", 2)) / 1000.0
+    except ValueError:
+        logger.warning("DeviceEmulator", "backend_from_environment", f"Ignoring invalid {EMULATOR_ENV_VAR}={value!r}")
+        return None
+    logger.info("DeviceEmulator", "backend_from_environment", f"Using an emulated device with {count} recordings")
+    profile = LinkProfile(latency_s=latency_s, bandwidth_bytes_per_s=bandwidth)
+    return EmulatedUSBBackend([JensenDeviceEmulator(generate_catalog(count), profile, md5_signatures=True)])
@@ -268,7 +268,7 @@ class IDeviceInterface(ABC):
         output_path: str,
         progress_callback: Optional[Callable[[OperationProgress], None]] = None,
         file_size: Optional[int] = None,
-    ) -> None:
+    ) -> Optional[Dict[str, Any]]:
         """
         Download an audio recording from the device directly to a file.
 
@@ -278,6 +278,11 @@ class IDeviceInterface(ABC):
             progress_callback: Optional callback for progress updates
             file_size: Optional file size from cache to avoid expensive file list operation
 
+        Returns:
+            Transfer statistics of the download, or None if not reported. An "md5"
+            entry holds the digest computed while writing and "signature_verified"
+            whether it matched the device's file signature.
+
         Raises:
             ConnectionError: If no device is connected
             FileNotFoundError: If recording not found
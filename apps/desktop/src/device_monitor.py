@@ -0,0 +1,340 @@
+"""
+Event-driven tracking of attached HiDock devices.
+
+Finding a device used to mean enumerating the whole USB bus: once per VID/PID
+pair in ``DesktopDeviceAdapter.discover_devices``, again in
+``HiDockJensen._find_device`` on every connect, and from the shell in
+scripts/linux-monitoring. ``DeviceMonitor`` keeps a registry of attached
+HiDock units. Where libusb supports hotplug (Linux, macOS) the registry is
+updated by libusb hotplug callbacks, so arrivals and removals are seen
+immediately and lookups never touch the bus. Elsewhere (Windows, old libusb
+builds, other backends) it enumerates the bus every ``poll_interval_s``
+seconds and diffs the result.
+
+Backends other than libusb can offer hotplug by implementing
+``register_hotplug_callback(callback)`` and ``deregister_hotplug_callback(handle)``
+with libusb's event codes; the device emulator does.
+"""
+
+import ctypes
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import usb.core
+
+from config_and_logger import logger
+from constants import ALL_VENDOR_IDS, HIDOCK_PRODUCT_IDS
+
+LIBUSB_CAP_HAS_HOTPLUG = 0x0001
+LIBUSB_HOTPLUG_EVENT_DEVICE_ARRIVED = 0x01
+LIBUSB_HOTPLUG_EVENT_DEVICE_LEFT = 0x02
+LIBUSB_HOTPLUG_ENUMERATE = 0x01
+LIBUSB_HOTPLUG_MATCH_ANY = -1
+
+MODE_HOTPLUG = "hotplug"
+MODE_POLLING = "polling"
+
+EVENT_ARRIVED = "arrived"
+EVENT_LEFT = "left"
+
+DEFAULT_POLL_INTERVAL_S = 2.0
+
+# int (*)(libusb_context *ctx, libusb_device *device, libusb_hotplug_event event, void *user_data)
+_HOTPLUG_CALLBACK = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p)
+
+
+class _Timeval(ctypes.Structure):
+    _fields_ = [("tv_sec", ctypes.c_long), ("tv_usec", ctypes.c_long)]
+
+
+class LibusbHotplug:
+    """
+    libusb hotplug callbacks for a PyUSB libusb1 backend.
+
+    Hotplug callbacks only run while someone handles libusb events, so
+    registering the first callback starts a daemon thread doing that.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.lib = backend.lib
+        self._callbacks: Dict[int, Tuple[ctypes.c_int, object]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def is_supported(backend) -> bool:
+        """True if ``backend`` is a libusb1 backend whose libusb build supports hotplug."""
+        lib = getattr(backend, "lib", None)
+        if getattr(backend, "ctx", None) is None or not hasattr(lib, "libusb_hotplug_register_callback"):
+            return False
+        try:
+            return bool(lib.libusb_has_capability(LIBUSB_CAP_HAS_HOTPLUG))
+        except (AttributeError, OSError):
+            return False
+
+    def register_hotplug_callback(self, callback: Callable[[int, object], None]) -> int:
+        """
+        Call ``callback(event, dev)`` for every arrival and removal, starting with
+        the devices already attached. ``dev`` can be passed to ``usb.core.Device``.
+        """
+        from usb.backend import libusb1
+
+        def on_event(ctx, device, event, user_data):
+            try:
+                callback(event, libusb1._Device(device))
+            except Exception as e:
+                logger.warning("LibusbHotplug", "on_event", f"Hotplug callback failed: {e}")
+            return 0  # Stay registered
+
+        c_callback = _HOTPLUG_CALLBACK(on_event)
+        handle = ctypes.c_int()
+        result = self.lib.libusb_hotplug_register_callback(
+            self.backend.ctx,
+            LIBUSB_HOTPLUG_EVENT_DEVICE_ARRIVED | LIBUSB_HOTPLUG_EVENT_DEVICE_LEFT,
+            LIBUSB_HOTPLUG_ENUMERATE,
+            LIBUSB_HOTPLUG_MATCH_ANY,
+            LIBUSB_HOTPLUG_MATCH_ANY,
+            LIBUSB_HOTPLUG_MATCH_ANY,
+            c_callback,
+            None,
+            ctypes.byref(handle),
+        )
+        if result != 0:
+            raise usb.core.USBError(f"libusb_hotplug_register_callback failed ({result})", result)
+        self._callbacks[handle.value] = (handle, c_callback)  # The C callback must outlive the registration
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._handle_events, name="libusb-hotplug", daemon=True)
+            self._thread.start()
+        return handle.value
+
+    def deregister_hotplug_callback(self, handle: int) -> None:
+        entry = self._callbacks.pop(handle, None)
+        if entry is not None:
+            self.lib.libusb_hotplug_deregister_callback(self.backend.ctx, entry[0])
+        if not self._callbacks and self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _handle_events(self):
+        timeout = _Timeval(0, 250_000)
+        while not self._stop.is_set():
+            result = self.lib.libusb_handle_events_timeout_completed(self.backend.ctx, ctypes.byref(timeout), None)
+            if result != 0:
+                logger.warning("LibusbHotplug", "_handle_events", f"libusb_handle_events failed ({result})")
+                time.sleep(0.25)
+
+
+class DeviceMonitor:
+    """
+    Registry of attached HiDock units, kept current by hotplug events or polling.
+
+    Listeners added with ``add_listener`` are called as ``callback(event, device)``
+    with ``EVENT_ARRIVED`` or ``EVENT_LEFT`` and the ``usb.core.Device``, from the
+    hotplug or polling thread.
+    """
+
+    def __init__(
+        self,
+        usb_backend,
+        vendor_ids: Iterable[int] = ALL_VENDOR_IDS,
+        product_ids: Iterable[int] = HIDOCK_PRODUCT_IDS,
+        poll_interval_s: float = DEFAULT_POLL_INTERVAL_S,
+    ):
+        self.usb_backend = usb_backend
+        self.vendor_ids = set(vendor_ids)
+        self.product_ids = set(product_ids)
+        self.poll_interval_s = poll_interval_s
+        self.mode: Optional[str] = None
+        self._lock = threading.Lock()
+        self._devices: Dict[Tuple[int, int], usb.core.Device] = {}
+        self._arrived_at: Dict[Tuple[int, int], float] = {}
+        self._listeners: List[Callable[[str, usb.core.Device], None]] = []
+        self._changed = threading.Condition(self._lock)
+        self._hotplug_source = None
+        self._hotplug_handle = None
+        self._stop = threading.Event()
+        self._poll_thread: Optional[threading.Thread] = None
+        self._stats = {"scans": 0, "arrivals": 0, "removals": 0}
+
+    # --- Lifecycle ---
+
+    def start(self) -> str:
+        """
+        Start tracking devices; the registry is populated before this returns.
+
+        Returns:
+            str: ``MODE_HOTPLUG`` or ``MODE_POLLING``.
+        """
+        if self.mode is not None:
+            return self.mode
+        source = self._find_hotplug_source()
+        if source is not None:
+            try:
+                self._hotplug_handle = source.register_hotplug_callback(self._on_hotplug_event)
+                self._hotplug_source = source
+                self.mode = MODE_HOTPLUG
+            except (usb.core.USBError, OSError, AttributeError) as e:
+                logger.warning("DeviceMonitor", "start", f"Hotplug registration failed, polling instead: {e}")
+        if self.mode is None:
+            self.mode = MODE_POLLING
+            self._stop.clear()
+            self._scan()
+            self._poll_thread = threading.Thread(target=self._poll_loop, name="usb-device-poll", daemon=True)
+            self._poll_thread.start()
+        logger.info(
+            "DeviceMonitor", "start", "Tracking HiDock devices by %s, %d attached", self.mode, len(self._devices)
+        )
+        return self.mode
+
+    def stop(self) -> None:
+        """Stop receiving events; the registry keeps its last state."""
+        if self._hotplug_source is not None:
+            self._hotplug_source.deregister_hotplug_callback(self._hotplug_handle)
+            self._hotplug_source = None
+        self._stop.set()
+        if self._poll_thread is not None:
+            self._poll_thread.join(timeout=self.poll_interval_s + 1.0)
+            self._poll_thread = None
+        self.mode = None
+
+    @property
+    def is_authoritative(self) -> bool:
+        """True if a device missing from the registry is known to be absent (hotplug mode)."""
+        return self.mode == MODE_HOTPLUG
+
+    def _find_hotplug_source(self):
+        if callable(getattr(self.usb_backend, "register_hotplug_callback", None)):
+            return self.usb_backend
+        if LibusbHotplug.is_supported(self.usb_backend):
+            return LibusbHotplug(self.usb_backend)
+        return None
+
+    # --- Queries ---
+
+    def devices(self) -> List[usb.core.Device]:
+        """Attached HiDock units, ordered by bus and address."""
+        with self._lock:
+            return [self._devices[key] for key in sorted(self._devices)]
+
+    def find(self, vid: int, pid: int, location: Optional[Tuple[int, int]] = None) -> Optional[usb.core.Device]:
+        """Attached unit matching VID/PID (and ``location`` if given), without a bus scan."""
+        with self._lock:
+            for key in sorted(self._devices):
+                device = self._devices[key]
+                if device.idVendor == vid and device.idProduct == pid and (location is None or key == tuple(location)):
+                    return device
+        return None
+
+    def arrival_time(self, location: Tuple[int, int]) -> Optional[float]:
+        """``time.monotonic()`` at which the unit at ``location`` was first seen."""
+        with self._lock:
+            return self._arrived_at.get(tuple(location))
+
+    def wait_for_device(self, timeout_s: float) -> Optional[usb.core.Device]:
+        """Block until at least one unit is attached; returns the first one or None on timeout."""
+        deadline = time.monotonic() + timeout_s
+        with self._changed:
+            while not self._devices:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._changed.wait(remaining)
+            return self._devices[min(self._devices)]
+
+    def get_stats(self) -> dict:
+        """Mode, bus scans made by the monitor, arrivals, removals and attached count."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["mode"] = self.mode
+            stats["attached"] = len(self._devices)
+            return stats
+
+    # --- Listeners ---
+
+    def add_listener(self, callback: Callable[[str, usb.core.Device], None]) -> None:
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[str, usb.core.Device], None]) -> None:
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def _notify(self, event: str, device: usb.core.Device) -> None:
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(event, device)
+            except Exception as e:
+                logger.warning("DeviceMonitor", "_notify", f"Listener failed for {event}: {e}")
+
+    # --- Registry updates ---
+
+    def _is_hidock(self, device) -> bool:
+        return device.idVendor in self.vendor_ids and device.idProduct in self.product_ids
+
+    def _on_hotplug_event(self, event: int, dev) -> None:
+        device = usb.core.Device(dev, self.usb_backend)
+        if not self._is_hidock(device):
+            return
+        if event == LIBUSB_HOTPLUG_EVENT_DEVICE_ARRIVED:
+            self._add(device)
+        elif event == LIBUSB_HOTPLUG_EVENT_DEVICE_LEFT:
+            self._remove((device.bus, device.address))
+
+    def _add(self, device: usb.core.Device) -> None:
+        key = (device.bus, device.address)
+        with self._lock:
+            if key in self._devices:
+                return
+            self._devices[key] = device
+            self._arrived_at[key] = time.monotonic()
+            self._stats["arrivals"] += 1
+            self._changed.notify_all()
+        logger.info(
+            "DeviceMonitor",
+            "_add",
+            "HiDock %04x:%04x arrived at bus %d address %d",
+            device.idVendor,
+            device.idProduct,
+            key[0],
+            key[1],
+        )
+        self._notify(EVENT_ARRIVED, device)
+
+    def _remove(self, key: Tuple[int, int]) -> None:
+        with self._lock:
+            device = self._devices.pop(key, None)
+            self._arrived_at.pop(key, None)
+            if device is None:
+                return
+            self._stats["removals"] += 1
+            self._changed.notify_all()
+        logger.info("DeviceMonitor", "_remove", "HiDock left bus %d address %d", key[0], key[1])
+        self._notify(EVENT_LEFT, device)
+
+    def _scan(self) -> None:
+        """Enumerate the bus once and apply the difference to the registry."""
+        try:
+            found = usb.core.find(find_all=True, backend=self.usb_backend, custom_match=self._is_hidock)
+            current = {(device.bus, device.address): device for device in found}
+        except (usb.core.USBError, OSError, ValueError) as e:
+            logger.warning("DeviceMonitor", "_scan", f"USB enumeration failed: {e}")
+            return
+        with self._lock:
+            self._stats["scans"] += 1
+            gone = [key for key in self._devices if key not in current]
+            new = [device for key, device in current.items() if key not in self._devices]
+        for key in gone:
+            self._remove(key)
+        for device in new:
+            self._add(device)
+
+    def _poll_loop(self) -> None:
+        while not self._stop.wait(self.poll_interval_s):
+            self._scan()
@@ -0,0 +1,275 @@
+"""
+Priority scheduling of HiDock device commands.
+
+The device can only process one command exchange at a time. Previously the
+GUI's ``device_lock``, ``HiDockJensen._usb_lock`` and the file list streaming
+flag each serialized access in their own way, so background work either
+blocked behind long transfers or skipped its turn entirely.
+
+``DeviceCommandScheduler`` replaces them with a single re-entrant lock that
+grants the device to waiting threads by priority class instead of arrival
+order:
+
+    PLAYBACK > USER_QUERY > BATCH_DOWNLOAD > POLLING
+
+A thread declares its class with ``command_priority()``; plain ``with
+scheduler:`` blocks (and every command helper inside HiDockJensen) then queue
+at that priority. Waiters age while they wait, so polling is delayed but never
+starved. Long transfers call ``yield_point()`` between blocks to hand the
+device to a more urgent waiter and queue again. Queue depth and wait times
+are collected per class and reported by ``get_stats()``.
+"""
+
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Any, Dict, Optional
+
+from config_and_logger import logger
+
+
+class CommandPriority(IntEnum):
+    """Priority classes for device access; lower values are served first."""
+
+    PLAYBACK = 0  # Download the user is waiting on to start playback
+    USER_QUERY = 1  # Interactive requests: file list, device info, delete, ...
+    BATCH_DOWNLOAD = 2  # Queued downloads
+    POLLING = 3  # Periodic background checks
+
+
+DEFAULT_PRIORITY = CommandPriority.USER_QUERY
+
+_thread_state = threading.local()
+
+
+def current_priority() -> CommandPriority:
+    """Priority class of the calling thread."""
+    return getattr(_thread_state, "priority", DEFAULT_PRIORITY)
+
+
+@contextmanager
+def command_priority(priority: CommandPriority):
+    """Run device commands issued by this thread in the block at ``priority``."""
+    previous = current_priority()
+    _thread_state.priority = CommandPriority(priority)
+    try:
+        yield
+    finally:
+        _thread_state.priority = previous
+
+
+class _Waiter:
+    __slots__ = ("priority", "order", "enqueued_at")
+
+    def __init__(self, priority: CommandPriority, order: int):
+        self.priority = priority
+        self.order = order
+        self.enqueued_at = time.monotonic()
+
+
+class DeviceCommandScheduler:
+    """
+    Re-entrant lock for device access that serves waiters by priority.
+
+    Supports the ``threading.RLock`` protocol (``acquire``, ``release`` and use
+    as a context manager) so it can be used wherever a device lock was used.
+    """
+
+    def __init__(self, aging_s: float = 2.0):
+        """
+        Args:
+            aging_s: A waiter moves up one priority class for every ``aging_s``
+                seconds it has been waiting.
+        """
+        self.aging_s = aging_s
+        self._cond = threading.Condition(threading.Lock())
+        self._owner: Optional[int] = None
+        self._owner_priority = DEFAULT_PRIORITY
+        self._depth = 0
+        self._waiters: Dict[int, _Waiter] = {}
+        self._chosen: Optional[int] = None  # Waiter picked to run next when the device was freed
+        self._order = itertools.count()
+
+        self._max_queue_depth = 0
+        self._yields = 0
+        self._class_stats = {
+            priority: {"granted": 0, "timeouts": 0, "wait_total_s": 0.0, "wait_max_s": 0.0}
+            for priority in CommandPriority
+        }
+
+    # --- Lock protocol ---
+
+    def acquire(self, blocking: bool = True, timeout: float = -1, priority: Optional[CommandPriority] = None) -> bool:
+        """
+        Acquire the device, waiting behind more urgent requests.
+
+        Args:
+            blocking: Wait until the device is free if True.
+            timeout: Maximum wait in seconds; -1 waits indefinitely.
+            priority: Priority class; defaults to the thread's ``command_priority``.
+
+        Returns:
+            bool: True if the device was acquired.
+        """
+        me = threading.get_ident()
+        priority = CommandPriority(priority if priority is not None else current_priority())
+        with self._cond:
+            if self._owner == me:
+                self._depth += 1
+                return True
+            if self._owner is None and not self._waiters:
+                self._grant(me, priority, 0.0)
+                return True
+            if not blocking:
+                return False
+
+            waiter = _Waiter(priority, next(self._order))
+            self._waiters[me] = waiter
+            self._max_queue_depth = max(self._max_queue_depth, len(self._waiters))
+            deadline = None if timeout is None or timeout < 0 else time.monotonic() + timeout
+            try:
+                while True:
+                    if self._owner is None and self._chosen is None:
+                        self._chosen = self._next_waiter()
+                    if self._owner is None and self._chosen == me:
+                        break
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        self._class_stats[priority]["timeouts"] += 1
+                        return False
+                    self._cond.wait(remaining)
+            finally:
+                del self._waiters[me]
+                if self._chosen == me:
+                    # Either taking the device now or giving up while picked; in the
+                    # latter case a woken waiter picks the next one in line
+                    self._chosen = None
+                    self._cond.notify_all()
+            self._grant(me, priority, time.monotonic() - waiter.enqueued_at)
+            return True
+
+    def release(self) -> None:
+        """Release one level of ownership held by the calling thread."""
+        with self._cond:
+            if self._owner != threading.get_ident():
+                raise RuntimeError("cannot release un-acquired device scheduler")
+            self._depth -= 1
+            if self._depth == 0:
+                self._owner = None
+                self._chosen = self._next_waiter()
+                self._cond.notify_all()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    @contextmanager
+    def slot(self, priority: CommandPriority, timeout: Optional[float] = None):
+        """
+        Hold the device for the block at ``priority``.
+
+        Raises:
+            TimeoutError: If the device could not be acquired within ``timeout``.
+        """
+        with command_priority(priority):
+            if not self.acquire(timeout=-1 if timeout is None else timeout):
+                raise TimeoutError(f"Device busy, no {CommandPriority(priority).name} slot within {timeout}s")
+            try:
+                yield self
+            finally:
+                self.release()
+
+    # --- Scheduling ---
+
+    def _grant(self, owner: int, priority: CommandPriority, waited_s: float) -> None:
+        self._owner = owner
+        self._owner_priority = priority
+        self._depth = 1
+        stats = self._class_stats[priority]
+        stats["granted"] += 1
+        stats["wait_total_s"] += waited_s
+        stats["wait_max_s"] = max(stats["wait_max_s"], waited_s)
+
+    def _effective_priority(self, waiter: _Waiter, now: float) -> int:
+        aged = int((now - waiter.enqueued_at) / self.aging_s) if self.aging_s > 0 else 0
+        return max(0, waiter.priority - aged)
+
+    def _next_waiter(self) -> Optional[int]:
+        """Thread id of the waiter to serve next (most urgent, then oldest)."""
+        if not self._waiters:
+            return None
+        now = time.monotonic()
+        return min(
+            self._waiters,
+            key=lambda ident: (self._effective_priority(self._waiters[ident], now), self._waiters[ident].order),
+        )
+
+    def is_owned(self) -> bool:
+        """True if the calling thread holds the device."""
+        return self._owner == threading.get_ident()
+
+    def should_yield(self) -> bool:
+        """True if a waiter is more urgent than the calling owner's priority class."""
+        with self._cond:
+            if self._owner != threading.get_ident() or not self._waiters:
+                return False
+            now = time.monotonic()
+            best = min(self._effective_priority(waiter, now) for waiter in self._waiters.values())
+            return best < self._owner_priority
+
+    def yield_point(self) -> bool:
+        """
+        Let a more urgent waiter use the device, then queue again.
+
+        Call only where no command exchange is in progress, e.g. between blocks
+        of a ranged download. All nested ownership levels are released and
+        restored afterwards.
+
+        Returns:
+            bool: True if the device was handed over.
+        """
+        if not self.should_yield():
+            return False
+        with self._cond:
+            depth, priority = self._depth, self._owner_priority
+            self._yields += 1
+            self._depth = 1
+        logger.debug("Scheduler", "yield_point", f"{priority.name} owner yielding to a more urgent request")
+        self.release()
+        self.acquire(priority=priority)
+        with self._cond:
+            self._depth = depth
+        return True
+
+    # --- Metrics ---
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of threads currently waiting for the device."""
+        return len(self._waiters)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, yields and per-class wait times in milliseconds."""
+        with self._cond:
+            classes = {}
+            for priority, stats in self._class_stats.items():
+                granted = stats["granted"]
+                classes[priority.name.lower()] = {
+                    "granted": granted,
+                    "timeouts": stats["timeouts"],
+                    "avg_wait_ms": round(stats["wait_total_s"] / granted * 1000, 2) if granted else 0.0,
+                    "max_wait_ms": round(stats["wait_max_s"] * 1000, 2),
+                }
+            return {
+                "queue_depth": len(self._waiters),
+                "max_queue_depth": self._max_queue_depth,
+                "busy": self._owner is not None,
+                "owner_priority": self._owner_priority.name.lower() if self._owner is not None else None,
+                "yields": self._yields,
+                "classes": classes,
+            }
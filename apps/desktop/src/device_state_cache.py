@@ -0,0 +1,142 @@
+"""
+Cache of device state queried over USB, invalidated by device events.
+
+Device info, card info, settings, the recording filename and the file count
+were each fetched on demand by whichever part of the app needed them: the
+status bar kept private copies with 30 s/60 s TTLs, the storage query, the
+recording poller and the file list cache asked the device again on their own.
+``DeviceStateCache`` keeps one copy of each value per connection. Values stay
+valid until an event that can change them is published:
+
+    download_finished   recording filename (polling pauses during transfers)
+    delete              card info, file count, recording filename
+    format              card info, file count, recording filename
+    recording_changed   card info, file count
+    settings_changed    settings
+    connected           everything
+    disconnected        everything
+
+``HiDockJensen`` owns the cache: its query methods answer from it and its
+delete, format, settings and download commands publish the matching event.
+The recording poller always asks the device and publishes
+``recording_changed`` when the reported filename changes. Listeners
+registered with ``add_listener`` are told which keys an event invalidated.
+"""
+
+import copy
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from config_and_logger import logger
+
+DEVICE_INFO = "device_info"
+CARD_INFO = "card_info"
+SETTINGS = "settings"
+RECORDING_FILE = "recording_file"
+FILE_COUNT = "file_count"
+
+ALL_KEYS = (DEVICE_INFO, CARD_INFO, SETTINGS, RECORDING_FILE, FILE_COUNT)
+
+EVENT_DOWNLOAD_FINISHED = "download_finished"
+EVENT_DELETE = "delete"
+EVENT_FORMAT = "format"
+EVENT_RECORDING_CHANGED = "recording_changed"
+EVENT_SETTINGS_CHANGED = "settings_changed"
+EVENT_CONNECTED = "connected"
+EVENT_DISCONNECTED = "disconnected"
+
+EVENT_INVALIDATIONS = {
+    EVENT_DOWNLOAD_FINISHED: (RECORDING_FILE,),
+    EVENT_DELETE: (CARD_INFO, FILE_COUNT, RECORDING_FILE),
+    EVENT_FORMAT: (CARD_INFO, FILE_COUNT, RECORDING_FILE),
+    EVENT_RECORDING_CHANGED: (CARD_INFO, FILE_COUNT),
+    EVENT_SETTINGS_CHANGED: (SETTINGS,),
+    EVENT_CONNECTED: ALL_KEYS,
+    EVENT_DISCONNECTED: ALL_KEYS,
+}
+
+
+class DeviceStateCache:
+    """Thread-safe store of device state values with event-driven invalidation."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: Dict[str, Any] = {}
+        self._listeners: List[Callable[[str, Tuple[str, ...]], None]] = []
+        self._stats = {"hits": 0, "misses": 0, "events": {}}
+
+    def lookup(self, key: str) -> Tuple[bool, Any]:
+        """
+        Cached value for ``key``.
+
+        Returns:
+            tuple: (True, copy of the value) on a hit, (False, None) on a miss.
+            A stored None (e.g. no recording file) is a hit.
+        """
+        with self._lock:
+            if key in self._values:
+                self._stats["hits"] += 1
+                return True, copy.copy(self._values[key])
+            self._stats["misses"] += 1
+            return False, None
+
+    def store(self, key: str, value: Any) -> None:
+        """Store the value just read from the device for ``key``."""
+        with self._lock:
+            self._values[key] = copy.copy(value)
+
+    def update_recording_file(self, value: Any) -> bool:
+        """
+        Store a freshly queried recording file and publish ``recording_changed``
+        if its name differs from the cached one.
+
+        Returns:
+            bool: True if the change event was published.
+        """
+        with self._lock:
+            known = RECORDING_FILE in self._values
+            previous = self._values.get(RECORDING_FILE)
+            self._values[RECORDING_FILE] = copy.copy(value)
+        changed = known and (previous or {}).get("name") != (value or {}).get("name")
+        if changed:
+            self.publish(EVENT_RECORDING_CHANGED)
+        return changed
+
+    def invalidate(self, keys: Iterable[str] = ALL_KEYS) -> None:
+        """Drop the cached values for ``keys``."""
+        with self._lock:
+            for key in keys:
+                self._values.pop(key, None)
+
+    def publish(self, event: str) -> None:
+        """Invalidate the keys affected by ``event`` and notify listeners."""
+        keys = EVENT_INVALIDATIONS[event]
+        with self._lock:
+            for key in keys:
+                self._values.pop(key, None)
+            events = self._stats["events"]
+            events[event] = events.get(event, 0) + 1
+            listeners = list(self._listeners)
+        logger.debug("DeviceStateCache", "publish", "%s invalidated %s", event, ", ".join(keys))
+        for listener in listeners:
+            try:
+                listener(event, keys)
+            except Exception as e:
+                logger.warning("DeviceStateCache", "publish", f"Listener failed for {event}: {e}")
+
+    def add_listener(self, callback: Callable[[str, Tuple[str, ...]], None]) -> None:
+        """Call ``callback(event, invalidated_keys)`` after every published event."""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[str, Tuple[str, ...]], None]) -> None:
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counts, events published and the keys currently cached."""
+        with self._lock:
+            stats = copy.deepcopy(self._stats)
+            stats["cached"] = sorted(self._values)
+            return stats
@@ -0,0 +1,267 @@
+"""
+Double-buffered disk writer for HiDock file downloads.
+
+``HiDockJensen.stream_file`` hands every received chunk to a data callback on
+the thread that is reading the USB IN endpoint. Writing straight to disk from
+that callback stalls the USB pipe whenever the disk is slow (antivirus scans,
+network drives, spinning disks). ``DoubleBufferedFileWriter.write`` is meant to
+be used as that callback instead: it copies the chunk into an in-memory staging
+buffer and returns immediately, while a dedicated writer thread flushes full
+buffers to disk. The number of buffers is bounded, so a disk that cannot keep
+up applies back-pressure to the reader instead of growing memory without limit.
+"""
+
+import os
+import queue
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config_and_logger import logger
+
+DEFAULT_BUFFER_SIZE = 1024 * 1024  # 1 MiB per staging buffer
+DEFAULT_BUFFER_COUNT = 2  # One being filled by the reader, one being written
+
+
+class DoubleBufferedFileWriter:
+    """
+    Writes a download to disk from a background thread.
+
+    The reader thread calls ``write()`` with each chunk; a writer thread drains
+    full buffers to the output file. ``close()`` flushes the remaining data,
+    waits for the writer thread and re-raises any disk error it hit.
+
+    Usage:
+        with DoubleBufferedFileWriter(path, file_length) as writer:
+            status = jensen.stream_file(name, file_length, writer.write, ...)
+        print(writer.get_stats()["mb_per_s"])
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        file_length: Optional[int] = None,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        buffer_count: int = DEFAULT_BUFFER_COUNT,
+        preallocate: bool = False,
+        opener: Optional[Callable[..., Any]] = None,
+        start_offset: int = 0,
+        start_crc: int = 0,
+        digest=None,
+    ):
+        """
+        Open ``output_path`` for writing and start the writer thread.
+
+        Args:
+            output_path: Destination file, truncated on open.
+            file_length: Expected size of the download, used for preallocation.
+            buffer_size: Size in bytes of each staging buffer.
+            buffer_count: Total number of staging buffers (minimum 2).
+            preallocate: Reserve ``file_length`` bytes on disk up front to reduce
+                fragmentation. The file is truncated back to the bytes actually
+                written on close, so a short transfer never leaves a file that
+                looks complete by size.
+            opener: Callable used to open the file (defaults to ``open``).
+            start_offset: Append after this many bytes of an existing partial
+                file instead of truncating it (used to resume downloads).
+            start_crc: CRC-32 of the first ``start_offset`` bytes, so that
+                ``committed()`` keeps describing the whole file on disk.
+            digest: Optional hashlib object updated with every byte written,
+                already fed the first ``start_offset`` bytes when resuming.
+        """
+        if buffer_size <= 0:
+            raise ValueError("buffer_size must be positive")
+        self.output_path = output_path
+        self.file_length = file_length
+        self.buffer_size = buffer_size
+        self.buffer_count = max(2, buffer_count)
+
+        if start_offset > 0:
+            self._file = (opener or open)(output_path, "r+b")
+            self._file.seek(start_offset)
+            self._file.truncate()
+        else:
+            self._file = (opener or open)(output_path, "wb")
+        self.start_offset = start_offset
+        self._preallocated = False
+        if preallocate and file_length:
+            self._preallocated = self._preallocate(file_length)
+
+        self._free_buffers: "queue.Queue[bytearray]" = queue.Queue()
+        self._full_buffers: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        for _ in range(self.buffer_count - 1):
+            self._free_buffers.put(bytearray(buffer_size))
+        self._active = bytearray(buffer_size)
+        self._active_len = 0
+
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        self._bytes_received = 0
+        self._bytes_written = 0
+        # (bytes on disk including start_offset, CRC-32 of those bytes), replaced atomically
+        self._committed = (start_offset, start_crc)
+        self.digest = digest
+        self._start_time: Optional[float] = None
+        self._end_time: Optional[float] = None
+        self._disk_time = 0.0
+        self._reader_wait_time = 0.0
+
+        self._thread = threading.Thread(target=self._writer_loop, name="DownloadWriter", daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    def _preallocate(self, length: int) -> bool:
+        """Reserve ``length`` bytes for the output file. Returns True on success."""
+        try:
+            if hasattr(os, "posix_fallocate"):
+                os.posix_fallocate(self._file.fileno(), 0, length)
+            else:
+                self._file.truncate(length)
+            self._file.seek(self.start_offset)
+            return True
+        except (OSError, ValueError, AttributeError) as e:
+            logger.debug("DownloadWriter", "_preallocate", f"Preallocation of {length} bytes skipped: {e}")
+            return False
+
+    def write(self, chunk) -> None:
+        """
+        Stage ``chunk`` for writing. Called from the USB reader thread.
+
+        The chunk is copied before returning, so zero-copy views from
+        ``stream_file`` may be passed directly. Raises the writer thread's
+        error, if any, so the stream is aborted as a file I/O failure.
+        """
+        if self._error is not None:
+            raise self._error
+        if self._closed:
+            raise ValueError("write to closed DoubleBufferedFileWriter")
+        if self._start_time is None:
+            self._start_time = time.perf_counter()
+
+        view = memoryview(chunk).cast("B")
+        total = len(view)
+        offset = 0
+        while offset < total:
+            n = min(total - offset, self.buffer_size - self._active_len)
+            self._active[self._active_len : self._active_len + n] = view[offset : offset + n]
+            self._active_len += n
+            offset += n
+            if self._active_len == self.buffer_size:
+                self._hand_off()
+        self._bytes_received += total
+
+    def _hand_off(self) -> None:
+        """Queue the active buffer for the writer and take a free one."""
+        self._full_buffers.put((self._active, self._active_len))
+        wait_start = time.perf_counter()
+        buffer = self._free_buffers.get()
+        self._reader_wait_time += time.perf_counter() - wait_start
+        if self._error is not None:
+            raise self._error
+        self._active = buffer
+        self._active_len = 0
+
+    def _writer_loop(self) -> None:
+        """Flush queued buffers to disk until the end-of-stream marker arrives."""
+        while True:
+            item = self._full_buffers.get()
+            if item is None:
+                break
+            buffer, length = item
+            if self._error is None:
+                try:
+                    write_start = time.perf_counter()
+                    data = memoryview(buffer)[:length]
+                    self._file.write(data)
+                    self._disk_time += time.perf_counter() - write_start
+                    self._bytes_written += length
+                    committed, crc = self._committed
+                    self._committed = (committed + length, zlib.crc32(data, crc))
+                    if self.digest is not None:
+                        self.digest.update(data)
+                except Exception as e:  # pylint: disable=broad-except
+                    self._error = e
+                    logger.error("DownloadWriter", "_writer_loop", f"Write to {self.output_path} failed: {e}")
+            # Always recycle the buffer so the reader never blocks on a dead writer
+            self._free_buffers.put(buffer)
+
+    def _finish(self, flush: bool) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if flush and self._active_len and self._error is None:
+            self._full_buffers.put((self._active, self._active_len))
+        self._active_len = 0
+        self._full_buffers.put(None)
+        self._thread.join()
+        self._end_time = time.perf_counter()
+        try:
+            if self._preallocated and self._committed[0] != self.file_length:
+                self._file.truncate(self._committed[0])
+        except OSError as e:
+            if self._error is None:
+                self._error = e
+        finally:
+            self._file.close()
+
+    def close(self) -> None:
+        """Flush staged data, stop the writer thread and close the file."""
+        self._finish(flush=True)
+        if self._error is not None:
+            raise self._error
+        logger.debug(
+            "DownloadWriter",
+            "close",
+            f"Wrote {self._bytes_written} bytes to {self.output_path} "
+            f"({self.get_stats()['mb_per_s']:.2f} MB/s sustained)",
+        )
+
+    def abort(self) -> None:
+        """Stop the writer thread, discarding staged data that was not yet written."""
+        self._finish(flush=False)
+
+    @property
+    def bytes_received(self) -> int:
+        """Bytes handed to ``write()`` so far (all of them are on disk after close)."""
+        return self._bytes_received
+
+    def committed(self) -> Tuple[int, int]:
+        """
+        Return ``(size, crc32)`` of the data handed to the OS so far.
+
+        Includes any ``start_offset`` prefix, so the pair can be persisted as a
+        resume checkpoint at any time from the reader thread.
+        """
+        return self._committed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return throughput statistics for the download.
+
+        ``mb_per_s`` is the sustained rate from the first chunk to close;
+        ``reader_wait_s`` is the time the USB reader spent blocked waiting for
+        a free buffer (non-zero means the disk, not USB, was the bottleneck).
+        """
+        elapsed = 0.0
+        if self._start_time is not None:
+            end = self._end_time if self._end_time is not None else time.perf_counter()
+            elapsed = max(end - self._start_time, 0.0)
+        mb = self._bytes_written / (1024 * 1024)
+        return {
+            "bytes_written": self._bytes_written,
+            "elapsed_s": elapsed,
+            "mb_per_s": mb / elapsed if elapsed > 0 else 0.0,
+            "disk_write_s": self._disk_time,
+            "reader_wait_s": self._reader_wait_time,
+            "preallocated": self._preallocated,
+        }
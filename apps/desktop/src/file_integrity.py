@@ -0,0 +1,59 @@
+"""
+Verification of downloads against the device's file signature.
+
+Every file list entry carries a 16-byte ``signature``, assumed to be the MD5
+digest of the file content. A download is checked without a second pass over
+the file: the digest is updated with each chunk as it is written and compared
+with the listed signature when the transfer ends. The digest is kept with the
+file metadata so later duplicate and re-sync checks need not hash the file
+again.
+
+The signature has not been confirmed to be a content MD5 on real hardware, so
+a mismatch is only logged and flagged unless ``STRICT_SIGNATURE_CHECK`` is set.
+"""
+
+import hashlib
+from typing import Optional, Union
+
+SIGNATURE_LENGTH = 16  # Bytes of the MD5 digest in a file list entry
+STRICT_SIGNATURE_CHECK = False  # Fail downloads whose digest differs from the signature
+
+
+def new_digest():
+    """Incremental digest matching the device's file signature."""
+    return hashlib.md5()
+
+
+def normalize_signature(signature: Union[str, bytes, None]) -> Optional[str]:
+    """
+    Lowercase hex form of a device signature, or None if there is nothing to verify against.
+
+    Accepts the hex strings produced by ``list_files`` or raw bytes. Missing,
+    malformed and all-zero signatures (files the device has not signed yet)
+    yield None.
+    """
+    if signature is None:
+        return None
+    if isinstance(signature, (bytes, bytearray)):
+        signature = bytes(signature).hex()
+    signature = str(signature).strip().lower()
+    if len(signature) != SIGNATURE_LENGTH * 2 or signature.strip("0") == "":
+        return None
+    try:
+        bytes.fromhex(signature)
+    except ValueError:
+        return None
+    return signature
+
+
+def verify_digest(digest_hex: Optional[str], signature: Union[str, bytes, None]) -> Optional[bool]:
+    """
+    Compare a computed digest with a device signature.
+
+    Returns:
+        bool or None: True if they match, False if they differ, None if either is unavailable.
+    """
+    expected = normalize_signature(signature)
+    if expected is None or not digest_hex:
+        return None
+    return digest_hex.lower() == expected
@@ -0,0 +1,223 @@
+"""
+Multi-core parser for large HiDock file lists.
+
+The serial ``FileListStreamParser`` decodes entries one at a time. For cards
+with many thousands of recordings this module splits the work into stages:
+
+1. A boundary pre-scan walks the buffer once, reading only the version byte
+   and the 3-byte name length of each entry, and records entry offsets.
+2. The fixed-width fields after each name (file length, reserved bytes,
+   signature) are gathered with NumPy fancy indexing into one contiguous
+   array and read through a structured dtype view.
+3. Filename date parsing and duration calculation, the expensive per-entry
+   work, run over offset ranges in a persistent process pool.
+
+The output is identical to ``HiDockJensen._parse_file_list_chunks``.
+"""
+
+import atexit
+import os
+import struct
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config_and_logger import logger
+
+_HEADER_SIZE = 6
+_ENTRY_PREFIX_SIZE = 4
+_ENTRY_TAIL_SIZE = 4 + 6 + 16
+
+# Fixed-width fields that follow the variable-length filename of every entry
+ENTRY_TAIL_DTYPE = np.dtype([("length", ">u4"), ("reserved", "V6"), ("signature", "V16")])
+
+# Below this many entries the process pool costs more than it saves
+MIN_ENTRIES_PER_WORKER = 2000
+MAX_WORKERS = 4
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_worker_decoder = None
+
+
+def scan_entry_offsets(buffer, start: int = 0, expected: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find the start offset and name length of every complete entry.
+
+    Args:
+        buffer: Joined file list bytes.
+        start: Offset of the first entry (6 when the 0xFFFF header is present).
+        expected: Stop after this many entries, if known.
+
+    Returns:
+        tuple: (offsets, name_lengths) as int64 arrays.
+    """
+    view = memoryview(buffer)
+    end = len(view)
+    limit = expected if expected is not None else end
+    offsets = []
+    name_lengths = []
+    pos = start
+    while len(offsets) < limit and pos + _ENTRY_PREFIX_SIZE <= end:
+        name_len = int.from_bytes(view[pos + 1 : pos + _ENTRY_PREFIX_SIZE], "big")
+        next_pos = pos + _ENTRY_PREFIX_SIZE + name_len + _ENTRY_TAIL_SIZE
+        if next_pos > end:
+            break
+        offsets.append(pos)
+        name_lengths.append(name_len)
+        pos = next_pos
+    return np.asarray(offsets, dtype=np.int64), np.asarray(name_lengths, dtype=np.int64)
+
+
+def extract_fixed_fields(buffer, offsets: np.ndarray, name_lengths: np.ndarray):
+    """
+    Gather versions, lengths and signatures for all entries at once.
+
+    Returns:
+        tuple: (versions, lengths, signatures_hex) where versions and lengths are
+        int arrays and signatures_hex is a list of 32-character hex strings.
+    """
+    data = np.frombuffer(buffer, dtype=np.uint8)
+    versions = data[offsets].astype(np.int64)
+    tail_starts = offsets + _ENTRY_PREFIX_SIZE + name_lengths
+    tails = data[tail_starts[:, None] + np.arange(_ENTRY_TAIL_SIZE)]
+    fields = tails.view(ENTRY_TAIL_DTYPE).ravel()
+    lengths = fields["length"].astype(np.int64)
+    signature_hex = np.ascontiguousarray(tails[:, 10:]).tobytes().hex()
+    signatures = [signature_hex[i : i + 32] for i in range(0, len(signature_hex), 32)]
+    return versions, lengths, signatures
+
+
+def extract_names(buffer, offsets: np.ndarray, name_lengths: np.ndarray) -> List[str]:
+    """Decode the filename of every entry."""
+    view = memoryview(buffer)
+    names = []
+    for start, length in zip((offsets + _ENTRY_PREFIX_SIZE).tolist(), name_lengths.tolist()):
+        names.append(bytes(view[start : start + length]).rstrip(b"\x00").decode("ascii", errors="ignore"))
+    return names
+
+
+def _init_worker():
+    """Create the per-process decoder once, when the pool worker starts."""
+    global _worker_decoder  # pylint: disable=global-statement
+    from hidock_device import HiDockJensen  # pylint: disable=import-outside-toplevel
+
+    _worker_decoder = HiDockJensen(None)
+
+
+def decode_range(names: Sequence[str], lengths: Sequence[int], versions: Sequence[int], decoder=None):
+    """
+    Decode dates and durations for a range of entries.
+
+    Runs in a pool worker (using the decoder created by ``_init_worker``) or
+    in-process when ``decoder`` is given.
+
+    Returns:
+        list: (createDate, createTime, time, duration) per entry.
+    """
+    decoder = decoder or _worker_decoder
+    parse_datetime = decoder._parse_filename_datetime  # pylint: disable=protected-access
+    file_duration = decoder._calculate_file_duration  # pylint: disable=protected-access
+    return [
+        (*parse_datetime(name), file_duration(length, version))
+        for name, length, version in zip(names, lengths, versions)
+    ]
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """Return the shared decode pool, starting it on first use."""
+    global _pool  # pylint: disable=global-statement
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+            atexit.register(shutdown_pool)
+        return _pool
+
+
+def shutdown_pool():
+    """Stop the shared decode pool, if it was started."""
+    global _pool  # pylint: disable=global-statement
+    with _pool_lock:
+        if _pool is not None:
+            if sys.version_info >= (3, 9):
+                _pool.shutdown(wait=False, cancel_futures=True)
+            else:  # cancel_futures is new in 3.9
+                _pool.shutdown(wait=False)
+            _pool = None
+
+
+def worker_count(entry_count: int) -> int:
+    """Number of pool workers worth using for ``entry_count`` entries (1 means in-process)."""
+    cpus = os.cpu_count() or 1
+    return max(1, min(MAX_WORKERS, cpus, entry_count // MIN_ENTRIES_PER_WORKER))
+
+
+def parse_file_list_parallel(chunks, decoder, workers: Optional[int] = None) -> List[dict]:
+    """
+    Parse a complete file list transfer using all stages above.
+
+    Args:
+        chunks: File list response bodies in arrival order.
+        decoder: Object providing ``_parse_filename_datetime`` and
+            ``_calculate_file_duration`` for in-process decoding.
+        workers: Force a worker count; by default it scales with the entry count.
+
+    Returns:
+        list: File info dictionaries in device order.
+    """
+    buffer = b"".join(bytes(chunk) for chunk in chunks)
+    if not buffer:
+        return []
+
+    start = 0
+    expected = None
+    if len(buffer) >= _HEADER_SIZE and buffer[0] == 0xFF and buffer[1] == 0xFF:
+        expected = struct.unpack_from(">I", buffer, 2)[0]
+        start = _HEADER_SIZE
+
+    offsets, name_lengths = scan_entry_offsets(buffer, start, expected)
+    count = len(offsets)
+    if count == 0:
+        return []
+
+    versions, lengths, signatures = extract_fixed_fields(buffer, offsets, name_lengths)
+    names = extract_names(buffer, offsets, name_lengths)
+    versions_list = versions.tolist()
+    lengths_list = lengths.tolist()
+
+    workers = workers if workers is not None else worker_count(count)
+    decoded = None
+    if workers > 1:
+        bounds = np.linspace(0, count, workers + 1, dtype=np.int64).tolist()
+        try:
+            pool = _get_pool(workers)
+            futures = [
+                pool.submit(decode_range, names[lo:hi], lengths_list[lo:hi], versions_list[lo:hi])
+                for lo, hi in zip(bounds[:-1], bounds[1:])
+            ]
+            decoded = [item for future in futures for item in future.result()]
+        except (BrokenProcessPool, OSError, RuntimeError) as e:
+            logger.warning("Jensen", "parallel_parse", f"Process pool unavailable ({e}), decoding in-process")
+            shutdown_pool()
+    if decoded is None:
+        decoded = decode_range(names, lengths_list, versions_list, decoder=decoder)
+
+    return [
+        {
+            "name": name,
+            "createDate": create_date,
+            "createTime": create_time,
+            "time": time_obj,
+            "duration": duration,
+            "version": version,
+            "length": length,
+            "signature": signature,
+        }
+        for name, (create_date, create_time, time_obj, duration), version, length, signature in zip(
+            names, decoded, versions_list, lengths_list, signatures
+        )
+    ]
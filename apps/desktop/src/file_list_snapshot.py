@@ -0,0 +1,237 @@
+"""
+Persistent per-device file list snapshots.
+
+Transferring the full file list with CMD_GET_FILE_LIST is the slowest part of
+connecting to a device with many recordings. A snapshot stores the last
+complete list for each device serial on disk, together with the entry count,
+the card's used space and a few bytes read from the end of the last file. On
+reconnect the snapshot can be validated with cheap file count and card info
+queries plus a tail read (see ``HiDockJensen.list_files_with_snapshot``), so the full
+transfer is only repeated when the card contents actually changed.
+
+When the card did change, the stored entries still save work: entries that
+arrive with the same (name, length, signature) are reused instead of decoded
+again, and ``compute_file_list_delta`` reports which recordings were added,
+removed or changed so the GUI only has to process those.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from config_and_logger import logger
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+@dataclass
+class FileListSnapshot:
+    """A complete file list as last seen on one device."""
+
+    serial: str
+    count: int
+    last_name: Optional[str] = None
+    last_length: int = 0
+    last_signature: Optional[str] = None
+    tail: Optional[str] = None  # Hex of the last bytes of the last file
+    card_used: Optional[int] = None  # Used space in MB from get_card_info
+    saved_at: float = 0.0
+    files: List[Dict[str, Any]] = field(default_factory=list)
+
+
+@dataclass
+class FileListDelta:
+    """Differences between two file lists, compared by (name, length, signature)."""
+
+    added: List[Dict[str, Any]] = field(default_factory=list)
+    removed: List[Dict[str, Any]] = field(default_factory=list)
+    changed: List[Dict[str, Any]] = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def is_empty(self) -> bool:
+        """True when both lists describe the same recordings."""
+        return not (self.added or self.removed or self.changed)
+
+    @property
+    def updated_names(self) -> set:
+        """Names of the entries that are new or changed in the current list."""
+        return {entry["name"] for entry in self.added} | {entry["name"] for entry in self.changed}
+
+
+def entry_key(entry: Dict[str, Any]) -> Tuple[str, int, Optional[str]]:
+    """Identity of a file list entry: a recording is unchanged while all three match."""
+    return entry["name"], entry["length"], entry.get("signature")
+
+
+def index_entries(files: List[Dict[str, Any]]) -> Dict[Tuple[str, int, Optional[str]], Dict[str, Any]]:
+    """Map entries by ``entry_key`` for ``HiDockJensen.list_files(known_entries=...)``."""
+    return {entry_key(entry): entry for entry in files}
+
+
+def compute_file_list_delta(previous: List[Dict[str, Any]], current: List[Dict[str, Any]]) -> FileListDelta:
+    """
+    Compare two file lists.
+
+    Args:
+        previous: Entries from the last complete listing.
+        current: Entries from the new listing.
+
+    Returns:
+        FileListDelta: Entries of ``current`` that are new or changed, and
+        entries of ``previous`` that are gone.
+    """
+    previous_by_name = {entry["name"]: entry for entry in previous}
+    current_names = set()
+    delta = FileListDelta()
+    for entry in current:
+        name = entry["name"]
+        current_names.add(name)
+        old = previous_by_name.get(name)
+        if old is None:
+            delta.added.append(entry)
+        elif entry_key(old) != entry_key(entry):
+            delta.changed.append(entry)
+        else:
+            delta.unchanged += 1
+    delta.removed = [entry for entry in previous if entry["name"] not in current_names]
+    return delta
+
+
+def _serialize_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+    data = dict(entry)
+    time_obj = data.get("time")
+    data["time"] = time_obj.isoformat() if isinstance(time_obj, datetime) else None
+    return data
+
+
+def _deserialize_entry(data: Dict[str, Any]) -> Dict[str, Any]:
+    entry = dict(data)
+    if entry.get("time"):
+        try:
+            entry["time"] = datetime.fromisoformat(entry["time"])
+        except (TypeError, ValueError):
+            entry["time"] = None
+    return entry
+
+
+class FileListSnapshotStore:
+    """Stores one file list snapshot per device serial as a JSON file."""
+
+    def __init__(self, cache_dir: str):
+        """
+        Args:
+            cache_dir: Directory for the snapshot files; created on first save.
+        """
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+
+    def _path(self, serial: str) -> str:
+        safe_serial = re.sub(r"[^A-Za-z0-9_.-]", "_", serial)
+        return os.path.join(self.cache_dir, f"file_list_{safe_serial}.json")
+
+    def load(self, serial: Optional[str]) -> Optional[FileListSnapshot]:
+        """Return the snapshot for ``serial``, or None if there is no usable one."""
+        if not serial:
+            return None
+        path = self._path(serial)
+        if not os.path.exists(path):
+            return None
+        try:
+            with self._lock, open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("format") != SNAPSHOT_FORMAT_VERSION or data.get("serial") != serial:
+                return None
+            files = [_deserialize_entry(entry) for entry in data.get("files", [])]
+            if len(files) != data.get("count"):
+                return None
+            return FileListSnapshot(
+                serial=serial,
+                count=data["count"],
+                last_name=data.get("last_name"),
+                last_length=data.get("last_length", 0),
+                last_signature=data.get("last_signature"),
+                tail=data.get("tail"),
+                card_used=data.get("card_used"),
+                saved_at=data.get("saved_at", 0.0),
+                files=files,
+            )
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("FileListSnapshot", "load", f"Ignoring unreadable snapshot for {serial}: {e}")
+            return None
+
+    def save(
+        self,
+        serial: Optional[str],
+        files: List[Dict[str, Any]],
+        tail: Optional[str] = None,
+        card_used: Optional[int] = None,
+    ) -> Optional[FileListSnapshot]:
+        """
+        Persist a complete file list for ``serial``.
+
+        Args:
+            serial: Device serial number.
+            files: Entries in device order, as returned by list_files.
+            tail: Hex of the last bytes of the last file, used for validation.
+            card_used: Used card space in MB at the time of the listing.
+
+        Returns:
+            The saved snapshot, or None if it could not be written.
+        """
+        if not serial:
+            return None
+        last = files[-1] if files else {}
+        snapshot = FileListSnapshot(
+            serial=serial,
+            count=len(files),
+            last_name=last.get("name"),
+            last_length=last.get("length", 0),
+            last_signature=last.get("signature"),
+            tail=tail,
+            card_used=card_used,
+            saved_at=time.time(),
+            files=list(files),
+        )
+        data = {
+            "format": SNAPSHOT_FORMAT_VERSION,
+            "serial": serial,
+            "count": snapshot.count,
+            "last_name": snapshot.last_name,
+            "last_length": snapshot.last_length,
+            "last_signature": snapshot.last_signature,
+            "tail": tail,
+            "card_used": card_used,
+            "saved_at": snapshot.saved_at,
+            "files": [_serialize_entry(entry) for entry in files],
+        }
+        path = self._path(serial)
+        tmp_path = f"{path}.tmp"
+        try:
+            with self._lock:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning("FileListSnapshot", "save", f"Could not save snapshot for {serial}: {e}")
+            return None
+        logger.debug("FileListSnapshot", "save", f"Saved {snapshot.count} entries for {serial}")
+        return snapshot
+
+    def invalidate(self, serial: Optional[str]) -> None:
+        """Delete the snapshot for ``serial`` so the next listing is a full transfer."""
+        if not serial:
+            return
+        try:
+            with self._lock:
+                os.remove(self._path(serial))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("FileListSnapshot", "invalidate", f"Could not remove snapshot for {serial}: {e}")
@@ -25,8 +25,13 @@ from enum import Enum
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Optional
 
+import file_integrity
+from batch_transfer import BatchDownloadItem, PipelinedBatchDownloader
 from config_and_logger import logger
 from device_interface import OperationProgress
+from device_scheduler import CommandPriority, command_priority
+from file_integrity import verify_digest
+from resumable_download import discard_checkpoint
 
 
 class FileOperationType(Enum):
@@ -64,6 +69,7 @@ class FileMetadata:
     last_accessed: Optional[datetime] = None
     download_count: int = 0
     tags: List[str] = None
+    verified_digest: Optional[str] = None  # MD5 of the local copy, computed while downloading
 
     def __post_init__(self):
         if self.tags is None:
@@ -176,10 +182,15 @@ class FileMetadataCache:
                     last_accessed TEXT,
                     download_count INTEGER,
                     tags TEXT,
-                    cache_timestamp TEXT
+                    cache_timestamp TEXT,
+                    verified_digest TEXT
                 )
             """
             )
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(file_metadata)")]
+            if "verified_digest" not in columns:
+                # Caches created before downloads were verified against device signatures
+                conn.execute("ALTER TABLE file_metadata ADD COLUMN verified_digest TEXT")
             conn.commit()
 
     def get_metadata(self, filename: str) -> Optional[FileMetadata]:
@@ -202,6 +213,7 @@ class FileMetadataCache:
                     last_accessed=datetime.fromisoformat(row[9]) if row[9] else None,
                     download_count=row[10],
                     tags=json.loads(row[11]) if row[11] else [],
+                    verified_digest=row[13] if len(row) > 13 else None,
                 )
         return None
 
@@ -213,8 +225,8 @@ class FileMetadataCache:
                 INSERT OR REPLACE INTO file_metadata
                 (filename, size, duration, date_created, device_path, local_path,
                  checksum, file_type, transcription_status, last_accessed,
-                 download_count, tags, cache_timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                 download_count, tags, cache_timestamp, verified_digest)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
                 (
                     metadata.filename,
@@ -230,6 +242,7 @@ class FileMetadataCache:
                     metadata.download_count,
                     json.dumps(metadata.tags),
                     datetime.now().isoformat(),
+                    metadata.verified_digest,
                 ),
             )
             conn.commit()
@@ -369,14 +382,16 @@ class FileOperationsManager:
         operation.start_time = datetime.now()
 
         try:
-            if operation.operation_type == FileOperationType.DOWNLOAD:
-                self._execute_download(operation)
-            elif operation.operation_type == FileOperationType.DELETE:
-                self._execute_delete(operation)
-            elif operation.operation_type == FileOperationType.VALIDATE:
-                self._execute_validate(operation)
-            elif operation.operation_type == FileOperationType.ANALYZE:
-                self._execute_analyze(operation)
+            # Device commands issued for this operation queue at its priority class
+            with command_priority(self._operation_priority(operation)):
+                if operation.operation_type == FileOperationType.DOWNLOAD:
+                    self._execute_download(operation)
+                elif operation.operation_type == FileOperationType.DELETE:
+                    self._execute_delete(operation)
+                elif operation.operation_type == FileOperationType.VALIDATE:
+                    self._execute_validate(operation)
+                elif operation.operation_type == FileOperationType.ANALYZE:
+                    self._execute_analyze(operation)
 
             # Check for cancellation after execution
             # (in case it was cancelled during execution)
@@ -404,14 +419,24 @@ class FileOperationsManager:
                 )
 
         finally:
-            operation.end_time = datetime.now()
-            self.operation_history.append(operation)
-            if operation.operation_id in self.active_operations:
-                del self.active_operations[operation.operation_id]
+            self._finish_operation(operation)
 
-            # Notify progress callback
-            if operation.operation_id in self.progress_callbacks:
-                self.progress_callbacks[operation.operation_id](operation)
+    def _finish_operation(self, operation: FileOperation):
+        """Move a finished operation to the history and notify its progress callback."""
+        operation.end_time = datetime.now()
+        self.operation_history.append(operation)
+        if operation.operation_id in self.active_operations:
+            del self.active_operations[operation.operation_id]
+
+        # Notify progress callback
+        if operation.operation_id in self.progress_callbacks:
+            self.progress_callbacks[operation.operation_id](operation)
+
+    def _operation_priority(self, operation: FileOperation) -> CommandPriority:
+        """Device scheduling class for an operation: queued downloads yield to interactive requests."""
+        if operation.operation_type == FileOperationType.DOWNLOAD:
+            return operation.metadata.get("priority", CommandPriority.BATCH_DOWNLOAD)
+        return CommandPriority.USER_QUERY
 
     def _execute_download(self, operation: FileOperation):
         """Execute a file download operation."""
@@ -445,6 +470,7 @@ class FileOperationsManager:
                 # We update the current operation and pass it along.
                 self.progress_callbacks[operation.operation_id](operation)
 
+        transfer_stats = None
         try:
             # Get cached file size to avoid expensive file list operation
             cached_metadata = self.metadata_cache.get_metadata(filename)
@@ -486,7 +512,7 @@ class FileOperationsManager:
                     f"Acquiring device lock for download of {filename}",
                 )
                 with self.device_lock:
-                    asyncio.run(
+                    transfer_stats = asyncio.run(
                         self.device_interface.device_interface.download_recording(
                             recording_id=filename,
                             output_path=local_path,
@@ -496,7 +522,7 @@ class FileOperationsManager:
                     )
             else:
                 # Fallback if no device lock is provided
-                asyncio.run(
+                transfer_stats = asyncio.run(
                     self.device_interface.device_interface.download_recording(
                         recording_id=filename,
                         output_path=local_path,
@@ -513,6 +539,8 @@ class FileOperationsManager:
                 "_execute_download",
                 f"Download execution failed for {filename}: {e}",
             )
+            if operation.status == FileOperationStatus.CANCELLED:
+                self._discard_partial_download(local_path)  # Written after cancel_operation cleaned up
             raise IOError(f"Download failed for {filename}") from e
 
         # Check for cancellation before validation
@@ -522,28 +550,144 @@ class FileOperationsManager:
                 "_execute_download",
                 f"Download of {filename} was cancelled before validation",
             )
+            # The transfer kept writing after cancel_operation cleaned up
+            self._discard_partial_download(local_path)
             return
 
-        # Validate downloaded file
-        if self._validate_downloaded_file(filename, local_path):
-            # Update metadata cache
+        # Validate downloaded file against the digest the adapter computed while writing it
+        transfer_stats = transfer_stats if isinstance(transfer_stats, dict) else {}
+        if self._validate_downloaded_file(filename, local_path, transfer_stats.get("md5")):
+            self._record_download(filename, local_path, transfer_stats)
+        else:
+            raise ValueError(f"File validation failed for {filename}")
+
+    def _record_download(self, filename: str, local_path: Path, transfer_stats: Optional[Dict[str, Any]] = None):
+        """
+        Update the metadata cache and statistics for a validated download.
+
+        The MD5 from ``transfer_stats`` is stored as the verified digest only if
+        it matched the device signature.
+        """
+        metadata = self.metadata_cache.get_metadata(filename)
+        if metadata:
+            metadata.local_path = str(local_path)
+            if transfer_stats and transfer_stats.get("signature_verified") is True:
+                metadata.verified_digest = transfer_stats["md5"]
+            metadata.download_count += 1
+            metadata.last_accessed = datetime.now()
+            self.metadata_cache.set_metadata(metadata)
+
+        self.operation_stats["total_downloads"] += 1
+        self.operation_stats["total_bytes_downloaded"] += local_path.stat().st_size
+
+        logger.info(
+            "FileOpsManager",
+            "_execute_download",
+            f"Successfully downloaded {filename}",
+        )
+
+    def _run_pipelined_batch(self, operations: List[FileOperation], report_callback: Optional[Callable] = None):
+        """
+        Download ``operations`` back to back with a PipelinedBatchDownloader.
+
+        Sizes, signatures and the in-use check are resolved here, before the
+        device is taken; validation and cache updates run on the downloader's
+        finalizer thread while the next file streams.
+        """
+        try:
+            self._download_pipelined(operations, report_callback)
+        except Exception as e:
+            logger.error("FileOpsManager", "_run_pipelined_batch", f"Pipelined batch download failed: {e}")
+            for operation in operations:
+                if operation.status in [FileOperationStatus.PENDING, FileOperationStatus.IN_PROGRESS]:
+                    self._fail_operation(operation, str(e))
+
+    def _download_pipelined(self, operations: List[FileOperation], report_callback: Optional[Callable]):
+        jensen = self.device_interface.device_interface.jensen_device
+        by_filename = {operation.filename: operation for operation in operations}
+        items = []
+        device_files = None
+        for operation in operations:
+            filename = operation.filename
+            if operation.status == FileOperationStatus.CANCELLED:
+                self._finish_operation(operation)
+                continue
+            local_path = self.download_dir / filename
             metadata = self.metadata_cache.get_metadata(filename)
-            if metadata:
-                metadata.local_path = str(local_path)
-                metadata.download_count += 1
-                metadata.last_accessed = datetime.now()
-                self.metadata_cache.set_metadata(metadata)
+            size, signature = (metadata.size, metadata.checksum) if metadata else (None, None)
+            if not size:
+                if device_files is None:
+                    # One listing for every file of the batch without cached metadata
+                    with command_priority(CommandPriority.BATCH_DOWNLOAD):
+                        listing = jensen.list_files() or {}
+                    device_files = {entry["name"]: entry for entry in listing.get("files", [])}
+                entry = device_files.get(filename)
+                size, signature = (entry["length"], entry.get("signature")) if entry else (None, None)
+            error = None if size else f"Recording {filename} not found"
+            if error is None and local_path.exists():
+                try:
+                    with open(local_path, "r+b"):
+                        pass  # File is not locked
+                except (PermissionError, OSError):
+                    error = f"File {filename} is currently in use and cannot be overwritten"
+            if error:
+                self._fail_operation(operation, error)
+                continue
+            item = BatchDownloadItem(filename, size, str(local_path), signature)
+            operation.metadata["cancel_event"] = item.cancel_event  # Set by cancel_operation
+            items.append(item)
 
-            self.operation_stats["total_downloads"] += 1
-            self.operation_stats["total_bytes_downloaded"] += local_path.stat().st_size
+        def on_start(item):
+            operation = by_filename[item.filename]
+            operation.status = FileOperationStatus.IN_PROGRESS
+            operation.start_time = datetime.now()
 
-            logger.info(
-                "FileOpsManager",
-                "_execute_download",
-                f"Successfully downloaded {filename}",
-            )
-        else:
-            raise ValueError(f"File validation failed for {filename}")
+        def on_progress(item, bytes_received, total):
+            operation = by_filename[item.filename]
+            if operation.status == FileOperationStatus.CANCELLED:
+                return
+            operation.progress = bytes_received / total * 100.0 if total else 0.0
+            if operation.operation_id in self.progress_callbacks:
+                self.progress_callbacks[operation.operation_id](operation)
+
+        def on_finished(item, status, stats):
+            operation = by_filename[item.filename]
+            local_path = Path(item.output_path)
+            if operation.status == FileOperationStatus.CANCELLED or status == "cancelled":
+                operation.status = FileOperationStatus.CANCELLED
+                if item.cancel_event.is_set():
+                    # Cancelled by cancel_operation; the transfer has stopped writing by now
+                    self._discard_partial_download(local_path)
+                self._finish_operation(operation)
+            elif status != "OK":
+                self._fail_operation(operation, f"Download failed for {item.filename}: {status}")
+            elif not self._validate_downloaded_file(item.filename, local_path, stats.get("md5")):
+                self._fail_operation(operation, f"File validation failed for {item.filename}")
+            else:
+                self._record_download(item.filename, local_path, stats)
+                operation.status = FileOperationStatus.COMPLETED
+                operation.progress = 100.0
+                operation.metadata["mb_per_s"] = stats.get("mb_per_s")
+                self._finish_operation(operation)
+
+        report = {}
+        if items:
+            downloader = PipelinedBatchDownloader(jensen, self.device_lock)
+            report = downloader.run(items, on_start, on_progress, on_finished, stop_event=self.cancel_event)
+            self.operation_stats["last_batch"] = report
+        if report_callback:
+            report_callback(report)
+
+    def _fail_operation(self, operation: FileOperation, error_message: str):
+        operation.status = FileOperationStatus.FAILED
+        operation.error_message = error_message
+        self.operation_stats["failed_operations"] += 1
+        logger.error(
+            "FileOpsManager",
+            "_fail_operation",
+            f"Operation {operation.operation_id} failed: {error_message}",
+        )
+        self._finish_operation(operation)
 
     def _execute_delete(self, operation: FileOperation):
         """Execute a file deletion operation."""
@@ -630,8 +774,16 @@ class FileOperationsManager:
         else:
             raise ValueError(f"No metadata found for {filename}")
 
-    def _validate_downloaded_file(self, filename: str, local_path: Path) -> bool:
-        """Validate a downloaded file's integrity."""
+    def _validate_downloaded_file(
+        self, filename: str, local_path: Path, verified_digest: Optional[str] = None
+    ) -> bool:
+        """
+        Validate a downloaded file's integrity.
+
+        ``verified_digest`` is the MD5 computed while the file was written. Without
+        it, the digest stored by an earlier verified download of the same local
+        file is used; the file is never re-read to hash it.
+        """
         try:
             if not local_path.exists():
                 logger.warning(
@@ -651,15 +803,18 @@ class FileOperationsManager:
                 )
                 return False
 
-            # Skip checksum validation for now as the device signature format
-            # is incompatible with SHA-256 checksums calculated locally
-            # TODO: Implement proper signature validation if device provides compatible checksums
+            # The device signature is taken to be the MD5 of the file content
             if metadata and metadata.checksum:
-                logger.debug(
-                    "FileOpsManager",
-                    "_validate_downloaded_file",
-                    f"Device signature for {filename}: {metadata.checksum} (validation skipped - format incompatible)",
-                )
+                if not verified_digest and metadata.local_path == str(local_path):
+                    verified_digest = metadata.verified_digest
+                if verify_digest(verified_digest, metadata.checksum) is False:
+                    logger.warning(
+                        "FileOpsManager",
+                        "_validate_downloaded_file",
+                        f"Signature mismatch for {filename}. Device: {metadata.checksum}, local: {verified_digest}",
+                    )
+                    if file_integrity.STRICT_SIGNATURE_CHECK:
+                        return False
 
             # Basic file integrity check - ensure file is not empty and has reasonable content
             if local_path.stat().st_size == 0:
@@ -729,8 +884,18 @@ class FileOperationsManager:
 
     # Public API methods
 
-    def queue_download(self, filename: str, progress_callback: Callable = None) -> str:
-        """Queue a file download operation."""
+    def queue_download(
+        self,
+        filename: str,
+        progress_callback: Callable = None,
+        priority: CommandPriority = CommandPriority.BATCH_DOWNLOAD,
+    ) -> str:
+        """
+        Queue a file download operation.
+
+        A PLAYBACK download starts on its own thread instead of waiting for a free
+        worker, and is served by the device scheduler before queued downloads.
+        """
         # Check if file is already queued or downloading
         for operation in self.active_operations.values():
             if (
@@ -760,12 +925,20 @@ class FileOperationsManager:
             operation_type=FileOperationType.DOWNLOAD,
             filename=filename,
             status=FileOperationStatus.PENDING,
+            metadata={"priority": priority},
         )
 
         self.active_operations[operation_id] = operation
         if progress_callback:
             self.progress_callbacks[operation_id] = progress_callback
 
+        if priority == CommandPriority.PLAYBACK:
+            threading.Thread(
+                target=self._execute_operation, args=(operation,), name=f"PlaybackDownload-{filename}", daemon=True
+            ).start()
+            logger.info("FileOpsManager", "queue_download", f"Started playback download for {filename}")
+            return operation_id
+
         self.operation_queue.put(operation)
         logger.info("FileOpsManager", "queue_download", f"Queued download for {filename}")
         return operation_id
@@ -788,8 +961,23 @@ class FileOperationsManager:
         logger.info("FileOpsManager", "queue_delete", f"Queued deletion for {filename}")
         return operation_id
 
-    def queue_batch_download(self, filenames: List[str], progress_callback: Callable = None) -> List[str]:
-        """Queue multiple files for download."""
+    def queue_batch_download(
+        self,
+        filenames: List[str],
+        progress_callback: Callable = None,
+        pipelined: bool = False,
+        report_callback: Callable = None,
+    ) -> List[str]:
+        """
+        Queue multiple files for download.
+
+        With ``pipelined`` the files are transferred back to back in one device
+        session (see batch_transfer) instead of as independent operations, and
+        ``report_callback`` receives the batch report with its link utilization.
+        """
+        if pipelined:
+            return self._queue_pipelined_batch(filenames, progress_callback, report_callback)
+
         operation_ids = []
         for filename in filenames:
             operation_id = self.queue_download(filename, progress_callback)
@@ -802,6 +990,51 @@ class FileOperationsManager:
         )
         return operation_ids
 
+    def _queue_pipelined_batch(
+        self, filenames: List[str], progress_callback: Callable = None, report_callback: Callable = None
+    ) -> List[str]:
+        operation_ids = []
+        operations = []
+        for filename in filenames:
+            existing = next(
+                (
+                    operation
+                    for operation in self.active_operations.values()
+                    if operation.filename == filename
+                    and operation.operation_type == FileOperationType.DOWNLOAD
+                    and operation.status in [FileOperationStatus.PENDING, FileOperationStatus.IN_PROGRESS]
+                ),
+                None,
+            )
+            if existing:
+                operation_ids.append(existing.operation_id)
+                continue
+            operation = FileOperation(
+                operation_id=f"download_{filename}_{int(time.time())}",
+                operation_type=FileOperationType.DOWNLOAD,
+                filename=filename,
+                status=FileOperationStatus.PENDING,
+                metadata={"priority": CommandPriority.BATCH_DOWNLOAD, "pipelined": True},
+            )
+            self.active_operations[operation.operation_id] = operation
+            if progress_callback:
+                self.progress_callbacks[operation.operation_id] = progress_callback
+            operations.append(operation)
+            operation_ids.append(operation.operation_id)
+
+        threading.Thread(
+            target=self._run_pipelined_batch,
+            args=(operations, report_callback),
+            name="PipelinedBatchDownload",
+            daemon=True,
+        ).start()
+        logger.info(
+            "FileOpsManager",
+            "queue_batch_download",
+            f"Started pipelined batch download of {len(operations)} files",
+        )
+        return operation_ids
+
     def queue_batch_delete(self, filenames: List[str], progress_callback: Callable = None) -> List[str]:
         """Queue multiple files for deletion."""
         operation_ids = []
@@ -816,44 +1049,52 @@ class FileOperationsManager:
         )
         return operation_ids
 
+    def _discard_partial_download(self, partial_file_path: Path):
+        """Delete a cancelled download and its checkpoint, retrying while the file is locked."""
+        # A cancelled download is not resumed, so drop its checkpoint too
+        discard_checkpoint(partial_file_path)
+        if not partial_file_path.exists():
+            return
+        for attempt in range(3):
+            try:
+                partial_file_path.unlink()
+                logger.info(
+                    "FileOpsManager",
+                    "cancel_operation",
+                    f"Cleaned up partial download: {partial_file_path}",
+                )
+                break
+            except (PermissionError, OSError) as e:
+                if attempt < 2:  # Not the last attempt
+                    time.sleep(0.5)  # Wait before retry
+                    continue
+                logger.warning(
+                    "FileOpsManager",
+                    "cancel_operation",
+                    f"Failed to clean up partial download {partial_file_path} after {attempt + 1} attempts: {e}",
+                )
+            except Exception as e:
+                logger.warning(
+                    "FileOpsManager",
+                    "cancel_operation",
+                    f"Failed to clean up partial download {partial_file_path}: {e}",
+                )
+                break
+
     def cancel_operation(self, operation_id: str) -> bool:
         """Cancel a specific operation and clean up partial files."""
         if operation_id in self.active_operations:
             operation = self.active_operations[operation_id]
             operation.status = FileOperationStatus.CANCELLED
-
-            # Clean up partial downloads with retry mechanism
-            if operation.operation_type == FileOperationType.DOWNLOAD:
-                partial_file_path = self.download_dir / operation.filename
-                if partial_file_path.exists():
-                    # Try multiple times to delete partial file (may be locked)
-                    for attempt in range(3):
-                        try:
-                            partial_file_path.unlink()
-                            logger.info(
-                                "FileOpsManager",
-                                "cancel_operation",
-                                f"Cleaned up partial download: {partial_file_path}",
-                            )
-                            break
-                        except (PermissionError, OSError) as e:
-                            if attempt < 2:  # Not the last attempt
-                                import time
-                                time.sleep(0.5)  # Wait before retry
-                                continue
-                            else:
-                                logger.warning(
-                                    "FileOpsManager",
-                                    "cancel_operation",
-                                    f"Failed to clean up partial download {partial_file_path} after {attempt + 1} attempts: {e}",
-                                )
-                        except Exception as e:
-                            logger.warning(
-                                "FileOpsManager",
-                                "cancel_operation",
-                                f"Failed to clean up partial download {partial_file_path}: {e}",
-                            )
-                            break
+            # A pipelined batch transfer stops at its next chunk
+            cancel_event = operation.metadata.get("cancel_event")
+            if cancel_event is not None:
+                cancel_event.set()
+
+            # A pipelined transfer cleans up itself once it has stopped (see _download_pipelined);
+            # deleting the file now would race its final checkpoint
+            if operation.operation_type == FileOperationType.DOWNLOAD and cancel_event is None:
+                self._discard_partial_download(self.download_dir / operation.filename)
 
             logger.info(
                 "FileOpsManager",
@@ -10,6 +10,7 @@ import asyncio
 import os
 import platform
 import threading
+import time
 import tkinter
 import traceback
 from datetime import datetime
@@ -19,7 +20,13 @@ import usb.core
 
 from config_and_logger import logger
 from ctk_custom_widgets import CTkBanner
+from device_emulator import backend_from_environment
+from device_monitor import EVENT_ARRIVED, EVENT_LEFT
+from device_scheduler import CommandPriority, command_priority
+from file_list_snapshot import FileListDelta
 from file_operations_manager import FileMetadata
+from live_tail import LiveRecordingTail
+from resumable_download import CHECKPOINT_SUFFIX
 
 
 class DeviceActionsMixin:
@@ -29,10 +36,16 @@ class DeviceActionsMixin:
         """Initialize libusb backend with cross-platform support.
         
         Handles macOS (Apple Silicon and Intel), Linux, and Windows with
-        comprehensive path detection and fallback mechanisms.
+        comprehensive path detection and fallback mechanisms. Setting the
+        HIDOCK_EMULATOR environment variable selects an emulated device instead
+        (see device_emulator.backend_from_environment).
         """
         import platform
         
+        emulated_backend = backend_from_environment()
+        if emulated_backend is not None:
+            return True, None, emulated_backend
+
         error_to_report, local_backend_instance = None, None
         try:
             script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -123,10 +136,21 @@ class DeviceActionsMixin:
             return False, error_to_report, None
 
     def attempt_autoconnect_on_startup(self):  # Enhanced with auto-detection
-        """Attempts to autoconnect to the HiDock device on startup if autoconnect is enabled."""
+        """Attempts to autoconnect to the HiDock device on startup if autoconnect is enabled.
+
+        The device monitor started here makes the only bus enumeration; discovery
+        and the connect look devices up in its registry, and later plug/unplug
+        events arrive through _on_device_hotplug.
+        """
         if not self.backend_initialized_successfully:
             logger.warning("GUI", "attempt_autoconnect", "Skipping autoconnect, USB backend error.")
             return
+
+        try:
+            self.device_adapter.start_device_monitor()
+            self.device_adapter.device_monitor.add_listener(self._on_device_hotplug)
+        except Exception as e:
+            logger.warning("GUI", "attempt_autoconnect", f"Device monitor unavailable, scanning on demand: {e}")
         
         # Always try to discover devices first, even if not auto-connecting
         # This helps set the correct PID for the connected device
@@ -174,6 +198,22 @@ class DeviceActionsMixin:
                 logger.info("GUI", "attempt_autoconnect", "Falling back to configured device...")
                 self.connect_device()
 
+    def _on_device_hotplug(self, event, device):
+        """Device monitor listener (monitor thread): autoconnect on arrival, drop the UI on removal."""
+        jensen = self.device_manager.device_interface.jensen_device
+        if event == EVENT_ARRIVED:
+            self.after(0, self._autoconnect_arrived_device, device.idVendor, device.idProduct)
+        elif event == EVENT_LEFT and jensen.is_connected() and jensen.usb_location == (device.bus, device.address):
+            self.after(0, self.handle_auto_disconnect_ui)
+
+    def _autoconnect_arrived_device(self, vid, pid):
+        if not self.autoconnect_var.get() or self.device_manager.device_interface.is_connected():
+            return
+        logger.info("GUI", "_on_device_hotplug", "HiDock plugged in, auto-connecting...")
+        self.selected_vid_var.set(vid)
+        self.selected_pid_var.set(pid)
+        self.connect_device()
+
     def connect_device(self):  # Identical to original, parent=self for dialogs
         """Connects to the HiDock device using the selected VID, PID, and interface."""
         if not self.backend_initialized_successfully:
@@ -522,6 +562,7 @@ class DeviceActionsMixin:
         # Cancel any ongoing operations first
         self.stop_auto_file_refresh_periodic_check()
         self.stop_recording_status_check()
+        self._stop_live_tail()
         
         # Update button immediately to show disconnect is in progress
         if hasattr(self, 'toolbar_connect_button') and self.toolbar_connect_button.winfo_exists():
@@ -631,7 +672,8 @@ class DeviceActionsMixin:
         for f_info in files:
             # Generate the safe filename as _get_local_filepath does
             safe_filename = f_info.filename.replace(":", "-").replace(" ", "_").replace("\\", "_").replace("/", "_")
-            if safe_filename in downloaded_files:
+            # A file with a resume checkpoint is a partial download or a live copy, not a finished one
+            if safe_filename in downloaded_files and safe_filename + CHECKPOINT_SUFFIX not in downloaded_files:
                 local_filepath = os.path.join(download_dir, safe_filename)
                 # Skip the isfile check for performance - trust the directory listing
                 f_info.local_path = local_filepath
@@ -790,7 +832,26 @@ class DeviceActionsMixin:
         try:
             files = None
             recording_info = None
+            file_list_delta = None
             all_files_to_display = []
+
+            # Rows are appended while the list streams in only when nothing (such as
+            # cached files) is displayed yet; otherwise just the progress is shown.
+            show_rows_progressively = not getattr(self, "displayed_files_details", None)
+            pending_rows = []
+            last_progress_update = [0.0]
+
+            def on_file_list_entries(new_entries, parsed_count, expected_count):
+                if show_rows_progressively:
+                    pending_rows.extend({**entry, "gui_status": "On Device"} for entry in new_entries)
+                now = time.monotonic()
+                finished = expected_count is not None and parsed_count >= expected_count
+                if not finished and now - last_progress_update[0] < 0.25:
+                    return
+                last_progress_update[0] = now
+                rows = pending_rows[:]
+                pending_rows.clear()
+                self.after(0, self._show_file_list_progress, parsed_count, expected_count, rows)
             
             # Check if we should abort before acquiring lock
             if hasattr(self, '_abort_file_operations') and self._abort_file_operations:
@@ -803,7 +864,15 @@ class DeviceActionsMixin:
                     logger.info("GUI", "_refresh_file_list_thread", "File refresh aborted due to disconnect")
                     return
                 # Always fetch fresh data from device to ensure we have the latest files
-                recording_info = asyncio.run(self.device_manager.device_interface.get_recordings())
+                recording_info = asyncio.run(
+                    self.device_manager.device_interface.get_recordings(entries_callback=on_file_list_entries)
+                )
+                # Changes since the stored file list snapshot; None means every file is treated as new
+                file_list_delta = getattr(self.device_manager.device_interface, "last_file_list_delta", None)
+                if not isinstance(file_list_delta, FileListDelta):
+                    file_list_delta = None
+                # Whether the device reported every file; a partial list must not replace the cache
+                list_complete = getattr(self.device_manager.device_interface, "last_file_list_complete", False) is True
 
                 # Get storage info after file list to avoid command conflicts
                 # Future: use storage info for enhanced UI
@@ -815,18 +884,7 @@ class DeviceActionsMixin:
 
                 # If we got fresh data from device, decide how to handle it
                 if recording_info:
-                    # Trust device data if it seems complete (has reasonable number of files)
-                    # Consider data complete if:
-                    # 1. It has at least 95% of cached files (allows for recent deletions)
-                    # 2. Or it has more files than cache (new recordings)
-                    # 3. Or it has at least 10 files (reasonable minimum for complete data)
-                    is_complete = (
-                        len(recording_info) >= cached_count * 0.95 or
-                        len(recording_info) >= cached_count or
-                        len(recording_info) >= 10
-                    )
-                    
-                    if is_complete:
+                    if list_complete:
                         # Device returned complete data, update cache fully
                         logger.info(
                             "GUI",
@@ -834,6 +892,20 @@ class DeviceActionsMixin:
                             f"Updating cache with {len(recording_info)} files from device (was {cached_count} cached)",
                         )
                         device_files = recording_info
+                        if file_list_delta is not None:
+                            # Only new or changed recordings (or ones missing from the cache) need a cache write
+                            updated_names = file_list_delta.updated_names
+                            cached_filenames = {f.filename for f in cached_files}
+                            device_files = []
+                            for f in recording_info:
+                                name = f["name"] if isinstance(f, dict) else f.filename
+                                if name in updated_names or name not in cached_filenames:
+                                    device_files.append(f)
+                            logger.debug(
+                                "GUI",
+                                "_refresh_file_list_thread",
+                                f"Delta refresh: writing {len(device_files)} of {len(recording_info)} files to cache",
+                            )
                         for f in device_files:
                             # Handle both AudioRecording objects and raw dictionaries
                             if isinstance(f, dict):
@@ -877,8 +949,8 @@ class DeviceActionsMixin:
                         logger.warning(
                             "GUI",
                             "_refresh_file_list_thread",
-                            f"Device returned incomplete data ({len(recording_info)} vs "
-                            f"{cached_count} cached), attempting merge",
+                            f"Device returned an incomplete list ({len(recording_info)} files, "
+                            f"{cached_count} cached), merging new files into cache",
                         )
                         # Create a set of cached filenames for quick lookup
                         cached_filenames = {f.filename for f in cached_files}
@@ -1020,14 +1092,16 @@ class DeviceActionsMixin:
             if hasattr(self, 'enhance_files_with_meeting_data_async'):
                 try:
                     # Start async enhancement in background without replacing current data
-                    self.enhance_files_with_meeting_data_async(files_dict, callback=self._on_async_calendar_update_complete)
+                    self.enhance_files_with_meeting_data_async(
+                        files_dict, callback=self._on_async_calendar_update_complete, delta=file_list_delta
+                    )
                 except Exception as e:
                     logger.debug("GUI", "_refresh_file_list_thread", f"Failed to start async calendar enhancement: {e}")
             
             # Enhance files with audio metadata (transcription, AI analysis, user edits)
             if hasattr(self, 'enhance_files_with_audio_metadata'):
                 try:
-                    files_dict = self.enhance_files_with_audio_metadata(files_dict)
+                    files_dict = self.enhance_files_with_audio_metadata(files_dict, delta=file_list_delta)
                     logger.debug("GUI", "_refresh_file_list_thread", f"Enhanced {len(files_dict)} files with audio metadata")
                 except Exception as e:
                     logger.warning("GUI", "_refresh_file_list_thread", f"Failed to enhance files with audio metadata: {e}")
@@ -1119,6 +1193,7 @@ class DeviceActionsMixin:
             self.after(0, lambda: self.update_status_bar(progress_text="Error loading files."))
         finally:
             self.after(0, lambda: setattr(self, "_is_ui_refresh_in_progress", False))
+            self.after(0, self._reset_file_list_progress)
             self.after(0, self._update_menu_states)
             self.after(
                 0,
@@ -1128,6 +1203,25 @@ class DeviceActionsMixin:
             )
             self.after(0, self.update_all_status_info)
 
+    def _show_file_list_progress(self, parsed_count, expected_count, rows):
+        """Shows file list transfer progress and appends newly received rows (main thread)."""
+        if expected_count:
+            progress_text = f"Loading files: {parsed_count} of {expected_count}..."
+        else:
+            progress_text = f"Loading files: {parsed_count}..."
+        self.update_status_bar(progress_text=progress_text)
+        progress_bar = getattr(self, "status_file_progress_bar", None)
+        if expected_count and progress_bar is not None and progress_bar.winfo_exists():
+            progress_bar.set(min(parsed_count / expected_count, 1.0))
+        if rows:
+            self._append_files_to_treeview(rows)
+
+    def _reset_file_list_progress(self):
+        """Clears the status bar progress bar after a file list refresh."""
+        progress_bar = getattr(self, "status_file_progress_bar", None)
+        if progress_bar is not None and progress_bar.winfo_exists():
+            progress_bar.set(0)
+
     def start_recording_status_check(self):  # Identical to original
         """Starts periodic checking of the recording status."""
         interval_s = self.recording_check_interval_var.get()
@@ -1144,58 +1238,31 @@ class DeviceActionsMixin:
             self.after_cancel(self._recording_check_timer_id)
             self._recording_check_timer_id = None
 
-    def _check_recording_status_periodically(
-        self,
-    ):  # Identical to original logic, uses self.after
-        """Periodically checks the recording status and updates the GUI."""
+    def _check_recording_status_periodically(self):
+        """
+        Periodically checks the recording status and updates the GUI.
+
+        The device query runs on a background thread at POLLING priority, so it
+        waits its turn behind user actions and downloads instead of being skipped
+        whenever the device is busy.
+        """
         try:
             if not self.device_manager.device_interface.is_connected():
                 self.stop_recording_status_check()
                 return
             if self.is_long_operation_active:
                 return
+            if getattr(self, "_recording_check_in_flight", False):
+                logger.debug("GUI", "_check_rec_status", "Previous check still waiting for the device.")
+                return
 
-            if self.device_lock.acquire(blocking=False):
-                try:
-                    # Skip recording check if file list streaming is active to avoid command conflicts
-                    if (
-                        hasattr(self.device_manager.device_interface, "jensen_device")
-                        and hasattr(
-                            self.device_manager.device_interface.jensen_device,
-                            "is_file_list_streaming",
-                        )
-                        and self.device_manager.device_interface.jensen_device.is_file_list_streaming()
-                    ):
-                        logger.debug(
-                            "GUI",
-                            "_check_recording_status_periodically",
-                            "Skipping recording check during file list streaming",
-                        )
-                        return
-
-                    # Use the new lightweight method instead of the heavy get_recordings()
-                    current_recording_filename = asyncio.run(
-                        self.device_manager.device_interface.get_current_recording_filename()
-                    )
-                    if not self.device_manager.device_interface.is_connected():
-                        self.stop_recording_status_check()
-                        return
-
-                    # A change in the reported filename indicates a new recording has started,
-                    # or the previous one has finished (filename becomes None).
-                    if current_recording_filename != self._previous_recording_filename:
-                        logger.info(
-                            "GUI",
-                            "_check_rec_status",
-                            f"Recording status changed (prev: '{self._previous_recording_filename}', "
-                            f"new: '{current_recording_filename}'). Refreshing file list.",
-                        )
-                        self._previous_recording_filename = current_recording_filename
-                        self.refresh_file_list_gui()
-                finally:
-                    self.device_lock.release()
-            else:
-                logger.debug("GUI", "_check_rec_status", "Skipping check, device is busy.")
+            self._recording_check_in_flight = True
+            threading.Thread(
+                target=self._check_recording_status_thread,
+                args=(max(1, self.recording_check_interval_var.get()),),
+                name="RecordingStatusCheck",
+                daemon=True,
+            ).start()
         except (ConnectionError, usb.core.USBError, tkinter.TclError) as e:
             logger.error("GUI", "_check_rec_status", f"Unhandled: {e}\n{traceback.format_exc()}")
         finally:
@@ -1206,6 +1273,75 @@ class DeviceActionsMixin:
                 else:
                     self._recording_check_timer_id = self.after(interval_ms, self._check_recording_status_periodically)
 
+    def _check_recording_status_thread(self, max_wait_s):
+        """Queries the current recording filename, waiting at most one check interval for the device."""
+        try:
+            with command_priority(CommandPriority.POLLING):
+                if not self.device_lock.acquire(timeout=max_wait_s):
+                    logger.debug("GUI", "_check_rec_status", "Device busy for a whole interval, skipping check.")
+                    return
+                try:
+                    # Use the new lightweight method instead of the heavy get_recordings()
+                    current_recording_filename = asyncio.run(
+                        self.device_manager.device_interface.get_current_recording_filename()
+                    )
+                finally:
+                    self.device_lock.release()
+
+            if not self.device_manager.device_interface.is_connected():
+                self.after(0, self.stop_recording_status_check)
+                return
+
+            # A change in the reported filename indicates a new recording has started,
+            # or the previous one has finished (filename becomes None).
+            if current_recording_filename != self._previous_recording_filename:
+                logger.info(
+                    "GUI",
+                    "_check_rec_status",
+                    f"Recording status changed (prev: '{self._previous_recording_filename}', "
+                    f"new: '{current_recording_filename}'). Refreshing file list.",
+                )
+                self._previous_recording_filename = current_recording_filename
+                self._update_live_tail(current_recording_filename)
+                self.after(0, self.refresh_file_list_gui)
+        except (ConnectionError, usb.core.USBError) as e:
+            logger.error("GUI", "_check_rec_status", f"Unhandled: {e}\n{traceback.format_exc()}")
+        finally:
+            self._recording_check_in_flight = False
+
+    def _update_live_tail(self, recording_filename):
+        """
+        Follows the recording in progress with a LiveRecordingTail if enabled in settings.
+
+        The copy goes where a download of the file would, so downloading the
+        recording once it has stopped only fetches the bytes recorded after the
+        last poll.
+        """
+        tail = self._live_tail
+        if tail is not None and tail.filename != recording_filename:
+            self._stop_live_tail()
+            tail = None
+        if tail is not None and tail.is_running():
+            return
+        if not recording_filename or not self.live_tail_recordings_var.get():
+            return
+        self._live_tail = LiveRecordingTail(
+            self.device_manager.device_interface.jensen_device,
+            recording_filename,
+            os.path.join(str(self.file_operations_manager.download_dir), recording_filename),
+            device_lock=self.device_lock,
+        )
+        self._live_tail.start()
+
+    def _stop_live_tail(self):
+        """Stops the live copy of the recording, leaving its checkpoint for the download."""
+        tail = self._live_tail
+        if tail is None:
+            return
+        self._live_tail = None
+        tail.stop()
+        logger.info("GUI", "_stop_live_tail", f"Live copy of {tail.filename} ended: {tail.get_stats()}")
+
     def start_auto_file_refresh_periodic_check(self):  # Identical to original
         """Starts periodic checking for file list refresh based on the auto-refresh settings."""
         self.stop_auto_file_refresh_periodic_check()
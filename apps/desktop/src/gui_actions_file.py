@@ -18,6 +18,7 @@ from tkinter import messagebox
 from config_and_logger import logger
 from file_operations_manager import FileOperationStatus, FileOperationType
 from transcription_module import process_audio_file_for_insights
+from waveform_peaks import discard_peak_file
 
 
 class FileActionsMixin:
@@ -55,7 +56,12 @@ class FileActionsMixin:
             if not self.file_operations_manager.is_file_operation_active(filename, FileOperationType.DOWNLOAD):
                 self._update_file_status_in_treeview(filename, "Queued", ("queued",))
 
-        self.file_operations_manager.queue_batch_download(filenames_to_download, self._update_operation_progress)
+        self.file_operations_manager.queue_batch_download(
+            filenames_to_download,
+            self._update_operation_progress,
+            pipelined=True,
+            report_callback=self._on_batch_download_report,
+        )
 
         # No need to refresh file list - downloads work with existing metadata
         # and status updates are handled by the progress callback
@@ -85,6 +91,16 @@ class FileActionsMixin:
 
         self.file_operations_manager.queue_batch_delete(filenames_to_delete, self._update_operation_progress)
 
+    def _on_batch_download_report(self, report):
+        """Show the throughput and link utilization of a finished batch. Called from a worker thread."""
+        if not report:
+            return
+        summary = (
+            f"Downloaded {report['files_ok']}/{report['files']} files at {report['mb_per_s']:.2f} MB/s "
+            f"(link utilization {report['link_utilization'] * 100:.0f}%)"
+        )
+        self.after(0, lambda: self.update_status_bar(progress_text=summary))
+
     def _update_operation_progress(self, operation):
         """
         Callback to update GUI with operation progress. Called from a worker thread.
@@ -592,6 +608,7 @@ class FileActionsMixin:
                     os.chmod(local_path, stat.S_IWRITE | stat.S_IREAD)
 
                 os.remove(local_path)
+                discard_peak_file(local_path)
                 deleted_count += 1
 
                 # Update metadata cache
@@ -741,6 +758,7 @@ class FileActionsMixin:
                     os.chmod(local_path, stat.S_IWRITE | stat.S_IREAD)
 
                 os.remove(local_path)
+                discard_peak_file(local_path)
 
                 # Update metadata cache
                 cached_metadata = self.file_operations_manager.metadata_cache.get_metadata(filename)
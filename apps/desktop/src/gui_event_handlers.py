@@ -9,7 +9,6 @@ for handling GUI events such as button clicks, key presses, and selection change
 import os
 import subprocess
 import sys
-import time
 import tkinter
 import traceback
 from pathlib import Path
@@ -648,17 +647,9 @@ class EventHandlersMixin:
             if len(selection) == 1:
                 self._update_waveform_for_selection()
 
-            # Skip status updates for simple selections - only update if cache is stale
-            current_time = time.time()
-            should_update_status = not self._status_update_in_progress and (
-                not hasattr(self, "_device_info_cache_time") or current_time - self._device_info_cache_time > 25.0
-            )  # Only update if cache is getting stale
-
-            if should_update_status:
-                self.update_all_status_info()
-            else:
-                # Just update the GUI elements without device communication
-                self._update_gui_file_counts_only()
+            # Selection only changes the file counts; device and storage status are
+            # refreshed when the device state cache reports an invalidation
+            self._update_gui_file_counts_only()
 
             self._selection_update_timer = None
         except Exception as e:
@@ -53,6 +53,8 @@ from constants import DEFAULT_PRODUCT_ID, DEFAULT_VENDOR_ID
 # from ctk_custom_widgets import CTkBanner  # Commented out - not used
 from desktop_device_adapter import DesktopDeviceAdapter
 from device_interface import DeviceManager
+from device_scheduler import CommandPriority, command_priority
+from device_state_cache import CARD_INFO, DEVICE_INFO, FILE_COUNT
 from file_operations_manager import FileOperationsManager
 from gui_actions_device import DeviceActionsMixin
 from gui_actions_file import FileActionsMixin
@@ -146,9 +148,13 @@ class HiDockToolGUI(
         self.device_adapter = DesktopDeviceAdapter(self.usb_backend_instance)
         self.device_manager = DeviceManager(self.device_adapter)
 
-        # Initialize device lock before file operations manager
-        self.device_lock = threading.Lock()
+        # The device lock is the adapter's command scheduler, so GUI actions, file
+        # operations and the protocol layer all queue for the device by priority
+        self.device_lock = self.device_adapter.jensen_device.command_scheduler
         self._abort_file_operations = False  # Flag to abort file operations on disconnect
+        # The status bar reads device and card state from the adapter's state cache and
+        # is refreshed whenever a device event invalidates part of it
+        self.device_adapter.jensen_device.state_cache.add_listener(self._on_device_state_invalidated)
 
         self.file_operations_manager = FileOperationsManager(
             self.device_manager,
@@ -172,6 +178,7 @@ class HiDockToolGUI(
         self._auto_file_refresh_timer_id = None
         self._is_ui_refresh_in_progress = False
         self._previous_recording_filename = None
+        self._live_tail = None  # LiveRecordingTail following the recording in progress
         self.is_long_operation_active = False
         self.cancel_operation_event = None
         self.active_operation_name = None
@@ -244,10 +251,6 @@ class HiDockToolGUI(
         self._selection_update_timer = None
         self._last_loaded_waveform_file = None
         self._waveform_loading = False
-        self._cached_device_info = None
-        self._device_info_cache_time = 0
-        self._cached_storage_info = None
-        self._storage_info_cache_time = 0
         self._cached_storage_text = None
 
         self._menu_image_references = []
@@ -559,6 +562,7 @@ class HiDockToolGUI(
         self.file_stream_timeout_s_var = ctk.IntVar(value=get_conf("file_stream_timeout_s", 180))
         self.auto_refresh_files_var = ctk.BooleanVar(value=get_conf("auto_refresh_files", False))
         self.auto_refresh_interval_s_var = ctk.IntVar(value=get_conf("auto_refresh_interval_s", 30))
+        self.live_tail_recordings_var = ctk.BooleanVar(value=get_conf("live_tail_recordings", False))
         self.quit_without_prompt_var = ctk.BooleanVar(value=get_conf("quit_without_prompt_if_connected", False))
         self.appearance_mode_var = ctk.StringVar(value=get_conf("appearance_mode", "System"))
         self.color_theme_var = ctk.StringVar(value=get_conf("color_theme", "blue"))
@@ -1466,95 +1470,67 @@ class HiDockToolGUI(
         self._status_update_in_progress = True
         threading.Thread(target=self._update_all_status_info_thread, daemon=True).start()
 
+    def _on_device_state_invalidated(self, event, keys):
+        """Device state cache listener: refresh the status bar when its inputs were invalidated."""
+        if not {DEVICE_INFO, CARD_INFO, FILE_COUNT}.intersection(keys):
+            return
+        try:
+            self.after(0, self.update_all_status_info)
+        except (RuntimeError, tkinter.TclError):
+            pass  # Window is being destroyed
+
     def _update_all_status_info_thread(self):
         """
         Worker thread that fetches device info and then schedules a GUI update.
         This runs in the background and should not touch GUI elements directly.
+
+        Device and card info come from the device state cache, so the device is
+        only queried after an event invalidated them.
         """
         try:
             conn_status_text = "Status: Disconnected"
             storage_text = "Storage: ---"
             is_connected = self.device_manager.device_interface.is_connected()
             if is_connected:
-                with self.device_lock:
-                    # Use cached device info if available and recent
-                    current_time = time.time()
-                    if (
-                        hasattr(self, "_cached_device_info")
-                        and hasattr(self, "_device_info_cache_time")
-                        and current_time - self._device_info_cache_time < 30.0
-                    ):  # 30 second cache
-                        device_info = self._cached_device_info
-                    else:
-                        # Check if still connected before getting device info
-                        if self.device_manager.device_interface.is_connected():
-                            try:
-                                device_info = asyncio.run(self.device_manager.device_interface.get_device_info())
-                                self._cached_device_info = device_info
-                                self._device_info_cache_time = current_time
-                            except (ConnectionError, Exception) as e:
-                                logger.debug("GUI", "_update_all_status_info_thread", f"Device info error: {e}")
-                                device_info = None
-                        else:
-                            device_info = None
+                with command_priority(CommandPriority.POLLING):
+                    try:
+                        device_info = asyncio.run(self.device_manager.device_interface.get_device_info())
+                    except (ConnectionError, Exception) as e:
+                        logger.debug("GUI", "_update_all_status_info_thread", f"Device info error: {e}")
+                        device_info = None
 
                     if device_info:
                         conn_status_text = f"Status: Connected ({device_info.model.value or 'HiDock'})"
                         if device_info.serial_number != "N/A":
                             conn_status_text += f" SN: {device_info.serial_number}"
 
-                    # Avoid getting storage info during file list streaming to prevent command conflicts
-                    if (
-                        hasattr(self.device_manager.device_interface, "jensen_device")
-                        and hasattr(
-                            self.device_manager.device_interface.jensen_device,
-                            "is_file_list_streaming",
+                    card_info = asyncio.run(self.device_manager.device_interface.get_storage_info())
+
+                    if card_info and card_info.total_capacity > 0:
+                        used_bytes, capacity_bytes = (
+                            card_info.used_space,
+                            card_info.total_capacity,
                         )
-                        and self.device_manager.device_interface.jensen_device.is_file_list_streaming()
-                    ):
-                        # Use cached storage info if available
-                        if hasattr(self, "_cached_storage_text"):
-                            storage_text = self._cached_storage_text
+                        # Define constants for clarity - use decimal GB (1000-based) not binary GiB (1024-based)
+                        BYTES_PER_MB_DECIMAL = 1000 * 1000
+                        BYTES_PER_GB_DECIMAL = BYTES_PER_MB_DECIMAL * 1000
+                        BYTES_PER_MB_BINARY = 1024 * 1024
+                        BYTES_PER_GB_BINARY = BYTES_PER_MB_BINARY * 1024
+
+                        # Display in GB if capacity is over ~0.9 GB (using decimal GB for proper "GB" labeling)
+                        if capacity_bytes > BYTES_PER_GB_DECIMAL * 0.9:
+                            used_gb = used_bytes / BYTES_PER_GB_DECIMAL
+                            capacity_gb = capacity_bytes / BYTES_PER_GB_DECIMAL
+                            storage_text = f"Storage: {used_gb:.2f}/{capacity_gb:.2f} GB"
                         else:
-                            storage_text = "Storage: Fetching..."
+                            # Otherwise, display in MB (decimal)
+                            used_mb = used_bytes / BYTES_PER_MB_DECIMAL
+                            capacity_mb = capacity_bytes / BYTES_PER_MB_DECIMAL
+                            storage_text = f"Storage: {used_mb:.0f}/{capacity_mb:.0f} MB"
+                        storage_text += f" (Status: {hex(card_info.status_raw)})"
+                        self._cached_storage_text = storage_text
                     else:
-                        # Use cached storage info if recent
-                        if (
-                            hasattr(self, "_cached_storage_info")
-                            and hasattr(self, "_storage_info_cache_time")
-                            and current_time - self._storage_info_cache_time < 60.0
-                        ):  # 60 second cache
-                            card_info = self._cached_storage_info
-                        else:
-                            card_info = asyncio.run(self.device_manager.device_interface.get_storage_info())
-                            self._cached_storage_info = card_info
-                            self._storage_info_cache_time = current_time
-
-                        if card_info and card_info.total_capacity > 0:
-                            used_bytes, capacity_bytes = (
-                                card_info.used_space,
-                                card_info.total_capacity,
-                            )
-                            # Define constants for clarity - use decimal GB (1000-based) not binary GiB (1024-based)
-                            BYTES_PER_MB_DECIMAL = 1000 * 1000
-                            BYTES_PER_GB_DECIMAL = BYTES_PER_MB_DECIMAL * 1000
-                            BYTES_PER_MB_BINARY = 1024 * 1024
-                            BYTES_PER_GB_BINARY = BYTES_PER_MB_BINARY * 1024
-
-                            # Display in GB if capacity is over ~0.9 GB (using decimal GB for proper "GB" labeling)
-                            if capacity_bytes > BYTES_PER_GB_DECIMAL * 0.9:
-                                used_gb = used_bytes / BYTES_PER_GB_DECIMAL
-                                capacity_gb = capacity_bytes / BYTES_PER_GB_DECIMAL
-                                storage_text = f"Storage: {used_gb:.2f}/{capacity_gb:.2f} GB"
-                            else:
-                                # Otherwise, display in MB (decimal)
-                                used_mb = used_bytes / BYTES_PER_MB_DECIMAL
-                                capacity_mb = capacity_bytes / BYTES_PER_MB_DECIMAL
-                                storage_text = f"Storage: {used_mb:.0f}/{capacity_mb:.0f} MB"
-                            storage_text += f" (Status: {hex(card_info.status_raw)})"
-                            self._cached_storage_text = storage_text
-                        else:
-                            storage_text = "Storage: Fetching..."
+                        storage_text = "Storage: Fetching..."
             elif not self.backend_initialized_successfully:
                 conn_status_text = "Status: USB Backend FAILED!"
             self.after(0, self._update_gui_with_status_info, conn_status_text, storage_text)
@@ -3177,16 +3153,9 @@ You can dismiss this warning and continue using the application with limited aud
                     # Start spectrum analysis if available
                     current_track = self.audio_player.get_current_track()
                     if current_track:
-                        # Get audio data for spectrum analysis
+                        # WAV files are mapped, so only the FFT window around the playhead is read
                         try:
-                            from audio_player_enhanced import AudioProcessor
-
-                            (
-                                waveform_data,
-                                sample_rate,
-                            ) = AudioProcessor.extract_waveform_data(current_track.filepath, max_points=1024)
-                            if len(waveform_data) > 0:
-                                self.audio_visualizer_widget.start_spectrum_analysis(waveform_data, sample_rate)
+                            self.audio_visualizer_widget.start_spectrum_analysis_for_file(current_track.filepath)
                         except Exception as spectrum_error:
                             logger.warning(
                                 "MainWindow",
@@ -3356,9 +3325,16 @@ You can dismiss this warning and continue using the application with limited aud
 
             # Use the fixed AudioProcessor method instead of librosa directly
             from audio_player_enhanced import AudioProcessor
+            from waveform_peaks import get_peak_pyramid
 
             # Load audio data in background (this is the slow part)
             try:
+                # Served from the file's peak file on reselect; only the first load decodes the audio
+                peaks = get_peak_pyramid(filepath)
+                if peaks is not None and peaks.frame_count:
+                    self.after(0, self._update_waveform_with_peaks, peaks, filename)
+                    return
+
                 y, sr = AudioProcessor.extract_waveform_data(filepath, max_points=2000)
 
                 if len(y) == 0:
@@ -3378,6 +3354,26 @@ You can dismiss this warning and continue using the application with limited aud
             # Schedule error handling on main thread
             self.after(0, self._handle_waveform_load_error, filename, str(e))
 
+    def _update_waveform_with_peaks(self, peaks, filename):
+        """Show a peak pyramid in the waveform visualizer if the file is still selected (main thread)."""
+        try:
+            if hasattr(self, "audio_visualizer_widget") and hasattr(
+                self.audio_visualizer_widget, "waveform_visualizer"
+            ):
+                current_selection = self.file_tree.selection()
+                if len(current_selection) == 1 and current_selection[0] == filename:
+                    self.audio_visualizer_widget.waveform_visualizer.show_peaks(peaks)
+                    logger.info("WaveformLoader", "_update_waveform_with_peaks", f"Waveform updated for {filename}")
+                else:
+                    logger.debug(
+                        "WaveformLoader",
+                        "_update_waveform_with_peaks",
+                        f"Skipping update - selection changed from {filename}",
+                    )
+        except Exception as e:
+            logger.error("MainWindow", "_update_waveform_with_peaks", f"Error updating waveform: {e}")
+            self._handle_waveform_load_error(filename, str(e))
+
     def _update_waveform_with_data(self, audio_data, sample_rate, filename):
         """Update waveform visualization with pre-loaded data (called on main thread)."""
         try:
@@ -3552,7 +3548,10 @@ You can dismiss this warning and continue using the application with limited aud
                     ),
                 )
 
-        self.file_operations_manager.queue_batch_download([filename], on_playback_download_complete)
+        # Playback downloads jump ahead of queued batch downloads in the device scheduler
+        self.file_operations_manager.queue_download(
+            filename, on_playback_download_complete, priority=CommandPriority.PLAYBACK
+        )
 
     def play_selected_audio_gui(self):
         selected_iids = self.file_tree.selection()
@@ -3687,6 +3686,7 @@ You can dismiss this warning and continue using the application with limited aud
         self.config["file_stream_timeout_s"] = self.file_stream_timeout_s_var.get()
         self.config["auto_refresh_files"] = self.auto_refresh_files_var.get()
         self.config["auto_refresh_interval_s"] = self.auto_refresh_interval_s_var.get()
+        self.config["live_tail_recordings"] = self.live_tail_recordings_var.get()
         self.config["quit_without_prompt_if_connected"] = self.quit_without_prompt_var.get()
         self.config["appearance_mode"] = self.appearance_mode_var.get()
         self.config["color_theme"] = self.color_theme_var.get()
@@ -3727,8 +3727,10 @@ You can dismiss this warning and continue using the application with limited aud
                 "treeview_sort_descending": self.treeview_sort_reverse,
             }
         )
+        self._stop_live_tail()
         if self.device_manager.device_interface.is_connected():
             self.device_manager.device_interface.disconnect()
+        self.device_adapter.stop_device_monitor()
 
         # Shutdown calendar system to save cache
         try:
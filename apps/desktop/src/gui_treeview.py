@@ -165,70 +165,7 @@ class TreeViewMixin:
 
         self.displayed_files_details = files_data
         for i, file_info in enumerate(files_data):
-            tags = []
-            status_text = file_info.get("gui_status", "On Device")
-            if file_info.get("is_recording"):
-                tags.append("recording")
-                status_text = "Recording"
-            elif status_text == "Downloaded":
-                tags.append("downloaded_ok")
-            elif status_text == "Mismatch":
-                tags.append("size_mismatch")
-            elif status_text == "Cancelled":
-                tags.append("cancelled")
-            elif "Error" in status_text:
-                tags.append("size_mismatch")
-            if self.is_audio_playing and self.current_playing_filename_for_replay == file_info["name"]:
-                tags.append("playing")
-                status_text = "Playing"
-            elif (
-                self.is_long_operation_active
-                and self.active_operation_name == "Playback Preparation"
-                and self.current_playing_filename_for_replay == file_info["name"]
-            ):
-                status_text = "Preparing Playback"
-            file_info["gui_status"] = status_text
-
-            # Format size in MB
-            size_bytes = file_info.get("length", 0)
-            size_mb_str = (
-                f"{size_bytes / (1024 * 1024):.2f}"
-                if isinstance(size_bytes, (int, float)) and size_bytes > 0
-                else "0.00"
-            )
-
-            # Format duration in HH:MM:SS
-            duration_sec = file_info.get("duration", 0)
-            if isinstance(duration_sec, (int, float)):
-                duration_str = time.strftime("%H:%M:%S", time.gmtime(duration_sec))
-            else:
-                duration_str = str(duration_sec)
-
-            # Combine Date and Time
-            datetime_str = f"{file_info.get('createDate', '')} {file_info.get('createTime', '')}".strip()
-            if not datetime_str:
-                datetime_str = "---"
-
-            # Format version - display the raw value from the device
-            version_str = str(file_info.get("version", "N/A"))
-
-            # Get meeting information
-            meeting_text = file_info.get("meeting_display_text", "")
-
-            # Get transcription status
-            transcription_display = self._format_transcription_status(file_info)
-
-            values = (
-                file_info.get("original_index", i + 1),
-                file_info["name"],
-                datetime_str,
-                size_mb_str,
-                duration_str,
-                meeting_text,
-                version_str,
-                status_text,
-                transcription_display,
-            )
+            values, tags = self._build_treeview_row(file_info, i)
             self.file_tree.insert("", "end", iid=file_info["name"], values=values, tags=tags)
         if selected_iids:
             new_selection = [iid for iid in selected_iids if self.file_tree.exists(iid)]
@@ -243,6 +180,108 @@ class TreeViewMixin:
             displayed_files = len(files_data)
             self.unified_filter_widget.update_file_counts(displayed_files, total_files)
 
+    def _append_files_to_treeview(self, files_data):
+        """
+        Appends files to the Treeview while a file list is still being received.
+
+        Rows that are already present are skipped, so a retried transfer that
+        starts again from the first entry does not duplicate rows.
+
+        Args:
+            files_data (list): File dictionaries in device order.
+        """
+        if not (hasattr(self, "file_tree") and self.file_tree.winfo_exists()):
+            return
+
+        for child in [child for child in self.file_tree.get_children() if child.startswith("loading_")]:
+            self.file_tree.delete(child)
+
+        if not isinstance(getattr(self, "displayed_files_details", None), list):
+            self.displayed_files_details = []
+        for file_info in files_data:
+            if self.file_tree.exists(file_info["name"]):
+                continue
+            values, tags = self._build_treeview_row(file_info, len(self.displayed_files_details))
+            self.displayed_files_details.append(file_info)
+            self.file_tree.insert("", "end", iid=file_info["name"], values=values, tags=tags)
+
+    def _build_treeview_row(self, file_info, index):
+        """
+        Builds the Treeview values and tags for one file, updating its gui_status.
+
+        Args:
+            file_info (dict): The file's details.
+            index (int): Zero-based position, used when no original_index is set.
+
+        Returns:
+            tuple: (values, tags) for Treeview.insert.
+        """
+        tags = []
+        status_text = file_info.get("gui_status", "On Device")
+        if file_info.get("is_recording"):
+            tags.append("recording")
+            status_text = "Recording"
+        elif status_text == "Downloaded":
+            tags.append("downloaded_ok")
+        elif status_text == "Mismatch":
+            tags.append("size_mismatch")
+        elif status_text == "Cancelled":
+            tags.append("cancelled")
+        elif "Error" in status_text:
+            tags.append("size_mismatch")
+        if self.is_audio_playing and self.current_playing_filename_for_replay == file_info["name"]:
+            tags.append("playing")
+            status_text = "Playing"
+        elif (
+            self.is_long_operation_active
+            and self.active_operation_name == "Playback Preparation"
+            and self.current_playing_filename_for_replay == file_info["name"]
+        ):
+            status_text = "Preparing Playback"
+        file_info["gui_status"] = status_text
+
+        # Format size in MB
+        size_bytes = file_info.get("length", 0)
+        size_mb_str = (
+            f"{size_bytes / (1024 * 1024):.2f}"
+            if isinstance(size_bytes, (int, float)) and size_bytes > 0
+            else "0.00"
+        )
+
+        # Format duration in HH:MM:SS
+        duration_sec = file_info.get("duration", 0)
+        if isinstance(duration_sec, (int, float)):
+            duration_str = time.strftime("%H:%M:%S", time.gmtime(duration_sec))
+        else:
+            duration_str = str(duration_sec)
+
+        # Combine Date and Time
+        datetime_str = f"{file_info.get('createDate', '')} {file_info.get('createTime', '')}".strip()
+        if not datetime_str:
+            datetime_str = "---"
+
+        # Format version - display the raw value from the device
+        version_str = str(file_info.get("version", "N/A"))
+
+        # Get meeting information
+        meeting_text = file_info.get("meeting_display_text", "")
+
+        # Get transcription status
+        transcription_display = self._format_transcription_status(file_info)
+
+        values = (
+            file_info.get("original_index", index + 1),
+            file_info["name"],
+            datetime_str,
+            size_mb_str,
+            duration_str,
+            meeting_text,
+            version_str,
+            status_text,
+            transcription_display,
+        )
+        return values, tags
+
     def _update_file_status_in_treeview(self, file_iid, status_text, tags_to_add):
         """
         Updates the status and tags for a specific file in the Treeview.
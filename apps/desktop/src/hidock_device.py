@@ -1,3 +1,4 @@
+import queue
 import struct
 
 # For platform detection (e.g., in connect method for kernel driver)
@@ -37,6 +38,135 @@ from constants import (
     EP_IN_ADDR,
     EP_OUT_ADDR,
 )
+from device_interface import detect_device_model
+from device_scheduler import DeviceCommandScheduler
+from device_state_cache import (
+    CARD_INFO,
+    DEVICE_INFO,
+    EVENT_CONNECTED,
+    EVENT_DELETE,
+    EVENT_DISCONNECTED,
+    EVENT_DOWNLOAD_FINISHED,
+    EVENT_FORMAT,
+    EVENT_SETTINGS_CHANGED,
+    FILE_COUNT,
+    RECORDING_FILE,
+    SETTINGS,
+    DeviceStateCache,
+)
+from file_list_snapshot import FileListDelta, compute_file_list_delta, index_entries
+from transfer_tuning import TransferAutoTuner
+
+# Jensen packet header: sync marker (0x1234), command ID, sequence ID, body length.
+# Precompiled once so the receive path can parse headers in place with unpack_from.
+_PACKET_HEADER = struct.Struct(">HHII")
+_PACKET_HEADER_SIZE = _PACKET_HEADER.size
+_SYNC_WORD = 0x1234
+_SYNC_MARKER = b"\x12\x34"
+
+# File list entry: version (1), name length (3), name, file length (4), reserved (6), signature (16)
+_FILE_LIST_HEADER_SIZE = 6  # 0xFFFF marker followed by a 4-byte file count
+_FILE_ENTRY_PREFIX_SIZE = 4
+_FILE_ENTRY_TAIL_SIZE = 4 + 6 + 16
+_FILE_LENGTH = struct.Struct(">I")
+
+# Bytes read from the end of the newest listed file to validate a file list snapshot
+FILE_TAIL_CHECK_BYTES = 16
+
+
+class _HexPreview:
+    """Hex dump of a slice that is only built if a log message is actually written."""
+
+    __slots__ = ("data", "start", "end")
+
+    def __init__(self, data, start=0, end=None):
+        self.data = data
+        self.start = start
+        self.end = end
+
+    def __str__(self):
+        return bytes(self.data[self.start : self.end]).hex()
+
+
+class FileListStreamParser:
+    """
+    Incremental parser for CMD_GET_FILE_LIST response bodies.
+
+    Chunks are fed in arrival order. Every entry whose bytes are complete is
+    decoded straight away; the bytes of an entry split across packets are
+    carried over until the next chunk completes it. The optional 0xFFFF header
+    at the start of the stream provides ``expected_count``.
+    """
+
+    def __init__(self, entry_builder):
+        """
+        Args:
+            entry_builder (callable): Called as ``entry_builder(version, filename, length, signature_hex)``
+                                      for each complete entry; its return value is emitted.
+        """
+        self._entry_builder = entry_builder
+        self._pending = bytearray()
+        self._header_checked = False
+        self.expected_count = None
+        self.parsed_count = 0
+        self.bytes_received = 0
+        self.chunks_received = 0
+
+    @property
+    def is_complete(self):
+        """True once as many entries as announced by the header have been parsed."""
+        return self.expected_count is not None and self.parsed_count >= self.expected_count
+
+    @property
+    def pending_bytes(self):
+        """Number of received bytes that do not yet form a complete entry."""
+        return len(self._pending)
+
+    def feed(self, chunk):
+        """
+        Add a chunk of list data and return the entries it completed.
+
+        Args:
+            chunk (bytes-like): Body of one CMD_GET_FILE_LIST response.
+
+        Returns:
+            list: Entries completed by this chunk, in device order.
+        """
+        if chunk:
+            self._pending += chunk
+            self.bytes_received += len(chunk)
+            self.chunks_received += 1
+
+        buffer = self._pending
+        pos = 0
+        if not self._header_checked:
+            if len(buffer) < 2 or (buffer[0] == 0xFF and buffer[1] == 0xFF and len(buffer) < _FILE_LIST_HEADER_SIZE):
+                return []
+            if buffer[0] == 0xFF and buffer[1] == 0xFF:
+                self.expected_count = _FILE_LENGTH.unpack_from(buffer, 2)[0]
+                pos = _FILE_LIST_HEADER_SIZE
+            self._header_checked = True
+
+        entries = []
+        end = len(buffer)
+        while not self.is_complete and pos + _FILE_ENTRY_PREFIX_SIZE <= end:
+            name_start = pos + _FILE_ENTRY_PREFIX_SIZE
+            name_end = name_start + int.from_bytes(buffer[pos + 1 : name_start], "big")
+            if name_end + _FILE_ENTRY_TAIL_SIZE > end:
+                break  # Entry continues in a later chunk
+
+            filename = bytes(buffer[name_start:name_end]).rstrip(b"\x00").decode("ascii", errors="ignore")
+            file_length = _FILE_LENGTH.unpack_from(buffer, name_end)[0]
+            signature_hex = buffer[name_end + 10 : name_end + _FILE_ENTRY_TAIL_SIZE].hex()
+            entries.append(self._entry_builder(buffer[pos], filename, file_length, signature_hex))
+            self.parsed_count += 1
+            pos = name_end + _FILE_ENTRY_TAIL_SIZE
+
+        if pos:
+            del buffer[:pos]
+        if self.is_complete:
+            buffer.clear()
+        return entries
 
 
 class HiDockJensen:
@@ -61,10 +191,21 @@ class HiDockJensen:
 
         self.usb_backend = usb_backend_instance_ref
         self.device = None
+        # (bus, address) of the unit this instance last connected to. Kept across
+        # disconnects so a reconnect finds the same unit when several are docked.
+        self.usb_location = None
+        # Optional device_monitor.DeviceMonitor. While it tracks attached units,
+        # _find_device looks devices up in its registry instead of scanning the bus.
+        self.device_monitor = None
         self.ep_out = None
         self.ep_in = None
         self.sequence_id = 0
         self.receive_buffer = bytearray()
+        # Read cursor into receive_buffer. Consumed packets advance the cursor instead of
+        # re-slicing the buffer, so parsing a large stream stays linear.
+        self._rx_pos = 0
+        # Views handed out by zero-copy receives; released before the buffer is mutated.
+        self._rx_exported_views = []
         self.device_info = {}
         self.model = "unknown"
         self.claimed_interface_number = -1
@@ -76,7 +217,19 @@ class HiDockJensen:
             "bluetoothTone": None,
             "notificationSound": None,
         }
-        self._usb_lock = threading.RLock()  # Changed to RLock
+        # Single priority-ordered, re-entrant lock for every command exchange. The GUI
+        # shares it as its device lock, so all device access is queued in one place.
+        self.command_scheduler = DeviceCommandScheduler()
+        self._usb_lock = self.command_scheduler
+        # Device info, card info, settings, recording file and file count, kept until
+        # a device event invalidates them instead of being re-queried by every caller.
+        self.state_cache = DeviceStateCache()
+        self.state_cache.add_listener(self._on_device_state_event)
+        # Read size and response timeouts, tuned from measurements of the connected
+        # device. With a TransferProfileStore set (the desktop adapter sets one) the
+        # tuned profile is loaded and saved per device serial.
+        self.transfer_tuner = TransferAutoTuner()
+        self.transfer_profile_store = None
         self._abort_operations = False  # Flag to abort ongoing operations
 
         # Enhanced connection management
@@ -86,7 +239,17 @@ class HiDockJensen:
         self._last_error = None
         self._connection_health_check_interval = 30.0  # seconds
         self._is_in_health_check = False
+        # Time the link was last known to be alive. Every successful write or read
+        # counts as a heartbeat, so the probe only runs after an idle interval.
         self._last_health_check = 0
+        self._health_stats = {
+            "probes": 0,
+            "probe_failures": 0,
+            "last_probe_ms": None,
+            "avg_probe_ms": None,
+            "max_probe_ms": None,
+        }
+        self._health_probe_total_ms = 0.0
 
         # Enhanced error tracking
         self._error_counts = {
@@ -104,14 +267,16 @@ class HiDockJensen:
             "bytes_transferred": 0,
             "connection_time": 0,
             "last_operation_time": 0,
+            "bus_scans": 0,
+            "last_connect_ms": 0,
         }
 
-    def get_usb_lock(self) -> threading.RLock:
+    def get_usb_lock(self) -> DeviceCommandScheduler:
         """
-        Provides access to the internal USB RLock for external synchronization.
+        Provides access to the device command scheduler for external synchronization.
 
         Returns:
-            threading.RLock: The RLock instance used for synchronizing USB operations.
+            DeviceCommandScheduler: Re-entrant lock used for synchronizing USB operations.
         """
         return self._usb_lock
 
@@ -125,13 +290,44 @@ class HiDockJensen:
         return {
             "is_connected": self.is_connected(),
             "model": self.model,
+            "usb_location": self.usb_location,
             "retry_count": self._connection_retry_count,
             "error_counts": self._error_counts.copy(),
             "operation_stats": self._operation_stats.copy(),
             "last_error": self._last_error,
             "device_info": self.device_info.copy(),
+            "scheduler": self.command_scheduler.get_stats(),
+            "health": self.get_health_stats(),
+            "state_cache": self.state_cache.get_stats(),
+            "transfer_profile": self.transfer_tuner.get_stats(),
         }
 
+    def get_health_stats(self) -> dict:
+        """
+        Returns liveness statistics, kept separate from command statistics.
+
+        Returns:
+            dict: Probe count, failures and latency in milliseconds, plus the
+            seconds since the link was last known to be alive.
+        """
+        stats = self._health_stats.copy()
+        stats["idle_s"] = round(time.time() - self._last_health_check, 3) if self._last_health_check else None
+        return stats
+
+    def _record_heartbeat(self):
+        """Marks the link as alive after a successful USB read or write."""
+        self._last_health_check = time.time()
+
+    def _record_health_probe(self, latency_ms: float, success: bool):
+        stats = self._health_stats
+        stats["probes"] += 1
+        if not success:
+            stats["probe_failures"] += 1
+        self._health_probe_total_ms += latency_ms
+        stats["last_probe_ms"] = round(latency_ms, 2)
+        stats["avg_probe_ms"] = round(self._health_probe_total_ms / stats["probes"], 2)
+        stats["max_probe_ms"] = round(max(stats["max_probe_ms"] or 0.0, latency_ms), 2)
+
     def reset_error_counts(self):
         """
         Resets all error counters. Useful for testing or after resolving issues.
@@ -173,7 +369,10 @@ class HiDockJensen:
 
     def _perform_health_check(self) -> bool:
         """
-        Performs a health check on the current connection.
+        Probes the connection if it has been idle for the health check interval.
+
+        Successful reads and writes refresh the liveness timestamp, so during
+        normal traffic (including batch transfers) no probe is sent.
 
         Returns:
             bool: True if connection is healthy, False otherwise.
@@ -183,7 +382,7 @@ class HiDockJensen:
 
         current_time = time.time()
         if (current_time - self._last_health_check) < self._connection_health_check_interval:
-            return True  # Skip check if too recent
+            return True  # Link was active recently
 
         self._last_health_check = current_time
 
@@ -191,13 +390,16 @@ class HiDockJensen:
             return False
 
         self._is_in_health_check = True
+        probe_start = time.perf_counter()
+        healthy = False
         try:
             try:
                 # Perform a lightweight operation to test connection
                 # Increased timeout to avoid false failures
-                device_info = self.get_device_info(timeout_s=5)
+                device_info = self.get_device_info(timeout_s=5, use_cache=False)
                 if device_info:
                     logger.debug("Jensen", "_perform_health_check", "Health check passed")
+                    healthy = True
                     return True
                 else:
                     logger.warning(
@@ -211,6 +413,7 @@ class HiDockJensen:
                 self._increment_error_count("connection_lost")
                 return False
         finally:
+            self._record_health_probe((time.perf_counter() - probe_start) * 1000, healthy)
             self._is_in_health_check = False
 
     def reset_device_state(self):
@@ -222,7 +425,7 @@ class HiDockJensen:
 
         with self._usb_lock:
             # Clear receive buffer to remove any stale data
-            self.receive_buffer.clear()
+            self._clear_receive_buffer()
 
             # Reset sequence ID to avoid conflicts
             self.sequence_id = 0
@@ -264,13 +467,15 @@ class HiDockJensen:
         """
         return self.device is not None and self.ep_in is not None and self.ep_out is not None and self.is_connected_flag
 
-    def _find_device(self, vid_to_find: int, pid_to_find: int):
+    def _find_device(self, vid_to_find: int, pid_to_find: int, location: tuple[int, int] | None = None):
         """
         Finds a USB device with the specified Vendor ID and Product ID.
 
         Args:
             vid_to_find (int): The Vendor ID of the device to find.
             pid_to_find (int): The Product ID of the device to find.
+            location (tuple[int, int], optional): (bus, address) of a specific unit when
+                                                  several with the same VID/PID are attached.
 
         Returns:
             usb.core.Device: The found PyUSB device object.
@@ -291,7 +496,21 @@ class HiDockJensen:
             "_find_device",
             f"Looking for VID={hex(vid_to_find)}, PID={hex(pid_to_find)}",
         )
-        device = usb.core.find(idVendor=vid_to_find, idProduct=pid_to_find, backend=self.usb_backend)
+        monitor = self.device_monitor
+        device = None
+        if monitor is not None and monitor.mode is not None:
+            device = monitor.find(vid_to_find, pid_to_find, location)
+        if device is None and (monitor is None or not monitor.is_authoritative):
+            self._operation_stats["bus_scans"] += 1
+            if location is None:
+                device = usb.core.find(idVendor=vid_to_find, idProduct=pid_to_find, backend=self.usb_backend)
+            else:
+                device = usb.core.find(
+                    idVendor=vid_to_find,
+                    idProduct=pid_to_find,
+                    backend=self.usb_backend,
+                    custom_match=lambda dev: (dev.bus, dev.address) == tuple(location),
+                )
         if device is None:
             logger.info(  # Changed from error to info, as this is an expected scenario
                 "Jensen",
@@ -344,6 +563,7 @@ class HiDockJensen:
         pid: int = DEFAULT_PRODUCT_ID,
         auto_retry: bool = True,
         force_reset: bool = False,
+        location: tuple[int, int] | None = None,
     ) -> tuple[bool, str | None]:
         """
         Connects to the HiDock device with automatic retry mechanisms.
@@ -358,6 +578,8 @@ class HiDockJensen:
             pid (int, optional): The Product ID of the device. Defaults to DEFAULT_PRODUCT_ID.
             auto_retry (bool, optional): Whether to automatically retry on failure. Defaults to True.
             force_reset (bool, optional): Whether to force a device state reset before connecting. Defaults to False.
+            location (tuple[int, int], optional): (bus, address) of the unit to connect to. Defaults to
+                                                  the first matching device.
 
         Returns:
             tuple[bool, str | None]: (True, None) if successful,
@@ -381,21 +603,24 @@ class HiDockJensen:
             self.claimed_interface_number = -1
             
             # Clear receive buffer to prevent stale data issues
-            self.receive_buffer.clear()
+            self._clear_receive_buffer()
             logger.debug("Jensen", "connect", "Cleared receive buffer before connection")
 
             # Reset retry count for new connection attempt
             if auto_retry:
                 self._connection_retry_count = 0
 
+            connect_started = time.perf_counter()
             # Attempt connection with retry logic
             while True:
-                success, error_msg = self._attempt_connection(target_interface_number, vid, pid)
+                success, error_msg = self._attempt_connection(target_interface_number, vid, pid, location)
 
                 if success:
                     self._connection_retry_count = 0
                     self._operation_stats["connection_time"] = time.time()
-                    logger.info("Jensen", "connect", f"Successfully connected to {self.model}")
+                    connect_ms = (time.perf_counter() - connect_started) * 1000
+                    self._operation_stats["last_connect_ms"] = connect_ms
+                    logger.info("Jensen", "connect", "Successfully connected to %s in %.1f ms", self.model, connect_ms)
                     return True, None
 
                 self._last_error = error_msg
@@ -442,7 +667,9 @@ class HiDockJensen:
                     )
                 time.sleep(self._retry_delay)
 
-    def _attempt_connection(self, target_interface_number: int, vid: int, pid: int) -> tuple[bool, str | None]:
+    def _attempt_connection(
+        self, target_interface_number: int, vid: int, pid: int, location: tuple[int, int] | None = None
+    ) -> tuple[bool, str | None]:
         """
         Attempts a single connection to the device.
 
@@ -450,16 +677,24 @@ class HiDockJensen:
             target_interface_number (int): The interface number to claim.
             vid (int): The Vendor ID of the device.
             pid (int): The Product ID of the device.
+            location (tuple[int, int], optional): (bus, address) of the unit to connect to.
 
         Returns:
             tuple[bool, str | None]: (True, None) if successful, (False, error_message) otherwise.
         """
 
         try:
-            self.device = self._find_device(vid, pid)
+            if location is None:
+                self.device = self._find_device(vid, pid)
+            else:
+                self.device = self._find_device(vid, pid, location)
             if self.device is None:
                 # _find_device now returns None if not found, and logs it.
                 error_msg = f"Device VID={hex(vid)}, PID={hex(pid)} not found."
+                if location is not None:
+                    error_msg = (
+                        f"Device VID={hex(vid)}, PID={hex(pid)} at bus {location[0]} address {location[1]} not found."
+                    )
                 logger.warning("Jensen", "_attempt_connection", f"Failed to connect: {error_msg}")
                 # No need to call self.disconnect() here as nothing was partially connected.
                 return False, error_msg
@@ -602,6 +837,8 @@ class HiDockJensen:
             )
 
             self.is_connected_flag = True
+            self.state_cache.publish(EVENT_CONNECTED)
+            self._record_heartbeat()  # The link was just proven alive; no probe before the first command
             
             # Flush any pending data from the USB endpoints to start fresh
             try:
@@ -630,10 +867,11 @@ class HiDockJensen:
                 logger.debug("Jensen", "_attempt_connection", f"Flush error (ignored): {e}")
             
             # Clear receive buffer one more time after flush
-            self.receive_buffer.clear()
+            self._clear_receive_buffer()
             
             # Reset sequence ID to sync with device
             self.sequence_id = 0
+            self.usb_location = (getattr(self.device, "bus", None), getattr(self.device, "address", None))
             
             return True, None
         except (
@@ -753,13 +991,15 @@ class HiDockJensen:
         Resets all internal attributes related to the USB connection and device state.
         Called during disconnection or when a connection attempt fails partway.
         """
+        self._save_transfer_profile()
+        self.transfer_tuner = TransferAutoTuner()
         self.device = None
         self.ep_out = None
         self.ep_in = None
         self.claimed_interface_number = -1
         self.detached_kernel_driver_on_interface = -1
         self.is_connected_flag = False
-        self.receive_buffer.clear()
+        self._clear_receive_buffer()
         self._abort_operations = False  # Reset abort flag
         self.sequence_id = 0  # Reset sequence ID for next connection
         self.device_info = {}
@@ -770,6 +1010,45 @@ class HiDockJensen:
             "bluetoothTone": None,
             "notificationSound": None,
         }
+        self.state_cache.publish(EVENT_DISCONNECTED)
+
+    def _release_exported_views(self):
+        """
+        Releases memoryviews handed out by zero-copy receives.
+
+        Zero-copy packet bodies are only valid until the next receive. Releasing them
+        here lets the receive buffer be compacted or resized safely.
+        """
+        for view in self._rx_exported_views:
+            view.release()
+        self._rx_exported_views.clear()
+
+    def _clear_receive_buffer(self):
+        """Discards all buffered receive data and resets the read cursor."""
+        self._release_exported_views()
+        try:
+            self.receive_buffer.clear()
+        except BufferError:
+            # A caller still holds a slice of a zero-copy body; leave it pointing at the
+            # old storage and start over with a fresh buffer.
+            self.receive_buffer = bytearray()
+        self._rx_pos = 0
+
+    def _compact_receive_buffer(self):
+        """
+        Drops already-consumed bytes from the front of the receive buffer.
+
+        Deleting a prefix of a bytearray only moves its start offset in CPython, so this
+        does not copy the unconsumed tail the way re-slicing the buffer would.
+        """
+        self._release_exported_views()
+        if self._rx_pos == 0:
+            return
+        try:
+            del self.receive_buffer[: self._rx_pos]
+        except BufferError:
+            self.receive_buffer = bytearray(memoryview(self.receive_buffer)[self._rx_pos :])
+        self._rx_pos = 0
 
     def _build_packet(self, command_id, body_bytes=b""):
         """
@@ -815,7 +1094,7 @@ class HiDockJensen:
             logger.error("Jensen", "_send_command", "Not connected. Cannot send command.")
             raise ConnectionError("Device not connected.")
 
-        # Perform health check if needed
+        # Probe only if the link has been idle; recent traffic already proves liveness
         if not self._perform_health_check():
             logger.warning(
                 "Jensen",
@@ -828,12 +1107,17 @@ class HiDockJensen:
         logger.debug(
             "Jensen",
             "_send_command",
-            f"SEND CMD: {command_id}, Seq: {self.sequence_id}, Len: {len(body_bytes)}, Data: {packet.hex()[:64]}...",
+            "SEND CMD: %s, Seq: %s, Len: %s, Data: %s...",
+            command_id,
+            self.sequence_id,
+            len(body_bytes),
+            _HexPreview(packet, 0, 32),
         )
 
         start_time = time.time()
         try:
             bytes_sent = self.ep_out.write(packet, timeout=int(timeout_ms))
+            self._record_heartbeat()
 
             # Update performance statistics
             self._operation_stats["commands_sent"] += 1
@@ -882,7 +1166,7 @@ class HiDockJensen:
             raise  # Re-raise to be caught by caller
         return self.sequence_id
 
-    def _receive_response(self, expected_seq_id, timeout_ms=5000, streaming_cmd_id=None):
+    def _receive_response(self, expected_seq_id, timeout_ms=5000, streaming_cmd_id=None, zero_copy=False):
         """
         Receives and parses a response packet from the device's IN endpoint.
 
@@ -891,6 +1175,10 @@ class HiDockJensen:
         and body. It waits for a response matching the `expected_seq_id` or,
         if `streaming_cmd_id` is provided, accepts packets matching that command ID.
 
+        Packets are parsed in place: a read cursor advances over consumed packets and
+        the buffer is only compacted right before more USB data is appended, so large
+        streams are not re-copied once per packet.
+
         Args:
             expected_seq_id (int): The sequence ID of the command for which a response is expected.
             timeout_ms (int, optional): Overall timeout for receiving a complete and valid response
@@ -898,6 +1186,10 @@ class HiDockJensen:
             streaming_cmd_id (int, optional): If provided, packets with this command ID will also be
                                               considered valid responses, typically used for data
                                               packets during file streaming. Defaults to None.
+            zero_copy (bool, optional): If True, the returned "body" is a memoryview into the
+                                        receive buffer instead of a copy. The view is only valid
+                                        until the next receive call and must not be stored.
+                                        Defaults to False.
 
         Returns:
             dict or None: A dictionary containing {"id", "sequence", "body"} of the response if successful,
@@ -907,6 +1199,9 @@ class HiDockJensen:
             logger.error("Jensen", "_receive_response", "Not connected. Cannot receive response.")
             raise ConnectionError("Device not connected.")
 
+        # Bodies handed out by the previous zero-copy receive are no longer valid.
+        self._release_exported_views()
+
         start_time = time.time()
         overall_timeout_sec = timeout_ms / 1000.0
 
@@ -915,19 +1210,21 @@ class HiDockJensen:
             if self._abort_operations:
                 logger.debug("Jensen", "_receive_response", "Operation aborted")
                 return None
-                
-            # --- BEGIN MODIFICATION ---
-            # Invert the logic: First, try to parse the existing buffer.
+
+            # First, try to parse the existing buffer.
             # Only read from the device if the buffer doesn't contain a full packet.
             # This prioritizes processing and prevents the buffer from growing uncontrollably.
+            buffer = self.receive_buffer
 
             # Attempt to parse messages from buffer
             while True:  # Loop to parse multiple messages if they are buffered
-                if len(self.receive_buffer) < 2:
+                pos = self._rx_pos
+                available = len(buffer) - pos
+                if available < 2:
                     break  # Not enough for sync marker
 
                 # Re-sync if necessary
-                if not (self.receive_buffer[0] == 0x12 and self.receive_buffer[1] == 0x34):
+                if not (buffer[pos] == 0x12 and buffer[pos + 1] == 0x34):
                     # During streaming, we expect a continuous flow of valid packets.
                     # A missing sync marker at the start of the buffer is a fatal protocol error.
                     if streaming_cmd_id is not None:
@@ -936,101 +1233,115 @@ class HiDockJensen:
                             "_receive_response",
                             f"Protocol desync during stream (CMD {streaming_cmd_id}). "
                             f"Buffer should start with sync marker but doesn't. "
-                            f"Prefix: {self.receive_buffer[:64].hex()}",
+                            f"Prefix: {bytes(buffer[pos:pos + 64]).hex()}",
                         )
                         self._increment_error_count("protocol_error")
-                        self.receive_buffer.clear()  # Clear bad data
+                        self._clear_receive_buffer()  # Clear bad data
                         # Exit parsing loop, will lead to timeout in stream_file
                         return None  # Make it fail fast
 
                     # For non-streaming commands, attempt to find the next sync marker.
-                    sync_offset = self.receive_buffer.find(b"\x12\x34")
+                    sync_offset = buffer.find(_SYNC_MARKER, pos)
                     if sync_offset != -1:
-                        if sync_offset > 0:
-                            logger.warning(
-                                "Jensen",
-                                "_receive_response",
-                                f"Re-syncing: Discarded {sync_offset} "
-                                f"prefix bytes: {self.receive_buffer[:sync_offset].hex()}",
-                            )
-                        self.receive_buffer = self.receive_buffer[sync_offset:]
+                        logger.warning(
+                            "Jensen",
+                            "_receive_response",
+                            f"Re-syncing: Discarded {sync_offset - pos} "
+                            f"prefix bytes: {bytes(buffer[pos:sync_offset]).hex()}",
+                        )
+                        self._rx_pos = pos = sync_offset
+                        available = len(buffer) - pos
                     else:
                         # No sync marker found at all, discard the whole buffer
                         # as it's unrecoverable garbage.
                         logger.warning(
                             "Jensen",
                             "_receive_response",
-                            f"No sync marker found in buffer. Discarding {len(self.receive_buffer)} bytes.",
+                            f"No sync marker found in buffer. Discarding {available} bytes.",
                         )
-                        self.receive_buffer.clear()
+                        self._clear_receive_buffer()
+                        buffer = self.receive_buffer
                         break
 
-                if len(self.receive_buffer) < 12:
+                if available < _PACKET_HEADER_SIZE:
                     break  # Not enough for full header
 
-                header_prefix = self.receive_buffer[:12]
-                response_cmd_id, response_seq_id, body_len_from_header = struct.unpack(">HII", header_prefix[2:])
+                _, response_cmd_id, response_seq_id, body_len_from_header = _PACKET_HEADER.unpack_from(buffer, pos)
 
                 checksum_len = (
                     body_len_from_header >> 24
                 ) & 0xFF  # Not used by this device typically, but part of spec
                 body_len = body_len_from_header & 0x00FFFFFF
-                total_msg_len = 12 + body_len + checksum_len
+                total_msg_len = _PACKET_HEADER_SIZE + body_len + checksum_len
 
-                if len(self.receive_buffer) >= total_msg_len:
-                    msg_bytes_full = self.receive_buffer[:total_msg_len]
-                    self.receive_buffer = self.receive_buffer[total_msg_len:]  # Consume the message from buffer
+                if available < total_msg_len:
+                    break  # Not enough data for this full message yet
 
-                    # Check if this is the response we're waiting for OR a streaming packet
-                    if response_seq_id == expected_seq_id or (
-                        streaming_cmd_id is not None and response_cmd_id == streaming_cmd_id
-                    ):
-                        logger.debug(
-                            "Jensen",
-                            "_receive_response",
-                            f"RECV RSP CMD: {response_cmd_id}, "
-                            f"Seq: {response_seq_id}, "
-                            f"BodyLen: {body_len}, "
-                            f"Body: {msg_bytes_full[12:12 + body_len].hex()[:64]}...",
-                        )
+                # Consume the message by advancing the cursor (no buffer copy).
+                body_start = pos + _PACKET_HEADER_SIZE
+                self._rx_pos = pos + total_msg_len
+
+                # Check if this is the response we're waiting for OR a streaming packet
+                if response_seq_id == expected_seq_id or (
+                    streaming_cmd_id is not None and response_cmd_id == streaming_cmd_id
+                ):
+                    logger.debug(
+                        "Jensen",
+                        "_receive_response",
+                        "RECV RSP CMD: %s, Seq: %s, BodyLen: %s, Body: %s...",
+                        response_cmd_id,
+                        response_seq_id,
+                        body_len,
+                        _HexPreview(buffer, body_start, body_start + 32),
+                    )
 
-                        # Update performance statistics
-                        self._operation_stats["responses_received"] += 1
-                        self._operation_stats["bytes_transferred"] += len(msg_bytes_full)
+                    # Update performance statistics
+                    self._operation_stats["responses_received"] += 1
+                    self._operation_stats["bytes_transferred"] += total_msg_len
+                    self._record_heartbeat()
 
-                        return {
-                            "id": response_cmd_id,
-                            "sequence": response_seq_id,
-                            "body": msg_bytes_full[12 : 12 + body_len],
-                        }
+                    if zero_copy:
+                        buffer_view = memoryview(buffer)
+                        body = buffer_view[body_start : body_start + body_len]
+                        self._rx_exported_views.extend((body, buffer_view))
                     else:
-                        logger.warning(
-                            "Jensen",
-                            "_receive_response",
-                            f"Unexpected Seq/CMD. Expected Seq: {expected_seq_id} "
-                            f"(or stream {streaming_cmd_id}), "
-                            f"Got CMD: {response_cmd_id} "
-                            f"Seq: {response_seq_id}. Discarding.",
-                        )
-                else:  # Not enough data for this full message yet
-                    break
+                        body = bytes(buffer[body_start : body_start + body_len])
+
+                    return {
+                        "id": response_cmd_id,
+                        "sequence": response_seq_id,
+                        "body": body,
+                    }
+
+                logger.warning(
+                    "Jensen",
+                    "_receive_response",
+                    f"Unexpected Seq/CMD. Expected Seq: {expected_seq_id} "
+                    f"(or stream {streaming_cmd_id}), "
+                    f"Got CMD: {response_cmd_id} "
+                    f"Seq: {response_seq_id}. Discarding.",
+                )
 
             # If we've reached here, it means the buffer didn't contain a full packet.
             # Now, we can safely read more data from the device.
             try:
-                # Read a larger chunk to reduce number of USB transactions, if wMaxPacketSize is known
-                read_size = self.ep_in.wMaxPacketSize * 64 if self.ep_in.wMaxPacketSize else 4096  # Increased read size
+                # Read several packets per transaction; the multiple and the per-read
+                # timeout come from the tuned transfer profile (64 packets / 200 ms by default)
+                profile = self.transfer_tuner.profile
+                packet_size = self.ep_in.wMaxPacketSize or 64
                 data_chunk = self.device.read(
-                    self.ep_in.bEndpointAddress, read_size, timeout=200
-                )  # Slightly longer individual timeout
+                    self.ep_in.bEndpointAddress, packet_size * profile.read_packets, timeout=profile.read_timeout_ms
+                )
                 if data_chunk:
+                    self._compact_receive_buffer()
                     self.receive_buffer.extend(data_chunk)
                     logger.debug(
                         "Jensen",
                         "_receive_response",
-                        f"Rcvd chunk len: {len(data_chunk)}. "
-                        f"Buf len: {len(self.receive_buffer)}. "
-                        f"Data: {bytes(data_chunk).hex()[:32]}...",
+                        "Rcvd chunk len: %s. Buf len: %s. Data: %s...",
+                        len(data_chunk),
+                        len(self.receive_buffer),
+                        _HexPreview(data_chunk, 0, 16),
                     )
             except usb.core.USBTimeoutError:
                 # If we are in a streaming context, a timeout is not necessarily an error,
@@ -1063,22 +1374,23 @@ class HiDockJensen:
                 self._increment_error_count("connection_lost")
                 self.disconnect()  # Assume connection is lost
                 return None
-            # --- END MODIFICATION ---
 
         # Use DEBUG level for streaming timeouts as they are expected behavior during multi-chunk transfers
         if streaming_cmd_id is not None:
             logger.debug(
                 "Jensen",
                 "_receive_response",
-                f"Expected streaming timeout for SeqID {expected_seq_id} (CMD {streaming_cmd_id}) - "
-                f"device pausing between chunks",
+                "Expected streaming timeout for SeqID %s (CMD %s) - device pausing between chunks",
+                expected_seq_id,
+                streaming_cmd_id,
             )
         else:
             logger.warning(
                 "Jensen",
                 "_receive_response",
                 f"Timeout waiting for response to SeqID {expected_seq_id}. "
-                f"Buffer content (first 128 bytes): {self.receive_buffer.hex()[:128]}",
+                f"Buffer content (first 64 bytes): "
+                f"{bytes(self.receive_buffer[self._rx_pos:self._rx_pos + 64]).hex()}",
             )
         return None
 
@@ -1106,16 +1418,20 @@ class HiDockJensen:
             try:
                 # Clear buffer only for non-streaming commands to avoid losing data from a previous stream
                 if command_id != CMD_TRANSFER_FILE:
-                    self.receive_buffer.clear()
+                    self._clear_receive_buffer()
 
+                started = time.perf_counter()
                 seq_id = self._send_command(command_id, body_bytes, timeout_ms)
                 # For streaming commands, pass the streaming_cmd_id to _receive_response
                 # so it knows to accept packets with that command ID even if sequence ID doesn't match the initial one.
-                return self._receive_response(
+                response = self._receive_response(
                     seq_id,
                     int(timeout_ms),
                     streaming_cmd_id=(CMD_TRANSFER_FILE if command_id == CMD_TRANSFER_FILE else None),
                 )
+                if response is not None and command_id != CMD_TRANSFER_FILE:
+                    self.transfer_tuner.record_command((time.perf_counter() - started) * 1000)
+                return response
             except (
                 usb.core.USBError,
                 ConnectionError,
@@ -1125,17 +1441,23 @@ class HiDockJensen:
                 raise  # Re-raise to be handled by the calling method in GUI
 
     # --- Device Command Methods (Identical to original script, using the logger instance) ---
-    def get_device_info(self, timeout_s=5):
+    def get_device_info(self, timeout_s=5, use_cache=True):
         """
         Retrieves device information (firmware version, serial number).
 
         Args:
             timeout_s (int, optional): Timeout in seconds for the operation. Defaults to 5.
+            use_cache (bool, optional): Answer from the device state cache if it holds
+                                        the value. Defaults to True.
 
         Returns:
             dict or None: A dictionary containing "versionCode", "versionNumber", and "sn"
                           if successful, None otherwise.
         """
+        if use_cache:
+            hit, cached = self.state_cache.lookup(DEVICE_INFO)
+            if hit:
+                return cached
         response = self._send_and_receive(CMD_GET_DEVICE_INFO, timeout_ms=int(timeout_s * 1000))
         if response and response["id"] == CMD_GET_DEVICE_INFO:
             body = response["body"]
@@ -1166,6 +1488,8 @@ class HiDockJensen:
                     "get_device_info",
                     f"Parsed Device Info: {self.device_info}",
                 )
+                self.state_cache.store(DEVICE_INFO, self.device_info)
+                self._load_transfer_profile()
                 return self.device_info
             else:
                 logger.error(
@@ -1181,17 +1505,44 @@ class HiDockJensen:
             )
         return None
 
-    def get_file_count(self, timeout_s=5):
+    def _load_transfer_profile(self):
+        """Start tuning from the stored profile for this serial, model and firmware."""
+        if self.transfer_profile_store is None:
+            return
+        model = detect_device_model(getattr(self.device, "idVendor", 0), getattr(self.device, "idProduct", 0))
+        self.transfer_tuner = self.transfer_profile_store.tuner_for(
+            self.device_info.get("sn"), model, self.device_info.get("versionCode")
+        )
+        logger.info(
+            "Jensen",
+            "_load_transfer_profile",
+            "Transfer profile for %s (%s): %s",
+            self.device_info.get("sn"),
+            self.transfer_tuner.source,
+            self.transfer_tuner.profile,
+        )
+
+    def _save_transfer_profile(self):
+        if self.transfer_profile_store is not None and self.device_info.get("sn"):
+            self.transfer_profile_store.save(self.device_info["sn"], self.transfer_tuner)
+
+    def get_file_count(self, timeout_s=5, use_cache=True):
         """
         Retrieves the total number of files stored on the device.
 
         Args:
             timeout_s (int, optional): Timeout in seconds for the operation. Defaults to 5.
+            use_cache (bool, optional): Answer from the device state cache if it holds
+                                        the value. Defaults to True.
 
         Returns:
             dict or None: A dictionary like {"count": number_of_files} if successful,
                           None otherwise.
         """
+        if use_cache:
+            hit, cached = self.state_cache.lookup(FILE_COUNT)
+            if hit:
+                return cached
         # Avoid command conflicts during file list streaming
         if self.is_file_list_streaming():
             logger.debug("Jensen", "get_file_count", "Skipping during file list streaming")
@@ -1200,11 +1551,14 @@ class HiDockJensen:
         response = self._send_and_receive(CMD_GET_FILE_COUNT, timeout_ms=int(timeout_s * 1000))
         if response and response["id"] == CMD_GET_FILE_COUNT:
             body = response["body"]
+            count = None
             if not body:
-                return {"count": 0}
-            if len(body) >= 4:
+                count = 0
+            elif len(body) >= 4:
                 count = struct.unpack(">I", body[:4])[0]
                 logger.info("Jensen", "get_file_count", f"File count: {count}")
+            if count is not None:
+                self.state_cache.store(FILE_COUNT, {"count": count})
                 return {"count": count}
         logger.error("Jensen", "get_file_count", "Failed to get file count or invalid response.")
         return None
@@ -1314,6 +1668,9 @@ class HiDockJensen:
     def list_files_cached(self, timeout_s=20, cache_max_age=30):
         """
         File listing with intelligent caching for dramatic performance improvement.
+
+        Cached lists are dropped early when a device event (delete, format,
+        recording change, reconnect) invalidates the file count.
         
         Args:
             timeout_s (int): Timeout for USB operations
@@ -1373,6 +1730,128 @@ class HiDockJensen:
             self._file_list_cache.clear()
             logger.info("Jensen", "clear_cache", "File list cache cleared")
 
+    def _on_device_state_event(self, event, keys):
+        """Device state cache listener: cached file lists go stale with the file count."""
+        if FILE_COUNT in keys and getattr(self, "_file_list_cache", None):
+            self._file_list_cache.clear()
+            logger.debug("Jensen", "_on_device_state_event", "File list cache cleared after %s", event)
+
+    def _read_file_tail(self, filename, file_length, size=FILE_TAIL_CHECK_BYTES, timeout_s=5):
+        """
+        Read the last ``size`` bytes of a file as a hex string.
+
+        Returns:
+            str or None: Hex of the tail bytes, "" for an empty file, or None if
+            the device could not serve the block.
+        """
+        if not filename:
+            return None
+        size = min(size, file_length)
+        if size <= 0:
+            return ""
+        block = self.get_file_block(filename, file_length - size, size, timeout_s=timeout_s)
+        if block is None or len(block) != size:
+            return None
+        return bytes(block).hex()
+
+    def _validate_file_list_snapshot(self, snapshot):
+        """
+        Check that a stored file list still describes the card.
+
+        The file count and card usage must be unchanged and the last file of
+        the stored list must still end with the same bytes. Any query that
+        fails counts as a mismatch, so the caller falls back to a full listing.
+        """
+        count_info = self.get_file_count(use_cache=False)
+        if not count_info or count_info.get("count") != snapshot.count:
+            return False
+        if snapshot.count == 0:
+            return True
+        if snapshot.card_used is not None:
+            card_info = self.get_card_info(use_cache=False)
+            if not card_info or card_info.get("used") != snapshot.card_used:
+                return False
+        if not snapshot.tail:
+            return False
+        return self._read_file_tail(snapshot.last_name, snapshot.last_length) == snapshot.tail
+
+    def list_files_with_snapshot(self, snapshot_store, timeout_s=20, max_retries=2, entries_callback=None):
+        """
+        List files, reusing the on-disk snapshot for this device when it is still valid.
+
+        A valid snapshot costs three small commands instead of a full file list
+        transfer. Otherwise the list is fetched with list_files_with_retry in
+        delta mode: entries already in the snapshot are not decoded again. A
+        complete list is saved as the new snapshot.
+
+        Args:
+            snapshot_store (FileListSnapshotStore): Store holding snapshots by serial.
+            timeout_s (int): Timeout for a full listing attempt.
+            max_retries (int): Retries for a full listing.
+            entries_callback (callable, optional): Called as
+                ``entries_callback(new_entries, parsed_count, expected_count)``;
+                a snapshot hit delivers all entries in one call.
+
+        Returns:
+            dict: File list result; ``snapshot`` is True when it came from disk.
+            ``delta`` is a FileListDelta against the stored list, or None when
+            there was no snapshot to compare with.
+        """
+        serial = self.device_info.get("sn") if self.device_info else None
+        snapshot = snapshot_store.load(serial) if serial else None
+        if snapshot is not None:
+            started = time.time()
+            if self._validate_file_list_snapshot(snapshot):
+                logger.info(
+                    "Jensen",
+                    "list_files_with_snapshot",
+                    f"Snapshot for {serial} is current ({snapshot.count} files, "
+                    f"validated in {time.time() - started:.3f}s)",
+                )
+                files = snapshot.files
+                if entries_callback and files:
+                    entries_callback(list(files), len(files), len(files))
+                return {
+                    "files": files,
+                    "totalFiles": len(files),
+                    "totalSize": sum(f["length"] for f in files),
+                    "complete": True,
+                    "snapshot": True,
+                    "delta": FileListDelta(unchanged=len(files)),
+                }
+            logger.info("Jensen", "list_files_with_snapshot", f"Snapshot for {serial} is stale, fetching full list")
+
+        result = self.list_files_with_retry(
+            timeout_s,
+            max_retries=max_retries,
+            entries_callback=entries_callback,
+            known_entries=index_entries(snapshot.files) if snapshot else None,
+        )
+        if result is not None:
+            result["delta"] = None
+            if snapshot is not None and not result.get("error"):
+                delta = compute_file_list_delta(snapshot.files, result.get("files", []))
+                result["delta"] = delta
+                logger.info(
+                    "Jensen",
+                    "list_files_with_snapshot",
+                    f"Delta for {serial}: {len(delta.added)} added, {len(delta.removed)} removed, "
+                    f"{len(delta.changed)} changed, {result.get('reusedEntries', 0)} entries reused",
+                )
+        if serial and result and not result.get("error") and not result.get("incomplete"):
+            files = result.get("files", [])
+            tail = None
+            card_used = None
+            if files:
+                tail = self._read_file_tail(files[-1]["name"], files[-1]["length"])
+                card_info = self.get_card_info(use_cache=False)
+                card_used = card_info.get("used") if card_info else None
+            self.state_cache.store(FILE_COUNT, {"count": len(files)})
+            snapshot_store.save(serial, files, tail=tail, card_used=card_used)
+        if result is not None:
+            result["snapshot"] = False
+        return result
+
     # Asynchronous USB Operations  
     async def async_list_files(self, timeout_s=20, use_cache=True, cache_max_age=30):
         """
@@ -1595,7 +2074,7 @@ class HiDockJensen:
         try:
             with self._usb_lock:
                 try:
-                    self.receive_buffer.clear()
+                    self._clear_receive_buffer()
                     seq_id = self._send_command(CMD_GET_FILE_LIST, timeout_ms=int(timeout_s * 1000))
                 except (usb.core.USBError, ConnectionError) as e:
                     logger.error("Jensen", "parallel_receive", f"Failed to send command: {e}")
@@ -1606,7 +2085,8 @@ class HiDockJensen:
                 total_bytes_received = 0
                 consecutive_timeouts = 0
                 max_consecutive_timeouts = 10  # Increased for large file lists
-                adaptive_timeout = 1000
+                profile = self.transfer_tuner.profile
+                adaptive_timeout = profile.list_chunk_timeout_ms
                 
                 while True:
                     response = self._receive_response(seq_id, timeout_ms=adaptive_timeout, streaming_cmd_id=CMD_GET_FILE_LIST)
@@ -1614,7 +2094,7 @@ class HiDockJensen:
                     if response and response["id"] == CMD_GET_FILE_LIST:
                         seq_id = response["sequence"]
                         consecutive_timeouts = 0
-                        adaptive_timeout = 1000
+                        adaptive_timeout = profile.list_chunk_timeout_ms
                         
                         chunk = response["body"]
                         if not chunk:  # Empty response = end of transmission
@@ -1637,7 +2117,7 @@ class HiDockJensen:
                                 
                     elif response is None:  # Timeout
                         consecutive_timeouts += 1
-                        adaptive_timeout = min(adaptive_timeout * 1.5, 3000)
+                        adaptive_timeout = min(adaptive_timeout * 1.5, profile.list_chunk_timeout_max_ms)
                         
                         if consecutive_timeouts >= max_consecutive_timeouts:
                             logger.warning("Jensen", "parallel_receive", f"Max timeouts reached, collected {len(file_list_chunks)} chunks")
@@ -1650,71 +2130,24 @@ class HiDockJensen:
             self._file_list_streaming = False
     
     def _parse_file_list_chunks_parallel(self, chunks):
-        """Parse file list chunks using parallel processing."""
-        import multiprocessing
-        from concurrent.futures import ProcessPoolExecutor
-        import pickle
-        
+        """
+        Parse file list chunks using parallel processing.
+
+        Entry boundaries are found with a pre-scan, fixed-width fields are read
+        with NumPy, and date/duration decoding is spread over a persistent
+        process pool (see file_list_parallel). Small lists are decoded in-process.
+        Falls back to the serial parser on any error.
+        """
         try:
-            # Combine all chunks first (this is fast)
-            total_size = sum(len(chunk) for chunk in chunks)
-            if total_size == 0:
-                return []
-            
-            buffer = bytearray(total_size)
-            offset = 0
-            for chunk in chunks:
-                chunk_len = len(chunk)
-                buffer[offset:offset + chunk_len] = chunk
-                offset += chunk_len
-            
-            # Extract header info
-            parse_offset = 0
-            total_files_from_header = -1
-            
-            if (len(buffer) >= 6 and buffer[parse_offset] == 0xFF and buffer[parse_offset + 1] == 0xFF):
-                total_files_from_header = struct.unpack(">I", buffer[parse_offset + 2:parse_offset + 6])[0]
-                parse_offset += 6
-            
-            if total_files_from_header <= 0:
-                logger.warning("Jensen", "parallel_parse", "No valid file count in header, falling back to serial")
-                return self._parse_file_list_chunks(chunks)
-            
-            # Split data into chunks for parallel processing
-            num_workers = min(4, multiprocessing.cpu_count())  # Don't use too many processes
-            chunk_size = len(buffer) // num_workers
-            
-            if chunk_size < 1000:  # Too small for parallel processing
-                logger.info("Jensen", "parallel_parse", "Data too small for parallel processing, using serial")
-                return self._parse_file_list_chunks(chunks)
-            
-            # Create work chunks - but we need to be careful about file boundaries
-            # For simplicity, let's use a simpler approach: split by estimated file count
-            files_per_worker = max(1, total_files_from_header // num_workers)
-            
-            # Initialize process pool
-            if not hasattr(self, '_parse_executor'):
-                self._parse_executor = ProcessPoolExecutor(max_workers=num_workers)
-            
-            # For now, let's do a simpler parallel approach:
-            # Process the full buffer in parallel by splitting parsing work
-            
-            # Serialize necessary data for worker processes
-            worker_data = {
-                'buffer_bytes': bytes(buffer),
-                'parse_offset': parse_offset,
-                'total_files': total_files_from_header
-            }
-            
-            # Split work by files, not by bytes (more complex but correct)
-            files_per_chunk = max(50, total_files_from_header // num_workers)
-            
-            # For this implementation, let's fall back to optimized serial processing
-            # because proper parallel parsing requires more complex file boundary detection
-            logger.info("Jensen", "parallel_parse", f"Processing {total_files_from_header} files with optimized serial parsing")
-            
-            return self._parse_file_list_chunks(chunks)
-            
+            from file_list_parallel import parse_file_list_parallel
+
+            files = parse_file_list_parallel(chunks, decoder=self)
+            logger.info(
+                "Jensen",
+                "parallel_parse",
+                f"Parallel parsing: {len(files)} files from {len(chunks)} chunks",
+            )
+            return files
         except Exception as e:
             logger.error("Jensen", "parallel_parse", f"Parallel processing failed: {e}, falling back to serial")
             return self._parse_file_list_chunks(chunks)
@@ -1764,17 +2197,45 @@ class HiDockJensen:
                 "error": f"Async parallel operation failed: {e}"
             }
 
-    def list_files_with_retry(self, timeout_s=20, max_retries=2):
+    def list_files_with_retry(self, timeout_s=20, max_retries=2, entries_callback=None, known_entries=None):
         """
-        List files with automatic retry for incomplete transfers.
-        
+        List files, filling in an incomplete list instead of starting over.
+
+        Entries parsed by an incomplete attempt are kept. A retry still has to
+        receive the list from the start (CMD_GET_FILE_LIST has no offset), but
+        entries that are already known are not decoded again and are not
+        reported to ``entries_callback`` a second time; only the missing tail is
+        new. After an incomplete attempt the count from CMD_GET_FILE_COUNT
+        decides whether the entries collected so far already cover the card, in
+        which case no retry is needed.
+
         Args:
             timeout_s (int): Timeout for each attempt
             max_retries (int): Maximum number of retries for incomplete data
-            
+            entries_callback (callable, optional): Called as
+                ``entries_callback(new_entries, parsed_count, expected_count)`` with
+                entries not reported by an earlier attempt; ``parsed_count`` counts
+                the entries collected over all attempts.
+            known_entries (dict, optional): Passed to list_files to skip decoding
+                entries that are already known.
+
         Returns:
-            dict: File list result with retry information
-        """
+            dict: File list result with retry information. ``complete`` is True
+            only when every file on the device is in ``files``.
+        """
+        collected = {}  # Entries from all attempts by filename, in device order
+        reported = set()
+        expected_count = [None]
+
+        def report_new_entries(new_entries, parsed_count, header_count):
+            if header_count is not None:
+                expected_count[0] = header_count
+            fresh = [entry for entry in new_entries if entry["name"] not in reported]
+            if not fresh:
+                return
+            reported.update(entry["name"] for entry in fresh)
+            entries_callback(fresh, len(reported), expected_count[0])
+
         for attempt in range(max_retries + 1):
             # Check if we should abort
             if self._abort_operations:
@@ -1783,77 +2244,138 @@ class HiDockJensen:
                     "files": [],
                     "totalFiles": 0,
                     "totalSize": 0,
+                    "complete": False,
                     "error": "Operation aborted"
                 }
-                
-            logger.info("Jensen", "list_files_with_retry", 
+
+            logger.info("Jensen", "list_files_with_retry",
                        f"Attempt {attempt + 1}/{max_retries + 1} to get file list")
-            
-            result = self.list_files(timeout_s)
-            
+
+            attempt_known = known_entries
+            if collected:
+                attempt_known = dict(known_entries or {})
+                attempt_known.update(index_entries(collected.values()))
+            result = self.list_files(
+                timeout_s,
+                entries_callback=report_new_entries if entries_callback else None,
+                known_entries=attempt_known,
+            )
+
             # If successful and complete, return immediately
-            if result and not result.get("incomplete"):
+            if result and result.get("complete"):
                 if attempt > 0:
-                    logger.info("Jensen", "list_files_with_retry", 
+                    logger.info("Jensen", "list_files_with_retry",
                                f"Success on attempt {attempt + 1}")
-                return result
-            
-            # If incomplete, decide whether to retry
-            if result and result.get("incomplete"):
-                files_received = len(result.get("files", []))
-                expected_count = result.get("expected", 0)
-                
-                logger.warning("Jensen", "list_files_with_retry", 
-                             f"Attempt {attempt + 1} incomplete: {files_received}/{expected_count} files")
-                
-                # Don't retry if we got a decent amount of data and it's the last attempt
-                if attempt == max_retries:
-                    logger.error("Jensen", "list_files_with_retry", 
-                               f"Final attempt failed, returning partial data: {files_received}/{expected_count}")
                     result["retries_attempted"] = attempt + 1
-                    return result
-                
-                # Wait before retrying
-                import time
-                retry_delay = 1.0 * (attempt + 1)  # Increasing delay
-                logger.info("Jensen", "list_files_with_retry", 
-                           f"Waiting {retry_delay}s before retry...")
-                time.sleep(retry_delay)
-            
+                return result
+
+            if result:
+                for entry in result.get("files", []):
+                    # Later attempts win, so a recording that is still growing keeps its latest length
+                    collected[entry["name"]] = entry
+                if result.get("expected") is not None:
+                    expected_count[0] = result["expected"]
+
+            if result and result.get("error") == "Operation aborted":
+                return result
+
+            # The count command is cheap compared to a list transfer and settles
+            # whether the entries collected so far are all there is
+            file_count = self.get_file_count(use_cache=False)
+            if file_count is not None:
+                expected_count[0] = file_count["count"]
+            if expected_count[0] is not None and len(collected) == expected_count[0]:
+                logger.info(
+                    "Jensen",
+                    "list_files_with_retry",
+                    f"Collected {len(collected)}/{expected_count[0]} files after {attempt + 1} attempt(s)",
+                )
+                return self._collected_file_list(collected, expected_count[0], attempt + 1)
+
+            if result and result.get("files"):
+                logger.warning("Jensen", "list_files_with_retry",
+                             f"Attempt {attempt + 1} incomplete: {len(collected)}/"
+                             f"{expected_count[0] if expected_count[0] is not None else '?'} files collected")
             else:
                 # Complete failure, retry with longer timeout
-                logger.error("Jensen", "list_files_with_retry", 
+                logger.error("Jensen", "list_files_with_retry",
                            f"Attempt {attempt + 1} failed completely")
-                if attempt < max_retries:
-                    timeout_s = min(timeout_s * 1.5, 60)  # Increase timeout for retry
-        
+                timeout_s = min(timeout_s * 1.5, 60)  # Increase timeout for retry
+
+            if attempt < max_retries:
+                retry_delay = 1.0 * (attempt + 1)  # Increasing delay
+                logger.info("Jensen", "list_files_with_retry",
+                           f"Waiting {retry_delay}s before retry...")
+                time.sleep(retry_delay)
+
+        if collected:
+            logger.error("Jensen", "list_files_with_retry",
+                       f"Final attempt failed, returning partial data: {len(collected)}/"
+                       f"{expected_count[0] if expected_count[0] is not None else '?'}")
+            return self._collected_file_list(collected, expected_count[0], max_retries + 1)
+
         # All retries failed
-        logger.error("Jensen", "list_files_with_retry", 
+        logger.error("Jensen", "list_files_with_retry",
                    f"All {max_retries + 1} attempts failed")
         return {
             "files": [],
-            "totalFiles": 0, 
+            "totalFiles": 0,
             "totalSize": 0,
+            "complete": False,
             "error": f"Failed after {max_retries + 1} attempts",
             "retries_attempted": max_retries + 1
         }
 
-    def list_files(self, timeout_s=20):
+    @staticmethod
+    def _collected_file_list(collected, expected_count, attempts):
+        """Build a list_files result from the entries gathered over several attempts."""
+        files = list(collected.values())
+        result = {
+            "files": files,
+            "totalFiles": len(files),
+            "totalSize": sum(f.get("length", 0) for f in files),
+            "complete": expected_count is not None and len(files) == expected_count,
+            "retries_attempted": attempts,
+        }
+        if not result["complete"]:
+            missing = max(expected_count - len(files), 0) if expected_count is not None else None
+            result.update(
+                incomplete=True,
+                expected=expected_count,
+                missing=missing,
+                error=f"Incomplete file list: {len(files)}/"
+                f"{expected_count if expected_count is not None else '?'} files received",
+            )
+        return result
+
+    def list_files(self, timeout_s=20, entries_callback=None, known_entries=None):
         """
         Retrieves a list of files from the device, including metadata.
 
         Parses the raw file list data from the device, extracting details like
         filename, creation date/time, duration, size, and version.
         It handles different device firmware versions that might affect how
-        file counts are determined.
+        file counts are determined. Entries are parsed as their packets arrive,
+        so callers can show them before the whole list has been transferred.
 
         Args:
             timeout_s (int, optional): Timeout in seconds for the operation. Defaults to 20.
+            entries_callback (callable, optional): Called as
+                ``entries_callback(new_entries, parsed_count, expected_count)`` whenever a
+                chunk completes one or more entries. ``expected_count`` is the count from
+                the 0xFFFF list header, or None if the device did not send one.
+            known_entries (dict, optional): Previously decoded entries keyed by
+                ``(name, length, signature)`` (see file_list_snapshot.index_entries).
+                Matching entries are copied instead of decoded again.
 
         Returns:
             dict or None: A dictionary containing
-                {"files": list_of_file_details, "totalFiles": count, "totalSize": bytes}
-                          if successful, or a dict with an "error" key otherwise.
+                {"files": list_of_file_details, "totalFiles": count, "totalSize": bytes,
+                 "complete": True} if successful, or a dict with an "error" key otherwise.
+                          An incomplete transfer has "complete" False and "incomplete"
+                          True alongside the entries that were received.
+                          With known_entries, "reusedEntries" counts the entries
+                          that were not decoded again.
         """
         if not self.device_info.get("versionNumber"):
             if not self.get_device_info():
@@ -1885,7 +2407,7 @@ class HiDockJensen:
         try:
             with self._usb_lock:
                 try:
-                    self.receive_buffer.clear()
+                    self._clear_receive_buffer()
                     seq_id = self._send_command(CMD_GET_FILE_LIST, timeout_ms=int(timeout_s * 1000))
                 except (usb.core.USBError, ConnectionError) as e:
                     logger.error(
@@ -1900,68 +2422,78 @@ class HiDockJensen:
                         "error": "Failed to send command",
                     }
 
-                # Web-style handler approach: accumulate data chunks and continue until completion
-                file_list_chunks = []
-                expected_file_count = None
+                # Parse entries incrementally as chunks arrive; an entry split across
+                # packets is carried over by the parser until its remaining bytes arrive.
+                reused_entries = [0]
+                entry_builder = self._build_file_entry
+                if known_entries:
 
-                # Optimized handler - avoids parsing on every chunk
-                total_bytes_received = 0
-                
-                def file_list_handler(response_data):
-                    nonlocal expected_file_count, total_bytes_received
+                    def entry_builder(file_version, filename, file_length, signature_hex):
+                        known = known_entries.get((filename, file_length, signature_hex))
+                        if known is None:
+                            return self._build_file_entry(file_version, filename, file_length, signature_hex)
+                        reused_entries[0] += 1
+                        return dict(known)
 
+                parser = FileListStreamParser(entry_builder)
+                parsed_files = []
+
+                def file_list_handler(response_data):
                     if not response_data or len(response_data) == 0:
                         # Empty response signals end of transmission
                         logger.info(
                             "Jensen",
                             "list_files",
-                            f"Empty response received, completing file list with {len(file_list_chunks)} chunks",
+                            f"Empty response received, completing file list with {parser.chunks_received} chunks",
                         )
-                        return self._parse_file_list_chunks(file_list_chunks) if file_list_chunks else []
-
-                    # Accumulate this chunk
-                    file_list_chunks.append(response_data)
-                    total_bytes_received += len(response_data)
-                    logger.debug(
-                        "Jensen",
-                        "list_files",
-                        f"Accumulated chunk {len(file_list_chunks)}, size: {len(response_data)} bytes, total: {total_bytes_received}",
-                    )
-
-                    # Get expected count from first chunk header if available (fast header extraction)
-                    if expected_file_count is None and len(file_list_chunks) == 1:
-                        first_chunk = file_list_chunks[0]
-                        if len(first_chunk) >= 6 and first_chunk[0] == 0xFF and first_chunk[1] == 0xFF:
-                            expected_file_count = struct.unpack(">I", first_chunk[2:6])[0]
-                            logger.info(
+                        if parser.pending_bytes:
+                            logger.warning(
                                 "Jensen",
                                 "list_files",
-                                f"Expected {expected_file_count} files from header",
+                                f"Discarding {parser.pending_bytes} bytes of an incomplete trailing entry",
                             )
+                        return parsed_files
 
-                    # Fast completion estimation (avoids expensive parsing)
-                    if expected_file_count is not None:
-                        # Conservative heuristic: ~60 bytes per file (actual data shows 57 bytes/file)
-                        # Subtract 6 bytes for header
-                        estimated_files = max(0, (total_bytes_received - 6) // 60)
-                        
-                        logger.debug(
+                    new_entries = parser.feed(response_data)
+                    if parser.chunks_received == 1 and parser.expected_count is not None:
+                        logger.info(
                             "Jensen",
                             "list_files",
-                            f"Estimated {estimated_files}/{expected_file_count} files from {total_bytes_received} bytes",
+                            f"Expected {parser.expected_count} files from header",
                         )
-                        
-                        # Don't use estimation to trigger early parsing - it was causing issues
-                        # Just continue accumulating chunks until we get an empty one
-
-                    # Continue receiving more data
+                    logger.debug(
+                        "Jensen",
+                        "list_files",
+                        "Chunk %s: %s bytes, %s/%s files parsed",
+                        parser.chunks_received,
+                        len(response_data),
+                        parser.parsed_count,
+                        parser.expected_count if parser.expected_count is not None else "?",
+                    )
+                    if new_entries:
+                        parsed_files.extend(new_entries)
+                        if entries_callback:
+                            try:
+                                entries_callback(new_entries, parser.parsed_count, parser.expected_count)
+                            except Exception as cb_e:  # pylint: disable=broad-except
+                                logger.warning("Jensen", "list_files", f"entries_callback failed: {cb_e}")
+
+                    if parser.is_complete:
+                        # Every entry announced by the header has been parsed; only the
+                        # empty terminator packet is still outstanding.
+                        return parsed_files
+
+                    # Keep receiving until the device sends the empty terminator packet
                     return None
 
                 # Optimized receiving with adaptive timeout
                 final_files = None
+                terminated = False  # Set once the list ended by header count or terminator packet
                 consecutive_timeouts = 0
                 max_consecutive_timeouts = 10  # Increased for large file lists (488+ files)
-                adaptive_timeout = 1000  # Back to original timeout
+                profile = self.transfer_tuner.profile
+                adaptive_timeout = profile.list_chunk_timeout_ms
+                last_chunk_at = time.perf_counter()
 
                 while final_files is None:
                     # Check if we should abort
@@ -1984,7 +2516,10 @@ class HiDockJensen:
                         seq_id = response["sequence"]
                         consecutive_timeouts = 0
                         # Reset to shorter timeout after successful receive
-                        adaptive_timeout = 1000
+                        adaptive_timeout = profile.list_chunk_timeout_ms
+                        now = time.perf_counter()
+                        self.transfer_tuner.record_list_gap((now - last_chunk_at) * 1000)
+                        last_chunk_at = now
 
                         # Process this chunk through our handler
                         result = file_list_handler(response["body"])
@@ -1992,33 +2527,43 @@ class HiDockJensen:
                         if result is not None:
                             # Handler indicates completion
                             final_files = result
+                            terminated = True
+                            if response["body"]:
+                                # Completed from the header count: consume the terminator so
+                                # it is not mistaken for a reply to the next command
+                                self._receive_response(seq_id, timeout_ms=200, streaming_cmd_id=CMD_GET_FILE_LIST)
                             break
 
                     elif response is None:  # Timeout
                         consecutive_timeouts += 1
                         # Increase timeout gradually for slow transfers
-                        adaptive_timeout = min(adaptive_timeout * 1.5, 3000)
+                        adaptive_timeout = min(adaptive_timeout * 1.5, profile.list_chunk_timeout_max_ms)
                         
                         logger.debug(
                             "Jensen",
                             "list_files",
-                            f"Timeout {consecutive_timeouts}/{max_consecutive_timeouts}, adaptive timeout: {adaptive_timeout}ms",
+                            "Timeout %s/%s, adaptive timeout: %sms",
+                            consecutive_timeouts,
+                            max_consecutive_timeouts,
+                            adaptive_timeout,
                         )
 
                         # Don't give up too early - only complete if we're confident we have all data
                         if consecutive_timeouts >= max_consecutive_timeouts:
                             # Check if we have a reasonable amount of data before giving up
-                            if file_list_chunks and total_bytes_received > 100:
+                            if parser.chunks_received and parser.bytes_received > 100:
                                 logger.info(
                                     "Jensen",
                                     "list_files",
-                                    f"Timeout after {len(file_list_chunks)} chunks ({total_bytes_received} bytes), processing available data",
+                                    f"Timeout after {parser.chunks_received} chunks ({parser.bytes_received} bytes), "
+                                    "processing available data",
                                 )
                             else:
                                 logger.warning(
                                     "Jensen",
                                     "list_files",
-                                    f"Max timeouts reached with minimal data ({len(file_list_chunks)} chunks, {total_bytes_received} bytes)",
+                                    f"Max timeouts reached with minimal data ({parser.chunks_received} chunks, "
+                                    f"{parser.bytes_received} bytes)",
                                 )
                             # Give the handler a chance to process final data
                             final_files = file_list_handler(b"")  # Empty data signals completion
@@ -2028,8 +2573,9 @@ class HiDockJensen:
                         logger.debug(
                             "Jensen",
                             "list_files",
-                            f"Unexpected response CMD:{response.get('id', 'unknown')} "
-                            f"SEQ:{response.get('sequence', 'unknown')} during file list",
+                            "Unexpected response CMD:%s SEQ:%s during file list",
+                            response.get("id", "unknown"),
+                            response.get("sequence", "unknown"),
                         )
                         continue
 
@@ -2045,6 +2591,7 @@ class HiDockJensen:
                 total_size_bytes = sum(file_info.get("length", 0) for file_info in final_files)
 
                 # Check if we received all expected files
+                expected_file_count = parser.expected_count
                 if expected_file_count and len(final_files) < expected_file_count:
                     logger.error(
                         "Jensen",
@@ -2058,17 +2605,39 @@ class HiDockJensen:
                         "files": final_files,
                         "totalFiles": len(final_files),
                         "totalSize": total_size_bytes,
+                        "complete": False,
                         "incomplete": True,
                         "expected": expected_file_count,
                         "missing": expected_file_count - len(final_files),
                         "error": f"Incomplete file list: {len(final_files)}/{expected_file_count} files received"
                     }
+                if expected_file_count is None and not terminated:
+                    # Without a header count, only the terminator packet shows the list is whole
+                    logger.warning(
+                        "Jensen",
+                        "list_files",
+                        f"File list ended without terminator after {len(final_files)} files",
+                    )
+                    return {
+                        "files": final_files,
+                        "totalFiles": len(final_files),
+                        "totalSize": total_size_bytes,
+                        "complete": False,
+                        "incomplete": True,
+                        "expected": None,
+                        "missing": None,
+                        "error": f"Incomplete file list: {len(final_files)} files received before timeout"
+                    }
 
-                return {
+                result = {
                     "files": final_files,
                     "totalFiles": len(final_files),
                     "totalSize": total_size_bytes,
+                    "complete": True,
                 }
+                if known_entries is not None:
+                    result["reusedEntries"] = reused_entries[0]
+                return result
         finally:
             self._file_list_streaming = False
 
@@ -2076,128 +2645,53 @@ class HiDockJensen:
         """Check if file list streaming is currently in progress."""
         return getattr(self, "_file_list_streaming", False)
 
-    def _parse_file_list_chunks(self, chunks):
+    def iter_files(self, timeout_s=20):
         """
-        Ultra-fast binary parsing with pre-compiled structs and memoryview optimization.
+        Yields file entries from the device as soon as each one has been received.
+
+        The transfer runs on a background thread, so a slow consumer never holds
+        the USB lock. Use list_files with an entries_callback instead when the
+        completeness information of the final result is needed.
 
         Args:
-            chunks: List of byte arrays from device responses
+            timeout_s (int, optional): Timeout in seconds for the operation. Defaults to 20.
 
-        Returns:
-            List of file info dictionaries
+        Yields:
+            dict: File entries in the same format as list_files()["files"].
         """
-        # Initialize pre-compiled struct formats (major speedup for repeated calls)
-        if not hasattr(self, '_binary_struct_formats'):
-            self._binary_struct_formats = {
-                'header_count': struct.Struct('>I'),
-                'name_len_3bytes': struct.Struct('>I'),
-                'file_length': struct.Struct('>I'),
-            }
-        
-        # Optimized buffer combination using memoryview
-        total_size = sum(len(chunk) for chunk in chunks)
-        if total_size == 0:
-            return []
-            
-        # Use memoryview for zero-copy operations
-        buffer = bytearray(total_size)
-        buffer_view = memoryview(buffer)
-        
-        data_offset = 0
-        for chunk in chunks:
-            chunk_view = memoryview(chunk)
-            chunk_len = len(chunk_view)
-            buffer_view[data_offset:data_offset + chunk_len] = chunk_view
-            data_offset += chunk_len
-
-        # Use memoryview for all parsing operations (no copying)
-        data = buffer_view
-        parse_offset = 0
-        total_files_from_header = -1
-
-        # Fast header parsing with pre-compiled struct
-        if (
-            len(data) >= 6
-            and data[parse_offset] == 0xFF
-            and data[parse_offset + 1] == 0xFF
-        ):
-            total_files_from_header = self._binary_struct_formats['header_count'].unpack_from(
-                data, parse_offset + 2
-            )[0]
-            parse_offset += 6
-
-        # Pre-allocate files list for optimal memory usage
-        files = []
-        if total_files_from_header > 0:
-            files = [None] * total_files_from_header  # Reserve capacity
-            files.clear()
+        batches = queue.Queue()
+        end_of_list = object()
 
-        parsed_file_count = 0
-        
-        # Fast parsing loop with minimal allocations
-        while parse_offset < len(data) and (total_files_from_header == -1 or parsed_file_count < total_files_from_header):
+        def producer():
             try:
-                if parse_offset + 4 > len(data):
-                    break
-
-                file_version = data[parse_offset]
-                parse_offset += 1
-
-                # Fast 3-byte length parsing with pre-compiled struct
-                if parse_offset + 3 > len(data):
-                    break
-                name_len = self._binary_struct_formats['name_len_3bytes'].unpack_from(
-                    b'\x00' + data[parse_offset:parse_offset + 3]
-                )[0]
-                parse_offset += 3
+                self.list_files(
+                    timeout_s,
+                    entries_callback=lambda new_entries, _parsed, _expected: batches.put(new_entries),
+                )
+            finally:
+                batches.put(end_of_list)
 
-                if parse_offset + name_len > len(data):
-                    break
+        threading.Thread(target=producer, name="JensenFileList", daemon=True).start()
+        while True:
+            batch = batches.get()
+            if batch is end_of_list:
+                return
+            yield from batch
 
-                # Ultra-fast filename extraction using memoryview slicing
-                filename_bytes = data[parse_offset:parse_offset + name_len]
-                filename = filename_bytes.tobytes().rstrip(b'\x00').decode('ascii', errors='ignore')
-                parse_offset += name_len
+    def _parse_file_list_chunks(self, chunks):
+        """
+        Parses a complete file list transfer.
 
-                min_remaining = 4 + 6 + 16
-                if parse_offset + min_remaining > len(data):
-                    break
+        Args:
+            chunks: List of byte arrays from device responses
 
-                # Fast file length parsing with pre-compiled struct
-                file_length_bytes = self._binary_struct_formats['file_length'].unpack_from(data, parse_offset)[0]
-                parse_offset += 4
-                parse_offset += 6  # Skip 6 bytes
-
-                # Fast signature extraction using memoryview
-                signature_bytes = data[parse_offset:parse_offset + 16]
-                signature_hex = signature_bytes.tobytes().hex()
-                parse_offset += 16
-
-                # Use cached parsing methods for expensive operations
-                create_date_str, create_time_str, time_obj = self._parse_filename_datetime_cached(filename)
-                duration_sec = self._calculate_file_duration_cached(file_length_bytes, file_version)
-
-                # Direct dictionary creation (faster than individual assignments)
-                files.append({
-                    "name": filename,
-                    "createDate": create_date_str,
-                    "createTime": create_time_str,
-                    "time": time_obj,
-                    "duration": duration_sec,
-                    "version": file_version,
-                    "length": file_length_bytes,
-                    "signature": signature_hex,
-                })
-
-                parsed_file_count += 1
-
-            except (struct.error, IndexError, UnicodeDecodeError) as e:
-                logger.error(
-                    "Jensen",
-                    "parse_file_list_chunks",
-                    f"Binary parsing error at offset {parse_offset}: {e}",
-                )
-                break
+        Returns:
+            List of file info dictionaries
+        """
+        parser = FileListStreamParser(self._build_file_entry)
+        files = []
+        for chunk in chunks:
+            files.extend(parser.feed(chunk))
 
         logger.info(
             "Jensen",
@@ -2206,6 +2700,20 @@ class HiDockJensen:
         )
         return files
 
+    def _build_file_entry(self, file_version, filename, file_length, signature_hex):
+        """Builds the file info dictionary for one parsed file list entry."""
+        create_date_str, create_time_str, time_obj = self._parse_filename_datetime_cached(filename)
+        return {
+            "name": filename,
+            "createDate": create_date_str,
+            "createTime": create_time_str,
+            "time": time_obj,
+            "duration": self._calculate_file_duration_cached(file_length, file_version),
+            "version": file_version,
+            "length": file_length,
+            "signature": signature_hex,
+        }
+
     def _parse_filename_datetime(self, filename):
         """Extract date/time from filename, returning formatted strings and datetime object."""
         create_date_str, create_time_str, time_obj = "", "", None
@@ -2353,7 +2861,10 @@ class HiDockJensen:
         Args:
             filename (str): The name of the file on the device.
             file_length (int): The expected total length of the file in bytes.
-            data_callback (callable): Function called with each received data chunk (bytes).
+            data_callback (callable): Function called with each received data chunk. Chunks are
+                                      memoryviews into the receive buffer that are only valid for
+                                      the duration of the call; write them out or copy them with
+                                      bytes() if they need to be kept.
             progress_callback (callable, optional): Function called with (bytes_received, file_length).
                                                     Defaults to None.
             timeout_s (int, optional): Timeout in seconds for the entire streaming operation.
@@ -2386,6 +2897,9 @@ class HiDockJensen:
                 bytes_received = 0
                 start_time = time.time()
                 end_time = start_time + timeout_s
+                stream_timeout_ms = self.transfer_tuner.profile.stream_timeout_ms
+                transfer_started = last_chunk_at = time.perf_counter()
+                max_gap_ms = 0.0
 
                 while bytes_received < file_length:
                     if time.time() > end_time:
@@ -2408,9 +2922,14 @@ class HiDockJensen:
 
                     # Use a shorter, rolling timeout for each read operation.
                     # This prevents timeouts on large files that are actively transferring.
-                    response = self._receive_response(initial_seq_id, 15000, streaming_cmd_id=CMD_TRANSFER_FILE)
+                    response = self._receive_response(
+                        initial_seq_id, stream_timeout_ms, streaming_cmd_id=CMD_TRANSFER_FILE, zero_copy=True
+                    )
 
                     if response and response["id"] == CMD_TRANSFER_FILE:
+                        now = time.perf_counter()
+                        max_gap_ms = max(max_gap_ms, (now - last_chunk_at) * 1000)
+                        last_chunk_at = now
                         chunk = response["body"]
                         if not chunk:
                             if bytes_received >= file_length:
@@ -2438,6 +2957,10 @@ class HiDockJensen:
                                 f"Successfully streamed '{filename}'. Rcvd {bytes_received} bytes.",
                             )
                             status_to_return = "OK"
+                            if self.transfer_tuner.record_stream(
+                                bytes_received, time.perf_counter() - transfer_started, max_gap_ms
+                            ):
+                                self._save_transfer_profile()
                             break
                     elif response is None:
                         logger.error(
@@ -2524,6 +3047,8 @@ class HiDockJensen:
                                 f"USBError during IN flush for '{filename}': {flush_e}",
                             )
                             break
+            if status_to_return == "OK":
+                self.state_cache.publish(EVENT_DOWNLOAD_FINISHED)
             return status_to_return
 
     def delete_file(self, filename, timeout_s=10):
@@ -2558,6 +3083,8 @@ class HiDockJensen:
                 "delete_file",
                 f"Delete '{filename}': {status_str} (code: {result_code})",
             )
+            if result_code == 0:
+                self.state_cache.publish(EVENT_DELETE)
             return {"result": status_str, "code": result_code}
         logger.error(
             "Jensen",
@@ -2570,18 +3097,24 @@ class HiDockJensen:
             "error": "No or invalid response from device",
         }
 
-    def get_card_info(self, timeout_s=5):
+    def get_card_info(self, timeout_s=5, use_cache=True):
         """
         Retrieves storage card information (used space, total capacity, status).
 
         Args:
             timeout_s (int, optional): Timeout in seconds for the operation. Defaults to 5.
+            use_cache (bool, optional): Answer from the device state cache if it holds
+                                        the value. Defaults to True.
 
         Returns:
             dict or None: A dictionary containing "used" (MB), "capacity" (MB),
                           and "status_raw" (int) if successful, None otherwise.
                           Units (MB) are assumed based on typical device behavior.
         """
+        if use_cache:
+            hit, cached = self.state_cache.lookup(CARD_INFO)
+            if hit:
+                return cached
         # Avoid command conflicts during file list streaming
         if self.is_file_list_streaming():
             logger.debug("Jensen", "get_card_info", "Skipping during file list streaming")
@@ -2597,11 +3130,13 @@ class HiDockJensen:
                         "get_card_info",
                         f"Card Info: Used={used_mb}MB, Total={capacity_mb}MB, StatusRaw={hex(status_raw)}",
                     )
-                    return {
+                    card_info = {
                         "used": used_mb,
                         "capacity": capacity_mb,
                         "status_raw": status_raw,
                     }
+                    self.state_cache.store(CARD_INFO, card_info)
+                    return card_info
                 except struct.error:
                     logger.error(
                         "Jensen",
@@ -2646,6 +3181,8 @@ class HiDockJensen:
                 "format_card",
                 f"Format card status: {status_str} (code: {result_code})",
             )
+            if result_code == 0:
+                self.state_cache.publish(EVENT_FORMAT)
             return {"result": status_str, "code": result_code}
         logger.error(
             "Jensen",
@@ -2658,18 +3195,28 @@ class HiDockJensen:
             "error": "No or invalid response from device",
         }
 
-    def get_recording_file(self, timeout_s=5):
+    def get_recording_file(self, timeout_s=5, use_cache=True):
         """
         Retrieves the name of the currently active or last recorded file.
 
+        A fresh answer whose filename differs from the cached one publishes a
+        recording change to the device state cache.
+
         Args:
             timeout_s (int, optional): Timeout in seconds for the operation. Defaults to 5.
+            use_cache (bool, optional): Answer from the device state cache if it holds
+                                        the value. Defaults to True; status polling
+                                        passes False.
 
         Returns:
             dict or None: A dictionary like {"name": "filename", "status": "recording_active_or_last"}
                           if a recording file is reported. Returns None if no file info is available,
                           the filename is empty, or an error occurs.
         """
+        if use_cache:
+            hit, cached = self.state_cache.lookup(RECORDING_FILE)
+            if hit:
+                return cached
         # Avoid command conflicts during file list streaming
         if self.is_file_list_streaming():
             logger.debug("Jensen", "get_recording_file", "Skipping during file list streaming")
@@ -2683,6 +3230,7 @@ class HiDockJensen:
                     "get_recording_file",
                     "No recording file info (empty body).",
                 )
+                self.state_cache.update_recording_file(None)
                 return None
             filename_bytes = response["body"]
             try:
@@ -2699,13 +3247,16 @@ class HiDockJensen:
                     "get_recording_file",
                     "Decoded recording filename is empty.",
                 )
+                self.state_cache.update_recording_file(None)
                 return None
             logger.debug(
                 "Jensen",
                 "get_recording_file",
                 f"Current or last recording file reported by device: {filename}",
             )
-            return {"name": filename, "status": "recording_active_or_last"}
+            recording = {"name": filename, "status": "recording_active_or_last"}
+            self.state_cache.update_recording_file(recording)
+            return recording
         elif response and response["id"] == CMD_GET_CARD_INFO:
             logger.warning(
                 "Jensen",
@@ -2844,7 +3395,7 @@ class HiDockJensen:
         )
         return None
 
-    def get_device_settings(self, timeout_s=5):
+    def get_device_settings(self, timeout_s=5, use_cache=True):
         """
         Retrieves current behavior settings from the device.
 
@@ -2852,10 +3403,16 @@ class HiDockJensen:
 
         Args:
             timeout_s (int, optional): Timeout in seconds for the operation. Defaults to 5.
+            use_cache (bool, optional): Answer from the device state cache if it holds
+                                        the value. Defaults to True.
 
         Returns:
             dict or None: A dictionary of settings if successful, None otherwise.
         """
+        if use_cache:
+            hit, cached = self.state_cache.lookup(SETTINGS)
+            if hit:
+                return cached
         response = self._send_and_receive(CMD_GET_SETTINGS, timeout_ms=int(timeout_s * 1000))
         if response and response["id"] == CMD_GET_SETTINGS and len(response["body"]) >= 4:
 
@@ -2873,6 +3430,7 @@ class HiDockJensen:
                 "get_device_settings",
                 f"Device settings: {self.device_behavior_settings}",
             )
+            self.state_cache.store(SETTINGS, self.device_behavior_settings)
             return self.device_behavior_settings
         logger.error(
             "Jensen",
@@ -2924,6 +3482,8 @@ class HiDockJensen:
             logger.info("Jensen", "set_device_settings", "Device settings updated successfully.")
             # Update local cache of settings
             self.device_behavior_settings = updated_settings
+            self.state_cache.publish(EVENT_SETTINGS_CHANGED)
+            self.state_cache.store(SETTINGS, updated_settings)
             return {"result": "success"}
         logger.error(
             "Jensen",
@@ -2953,10 +3513,13 @@ class HiDockJensen:
                 seq_id = self._send_command(CMD_GET_FILE_BLOCK, body, timeout_ms=int(timeout_s * 1000))
                 response = self._receive_response(seq_id, int(timeout_s * 1000), streaming_cmd_id=CMD_GET_FILE_BLOCK)
                 if response and response["id"] == CMD_GET_FILE_BLOCK:
-                    logger.info(
+                    # Called once per block by ranged downloads, so keep it at DEBUG
+                    logger.debug(
                         "Jensen",
                         "get_file_block",
-                        f"Received block of size {len(response['body'])} for '{filename}'.",
+                        "Received block of size %s for '%s'.",
+                        len(response["body"]),
+                        filename,
                     )
                     status_to_return = response["body"]
                 else:
@@ -23,6 +23,7 @@ import wave
 from typing import Optional, Tuple
 
 from config_and_logger import logger
+from mpeg_audio import decode_mpeg_to_pcm, find_ffmpeg, scan_mpeg_frames
 
 
 class HTAConverter:
@@ -156,6 +157,9 @@ class HTAConverter:
 
             # Method 2: Check for common HTA header patterns
             if self._try_hta_format_1(file_data):
+                audio_data, sample_rate, channels = self._decode_mpeg_stream(hta_file_path, file_data)
+                if audio_data is not None:
+                    return audio_data, sample_rate, channels
                 return self._parse_hta_format_1(file_data)
 
             # Method 3: Try raw PCM data with common settings
@@ -228,6 +232,36 @@ class HTAConverter:
 
         return False
 
+    def _decode_mpeg_stream(self, hta_file_path: str, data: bytes) -> Tuple[Optional[bytes], int, int]:
+        """
+        Decode MPEG Audio Layer 1/2 through an ffmpeg pipe of raw PCM.
+
+        The frame headers are scanned in process for the stream parameters and
+        sample count, and the decoded PCM is read straight into a buffer of that
+        size at a transcription-compatible rate. Returns (None, 0, 0) if the data
+        is not a Layer 1/2 stream or ffmpeg cannot be used, leaving the pydub
+        route of _parse_hta_format_1 as the fallback.
+        """
+        if find_ffmpeg() is None:
+            return None, 0, 0  # Not worth a frame scan when the pydub route decodes anyway
+        info = scan_mpeg_frames(data)
+        if info is None or not info.frame_count:
+            return None, 0, 0
+
+        target_rate = self._get_compatible_sample_rate(info.sample_rate)
+        audio_data = decode_mpeg_to_pcm(hta_file_path, info, target_rate)
+        if audio_data is None:
+            logger.debug("HTAConverter", "_decode_mpeg_stream", "ffmpeg pipe failed, falling back to pydub")
+            return None, 0, 0
+
+        logger.info(
+            "HTAConverter",
+            "_decode_mpeg_stream",
+            f"Decoded {info.frame_count} MPEG Layer {info.layer} frames: {info.sample_rate}Hz, "
+            f"{info.channels} channel(s), {info.bitrate_kbps} kb/s, {info.duration:.1f}s",
+        )
+        return audio_data, target_rate, info.channels
+
     def _parse_hta_format_1(self, data: bytes) -> Tuple[Optional[bytes], int, int]:
         """
         Parse MPEG Audio Layer 1/2 format using pydub.
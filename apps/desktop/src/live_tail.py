@@ -0,0 +1,198 @@
+"""
+Live copy of the recording in progress.
+
+A recording can normally only be downloaded once it has been stopped, so the
+whole meeting crosses the USB link after it ends. ``LiveRecordingTail`` copies
+it while it is being made instead: it polls ``CMD_GET_FILE_BLOCK`` for the
+bytes appended since the last poll and appends them to the local file, where
+a normal download would put it. Each chunk can also be handed to a streaming
+consumer (live waveform, incremental transcription).
+
+The tail keeps a resume checkpoint next to the file (see resumable_download)
+without a file length, since the recording is still growing. Once the
+recording has been stopped, the regular download of the file resumes from that
+checkpoint and only fetches the bytes recorded after the last poll.
+"""
+
+import json
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Optional
+
+from config_and_logger import logger
+from device_scheduler import CommandPriority, command_priority
+from resumable_download import (
+    DEFAULT_BLOCK_SIZE,
+    DEFAULT_CHECKPOINT_INTERVAL,
+    _file_crc32,
+    checkpoint_path,
+    write_checkpoint,
+)
+
+DEFAULT_POLL_INTERVAL_S = 1.0
+# A tail that has caught up and sees no new bytes for this long assumes the recording ended
+DEFAULT_IDLE_STOP_S = 15.0
+
+
+class LiveRecordingTail:
+    """Appends the growing recording on the device to a local file from a background thread."""
+
+    def __init__(
+        self,
+        jensen_device,
+        filename: str,
+        output_path,
+        data_callback: Optional[Callable[[bytes, int], None]] = None,
+        device_lock=None,
+        poll_interval_s: float = DEFAULT_POLL_INTERVAL_S,
+        idle_stop_s: Optional[float] = DEFAULT_IDLE_STOP_S,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+    ):
+        """
+        Args:
+            jensen_device: Connected HiDockJensen instance.
+            filename: Device name of the recording in progress.
+            output_path: Local file the recording is appended to.
+            data_callback: Called on the tail thread as ``data_callback(chunk, offset)``
+                for every block of new audio data.
+            device_lock: Lock taken for each poll; the device's command scheduler if None.
+            poll_interval_s: Pause between polls once the tail has caught up.
+            idle_stop_s: Stop after this long without new bytes; None to run until stop().
+            block_size: Largest block requested with one CMD_GET_FILE_BLOCK.
+        """
+        self.jensen = jensen_device
+        self.filename = filename
+        self.output_path = str(output_path)
+        self.data_callback = data_callback
+        self.device_lock = device_lock if device_lock is not None else getattr(jensen_device, "command_scheduler", None)
+        self.poll_interval_s = poll_interval_s
+        self.idle_stop_s = idle_stop_s
+        self.block_size = block_size
+        self.status: Optional[str] = None  # "running", then "stopped", "idle", "fail_disconnected" or "fail_file_io"
+        self._committed = 0
+        self._crc = 0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {"polls": 0, "blocks": 0, "last_data": None}
+
+    @property
+    def bytes_tailed(self) -> int:
+        """Bytes of the recording on disk."""
+        return self._committed
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start tailing, continuing a previous tail of the same recording if its bytes are intact."""
+        if self.is_running():
+            return
+        self._committed, self._crc = self._resume_offset()
+        self._stop_event.clear()
+        self.status = "running"
+        self._thread = threading.Thread(target=self._run, name=f"LiveTail-{self.filename}", daemon=True)
+        self._thread.start()
+        logger.info("LiveTail", "start", f"Tailing {self.filename} into {self.output_path} from byte {self._committed}")
+
+    def stop(self, timeout: Optional[float] = 10.0) -> int:
+        """
+        Stop tailing and wait for the current poll to finish.
+
+        Returns:
+            int: Bytes of the recording on disk; a download of the finished
+            recording continues after them.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self._committed
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "filename": self.filename,
+            "status": self.status,
+            "bytes_tailed": self._committed,
+            "polls": self._stats["polls"],
+            "blocks": self._stats["blocks"],
+            "seconds_since_data": (
+                round(time.time() - self._stats["last_data"], 1) if self._stats["last_data"] else None
+            ),
+        }
+
+    def _resume_offset(self):
+        """Return (offset, crc) after the bytes a previous tail left for this recording, else (0, 0)."""
+        try:
+            with open(checkpoint_path(self.output_path), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("filename") != self.filename or data.get("file_length") is not None:
+                return 0, 0
+            committed = int(data["committed"])
+            crc = _file_crc32(self.output_path, committed)
+            return (committed, crc) if crc is not None and crc == int(data["crc32"]) else (0, 0)
+        except (OSError, ValueError, KeyError, TypeError):
+            return 0, 0
+
+    def _poll_block(self, offset: int):
+        """Read the next block behind ``offset`` at polling priority; None if the device was busy."""
+        with command_priority(CommandPriority.POLLING):
+            if self.device_lock is None:
+                return self.jensen.get_file_block(self.filename, offset, self.block_size)
+            if not self.device_lock.acquire(timeout=self.poll_interval_s):
+                return None
+            try:
+                return self.jensen.get_file_block(self.filename, offset, self.block_size)
+            finally:
+                self.device_lock.release()
+
+    def _run(self) -> None:
+        last_data = time.monotonic()
+        last_checkpoint = self._committed
+        try:
+            with open(self.output_path, "r+b" if self._committed else "wb") as f:
+                f.seek(self._committed)
+                f.truncate()
+                while not self._stop_event.is_set():
+                    if not self.jensen.is_connected():
+                        self.status = "fail_disconnected"
+                        break
+                    self._stats["polls"] += 1
+                    block = self._poll_block(self._committed)
+                    if block:
+                        block = bytes(block)
+                        f.write(block)
+                        f.flush()
+                        offset = self._committed
+                        self._crc = zlib.crc32(block, self._crc)
+                        self._committed += len(block)
+                        self._stats["blocks"] += 1
+                        self._stats["last_data"] = time.time()
+                        last_data = time.monotonic()
+                        if self.data_callback:
+                            try:
+                                self.data_callback(block, offset)
+                            except Exception as e:  # A failing consumer must not stop the copy
+                                logger.warning("LiveTail", "_run", f"data_callback failed: {e}")
+                        caught_up = len(block) < self.block_size
+                        if caught_up or self._committed - last_checkpoint >= DEFAULT_CHECKPOINT_INTERVAL:
+                            write_checkpoint(self.output_path, self.filename, None, None, self._committed, self._crc)
+                            last_checkpoint = self._committed
+                        if not caught_up:
+                            continue  # Still behind the recording; read on without waiting
+                    elif self.idle_stop_s is not None and time.monotonic() - last_data > self.idle_stop_s:
+                        self.status = "idle"
+                        logger.info(
+                            "LiveTail",
+                            "_run",
+                            f"No new data for {self.filename} in {self.idle_stop_s:.0f}s, assuming the recording ended",
+                        )
+                        break
+                    self._stop_event.wait(self.poll_interval_s)
+                else:
+                    self.status = "stopped"
+        except OSError as e:
+            logger.error("LiveTail", "_run", f"Writing {self.output_path} failed: {e}")
+            self.status = "fail_file_io"
+        if self._committed != last_checkpoint:
+            write_checkpoint(self.output_path, self.filename, None, None, self._committed, self._crc)
+        logger.info("LiveTail", "_run", f"Tail of {self.filename} ended ({self.status}) at byte {self._committed}")
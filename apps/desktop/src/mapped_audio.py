@@ -0,0 +1,120 @@
+"""
+Memory-mapped access to the samples of a WAV file.
+
+The spectrum view only ever looks at one FFT window around the playhead, yet
+it used to be handed the whole decoded recording. ``MappedWavAudio`` parses
+the WAV header once and maps the PCM data region with ``np.memmap``; slicing
+it converts just the requested frames to mono float32, so the operating
+system pages in only the part of the file that is being looked at.
+"""
+
+import struct
+from typing import Optional
+
+import numpy as np
+
+from config_and_logger import logger
+from waveform_peaks import pcm_to_mono
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class MappedWavAudio:
+    """
+    Mono float32 view of a PCM or float WAV file, read on demand.
+
+    Supports ``len()`` and slicing with a step of one, which is all the
+    visualizers need from an audio array.
+    """
+
+    def __init__(
+        self, filepath: str, sample_rate: int, channels: int, sample_width: int, fmt: int, offset: int, frames: int
+    ):
+        self.filepath = filepath
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.format = fmt
+        self.frame_count = frames
+        self._data: Optional[np.memmap] = None
+        if frames:
+            self._data = np.memmap(
+                filepath, dtype=np.uint8, mode="r", offset=offset, shape=(frames, channels * sample_width)
+            )
+
+    @property
+    def duration(self) -> float:
+        return self.frame_count / self.sample_rate if self.sample_rate else 0.0
+
+    def __len__(self) -> int:
+        return self.frame_count
+
+    def __getitem__(self, index) -> np.ndarray:
+        if not isinstance(index, slice) or index.step not in (None, 1):
+            raise TypeError("MappedWavAudio only supports contiguous slices")
+        start, stop, _ = index.indices(self.frame_count)
+        if self._data is None or stop <= start:
+            return np.zeros(0, dtype=np.float32)
+        raw = self._data[start:stop].tobytes()
+        if self.format == WAVE_FORMAT_IEEE_FLOAT:
+            data = np.frombuffer(raw, dtype="<f4" if self.sample_width == 4 else "<f8").astype(np.float32)
+            if self.channels > 1:
+                data = data.reshape(-1, self.channels).mean(axis=1, dtype=np.float32)
+            return data
+        return pcm_to_mono(raw, self.sample_width, self.channels)
+
+    def close(self) -> None:
+        """Drop the mapping so the file can be deleted or replaced (required on Windows)."""
+        self._data = None
+
+
+def _read_header(f):
+    """Return (format, channels, sample_rate, sample_width, data_offset, data_size) of an open WAV file."""
+    riff = f.read(12)
+    if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+        raise ValueError("not a RIFF/WAVE file")
+    fmt = None
+    while True:
+        chunk_header = f.read(8)
+        if len(chunk_header) < 8:
+            raise ValueError("no data chunk")
+        chunk_id, chunk_size = struct.unpack("<4sI", chunk_header)
+        if chunk_id == b"fmt ":
+            body = f.read(chunk_size)
+            tag, channels, sample_rate, _, _, bits = struct.unpack("<HHIIHH", body[:16])
+            if tag == WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+                tag = struct.unpack("<H", body[24:26])[0]  # First two bytes of the sub-format GUID
+            fmt = (tag, channels, sample_rate, (bits + 7) // 8)
+            if chunk_size % 2:
+                f.seek(1, 1)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("data chunk before fmt chunk")
+            return fmt + (f.tell(), chunk_size)
+        else:
+            f.seek(chunk_size + chunk_size % 2, 1)
+
+
+def open_mapped_wav(filepath: str) -> Optional[MappedWavAudio]:
+    """Map the samples of ``filepath``; None if it is not a WAV file that can be mapped."""
+    if not filepath.lower().endswith(".wav"):
+        return None
+    try:
+        with open(filepath, "rb") as f:
+            tag, channels, sample_rate, sample_width, offset, data_size = _read_header(f)
+            f.seek(0, 2)
+            file_size = f.tell()
+        if tag == WAVE_FORMAT_PCM and sample_width not in (1, 2, 3, 4):
+            raise ValueError(f"unsupported sample width {sample_width}")
+        if tag == WAVE_FORMAT_IEEE_FLOAT and sample_width not in (4, 8):
+            raise ValueError(f"unsupported float width {sample_width}")
+        if tag not in (WAVE_FORMAT_PCM, WAVE_FORMAT_IEEE_FLOAT) or not channels or not sample_rate:
+            raise ValueError(f"unsupported format {tag:#06x}")
+        # Recorders that were interrupted leave a data size past the end of the file
+        frames = min(data_size, file_size - offset) // (channels * sample_width)
+        return MappedWavAudio(filepath, sample_rate, channels, sample_width, tag, offset, frames)
+    except (OSError, ValueError, struct.error) as e:
+        logger.debug("MappedAudio", "open_mapped_wav", f"Cannot map {filepath}: {e}")
+        return None
@@ -0,0 +1,200 @@
+"""
+MPEG audio frame scanning and streaming decode of HiDock recordings.
+
+HiDock .hda files are plain MPEG-1/2 Layer I/II streams (the H1E records mono
+16 kHz Layer II at 64 kb/s). ``scan_mpeg_frames`` walks the frame headers in
+process, which gives the exact stream parameters and the number of samples
+before anything is decoded. ``decode_mpeg_to_pcm`` then has ffmpeg decode the
+file and stream raw 16-bit PCM through a pipe straight into an output buffer
+allocated once from that count, instead of going through pydub, an exported
+WAV in memory and a second parse of that WAV.
+"""
+
+import math
+import shutil
+import subprocess
+import tempfile
+from dataclasses import dataclass
+from typing import Optional
+
+from config_and_logger import logger
+
+try:
+    from pydub import AudioSegment
+
+    PYDUB_AVAILABLE = True
+except ImportError:
+    AudioSegment = None
+    PYDUB_AVAILABLE = False
+
+# Version bits of the frame header: 0 = MPEG-2.5, 2 = MPEG-2, 3 = MPEG-1 (1 is reserved)
+SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+# kb/s by (MPEG-1, layer) and bitrate index; MPEG-2 and 2.5 share their tables
+BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+SAMPLES_PER_FRAME = {1: 384, 2: 1152}
+MAX_RESYNC_BYTES = 64 * 1024  # Garbage skipped between frames before the stream is considered over
+PIPE_READ_SIZE = 256 * 1024
+
+
+@dataclass
+class MpegStreamInfo:
+    """Parameters of an MPEG audio stream, taken from its frame headers."""
+
+    layer: int
+    sample_rate: int
+    channels: int
+    bitrate_kbps: int
+    frame_count: int
+    sample_count: int  # Samples per channel
+    data_offset: int  # Offset of the first frame
+
+    @property
+    def duration(self) -> float:
+        return self.sample_count / self.sample_rate if self.sample_rate else 0.0
+
+
+def _parse_header(data, pos: int):
+    """(version, layer, sample_rate, channels, bitrate_kbps, frame_length) of the frame at ``pos``, else None."""
+    if pos + 4 > len(data) or data[pos] != 0xFF or (data[pos + 1] & 0xE0) != 0xE0:
+        return None
+    version = (data[pos + 1] >> 3) & 0x3
+    layer = 4 - ((data[pos + 1] >> 1) & 0x3)
+    bitrate_index = data[pos + 2] >> 4
+    rate_index = (data[pos + 2] >> 2) & 0x3
+    padding = (data[pos + 2] >> 1) & 0x1
+    channels = 1 if (data[pos + 3] >> 6) == 0x3 else 2
+    # Layer III is left to the generic decoders; free-format frames have no computable length
+    if version == 1 or layer not in SAMPLES_PER_FRAME or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    sample_rate = SAMPLE_RATES[version][rate_index]
+    bitrate = BITRATES[(version == 3, layer)][bitrate_index]
+    if layer == 1:
+        frame_length = (12 * bitrate * 1000 // sample_rate + padding) * 4
+    else:
+        frame_length = 144 * bitrate * 1000 // sample_rate + padding
+    return version, layer, sample_rate, channels, bitrate, frame_length
+
+
+def _skip_id3v2(data) -> int:
+    if len(data) >= 10 and data[:3] == b"ID3":
+        size = (data[6] & 0x7F) << 21 | (data[7] & 0x7F) << 14 | (data[8] & 0x7F) << 7 | (data[9] & 0x7F)
+        return 10 + size
+    return 0
+
+
+def scan_mpeg_frames(data) -> Optional[MpegStreamInfo]:
+    """
+    Walk the frame headers of an MPEG Layer I/II stream.
+
+    Frames must agree on version, layer, sample rate and channel mode with the
+    first frame; short runs of other bytes between frames are skipped.
+
+    Returns:
+        MpegStreamInfo or None: None if ``data`` does not start with a Layer I/II stream.
+    """
+    data_offset = pos = _skip_id3v2(data)
+    first = _parse_header(data, pos)
+    if first is None:
+        return None
+    version, layer, sample_rate, channels, bitrate, _ = first
+    frame_count = 0
+    while pos < len(data):
+        header = _parse_header(data, pos)
+        if header is not None and header[:4] == first[:4] and pos + header[5] <= len(data):
+            frame_count += 1
+            pos += header[5]
+            continue
+        # Lost sync: look for the next matching frame a little further on
+        next_pos = data.find(b"\xff", pos + 1, pos + MAX_RESYNC_BYTES)
+        while next_pos != -1:
+            header = _parse_header(data, next_pos)
+            if header is not None and header[:4] == first[:4]:
+                break
+            next_pos = data.find(b"\xff", next_pos + 1, pos + MAX_RESYNC_BYTES)
+        if next_pos == -1:
+            break
+        pos = next_pos
+    return MpegStreamInfo(
+        layer=layer,
+        sample_rate=sample_rate,
+        channels=channels,
+        bitrate_kbps=bitrate,
+        frame_count=frame_count,
+        sample_count=frame_count * SAMPLES_PER_FRAME[layer],
+        data_offset=data_offset,
+    )
+
+
+def find_ffmpeg() -> Optional[str]:
+    """Path of the ffmpeg executable pydub is configured with, or of ffmpeg on PATH."""
+    converter = getattr(AudioSegment, "converter", None) if PYDUB_AVAILABLE else None
+    return shutil.which(converter or "ffmpeg")
+
+
+def decode_mpeg_to_pcm(filepath: str, info: MpegStreamInfo, sample_rate: Optional[int] = None) -> Optional[bytearray]:
+    """
+    Decode ``filepath`` to interleaved 16-bit PCM through an ffmpeg pipe.
+
+    The output buffer is allocated once from the frame count in ``info`` and the
+    pipe is read straight into it.
+
+    Args:
+        filepath: MPEG audio file, whatever its extension.
+        info: Result of scan_mpeg_frames for the file.
+        sample_rate: Output rate; ffmpeg resamples if it differs from the stream's.
+
+    Returns:
+        bytearray or None: PCM data with ``info.channels`` channels, or None if
+        ffmpeg is unavailable or fails.
+    """
+    ffmpeg = find_ffmpeg()
+    if not ffmpeg:
+        return None
+    sample_rate = sample_rate or info.sample_rate
+    command = [ffmpeg, "-nostdin", "-v", "error", "-f", "mp3", "-i", filepath, "-map", "0:a:0"]
+    command += ["-ar", str(sample_rate), "-ac", str(info.channels), "-c:a", "pcm_s16le", "-f", "s16le", "pipe:1"]
+    frame_width = 2 * info.channels
+    expected = math.ceil(info.sample_count * sample_rate / info.sample_rate) * frame_width
+    output = bytearray(expected)
+    filled = 0
+    # A file rather than a pipe, so a chatty decoder cannot stall the PCM pipe
+    with tempfile.TemporaryFile() as error_log:
+        try:
+            process = subprocess.Popen(
+                command,
+                stdout=subprocess.PIPE,
+                stderr=error_log,
+                creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+            )
+        except OSError as e:
+            logger.debug("MpegAudio", "decode_mpeg_to_pcm", f"Cannot start ffmpeg: {e}")
+            return None
+        with process:
+            view = memoryview(output)
+            while True:
+                if filled == len(output):
+                    # Resampler rounding can add a few frames beyond the estimate
+                    view.release()
+                    output.extend(bytes(PIPE_READ_SIZE))
+                    view = memoryview(output)
+                count = process.stdout.readinto(view[filled : filled + PIPE_READ_SIZE])
+                if not count:
+                    break
+                filled += count
+            view.release()
+        error_log.seek(0)
+        errors = error_log.read()
+    if process.returncode != 0:
+        logger.warning(
+            "MpegAudio",
+            "decode_mpeg_to_pcm",
+            f"ffmpeg failed on {filepath} ({process.returncode}): {errors.decode(errors='replace').strip()}",
+        )
+        return None
+    del output[filled - filled % frame_width :]
+    return output
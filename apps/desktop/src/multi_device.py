@@ -0,0 +1,401 @@
+"""
+Concurrent access to several docked HiDock devices.
+
+``HiDockJensen`` talks to one unit and its command scheduler serializes every
+exchange, so offloading a dock of H1/H1E/P1 units one after the other takes
+the sum of their transfer times. ``DevicePool`` finds every attached unit,
+connects one ``HiDockJensen`` per unit (selected by USB bus and address) and
+gives each its own ``DeviceWorker`` thread: commands for different devices
+run side by side, commands for the same device stay in order.
+
+``BatchDownloadPlanner`` turns the file lists of all pool devices into one
+download queue per device, runs the queues on the workers concurrently and
+reports per-device and aggregate throughput. A batch takes about as long as
+its slowest device.
+"""
+
+import concurrent.futures
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import usb.core
+
+from config_and_logger import logger
+from constants import ALL_VENDOR_IDS, HIDOCK_PRODUCT_IDS
+from hidock_device import HiDockJensen
+from resumable_download import ResumableDownloader, has_checkpoint
+
+
+def find_hidock_devices(
+    usb_backend, vendor_ids: Iterable[int] = ALL_VENDOR_IDS, product_ids: Iterable[int] = HIDOCK_PRODUCT_IDS
+) -> List[Dict[str, int]]:
+    """
+    List every attached HiDock unit.
+
+    Returns:
+        list: {"vid", "pid", "bus", "address"} per unit, ordered by bus and address.
+    """
+    vendor_ids, product_ids = set(vendor_ids), set(product_ids)
+    devices = usb.core.find(
+        find_all=True,
+        backend=usb_backend,
+        custom_match=lambda dev: dev.idVendor in vendor_ids and dev.idProduct in product_ids,
+    )
+    found = [{"vid": dev.idVendor, "pid": dev.idProduct, "bus": dev.bus, "address": dev.address} for dev in devices]
+    return sorted(found, key=lambda device: (device["bus"], device["address"]))
+
+
+class DeviceWorker:
+    """One docked unit, its ``HiDockJensen`` and the thread that runs all of its I/O."""
+
+    def __init__(self, usb_backend, vid: int, pid: int, bus: int, address: int):
+        self.jensen = HiDockJensen(usb_backend)
+        self.vid = vid
+        self.pid = pid
+        self.location = (bus, address)
+        self.serial: Optional[str] = None
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f"hidock-io-{bus}-{address}"
+        )
+
+    @property
+    def label(self) -> str:
+        """Serial number once connected, otherwise the USB location."""
+        return self.serial or "%d-%d" % self.location
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> concurrent.futures.Future:
+        """Run ``fn(jensen, *args, **kwargs)`` on this device's worker thread."""
+        return self._executor.submit(fn, self.jensen, *args, **kwargs)
+
+    def connect(self, auto_retry: bool = False) -> concurrent.futures.Future:
+        """Connect on the worker thread. The future resolves to (success, error_message)."""
+        return self.submit(self._connect, auto_retry)
+
+    def _connect(self, jensen: HiDockJensen, auto_retry: bool):
+        success, error = jensen.connect(vid=self.vid, pid=self.pid, auto_retry=auto_retry, location=self.location)
+        if success:
+            self.serial = (jensen.get_device_info() or {}).get("sn") or None
+        return success, error
+
+    def close(self) -> None:
+        """Disconnect after queued work has finished and stop the worker thread."""
+        try:
+            self.submit(lambda jensen: jensen.disconnect()).result()
+        except Exception as e:
+            logger.warning("DeviceWorker", "close", f"Disconnect of {self.label} failed: {e}")
+        self._executor.shutdown(wait=True)
+
+
+class DevicePool:
+    """Connected HiDock units, one ``DeviceWorker`` each."""
+
+    def __init__(self, usb_backend):
+        self.usb_backend = usb_backend
+        self.workers: List[DeviceWorker] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close_all()
+
+    def connect_all(self, auto_retry: bool = False) -> Dict[str, str]:
+        """
+        Connect every attached unit that is not in the pool yet, all in parallel.
+
+        Returns:
+            dict: Error message per "bus-address" location for units that failed to connect.
+        """
+        known = {worker.location for worker in self.workers}
+        pending = []
+        for device in find_hidock_devices(self.usb_backend):
+            if (device["bus"], device["address"]) in known:
+                continue
+            worker = DeviceWorker(self.usb_backend, device["vid"], device["pid"], device["bus"], device["address"])
+            # The label turns into the serial number once the worker has connected
+            pending.append((worker, worker.label, worker.connect(auto_retry)))
+
+        errors = {}
+        for worker, location, future in pending:
+            try:
+                success, error = future.result()
+            except Exception as e:
+                success, error = False, str(e)
+            if success:
+                self.workers.append(worker)
+                logger.info("DevicePool", "connect_all", "Connected %s at %s", worker.label, location)
+            else:
+                errors[location] = error or "Connection failed"
+                worker.close()
+        return errors
+
+    def get_worker(self, label: str) -> Optional[DeviceWorker]:
+        """Worker whose serial (or location label) is ``label``."""
+        for worker in self.workers:
+            if worker.label == label:
+                return worker
+        return None
+
+    def run_on_all(self, fn: Callable[..., Any], *args, **kwargs) -> Dict[str, Any]:
+        """
+        Run ``fn(jensen, *args, **kwargs)`` on every device concurrently.
+
+        Returns:
+            dict: Result per device label; an exception raised on a device is
+            returned as that device's result.
+        """
+        futures = {worker.label: worker.submit(fn, *args, **kwargs) for worker in self.workers}
+        results = {}
+        for label, future in futures.items():
+            try:
+                results[label] = future.result()
+            except Exception as e:
+                results[label] = e
+        return results
+
+    def close_all(self) -> None:
+        """Disconnect every device and stop the workers."""
+        workers, self.workers = self.workers, []
+        for worker in workers:
+            worker.close()
+
+
+@dataclass
+class DownloadJob:
+    """One file to fetch from one device."""
+
+    device: str
+    file_info: Dict[str, Any]
+    output_path: str
+
+
+class BatchDownloadPlanner:
+    """
+    Plans and runs downloads from every device in a ``DevicePool``.
+
+    Each device's files can only come from that device, so the plan is one
+    queue per device; queues run concurrently, files within a queue run in
+    order. ``get_throughput()`` may be called from any thread during ``run()``.
+    """
+
+    def __init__(
+        self,
+        pool: DevicePool,
+        output_dir,
+        per_device_dirs: bool = True,
+        retry_count: int = 3,
+        timeout_s: float = 300,
+    ):
+        """
+        Args:
+            pool: Connected devices.
+            output_dir: Destination directory.
+            per_device_dirs: Put each device's files in a subdirectory named after
+                its serial, so equally named recordings on different units do not collide.
+            retry_count: Attempts per file; failed attempts resume from their checkpoint.
+            timeout_s: Timeout per file attempt.
+        """
+        self.pool = pool
+        self.output_dir = str(output_dir)
+        self.per_device_dirs = per_device_dirs
+        self.retry_count = retry_count
+        self.timeout_s = timeout_s
+        self._lock = threading.Lock()
+        self._progress: Dict[str, Dict[str, Any]] = {}
+        self._run_started: Optional[float] = None
+        self._run_finished: Optional[float] = None
+
+    def device_dir(self, label: str) -> str:
+        return os.path.join(self.output_dir, label) if self.per_device_dirs else self.output_dir
+
+    def plan(
+        self, file_lists: Dict[str, List[Dict[str, Any]]], skip_existing: bool = True
+    ) -> Dict[str, List[DownloadJob]]:
+        """
+        Build the per-device download queues.
+
+        Args:
+            file_lists: File entries (as returned by ``list_files``) per device label.
+            skip_existing: Leave out files already on disk with the right size and
+                no pending resume checkpoint.
+
+        Returns:
+            dict: Jobs per device label, in device listing order.
+        """
+        plan = {}
+        for label, files in file_lists.items():
+            directory = self.device_dir(label)
+            jobs = []
+            for file_info in files:
+                output_path = os.path.join(directory, file_info["name"])
+                if (
+                    skip_existing
+                    and os.path.exists(output_path)
+                    and not has_checkpoint(output_path)
+                    and os.path.getsize(output_path) == file_info["length"]
+                ):
+                    continue
+                jobs.append(DownloadJob(label, file_info, output_path))
+            plan[label] = jobs
+        return plan
+
+    def run(
+        self,
+        plan: Dict[str, List[DownloadJob]],
+        progress_callback: Optional[Callable[[str, str, int, int], None]] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> Dict[str, Any]:
+        """
+        Download every planned file, one queue per device worker, all devices at once.
+
+        Args:
+            plan: Result of ``plan()``.
+            progress_callback: Called from worker threads as (device, filename, received, total).
+            cancel_event: Set to stop all devices after their current transfer.
+
+        Returns:
+            dict: ``get_throughput()`` after the last device finished; each
+            device entry lists its failed files as (filename, status).
+
+        Raises:
+            KeyError: A planned device is not in the pool; nothing is downloaded then.
+        """
+        workers = {label: self.pool.get_worker(label) for label in plan}
+        missing = [label for label, worker in workers.items() if worker is None]
+        if missing:
+            raise KeyError(f"No connected device {', '.join(missing)} in the pool")
+
+        with self._lock:
+            self._progress = {
+                label: {
+                    "files_total": len(jobs),
+                    "files_done": 0,
+                    "bytes_total": sum(job.file_info["length"] for job in jobs),
+                    "bytes_done": 0,
+                    "current_bytes": 0,
+                    "failed": [],
+                    "started": None,
+                    "finished": None,
+                }
+                for label, jobs in plan.items()
+            }
+            self._run_started = time.perf_counter()
+            self._run_finished = None
+
+        futures = []
+        for label, jobs in plan.items():
+            os.makedirs(self.device_dir(label), exist_ok=True)
+            futures.append(workers[label].submit(self._run_queue, label, jobs, progress_callback, cancel_event))
+        for future in concurrent.futures.as_completed(futures):
+            future.result()
+
+        with self._lock:
+            self._run_finished = time.perf_counter()
+        report = self.get_throughput()
+        logger.info(
+            "BatchDownloadPlanner",
+            "run",
+            "%d devices, %.1f MB in %.2f s: %.2f MB/s aggregate",
+            len(plan),
+            report["bytes"] / (1024 * 1024),
+            report["elapsed_s"],
+            report["mb_per_s"],
+        )
+        return report
+
+    def _run_queue(self, jensen, label, jobs, progress_callback, cancel_event):
+        """Worker-thread body: download ``jobs`` from one device in order."""
+        progress = self._progress[label]
+        with self._lock:
+            progress["started"] = time.perf_counter()
+        downloader = ResumableDownloader(jensen)
+        try:
+            for job in jobs:
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                status = self._download_job(downloader, job, progress, progress_callback, cancel_event)
+                with self._lock:
+                    progress["current_bytes"] = 0
+                    if status == "OK":
+                        progress["files_done"] += 1
+                        progress["bytes_done"] += job.file_info["length"]
+                    else:
+                        progress["failed"].append((job.file_info["name"], status))
+        finally:
+            with self._lock:
+                progress["finished"] = time.perf_counter()
+
+    def _download_job(self, downloader, job, progress, progress_callback, cancel_event) -> str:
+        filename = job.file_info["name"]
+        file_length = job.file_info["length"]
+
+        def on_progress(received: int, total: int):
+            with self._lock:
+                progress["current_bytes"] = received
+            if progress_callback:
+                progress_callback(job.device, filename, received, total)
+
+        status = "fail"
+        for attempt in range(1, self.retry_count + 1):
+            status = downloader.download(
+                filename=filename,
+                file_length=file_length,
+                output_path=job.output_path,
+                progress_callback=on_progress,
+                timeout_s=self.timeout_s,
+                cancel_event=cancel_event,
+                signature=job.file_info.get("signature"),
+            )
+            if status in ("OK", "cancelled"):
+                break
+            logger.warning(
+                "BatchDownloadPlanner",
+                "_download_job",
+                f"{job.device}: {filename} attempt {attempt}/{self.retry_count} ended with '{status}'",
+            )
+        return status
+
+    def get_throughput(self) -> Dict[str, Any]:
+        """
+        Per-device and aggregate progress of the current or last run.
+
+        Returns:
+            dict: "devices" maps each label to files/bytes done and total, elapsed
+            seconds and MB/s; the top level holds the aggregate bytes, wall-clock
+            "elapsed_s", aggregate "mb_per_s", "device_seconds" (sum of device
+            busy times) and "parallelism" (device_seconds / elapsed_s).
+        """
+        now = time.perf_counter()
+        with self._lock:
+            devices = {}
+            device_seconds = 0.0
+            total_bytes = 0
+            for label, progress in self._progress.items():
+                done = progress["bytes_done"] + progress["current_bytes"]
+                started = progress["started"]
+                elapsed = ((progress["finished"] or now) - started) if started is not None else 0.0
+                devices[label] = {
+                    "files_done": progress["files_done"],
+                    "files_total": progress["files_total"],
+                    "bytes_done": done,
+                    "bytes_total": progress["bytes_total"],
+                    "elapsed_s": elapsed,
+                    "mb_per_s": done / (1024 * 1024) / elapsed if elapsed > 0 else 0.0,
+                    "failed": list(progress["failed"]),
+                }
+                device_seconds += elapsed
+                total_bytes += done
+            elapsed = 0.0
+            if self._run_started is not None:
+                elapsed = (self._run_finished or now) - self._run_started
+        return {
+            "devices": devices,
+            "bytes": total_bytes,
+            "elapsed_s": elapsed,
+            "mb_per_s": total_bytes / (1024 * 1024) / elapsed if elapsed > 0 else 0.0,
+            "device_seconds": device_seconds,
+            "parallelism": device_seconds / elapsed if elapsed > 0 else 0.0,
+        }
@@ -0,0 +1,429 @@
+"""
+Resumable downloads for HiDock recordings.
+
+A failed ``stream_file`` transfer normally means starting the whole recording
+again. ``ResumableDownloader`` keeps a small JSON checkpoint next to the
+partial file (``<output>.resume``) recording how many bytes are safely on disk
+and a CRC-32 of those bytes. A later attempt validates the partial file
+against the checkpoint and continues from the last good offset with
+``CMD_GET_FILE_BLOCK`` ranged reads. A full stream from offset zero is only
+used for fresh downloads, invalid checkpoints, or devices that do not answer
+ranged reads.
+
+A checkpoint may also come from ``live_tail.LiveRecordingTail``, which copies
+a recording while it is still being made. Such a checkpoint has no file length
+(the file was still growing), so it is accepted for any final length at least
+as long as the bytes already on disk; the download then only fetches what was
+recorded after the tail's last poll.
+
+When the file list signature is known, the download is also checked against
+it: the writer feeds every byte into an MD5 digest as it goes to disk (see
+file_integrity). A finished file whose digest differs is flagged in
+``last_stats`` and, with ``file_integrity.STRICT_SIGNATURE_CHECK`` set,
+reported as "fail_signature_mismatch".
+"""
+
+import json
+import os
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import file_integrity
+from config_and_logger import logger
+from device_state_cache import EVENT_DOWNLOAD_FINISHED
+from download_writer import DoubleBufferedFileWriter
+from file_integrity import new_digest, normalize_signature, verify_digest
+
+CHECKPOINT_SUFFIX = ".resume"
+CHECKPOINT_VERSION = 1
+DEFAULT_BLOCK_SIZE = 64 * 1024
+DEFAULT_CHECKPOINT_INTERVAL = 4 * 1024 * 1024
+DEFAULT_BLOCK_RETRIES = 3
+BLOCK_RETRY_DELAY_S = 0.2
+
+# stream_file statuses after which the link is usually still usable for ranged reads
+_RESUMABLE_STREAM_STATUSES = ("fail", "fail_timeout", "fail_comms_error", "fail_unexpected_response")
+
+
+def checkpoint_path(output_path) -> str:
+    """Return the sidecar checkpoint path for ``output_path``."""
+    return f"{output_path}{CHECKPOINT_SUFFIX}"
+
+
+def discard_checkpoint(output_path) -> None:
+    """Remove the checkpoint for ``output_path`` if there is one."""
+    try:
+        os.remove(checkpoint_path(output_path))
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning("ResumableDownload", "discard_checkpoint", f"Could not remove checkpoint for {output_path}: {e}")
+
+
+def write_checkpoint(
+    output_path, filename: str, file_length: Optional[int], signature: Optional[str], committed: int, crc: int
+) -> None:
+    """
+    Atomically write the checkpoint for a partial download of ``output_path``.
+
+    ``file_length`` is None for a recording that is still growing.
+    """
+    if committed <= 0:
+        return
+    path = checkpoint_path(output_path)
+    tmp_path = f"{path}.tmp"
+    data = {
+        "version": CHECKPOINT_VERSION,
+        "filename": filename,
+        "file_length": file_length,
+        "signature": signature,
+        "committed": committed,
+        "crc32": crc,
+        "updated": time.time(),
+    }
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning("ResumableDownload", "write_checkpoint", f"Could not save checkpoint for {filename}: {e}")
+
+
+def has_checkpoint(output_path) -> bool:
+    """Return True if a partial download of ``output_path`` can potentially be resumed."""
+    return os.path.exists(checkpoint_path(output_path))
+
+
+def _file_crc32(path, length: int, chunk_size: int = 1024 * 1024, digest=None) -> Optional[int]:
+    """
+    CRC-32 of the first ``length`` bytes of ``path``, or None if the file is shorter.
+
+    ``digest``, if given, is fed the same bytes in the same pass.
+    """
+    crc = 0
+    remaining = length
+    with open(path, "rb") as f:
+        while remaining > 0:
+            data = f.read(min(chunk_size, remaining))
+            if not data:
+                return None
+            crc = zlib.crc32(data, crc)
+            if digest is not None:
+                digest.update(data)
+            remaining -= len(data)
+    return crc
+
+
+class ResumableDownloader:
+    """
+    Downloads a device file to disk, resuming interrupted transfers.
+
+    ``download()`` returns the same status strings as ``HiDockJensen.stream_file``
+    ("OK", "cancelled", "fail_timeout", ...) plus "fail_file_io" for local
+    disk errors and, with strict signature checks, "fail_signature_mismatch" for
+    a complete file that does not match its device signature. On failure the
+    partial file and its checkpoint are kept so the next call resumes; on
+    success the checkpoint is removed.
+    """
+
+    def __init__(
+        self,
+        jensen_device,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+        block_retries: int = DEFAULT_BLOCK_RETRIES,
+    ):
+        self.jensen = jensen_device
+        self.block_size = block_size
+        self.checkpoint_interval = checkpoint_interval
+        self.block_retries = block_retries
+        self.ranged_reads_supported: Optional[bool] = None
+        self.last_stats: Dict[str, Any] = {}
+        self._committed_crc = 0
+        # MD5 of the committed bytes while a signature is being verified, else None
+        self._committed_digest = None
+
+    # --- Checkpoints ---
+
+    def _load_checkpoint(
+        self, filename: str, file_length: int, output_path, signature: Optional[str]
+    ) -> Tuple[int, int]:
+        """
+        Return ``(offset, crc)`` to resume from, or ``(0, 0)`` to start over.
+
+        The checkpoint must describe the same device file and the partial file
+        on disk must still hash to the recorded CRC. A checkpoint written while
+        the file was still being recorded matches any ``file_length`` that
+        covers its committed bytes.
+        """
+        path = checkpoint_path(output_path)
+        if not os.path.exists(path):
+            return 0, 0
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            committed = int(data["committed"])
+            crc = int(data["crc32"])
+            growing = data.get("file_length", -1) is None
+            if (
+                data.get("version") != CHECKPOINT_VERSION
+                or data.get("filename") != filename
+                or (not growing and int(data.get("file_length", -1)) != file_length)
+                or (signature and data.get("signature") and data["signature"] != signature)
+                or not (0 < committed <= file_length if growing else 0 < committed < file_length)
+            ):
+                raise ValueError("checkpoint does not match this download")
+            # The prefix is read once anyway, so seed the signature digest in the same pass
+            digest = new_digest() if normalize_signature(signature) else None
+            if _file_crc32(output_path, committed, digest=digest) != crc:
+                raise ValueError("partial file does not match checkpoint hash")
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.info("ResumableDownload", "_load_checkpoint", f"Discarding checkpoint for {filename}: {e}")
+            discard_checkpoint(output_path)
+            return 0, 0
+        self._committed_digest = digest
+        return committed, crc
+
+    def _save_checkpoint(
+        self, filename: str, file_length: int, output_path, signature: Optional[str], committed: int, crc: int
+    ) -> None:
+        """Atomically write the checkpoint for a partial download."""
+        write_checkpoint(output_path, filename, file_length, signature, committed, crc)
+
+    # --- Download ---
+
+    def download(
+        self,
+        filename: str,
+        file_length: int,
+        output_path,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        timeout_s: float = 180,
+        cancel_event: Optional[threading.Event] = None,
+        signature: Optional[str] = None,
+        preallocate: bool = False,
+    ) -> str:
+        """
+        Download ``filename`` to ``output_path``, resuming from a checkpoint if possible.
+
+        Args:
+            filename: Name of the file on the device.
+            file_length: Expected size in bytes.
+            output_path: Local destination path.
+            progress_callback: Called with (bytes_received, file_length).
+            timeout_s: Overall timeout for the transfer.
+            cancel_event: Set to cancel the transfer.
+            signature: Device signature of the file; a checkpoint recorded for a
+                different signature is discarded, and the finished file is
+                verified against it (see ``last_stats["signature_verified"]``).
+            preallocate: Reserve the full file size on disk before writing.
+
+        Returns:
+            str: Status string, "OK" on success.
+        """
+        self._committed_digest = None
+        start_offset, start_crc = self._load_checkpoint(filename, file_length, output_path, signature)
+        self.last_stats = {
+            "resumed_from": start_offset,
+            "mode": None,
+            "mb_per_s": 0.0,
+            "bytes_transferred": 0,
+            "bytes_on_disk": start_offset,
+            "md5": None,
+            "signature_verified": None,
+        }
+        context = (filename, file_length, output_path, signature)
+        deadline = time.time() + timeout_s
+
+        if start_offset > 0 and self.ranged_reads_supported is not False:
+            logger.info(
+                "ResumableDownload",
+                "download",
+                f"Resuming {filename} at byte {start_offset} of {file_length}",
+            )
+            status = self._download_ranged(context, start_offset, start_crc, progress_callback, deadline, cancel_event)
+            if status != "fail_unsupported":
+                return self._finish(context, status)
+            logger.warning(
+                "ResumableDownload",
+                "download",
+                "Device does not answer ranged reads, falling back to a full stream",
+            )
+
+        status, committed = self._download_streamed(context, progress_callback, timeout_s, cancel_event, preallocate)
+        if (
+            status in _RESUMABLE_STREAM_STATUSES
+            and 0 < committed < file_length
+            and self.ranged_reads_supported is not False
+            and self.jensen.is_connected()
+        ):
+            logger.info(
+                "ResumableDownload",
+                "download",
+                f"Stream of {filename} ended with '{status}' at byte {committed}, continuing with ranged reads",
+            )
+            ranged_status = self._download_ranged(
+                context, committed, self._committed_crc, progress_callback, deadline, cancel_event
+            )
+            if ranged_status != "fail_unsupported":
+                status = ranged_status
+        return self._finish(context, status)
+
+    def _finish(self, context, status: str) -> str:
+        """Verify the signature and drop the checkpoint after a successful download."""
+        if status == "OK" and self._committed_digest is not None:
+            filename, _, _, signature = context
+            self.last_stats["md5"] = self._committed_digest.hexdigest()
+            self.last_stats["signature_verified"] = verify_digest(self.last_stats["md5"], signature)
+            if self.last_stats["signature_verified"] is False:
+                logger.warning(
+                    "ResumableDownload",
+                    "_finish",
+                    f"{filename} does not match its device signature: got {self.last_stats['md5']}, "
+                    f"expected {normalize_signature(signature)}",
+                )
+                if file_integrity.STRICT_SIGNATURE_CHECK:
+                    return "fail_signature_mismatch"  # The checkpoint stays; the bytes may well be right
+        if status == "OK":
+            discard_checkpoint(context[2])
+            state_cache = getattr(self.jensen, "state_cache", None)
+            if state_cache is not None and self.last_stats.get("mode") == "ranged":
+                state_cache.publish(EVENT_DOWNLOAD_FINISHED)  # stream_file publishes its own
+        return status
+
+    def _record_stats(self, mode: str, writer: DoubleBufferedFileWriter) -> None:
+        stats = writer.get_stats()
+        self.last_stats["mode"] = mode
+        self.last_stats["mb_per_s"] = stats["mb_per_s"]
+        self.last_stats["reader_wait_s"] = stats["reader_wait_s"]
+        self.last_stats["bytes_transferred"] += stats["bytes_written"]
+        self.last_stats["bytes_on_disk"] = writer.committed()[0]
+
+    def _download_streamed(self, context, progress_callback, timeout_s, cancel_event, preallocate) -> Tuple[str, int]:
+        """Stream the whole file from offset zero. Returns (status, bytes committed)."""
+        filename, file_length, output_path, signature = context
+        discard_checkpoint(output_path)
+        self._committed_crc = 0
+        self._committed_digest = new_digest() if normalize_signature(signature) else None
+        try:
+            writer = DoubleBufferedFileWriter(
+                output_path, file_length, preallocate=preallocate, digest=self._committed_digest
+            )
+        except OSError as e:
+            logger.error("ResumableDownload", "_download_streamed", f"Cannot open {output_path}: {e}")
+            return "fail_file_io", 0
+
+        last_checkpoint = [0]
+
+        def on_progress(bytes_received: int, total: int):
+            if progress_callback:
+                progress_callback(bytes_received, total)
+            committed, crc = writer.committed()
+            if committed - last_checkpoint[0] >= self.checkpoint_interval:
+                self._save_checkpoint(filename, file_length, output_path, signature, committed, crc)
+                last_checkpoint[0] = committed
+
+        status = "fail_exception"
+        try:
+            stream_kwargs = {
+                "filename": filename,
+                "file_length": file_length,
+                "data_callback": writer.write,
+                "progress_callback": on_progress,
+                "timeout_s": timeout_s,
+            }
+            if cancel_event is not None:
+                stream_kwargs["cancel_event"] = cancel_event
+            status = self.jensen.stream_file(**stream_kwargs)
+        finally:
+            # Keep whatever arrived so a failed stream can be resumed
+            try:
+                writer.close()
+            except OSError as e:
+                logger.error("ResumableDownload", "_download_streamed", f"Write to {output_path} failed: {e}")
+                status = "fail_file_io"
+            self._record_stats("stream", writer)
+
+        committed, self._committed_crc = writer.committed()
+        if status != "OK":
+            self._save_checkpoint(filename, file_length, output_path, signature, committed, self._committed_crc)
+        return status, committed
+
+    def _download_ranged(self, context, offset: int, crc: int, progress_callback, deadline, cancel_event) -> str:
+        """Fetch the rest of the file with CMD_GET_FILE_BLOCK starting at ``offset``."""
+        filename, file_length, output_path, signature = context
+        try:
+            writer = DoubleBufferedFileWriter(
+                output_path, file_length, start_offset=offset, start_crc=crc, digest=self._committed_digest
+            )
+        except OSError as e:
+            logger.error("ResumableDownload", "_download_ranged", f"Cannot reopen {output_path}: {e}")
+            return "fail_file_io"
+
+        status = "fail"
+        last_checkpoint = offset
+        received_any = False
+        failures = 0
+        try:
+            while offset < file_length:
+                if cancel_event is not None and cancel_event.is_set():
+                    status = "cancelled"
+                    break
+                if time.time() > deadline:
+                    status = "fail_timeout"
+                    break
+                if not self.jensen.is_connected():
+                    status = "fail_disconnected"
+                    break
+
+                length = min(self.block_size, file_length - offset)
+                block = self.jensen.get_file_block(filename, offset, length)
+                if not isinstance(block, (bytes, bytearray, memoryview)) or len(block) == 0:
+                    failures += 1
+                    if failures <= self.block_retries:
+                        time.sleep(BLOCK_RETRY_DELAY_S)
+                        continue
+                    if not received_any and self.ranged_reads_supported is None and self.jensen.is_connected():
+                        self.ranged_reads_supported = False
+                        status = "fail_unsupported"
+                    else:
+                        status = "fail_comms_error"
+                    break
+
+                failures = 0
+                received_any = True
+                self.ranged_reads_supported = True
+                block = memoryview(block)[:length]
+                writer.write(block)
+                offset += len(block)
+                if progress_callback:
+                    progress_callback(offset, file_length)
+                committed, committed_crc = writer.committed()
+                if committed - last_checkpoint >= self.checkpoint_interval:
+                    self._save_checkpoint(filename, file_length, output_path, signature, committed, committed_crc)
+                    last_checkpoint = committed
+                # Between blocks no exchange is in flight, so a more urgent request may run
+                scheduler = getattr(self.jensen, "command_scheduler", None)
+                if scheduler is not None:
+                    scheduler.yield_point()
+            else:
+                status = "OK"
+        except OSError as e:
+            logger.error("ResumableDownload", "_download_ranged", f"Write to {output_path} failed: {e}")
+            status = "fail_file_io"
+        finally:
+            try:
+                writer.close()
+            except OSError as e:
+                logger.error("ResumableDownload", "_download_ranged", f"Write to {output_path} failed: {e}")
+                status = "fail_file_io"
+            self._record_stats("ranged", writer)
+
+        if status == "fail_unsupported":
+            return status
+        if status != "OK":
+            committed, committed_crc = writer.committed()
+            self._save_checkpoint(filename, file_length, output_path, signature, committed, committed_crc)
+        return status
@@ -149,6 +149,7 @@ class SettingsDialog(ctk.CTkToplevel):
             "file_stream_timeout_s_var": "StringVar",  # Changed from IntVar to prevent TclError
             "auto_refresh_files_var": "BooleanVar",
             "auto_refresh_interval_s_var": "StringVar",  # Changed from IntVar to prevent TclError
+            "live_tail_recordings_var": "BooleanVar",
             "quit_without_prompt_var": "BooleanVar",
             "appearance_mode_var": "StringVar",
             "color_theme_var": "StringVar",
@@ -419,6 +420,11 @@ class SettingsDialog(ctk.CTkToplevel):
             textvariable=self.local_vars["auto_refresh_interval_s_var"],
             width=60,
         ).pack(anchor="w", pady=(2, 10), padx=10)
+        ctk.CTkCheckBox(
+            scroll_frame,
+            text="Copy the recording in progress while it is being recorded",
+            variable=self.local_vars["live_tail_recordings_var"],
+        ).pack(anchor="w", pady=(0, 10), padx=10)
 
         # Calendar Settings Section
 
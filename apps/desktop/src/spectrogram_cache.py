@@ -0,0 +1,236 @@
+"""
+Precomputed spectrum frames for the spectrum view.
+
+The spectrum view used to window, transform, resample and smooth one FFT on
+every animation frame. ``Spectrogram`` computes all frames of a track up
+front instead: a background pass cuts the audio into overlapping windows with
+a strided view, transforms a batch of them with one ``rfft`` call, and applies
+the same log-frequency resampling, normalization and Savitzky-Golay smoothing
+as the live path to the whole batch at once. The animation callback then only
+looks up the frame at the playhead.
+
+Finished spectrograms of files are kept in a small in-memory cache and can be
+saved next to the audio file (``<file>.spectrum``), keyed by its size and
+modification time like the waveform peak files.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import numpy as np
+from scipy import signal
+
+from config_and_logger import logger
+
+SPECTROGRAM_FILE_SUFFIX = ".spectrum"
+SPECTROGRAM_FILE_VERSION = 1
+SPECTRUM_BANDS = 50  # Points of the log-frequency axis, as drawn by the live path
+SPECTRUM_FLOOR_DB = -80.0
+DEFAULT_HOP_S = 0.05  # One frame per animation tick
+BATCH_FRAMES = 2048  # Frames transformed per rfft call
+MEMORY_CACHE_SIZE = 4
+
+
+@lru_cache(maxsize=8)
+def _spectrum_grid(sample_rate: int, fft_size: int):
+    """Window, log-frequency axis and linear interpolation weights from FFT bins to that axis."""
+    window = np.hanning(fft_size).astype(np.float32)
+    bin_freqs = np.fft.fftfreq(fft_size, 1 / sample_rate)[1 : fft_size // 2]  # Without the DC bin
+    log_freqs = np.logspace(1, np.log10(sample_rate / 2), SPECTRUM_BANDS)
+    # Same result as np.interp(log_freqs, bin_freqs, row) for every row at once
+    left = np.clip(np.searchsorted(bin_freqs, log_freqs, side="right") - 1, 0, len(bin_freqs) - 2)
+    weight = np.clip((log_freqs - bin_freqs[left]) / (bin_freqs[left + 1] - bin_freqs[left]), 0.0, 1.0)
+    return window, log_freqs, left, weight.astype(np.float32)
+
+
+def spectrum_frame_count(sample_count: int, fft_size: int, hop: int) -> int:
+    """Frames whose window holds at least half an FFT of audio; later positions show an empty spectrum."""
+    if sample_count < fft_size // 2:
+        return 0
+    return (sample_count - fft_size // 2) // hop + 1
+
+
+def compute_spectrum_frames(
+    audio, sample_rate: int, fft_size: int, hop: int, first_frame: int, count: int
+) -> np.ndarray:
+    """
+    Log-binned, normalized and smoothed spectra of ``count`` frames starting at ``first_frame``.
+
+    ``audio`` is any mono sequence supporting ``len()`` and slicing, such as an
+    ndarray or a MappedWavAudio. Frame ``k`` analyzes ``fft_size`` samples from
+    sample ``k * hop``, zero-padded at the end of the audio.
+
+    Returns:
+        np.ndarray: float32 array of shape (count, SPECTRUM_BANDS) in dB, 0 dB being
+        the loudest band of each frame.
+    """
+    window, _, left, weight = _spectrum_grid(sample_rate, fft_size)
+    start = first_frame * hop
+    span = (count - 1) * hop + fft_size
+    chunk = np.asarray(audio[start : start + span], dtype=np.float32)
+    if len(chunk) < span:
+        chunk = np.pad(chunk, (0, span - len(chunk)))
+    frames = np.lib.stride_tricks.sliding_window_view(chunk, fft_size)[::hop][:count]
+    magnitude = np.abs(np.fft.rfft(frames * window, axis=1)[:, 1 : fft_size // 2])
+    spectrum_db = 20 * np.log10(np.maximum(magnitude, 1e-10))
+    spectrum = spectrum_db[:, left] * (1 - weight) + spectrum_db[:, left + 1] * weight
+    spectrum -= spectrum.max(axis=1, keepdims=True)
+    np.maximum(spectrum, SPECTRUM_FLOOR_DB, out=spectrum)
+    return signal.savgol_filter(spectrum, 5, 2, axis=1).astype(np.float32)
+
+
+class Spectrogram:
+    """Spectrum frames of one track, filled in from the start by a background thread."""
+
+    def __init__(self, sample_rate: int, fft_size: int, hop: int, frames: np.ndarray, frames_done: int = 0):
+        self.sample_rate = sample_rate
+        self.fft_size = fft_size
+        self.hop = hop
+        self.frames = frames
+        self.frames_done = frames_done
+        self.log_freqs = _spectrum_grid(sample_rate, fft_size)[1]
+        self._cancel_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def complete(self) -> bool:
+        return self.frames_done >= len(self.frames)
+
+    def lookup(self, position_s: float) -> Optional[np.ndarray]:
+        """Spectrum at ``position_s`` seconds; None if the background pass has not reached it yet."""
+        index = int(position_s * self.sample_rate) // self.hop
+        if 0 <= index < self.frames_done:
+            return self.frames[index]
+        return None
+
+    def cancel(self, timeout: Optional[float] = 1.0) -> None:
+        """Stop the background pass, waiting for the batch in progress so the audio can be released."""
+        self._cancel_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def _compute(self, audio, on_complete=None) -> None:
+        try:
+            while self.frames_done < len(self.frames) and not self._cancel_event.is_set():
+                count = min(BATCH_FRAMES, len(self.frames) - self.frames_done)
+                self.frames[self.frames_done : self.frames_done + count] = compute_spectrum_frames(
+                    audio, self.sample_rate, self.fft_size, self.hop, self.frames_done, count
+                )
+                self.frames_done += count
+        except Exception as e:  # The live path in the analyzer covers whatever is missing
+            logger.error("Spectrogram", "_compute", f"Spectrum pass failed at frame {self.frames_done}: {e}")
+            return
+        if self.complete and on_complete:
+            on_complete(self)
+
+    def save(self, path: str, source_size: int, source_mtime_ns: int) -> None:
+        """Atomically write the frames, tagged with the size and mtime of their source file."""
+        tmp_path = f"{path}.tmp"
+        meta = np.array(
+            [SPECTROGRAM_FILE_VERSION, self.sample_rate, self.fft_size, self.hop, source_size, source_mtime_ns],
+            dtype=np.int64,
+        )
+        with open(tmp_path, "wb") as f:
+            np.savez(f, meta=meta, frames=self.frames)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(
+        cls, path: str, sample_rate: int, fft_size: int, hop: int, source_size: int, source_mtime_ns: int
+    ) -> Optional["Spectrogram"]:
+        """Read saved frames; None if missing, unreadable or made with other settings or from another file."""
+        expected = [SPECTROGRAM_FILE_VERSION, sample_rate, fft_size, hop, source_size, source_mtime_ns]
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if [int(v) for v in data["meta"]] != expected:
+                    return None
+                frames = data["frames"]
+        except (OSError, ValueError, KeyError):
+            return None
+        return cls(sample_rate, fft_size, hop, frames, frames_done=len(frames))
+
+
+def spectrogram_file_path(audio_path: str) -> str:
+    return f"{audio_path}{SPECTROGRAM_FILE_SUFFIX}"
+
+
+_memory_cache: "OrderedDict[Tuple, Spectrogram]" = OrderedDict()
+_memory_cache_lock = threading.Lock()
+
+
+def _remember(key: Tuple, spectrogram: Spectrogram) -> None:
+    with _memory_cache_lock:
+        _memory_cache[key] = spectrogram
+        _memory_cache.move_to_end(key)
+        while len(_memory_cache) > MEMORY_CACHE_SIZE:
+            _memory_cache.popitem(last=False)
+
+
+def get_spectrogram(
+    audio,
+    sample_rate: int,
+    fft_size: int = 1024,
+    hop_s: float = DEFAULT_HOP_S,
+    source_path: Optional[str] = None,
+    use_disk_cache: bool = False,
+) -> Spectrogram:
+    """
+    Spectrogram of ``audio``, from the cache or being computed in the background.
+
+    Args:
+        audio: Mono samples supporting ``len()`` and slicing.
+        sample_rate: Sample rate of ``audio``.
+        fft_size: Samples per FFT.
+        hop_s: Time between frames in seconds.
+        source_path: File ``audio`` was read from; only spectrograms of files are cached.
+        use_disk_cache: Also load and save ``<source_path>.spectrum``.
+
+    Returns:
+        Spectrogram: Complete if cached, otherwise filling in on a daemon thread;
+        cancel() it when the audio is released.
+    """
+    hop = max(1, int(round(hop_s * sample_rate)))
+    key = None
+    stat = None
+    if source_path:
+        try:
+            stat = os.stat(source_path)
+            key = (os.path.abspath(source_path), stat.st_size, stat.st_mtime_ns, sample_rate, fft_size, hop)
+        except OSError:
+            pass
+    if key is not None:
+        with _memory_cache_lock:
+            spectrogram = _memory_cache.get(key)
+            if spectrogram is not None:
+                _memory_cache.move_to_end(key)
+                return spectrogram
+        if use_disk_cache:
+            spectrogram = Spectrogram.load(
+                spectrogram_file_path(source_path), sample_rate, fft_size, hop, stat.st_size, stat.st_mtime_ns
+            )
+            if spectrogram is not None:
+                _remember(key, spectrogram)
+                return spectrogram
+
+    frame_count = spectrum_frame_count(len(audio), fft_size, hop)
+    frames = np.full((frame_count, SPECTRUM_BANDS), SPECTRUM_FLOOR_DB, dtype=np.float16)
+    spectrogram = Spectrogram(sample_rate, fft_size, hop, frames)
+
+    def on_complete(finished: Spectrogram):
+        if key is None:
+            return
+        _remember(key, finished)
+        if use_disk_cache:
+            try:
+                finished.save(spectrogram_file_path(source_path), stat.st_size, stat.st_mtime_ns)
+            except OSError as e:
+                logger.warning("Spectrogram", "get_spectrogram", f"Could not save spectrogram of {source_path}: {e}")
+
+    spectrogram._thread = threading.Thread(
+        target=spectrogram._compute, args=(audio, on_complete), name="SpectrogramPass", daemon=True
+    )
+    spectrogram._thread.start()
+    return spectrogram
@@ -0,0 +1,259 @@
+"""
+Per-device tuning of USB read sizes and response timeouts.
+
+``HiDockJensen`` used fixed transfer parameters for every model and firmware:
+reads of 64 packets with a 200 ms timeout, file list chunks awaited for 1 s
+(backing off to 3 s) and 15 s per ``stream_file`` response. ``TransferAutoTuner``
+starts from those values and adjusts them from what the connected device
+actually does:
+
+* read size: every streamed transfer of at least ``MIN_TUNING_BYTES`` is a
+  throughput sample for the read size it used. The tuner tries the
+  neighbouring sizes in ``READ_PACKET_STEPS`` and settles on the fastest.
+* read timeout: a small multiple of the command round-trip latency, so reads
+  wake up quickly on fast links and do not spin on slow ones.
+* list and stream timeouts: a multiple of the longest gap seen between
+  consecutive response chunks, bounded on both sides.
+
+``TransferProfileStore`` persists the tuned profile per device serial. A
+device seen for the first time starts from the most recent profile of the
+same model and firmware, if there is one.
+"""
+
+import json
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Dict, Optional
+
+from config_and_logger import logger
+from device_interface import DeviceModel
+
+PROFILE_FORMAT_VERSION = 1
+
+READ_PACKET_STEPS = (16, 32, 64, 128, 256)
+MIN_TUNING_BYTES = 1024 * 1024  # Shorter transfers are dominated by command latency
+
+# Bounds for the tuned timeouts, in milliseconds
+READ_TIMEOUT_RANGE = (50, 500)
+LIST_CHUNK_TIMEOUT_RANGE = (300, 1000)
+STREAM_TIMEOUT_RANGE = (3000, 15000)
+
+# Samples required before a timeout is derived from measurements
+MIN_LATENCY_SAMPLES = 8
+MIN_GAP_SAMPLES = 16
+
+
+@dataclass
+class TransferProfile:
+    """Read size and timeouts used by ``HiDockJensen`` for one device."""
+
+    read_packets: int = 64  # Read size in multiples of wMaxPacketSize
+    read_timeout_ms: int = 200
+    list_chunk_timeout_ms: int = 1000
+    list_chunk_timeout_max_ms: int = 3000
+    stream_timeout_ms: int = 15000
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TransferProfile":
+        names = {field.name for field in fields(cls)}
+        return cls(**{key: int(value) for key, value in data.items() if key in names})
+
+
+def _clamp(value: float, bounds) -> int:
+    return int(min(max(value, bounds[0]), bounds[1]))
+
+
+class TransferAutoTuner:
+    """Measures one device's link and adjusts its ``TransferProfile``. Thread-safe."""
+
+    def __init__(
+        self,
+        model: DeviceModel = DeviceModel.UNKNOWN,
+        firmware: Optional[str] = None,
+        profile: Optional[TransferProfile] = None,
+        read_rates: Optional[Dict[int, float]] = None,
+        source: str = "default",
+    ):
+        """
+        Args:
+            model: Device model the measurements belong to.
+            firmware: Firmware version string ("6.2.4").
+            profile: Starting profile; the built-in defaults if None.
+            read_rates: Previously measured MB/s per read size (in packets).
+            source: Where the starting profile came from: "default", "model" or "stored".
+        """
+        self.model = model
+        self.firmware = firmware
+        self.profile = profile or TransferProfile()
+        self.source = source
+        self._lock = threading.Lock()
+        self._read_rates: Dict[int, float] = dict(read_rates or {})
+        self._latencies = deque(maxlen=64)
+        self._list_gaps = deque(maxlen=256)
+        self._stream_gaps = deque(maxlen=256)
+        self._mb_per_s: Optional[float] = None
+        self._bytes_measured = 0
+
+    # --- Measurements ---
+
+    def record_command(self, latency_ms: float) -> None:
+        """Round-trip time of a single request/response command."""
+        with self._lock:
+            self._latencies.append(latency_ms)
+            if len(self._latencies) >= MIN_LATENCY_SAMPLES:
+                p95 = sorted(self._latencies)[int(len(self._latencies) * 0.95) - 1]
+                self.profile.read_timeout_ms = _clamp(p95 * 4, READ_TIMEOUT_RANGE)
+
+    def record_list_gap(self, gap_ms: float) -> None:
+        """Time between two consecutive file list chunks."""
+        with self._lock:
+            self._list_gaps.append(gap_ms)
+            if len(self._list_gaps) >= MIN_GAP_SAMPLES:
+                timeout = _clamp(max(self._list_gaps) * 4, LIST_CHUNK_TIMEOUT_RANGE)
+                self.profile.list_chunk_timeout_ms = timeout
+                self.profile.list_chunk_timeout_max_ms = timeout * 3
+
+    def record_stream(self, byte_count: int, seconds: float, max_gap_ms: float) -> bool:
+        """
+        A finished ``stream_file`` transfer made with the current profile.
+
+        Args:
+            byte_count: Bytes received.
+            seconds: Duration of the transfer.
+            max_gap_ms: Longest wait between two data chunks.
+
+        Returns:
+            bool: True if the profile changed.
+        """
+        with self._lock:
+            before = asdict(self.profile)
+            self._stream_gaps.append(max_gap_ms)
+            if len(self._stream_gaps) >= MIN_GAP_SAMPLES:
+                self.profile.stream_timeout_ms = _clamp(max(self._stream_gaps) * 5, STREAM_TIMEOUT_RANGE)
+            if byte_count >= MIN_TUNING_BYTES and seconds > 0:
+                rate = byte_count / (1024 * 1024) / seconds
+                self._bytes_measured += byte_count
+                self._mb_per_s = rate if self._mb_per_s is None else 0.7 * self._mb_per_s + 0.3 * rate
+                packets = self.profile.read_packets
+                previous = self._read_rates.get(packets)
+                self._read_rates[packets] = rate if previous is None else 0.5 * previous + 0.5 * rate
+                self.profile.read_packets = self._next_read_packets(packets)
+            changed = asdict(self.profile) != before
+        if changed:
+            logger.debug("TransferTuner", "record_stream", "Profile for %s now %s", self.model.value, self.profile)
+        return changed
+
+    def _next_read_packets(self, current: int) -> int:
+        """Explore an unmeasured neighbour of the fastest size, otherwise stay on the fastest."""
+        best = max(self._read_rates, key=self._read_rates.get)
+        if best not in READ_PACKET_STEPS:
+            return best
+        index = READ_PACKET_STEPS.index(best)
+        for neighbour in (index + 1, index - 1):
+            if 0 <= neighbour < len(READ_PACKET_STEPS) and READ_PACKET_STEPS[neighbour] not in self._read_rates:
+                return READ_PACKET_STEPS[neighbour]
+        return best
+
+    # --- Reporting ---
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Model, firmware, current profile and its origin, and the measured link figures."""
+        with self._lock:
+            return {
+                "model": self.model.value,
+                "firmware": self.firmware,
+                "source": self.source,
+                "profile": asdict(self.profile),
+                "mb_per_s": round(self._mb_per_s, 3) if self._mb_per_s is not None else None,
+                "latency_ms": round(statistics.median(self._latencies), 2) if self._latencies else None,
+                "read_rates": {packets: round(rate, 3) for packets, rate in sorted(self._read_rates.items())},
+                "bytes_measured": self._bytes_measured,
+            }
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "model": self.model.value,
+                "firmware": self.firmware,
+                "profile": asdict(self.profile),
+                "read_rates": {str(packets): rate for packets, rate in self._read_rates.items()},
+                "mb_per_s": self._mb_per_s,
+                "saved_at": time.time(),
+            }
+
+
+class TransferProfileStore:
+    """Tuned transfer profiles per device serial, in one JSON file."""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: JSON file; created on first save.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self) -> Dict[str, Any]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("format") != PROFILE_FORMAT_VERSION:
+                return {}
+            return data.get("devices", {})
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning("TransferProfileStore", "_read", f"Ignoring unreadable profiles in {self.path}: {e}")
+            return {}
+
+    def tuner_for(self, serial: Optional[str], model: DeviceModel, firmware: Optional[str]) -> TransferAutoTuner:
+        """
+        Tuner starting from the stored profile of ``serial``, or from the latest
+        profile of another unit with the same model and firmware.
+
+        A stored profile recorded under a different firmware is not reused.
+        """
+        with self._lock:
+            devices = self._read()
+        entry, source = devices.get(serial) if serial else None, "stored"
+        if not entry or entry.get("model") != model.value or entry.get("firmware") != firmware:
+            same_model = [
+                candidate
+                for candidate in devices.values()
+                if candidate.get("model") == model.value and candidate.get("firmware") == firmware
+            ]
+            entry = max(same_model, key=lambda candidate: candidate.get("saved_at", 0), default=None)
+            source = "model"
+        if not entry:
+            return TransferAutoTuner(model, firmware)
+        try:
+            profile = TransferProfile.from_dict(entry.get("profile", {}))
+            read_rates = {int(packets): float(rate) for packets, rate in entry.get("read_rates", {}).items()}
+        except (TypeError, ValueError) as e:
+            logger.warning("TransferProfileStore", "tuner_for", f"Ignoring invalid profile for {serial}: {e}")
+            return TransferAutoTuner(model, firmware)
+        return TransferAutoTuner(model, firmware, profile, read_rates, source)
+
+    def save(self, serial: Optional[str], tuner: TransferAutoTuner) -> bool:
+        """Persist ``tuner``'s profile for ``serial``. Returns False if it could not be written."""
+        if not serial:
+            return False
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with self._lock:
+                devices = self._read()
+                devices[serial] = tuner.to_dict()
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({"format": PROFILE_FORMAT_VERSION, "devices": devices}, f, indent=1)
+                os.replace(tmp_path, self.path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning("TransferProfileStore", "save", f"Could not save transfer profile for {serial}: {e}")
+            return False
+        return True
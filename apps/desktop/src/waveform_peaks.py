@@ -0,0 +1,468 @@
+"""
+Multi-resolution peak files for waveform display.
+
+Drawing a waveform only needs, for every horizontal pixel, the smallest and
+largest sample it covers. ``PeakPyramid`` stores exactly that: min, max and
+RMS per bucket of ``BASE_BUCKET_FRAMES`` frames, plus coarser levels that each
+merge ``LEVEL_FACTOR`` buckets of the level below. Unlike taking every n-th
+sample, a bucket's min/max never drops a peak, and merging buckets is exact.
+
+A pyramid is computed in one streaming pass over the audio and saved next to
+the audio file (``<file>.peaks``), keyed by the file's size and modification
+time. Reselecting a recording or changing the zoom then reads a few thousand
+buckets from the level that matches the visible window instead of decoding the
+whole file again.
+
+Both the pyramid and ``reduce_waveform`` read the audio in blocks of
+``READ_BLOCK_FRAMES`` frames and reduce each block before the next is read:
+WAV files through ``wave``, other formats through an ffmpeg pipe of raw PCM,
+so memory does not grow with the length of the recording. Only when ffmpeg
+cannot be started is a non-WAV file decoded whole with pydub.
+"""
+
+import math
+import os
+import subprocess
+import threading
+import wave
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from pydub import AudioSegment
+
+    PYDUB_AVAILABLE = True
+except ImportError:
+    AudioSegment = None
+    PYDUB_AVAILABLE = False
+
+from config_and_logger import logger
+from mpeg_audio import find_ffmpeg
+
+PEAK_FILE_SUFFIX = ".peaks"
+PEAK_FILE_VERSION = 1
+BASE_BUCKET_FRAMES = 512  # Frames per bucket at the finest level
+LEVEL_FACTOR = 4  # Buckets of one level merged into one bucket of the next
+TOP_LEVEL_MAX_BUCKETS = 2048  # Coarser levels are added until one is this small
+READ_BLOCK_FRAMES = 256 * 1024  # Frames decoded per step of the streaming pass
+MEMORY_CACHE_SIZE = 8
+FFMPEG_STARTUP_TIMEOUT_S = 5.0
+
+MIN, MAX, RMS = 0, 1, 2  # Columns of a level array
+
+
+class PeakPyramid:
+    """Min/max/RMS buckets of one recording at several resolutions."""
+
+    def __init__(
+        self, sample_rate: int, frame_count: int, levels: List[np.ndarray], bucket_frames: int = BASE_BUCKET_FRAMES
+    ):
+        """
+        Args:
+            sample_rate: Frames per second of the source audio.
+            frame_count: Number of frames in the source audio.
+            levels: Arrays of shape (buckets, 3) holding min, max and RMS, finest first.
+            bucket_frames: Frames per bucket at level 0.
+        """
+        self.sample_rate = sample_rate
+        self.frame_count = frame_count
+        self.levels = levels
+        self.bucket_frames = bucket_frames
+
+    @property
+    def duration(self) -> float:
+        return self.frame_count / self.sample_rate if self.sample_rate else 0.0
+
+    @property
+    def peak(self) -> float:
+        """Largest absolute sample value of the recording."""
+        top = self.levels[-1]
+        if not len(top):
+            return 0.0
+        return float(max(abs(top[:, MIN].min()), abs(top[:, MAX].max())))
+
+    def level_bucket_seconds(self, level: int) -> float:
+        return self.bucket_frames * LEVEL_FACTOR**level / self.sample_rate
+
+    def window(
+        self, start_s: float = 0.0, end_s: Optional[float] = None, max_points: int = 2000
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Buckets covering ``[start_s, end_s)`` at no more than ``max_points`` points.
+
+        The finest level that fits is used; if even the coarsest level has too
+        many buckets in the window, neighbouring buckets are merged further.
+
+        Returns:
+            tuple: (times, mins, maxs, rms), times being bucket centres in seconds.
+        """
+        end_s = self.duration if end_s is None else min(end_s, self.duration)
+        start_s = max(0.0, start_s)
+        empty = np.zeros(0, dtype=np.float32)
+        if end_s <= start_s or not self.levels or not len(self.levels[0]):
+            return empty, empty, empty, empty
+
+        for level, data in enumerate(self.levels):
+            bucket_s = self.level_bucket_seconds(level)
+            first = int(start_s / bucket_s)
+            last = min(int(np.ceil(end_s / bucket_s)), len(data))
+            if last - first <= max_points:
+                break
+        origin = first * bucket_s
+        buckets = data[first:last]
+        if len(buckets) > max_points:
+            group = int(np.ceil(len(buckets) / max_points))
+            buckets = _merge_buckets(buckets, group)
+            bucket_s *= group
+        times = origin + (np.arange(len(buckets)) + 0.5) * bucket_s
+        return times, buckets[:, MIN], buckets[:, MAX], buckets[:, RMS]
+
+    def save(self, path: str, source_size: int, source_mtime_ns: int) -> None:
+        """Atomically write the pyramid, tagged with the size and mtime of its source file."""
+        tmp_path = f"{path}.tmp"
+        meta = np.array(
+            [PEAK_FILE_VERSION, self.sample_rate, self.frame_count, self.bucket_frames, source_size, source_mtime_ns],
+            dtype=np.int64,
+        )
+        with open(tmp_path, "wb") as f:
+            np.savez(f, meta=meta, **{f"level{i}": level for i, level in enumerate(self.levels)})
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, source_size: int, source_mtime_ns: int) -> Optional["PeakPyramid"]:
+        """Read a saved pyramid; None if it is missing, unreadable or was made from another version of the file."""
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                version, sample_rate, frame_count, bucket_frames, size, mtime_ns = (int(v) for v in data["meta"])
+                if version != PEAK_FILE_VERSION or size != source_size or mtime_ns != source_mtime_ns:
+                    return None
+                levels = [data[f"level{i}"] for i in range(len(data.files) - 1)]
+        except (OSError, ValueError, KeyError):
+            return None
+        return cls(sample_rate, frame_count, levels, bucket_frames)
+
+
+def _merge_buckets(buckets: np.ndarray, group: int) -> np.ndarray:
+    """Merge every ``group`` consecutive buckets; the last group may be shorter."""
+    starts = np.arange(0, len(buckets), group)
+    counts = np.diff(np.append(starts, len(buckets)))
+    merged = np.empty((len(starts), 3), dtype=np.float32)
+    merged[:, MIN] = np.minimum.reduceat(buckets[:, MIN], starts)
+    merged[:, MAX] = np.maximum.reduceat(buckets[:, MAX], starts)
+    merged[:, RMS] = np.sqrt(np.add.reduceat(buckets[:, RMS].astype(np.float64) ** 2, starts) / counts)
+    return merged
+
+
+class PeakPyramidBuilder:
+    """Builds a PeakPyramid from mono sample blocks fed in order."""
+
+    def __init__(self, sample_rate: int, bucket_frames: int = BASE_BUCKET_FRAMES):
+        self.sample_rate = sample_rate
+        self.bucket_frames = bucket_frames
+        self.frame_count = 0
+        self._carry = np.zeros(0, dtype=np.float32)
+        self._parts: List[np.ndarray] = []
+
+    def add(self, samples: np.ndarray) -> None:
+        """Reduce a block of mono float samples to buckets; a partial bucket is kept for the next block."""
+        self.frame_count += len(samples)
+        if len(self._carry):
+            samples = np.concatenate((self._carry, samples))
+        full = len(samples) // self.bucket_frames * self.bucket_frames
+        if full:
+            self._parts.append(self._reduce(samples[:full].reshape(-1, self.bucket_frames)))
+        self._carry = np.array(samples[full:], dtype=np.float32)
+
+    @staticmethod
+    def _reduce(blocks: np.ndarray) -> np.ndarray:
+        reduced = np.empty((len(blocks), 3), dtype=np.float32)
+        reduced[:, MIN] = blocks.min(axis=1)
+        reduced[:, MAX] = blocks.max(axis=1)
+        reduced[:, RMS] = np.sqrt(np.einsum("ij,ij->i", blocks, blocks, dtype=np.float64) / blocks.shape[1])
+        return reduced
+
+    def finish(self) -> PeakPyramid:
+        if len(self._carry):
+            self._parts.append(self._reduce(self._carry.reshape(1, -1)))
+            self._carry = np.zeros(0, dtype=np.float32)
+        base = np.concatenate(self._parts) if self._parts else np.zeros((0, 3), dtype=np.float32)
+        levels = [base]
+        while len(levels[-1]) > TOP_LEVEL_MAX_BUCKETS:
+            levels.append(_merge_buckets(levels[-1], LEVEL_FACTOR))
+        return PeakPyramid(self.sample_rate, self.frame_count, levels, self.bucket_frames)
+
+
+class WaveformReducer:
+    """
+    Reduces a stream of mono sample blocks to at most ``max_points`` min/max buckets.
+
+    With a known frame count the bucket size is fixed up front. Otherwise buckets
+    start one frame wide and neighbours are merged whenever more than twice
+    ``max_points`` have accumulated, so memory stays bounded by one block plus
+    ``2 * max_points`` buckets however long the stream is.
+    """
+
+    def __init__(self, max_points: int, total_frames: Optional[int] = None):
+        self.max_points = max(1, max_points)
+        self.bucket_frames = max(1, math.ceil(total_frames / self.max_points)) if total_frames else 1
+        self.frame_count = 0
+        self._mins = np.zeros(0, dtype=np.float32)
+        self._maxs = np.zeros(0, dtype=np.float32)
+        # Bucket still being filled: min, max and the frames it covers so far
+        self._partial: Optional[List[float]] = None
+
+    def add(self, samples: np.ndarray) -> None:
+        self.frame_count += len(samples)
+        if self._partial is not None and len(samples):
+            need = self.bucket_frames - self._partial[2]
+            head, samples = samples[:need], samples[need:]
+            self._partial = [
+                min(self._partial[0], float(head.min())),
+                max(self._partial[1], float(head.max())),
+                self._partial[2] + len(head),
+            ]
+            if self._partial[2] == self.bucket_frames:
+                self._append(np.float32([self._partial[0]]), np.float32([self._partial[1]]))
+                self._partial = None
+        full = len(samples) // self.bucket_frames * self.bucket_frames
+        if full:
+            blocks = samples[:full].reshape(-1, self.bucket_frames)
+            self._append(blocks.min(axis=1), blocks.max(axis=1))
+        if full < len(samples):
+            tail = samples[full:]
+            self._partial = [float(tail.min()), float(tail.max()), len(tail)]
+        while len(self._mins) > 2 * self.max_points:
+            self._halve()
+
+    def _append(self, mins: np.ndarray, maxs: np.ndarray) -> None:
+        self._mins = np.concatenate((self._mins, mins.astype(np.float32, copy=False)))
+        self._maxs = np.concatenate((self._maxs, maxs.astype(np.float32, copy=False)))
+
+    def _halve(self) -> None:
+        """Merge neighbouring buckets, doubling the bucket size."""
+        if len(self._mins) % 2:
+            # The odd bucket out starts the partial bucket of the new size
+            last_min, last_max = float(self._mins[-1]), float(self._maxs[-1])
+            self._mins, self._maxs = self._mins[:-1], self._maxs[:-1]
+            frames = self.bucket_frames
+            if self._partial is not None:
+                last_min, last_max = min(last_min, self._partial[0]), max(last_max, self._partial[1])
+                frames += self._partial[2]
+            self._partial = [last_min, last_max, frames]
+        self._mins = self._mins.reshape(-1, 2).min(axis=1)
+        self._maxs = self._maxs.reshape(-1, 2).max(axis=1)
+        self.bucket_frames *= 2
+
+    def finish(self) -> Tuple[np.ndarray, np.ndarray, int]:
+        """
+        Returns:
+            tuple: (mins, maxs, bucket_frames); the last bucket may cover fewer frames.
+        """
+        mins, maxs = self._mins, self._maxs
+        if self._partial is not None:
+            mins = np.append(mins, np.float32(self._partial[0]))
+            maxs = np.append(maxs, np.float32(self._partial[1]))
+        bucket_frames = self.bucket_frames
+        if len(mins) > self.max_points:
+            group = math.ceil(len(mins) / self.max_points)
+            starts = np.arange(0, len(mins), group)
+            mins, maxs = np.minimum.reduceat(mins, starts), np.maximum.reduceat(maxs, starts)
+            bucket_frames *= group
+        return mins, maxs, bucket_frames
+
+
+def pcm_to_mono(frames: bytes, sample_width: int, channels: int) -> np.ndarray:
+    """Convert interleaved PCM bytes to mono float32 samples in [-1, 1]."""
+    if sample_width == 1:
+        data = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sample_width == 2:
+        data = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    elif sample_width == 3:
+        raw = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        data = ((raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)) << 8 >> 8).astype(np.float32) / 8388608.0
+    elif sample_width == 4:
+        data = np.frombuffer(frames, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"Unsupported sample width: {sample_width}")
+    if channels > 1:
+        data = data[: len(data) // channels * channels].reshape(-1, channels).mean(axis=1, dtype=np.float32)
+    return data
+
+
+def _wav_blocks(wav_file, block_frames: int, on_close=None) -> Iterator[np.ndarray]:
+    try:
+        channels, width = wav_file.getnchannels(), wav_file.getsampwidth()
+        while True:
+            frames = wav_file.readframes(block_frames)
+            if not frames:
+                return
+            yield pcm_to_mono(frames, width, channels)
+    finally:
+        wav_file.close()
+        if on_close:
+            on_close()
+
+
+def _open_ffmpeg_pipe(filepath: str, block_frames: int) -> Optional[Tuple[int, Optional[int], Iterator[np.ndarray]]]:
+    """Decode ``filepath`` with ffmpeg into a pipe of 16-bit mono WAV read block by block."""
+    ffmpeg = find_ffmpeg()
+    if not ffmpeg:
+        return None
+    command = [ffmpeg, "-nostdin", "-v", "error", "-i", filepath, "-map", "0:a:0", "-ac", "1"]
+    command += ["-c:a", "pcm_s16le", "-map_metadata", "-1", "-fflags", "+bitexact", "-f", "wav", "pipe:1"]
+    creationflags = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+    try:
+        process = subprocess.Popen(
+            command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, creationflags=creationflags
+        )
+    except OSError as e:
+        logger.debug("WaveformPeaks", "_open_ffmpeg_pipe", f"Cannot start ffmpeg: {e}")
+        return None
+
+    def close_process():
+        if process.poll() is None:
+            process.kill()
+        process.stdout.close()
+        try:
+            process.wait(FFMPEG_STARTUP_TIMEOUT_S)
+        except subprocess.TimeoutExpired:
+            pass
+
+    try:
+        # ffmpeg cannot fill in the chunk sizes on a pipe, so the frame count in the header is meaningless
+        wav_file = wave.open(process.stdout, "rb")
+    except (OSError, EOFError, wave.Error) as e:
+        logger.debug("WaveformPeaks", "_open_ffmpeg_pipe", f"ffmpeg cannot decode {filepath}: {e}")
+        close_process()
+        return None
+    return wav_file.getframerate(), None, _wav_blocks(wav_file, block_frames, close_process)
+
+
+def open_audio_blocks(
+    filepath: str, block_frames: int = READ_BLOCK_FRAMES
+) -> Optional[Tuple[int, Optional[int], Iterator[np.ndarray]]]:
+    """
+    Open ``filepath`` for a streaming pass.
+
+    Returns:
+        tuple or None: (sample_rate, frame count or None if unknown, iterator of
+        mono float32 blocks), or None if the file cannot be decoded here.
+    """
+    if filepath.lower().endswith(".wav"):
+        try:
+            wav_file = wave.open(filepath, "rb")
+        except (OSError, EOFError, wave.Error) as e:
+            logger.debug("WaveformPeaks", "open_audio_blocks", f"wave cannot read {filepath}: {e}")
+        else:
+            return wav_file.getframerate(), wav_file.getnframes(), _wav_blocks(wav_file, block_frames)
+
+    opened = _open_ffmpeg_pipe(filepath, block_frames)
+    if opened is not None or not PYDUB_AVAILABLE:
+        return opened
+    try:
+        audio = AudioSegment.from_file(filepath)
+    except Exception as e:  # pydub raises whatever the decoder raised
+        logger.warning("WaveformPeaks", "open_audio_blocks", f"Cannot decode {filepath}: {e}")
+        return None
+    raw = audio.raw_data
+    step = block_frames * audio.frame_width
+
+    def decoded_blocks():
+        for pos in range(0, len(raw), step):
+            yield pcm_to_mono(raw[pos : pos + step], audio.sample_width, audio.channels)
+
+    return audio.frame_rate, int(audio.frame_count()), decoded_blocks()
+
+
+def peak_file_path(audio_path: str) -> str:
+    return f"{audio_path}{PEAK_FILE_SUFFIX}"
+
+
+def discard_peak_file(audio_path: str) -> None:
+    """Remove the peak file of ``audio_path`` if there is one."""
+    try:
+        Path(peak_file_path(audio_path)).unlink(missing_ok=True)
+    except OSError as e:
+        logger.warning("WaveformPeaks", "discard_peak_file", f"Could not remove peak file of {audio_path}: {e}")
+
+
+def build_peak_pyramid(audio_path: str) -> Optional[PeakPyramid]:
+    """Compute the pyramid of ``audio_path`` in one streaming pass, without caching it."""
+    opened = open_audio_blocks(audio_path)
+    if opened is None:
+        return None
+    sample_rate, _, blocks = opened
+    builder = PeakPyramidBuilder(sample_rate)
+    for block in blocks:
+        builder.add(block)
+    return builder.finish()
+
+
+def reduce_waveform(
+    audio_path: str, max_points: int = 2000, block_frames: int = READ_BLOCK_FRAMES
+) -> Optional[Tuple[np.ndarray, np.ndarray, int, int]]:
+    """
+    Min/max envelope of ``audio_path`` in at most ``max_points`` buckets, in one streaming pass.
+
+    Returns:
+        tuple or None: (mins, maxs, bucket_frames, sample_rate), or None if the
+        file cannot be decoded.
+    """
+    opened = open_audio_blocks(audio_path, block_frames)
+    if opened is None:
+        return None
+    sample_rate, total_frames, blocks = opened
+    reducer = WaveformReducer(max_points, total_frames)
+    for block in blocks:
+        reducer.add(block)
+    mins, maxs, bucket_frames = reducer.finish()
+    return mins, maxs, bucket_frames, sample_rate
+
+
+_memory_cache: "OrderedDict[Tuple[str, int, int], PeakPyramid]" = OrderedDict()
+_memory_cache_lock = threading.Lock()
+
+
+def get_peak_pyramid(audio_path: str, use_disk_cache: bool = True) -> Optional[PeakPyramid]:
+    """
+    Peak pyramid of ``audio_path`` from memory, its peak file, or a fresh pass.
+
+    A fresh pyramid is saved as the file's peak file. Returns None if the file
+    does not exist or cannot be decoded.
+    """
+    try:
+        stat = os.stat(audio_path)
+    except OSError:
+        return None
+    key = (os.path.abspath(audio_path), stat.st_size, stat.st_mtime_ns)
+    with _memory_cache_lock:
+        pyramid = _memory_cache.get(key)
+        if pyramid is not None:
+            _memory_cache.move_to_end(key)
+            return pyramid
+
+    peaks_path = peak_file_path(audio_path)
+    pyramid = PeakPyramid.load(peaks_path, stat.st_size, stat.st_mtime_ns) if use_disk_cache else None
+    if pyramid is None:
+        pyramid = build_peak_pyramid(audio_path)
+        if pyramid is None:
+            return None
+        logger.debug(
+            "WaveformPeaks",
+            "get_peak_pyramid",
+            f"Built {len(pyramid.levels)} levels ({len(pyramid.levels[0])} buckets) for {audio_path}",
+        )
+        if use_disk_cache:
+            try:
+                pyramid.save(peaks_path, stat.st_size, stat.st_mtime_ns)
+            except OSError as e:
+                logger.warning("WaveformPeaks", "get_peak_pyramid", f"Could not save {peaks_path}: {e}")
+
+    with _memory_cache_lock:
+        _memory_cache[key] = pyramid
+        while len(_memory_cache) > MEMORY_CACHE_SIZE:
+            _memory_cache.popitem(last=False)
+    return pyramid
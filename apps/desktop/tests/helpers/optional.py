@@ -0,0 +1,3 @@
+import pytest
+def require(mod, marker=None):
+    return pytest.importorskip(mod)
@@ -0,0 +1,136 @@
+"""
+Tests for pipelined batch downloads and their link utilization report.
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from batch_transfer import BatchDownloadItem, PipelinedBatchDownloader
+from device_emulator import EmulatedUSBBackend, JensenDeviceEmulator, LinkProfile, generate_catalog
+from file_operations_manager import FileOperationsManager, FileOperationStatus
+from hidock_device import HiDockJensen
+from resumable_download import has_checkpoint
+
+
+@pytest.fixture
+def device():
+    emulator = JensenDeviceEmulator(
+        generate_catalog(4, min_size=200_000, max_size=300_000),
+        LinkProfile(latency_s=0.0, bandwidth_bytes_per_s=8_000_000),
+        md5_signatures=True,
+    )
+    jensen = HiDockJensen(EmulatedUSBBackend([emulator]))
+    success, error = jensen.connect(auto_retry=False)
+    assert success, error
+    yield jensen, emulator
+    jensen.disconnect()
+
+
+def _items(emulator, directory):
+    return [
+        BatchDownloadItem(recording.name, recording.length, str(directory / recording.name))
+        for recording in emulator.recordings
+    ]
+
+
+class TestPipelinedBatchDownloader:
+    """Test back-to-back transfers and the batch report."""
+
+    def test_finalizing_runs_beside_the_next_transfer(self, device, tmp_path):
+        """Slow per-file finishing work does not leave the link idle between files."""
+        jensen, emulator = device
+        finalized = []
+
+        def finalize(item, status, stats):
+            time.sleep(0.03)  # Stands in for validation and cache updates
+            finalized.append((item.filename, status, threading.current_thread().name))
+
+        report = PipelinedBatchDownloader(jensen).run(_items(emulator, tmp_path), finalize_callback=finalize)
+
+        assert report["files_ok"] == 4
+        for recording in emulator.recordings:
+            assert (tmp_path / recording.name).read_bytes() == recording.read(0, recording.length)
+        assert [name for name, _, _ in finalized] == [recording.name for recording in emulator.recordings]
+        assert all(thread.startswith("BatchFinalize") for _, _, thread in finalized)
+        assert report["max_gap_ms"] < 30
+        assert report["link_utilization"] > 0.8
+        assert report["bytes"] == sum(recording.length for recording in emulator.recordings)
+
+    def test_cancelled_items_are_skipped_and_reported(self, device, tmp_path):
+        """An item cancelled before its turn is finalized as cancelled without a transfer."""
+        jensen, emulator = device
+        items = _items(emulator, tmp_path)
+        items[1].cancel_event.set()
+        statuses = {}
+
+        report = PipelinedBatchDownloader(jensen).run(
+            items, finalize_callback=lambda item, status, stats: statuses.__setitem__(item.filename, status)
+        )
+
+        assert statuses[items[1].filename] == "cancelled"
+        assert report["files_ok"] == 3 and not (tmp_path / items[1].filename).exists()
+
+
+class TestFileOperationsManagerPipelined:
+    """Test the pipelined mode of queue_batch_download."""
+
+    def test_pipelined_batch_completes_operations(self, device, tmp_path):
+        """Every file ends as a completed operation and the report reaches the callback."""
+        jensen, emulator = device
+        reports = []
+        done = threading.Event()
+        manager = FileOperationsManager(
+            SimpleNamespace(device_interface=SimpleNamespace(jensen_device=jensen)),
+            str(tmp_path / "downloads"),
+            cache_dir=str(tmp_path / "cache"),
+            device_lock=jensen.command_scheduler,
+        )
+        try:
+            names = [recording.name for recording in emulator.recordings] + ["missing.hda"]
+            operation_ids = manager.queue_batch_download(
+                names, pipelined=True, report_callback=lambda report: (reports.append(report), done.set())
+            )
+            assert done.wait(20)
+
+            history = {operation.operation_id: operation for operation in manager.operation_history}
+            assert [history[operation_id].status for operation_id in operation_ids] == [
+                FileOperationStatus.COMPLETED
+            ] * 4 + [FileOperationStatus.FAILED]
+            assert reports[0]["files_ok"] == 4
+            assert manager.get_statistics()["last_batch"]["link_utilization"] > 0
+            assert manager.active_operations == {}
+        finally:
+            manager.shutdown()
+            manager.metadata_cache.close()
+
+    def test_cancel_during_transfer_leaves_no_partial_file(self, device, tmp_path):
+        """A file cancelled mid-transfer is removed with its checkpoint once the transfer has stopped."""
+        jensen, emulator = device
+        done = threading.Event()
+        manager = FileOperationsManager(
+            SimpleNamespace(device_interface=SimpleNamespace(jensen_device=jensen)),
+            str(tmp_path / "downloads"),
+            cache_dir=str(tmp_path / "cache"),
+            device_lock=jensen.command_scheduler,
+        )
+        cancelled = emulator.recordings[1].name
+
+        def on_progress(operation):
+            if operation.filename == cancelled and operation.status == FileOperationStatus.IN_PROGRESS:
+                manager.cancel_operation(operation.operation_id)
+
+        try:
+            names = [recording.name for recording in emulator.recordings]
+            manager.queue_batch_download(names, on_progress, pipelined=True, report_callback=lambda _: done.set())
+            assert done.wait(20)
+
+            partial = tmp_path / "downloads" / cancelled
+            assert manager.get_statistics()["last_batch"]["statuses"][cancelled] == "cancelled"
+            assert not partial.exists() and not has_checkpoint(partial)
+            assert (tmp_path / "downloads" / names[2]).exists()
+        finally:
+            manager.shutdown()
+            manager.metadata_cache.close()
@@ -0,0 +1,39 @@
+"""
+Smoke tests for the hot path benchmark suite in scripts/benchmark_suite.py.
+
+Timing is not asserted here; these tests keep every case runnable and check
+the baseline comparison.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+import benchmark_suite  # noqa: E402
+
+
+@pytest.mark.parametrize("name", sorted(benchmark_suite.CASES))
+def test_case_processes_whole_dataset(name):
+    """Each case runs at a small tier and processes every synthetic recording."""
+    seconds = benchmark_suite.measure(benchmark_suite.CASES[name], 20, repeat=1, min_time_s=0)
+    assert seconds > 0
+
+
+def test_compare_flags_only_regressions_beyond_threshold():
+    """Cases slower than baseline * (1 + threshold) are reported; per-case thresholds win."""
+    baseline = {
+        "threshold": 0.5,
+        "cases": {
+            "fast[100]": {"seconds": 1.0},
+            "slow[100]": {"seconds": 1.0},
+            "noisy[100]": {"seconds": 1.0, "threshold": 2.0},
+        },
+    }
+    results = {"fast[100]": 1.4, "slow[100]": 1.6, "noisy[100]": 2.5, "new[100]": 9.0}
+
+    regressions = benchmark_suite.compare(results, baseline, default_threshold=0.1)
+
+    assert [key for key, *_ in regressions] == ["slow[100]"]
@@ -387,6 +387,34 @@ class TestLogger:
         assert calls[2][0][:4] == ("error", "TestModule", "test_method", "Error message")
         assert calls[3][0][:4] == ("warning", "TestModule", "test_method", "Warning message")
 
+    def test_logger_lazy_message_formatting(self):
+        """Test that %-style args and callables are only formatted when the message is written"""
+        logger = Logger({"console_log_level": "INFO", "suppress_console_output": False})
+        build_message = Mock(return_value="built")
+
+        with patch("builtins.print") as mock_print:
+            logger.debug("TestModule", "test_proc", build_message)
+            logger.debug("TestModule", "test_proc", "Value %s", Mock(__str__=Mock(side_effect=AssertionError)))
+            logger.info("TestModule", "test_proc", "Read %d bytes from %s", 512, "ep_in")
+            logger.info("TestModule", "test_proc", build_message)
+
+        build_message.assert_called_once_with()
+        assert mock_print.call_count == 2
+        assert "Read 512 bytes from ep_in" in mock_print.call_args_list[0][0][0]
+        assert "built" in mock_print.call_args_list[1][0][0]
+
+    def test_logger_is_enabled_for(self):
+        """Test that is_enabled_for reflects every output's threshold"""
+        logger = Logger({"console_log_level": "WARNING", "gui_log_level": "DEBUG", "suppress_console_output": False})
+
+        assert logger.is_enabled_for("WARNING")
+        assert logger.is_enabled_for(Logger.LEVELS["ERROR"])
+        assert not logger.is_enabled_for("DEBUG")  # No GUI callback registered yet
+        assert not logger.is_enabled_for("INVALID")
+
+        logger.set_gui_log_callback(Mock())
+        assert logger.is_enabled_for("debug")
+
     def test_logger_levels_constant(self):
         """Test that LEVELS constant is correct"""
         expected_levels = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
@@ -415,6 +415,23 @@ class TestRecordingOperations:
             mock_file.assert_called_once_with("/tmp/output.wav", "wb")
             self.mock_jensen.stream_file.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_download_recording_reuses_downloader_until_disconnect(self):
+        """Downloads of one connection share a downloader, so ranged read support is probed once."""
+        self.mock_jensen.is_connected.return_value = True
+        with patch("desktop_device_adapter.ResumableDownloader") as downloader_class:
+            downloader_class.return_value.download.return_value = "OK"
+            downloader_class.return_value.last_stats = {"bytes_transferred": 1, "mb_per_s": 1.0, "mode": "stream"}
+            downloader_class.return_value.last_stats.update(resumed_from=0, bytes_on_disk=1)
+
+            await self.adapter.download_recording("a.hda", "/tmp/a.hda", file_size=1)
+            stats = await self.adapter.download_recording("b.hda", "/tmp/b.hda", file_size=1)
+            assert downloader_class.call_count == 1 and stats["mode"] == "stream"
+
+            await self.adapter.disconnect()
+            await self.adapter.download_recording("a.hda", "/tmp/a.hda", file_size=1)
+            assert downloader_class.call_count == 2
+
     @pytest.mark.asyncio
     async def test_delete_recording_success(self):
         """Test successful recording deletion."""
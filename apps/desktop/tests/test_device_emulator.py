@@ -0,0 +1,145 @@
+"""
+Tests for the in-process Jensen device emulator, driven through HiDockJensen.
+"""
+
+import time
+
+import pytest
+import usb.core
+
+from constants import CMD_GET_DEVICE_INFO
+from device_emulator import (
+    EmulatedRecording,
+    EmulatedUSBBackend,
+    JensenDeviceEmulator,
+    LinkProfile,
+    backend_from_environment,
+    generate_catalog,
+)
+from hidock_device import HiDockJensen
+from resumable_download import ResumableDownloader
+
+
+def _connect(emulator):
+    jensen = HiDockJensen(EmulatedUSBBackend([emulator]))
+    success, error = jensen.connect(auto_retry=False)
+    assert success, error
+    return jensen
+
+
+@pytest.fixture
+def emulator():
+    return JensenDeviceEmulator(generate_catalog(50), LinkProfile(latency_s=0.0))
+
+
+class TestJensenDeviceEmulator:
+    """End-to-end protocol behaviour through the PyUSB backend."""
+
+    def test_connect_reports_device_info(self, emulator):
+        """HiDockJensen connects through the backend and reads serial and firmware."""
+        jensen = _connect(emulator)
+        try:
+            info = jensen.get_device_info()
+            assert info["sn"] == emulator.serial
+            assert info["versionCode"] == "6.2.4"
+        finally:
+            jensen.disconnect()
+
+    def test_large_catalog_is_listed_completely(self):
+        """A 10k recording catalog arrives in many chunks and parses completely."""
+        catalog = generate_catalog(10000)
+        emulator = JensenDeviceEmulator(catalog, LinkProfile(latency_s=0.0, file_list_chunk_size=1024))
+        jensen = _connect(emulator)
+        try:
+            result = jensen.list_files(timeout_s=30)
+        finally:
+            jensen.disconnect()
+
+        assert result["totalFiles"] == 10000
+        assert [f["name"] for f in result["files"]] == [rec.name for rec in catalog]
+        assert result["files"][-1]["length"] == catalog[-1].length
+
+    def test_stream_file_and_file_block_return_content(self, emulator):
+        """Streamed downloads and ranged reads return the recording's bytes."""
+        recording = emulator.recordings[3]
+        jensen = _connect(emulator)
+        try:
+            received = bytearray()
+            status = jensen.stream_file(recording.name, recording.length, received.extend)
+            block = jensen.get_file_block(recording.name, 1000, 512)
+        finally:
+            jensen.disconnect()
+
+        assert status == "OK"
+        assert bytes(received) == recording.read(0, recording.length)
+        assert block == recording.read(1000, 512)
+
+    def test_card_info_and_live_recording(self, emulator):
+        """Card usage and the in-progress recording are reported."""
+        live = emulator.start_recording("2026Oct17-090000-Rec01.hda", bytes_per_s=32000)
+        jensen = _connect(emulator)
+        try:
+            card = jensen.get_card_info()
+            recording = jensen.get_recording_file()
+        finally:
+            jensen.disconnect()
+
+        assert card["capacity"] == emulator.card_capacity_mb
+        assert recording["name"] == live.name
+        assert live.current_length() > 0
+        assert emulator.stop_recording() is live
+        assert live.recording_since is None
+
+    def test_bandwidth_limit_paces_reads(self):
+        """Reads are paced to the configured link bandwidth."""
+        recording = EmulatedRecording("2024Jan01-080000-Rec00.hda", 200_000)
+        emulator = JensenDeviceEmulator([recording], LinkProfile(latency_s=0.0, bandwidth_bytes_per_s=1_000_000))
+        jensen = _connect(emulator)
+        try:
+            started = time.perf_counter()
+            status = jensen.stream_file(recording.name, recording.length, lambda chunk: None)
+            elapsed = time.perf_counter() - started
+        finally:
+            jensen.disconnect()
+
+        assert status == "OK"
+        assert elapsed >= 0.18
+
+    def test_dropped_response_times_out(self):
+        """A dropped response surfaces as a read timeout and is counted."""
+        emulator = JensenDeviceEmulator([], LinkProfile(latency_s=0.0, drop_probability=1.0))
+        emulator.write(b"\x12\x34" + CMD_GET_DEVICE_INFO.to_bytes(2, "big") + (1).to_bytes(4, "big") + bytes(4))
+
+        with pytest.raises(usb.core.USBTimeoutError):
+            emulator.read(512, timeout_ms=20)
+        stats = emulator.get_stats()
+        assert stats["dropped_packets"] == 1
+        assert stats["read_timeouts"] == 1
+
+    def test_detached_device_raises_no_device(self, emulator):
+        """Unplugging the emulator makes I/O fail with ENODEV."""
+        backend = EmulatedUSBBackend([emulator])
+        backend.detach(emulator)
+
+        assert backend.enumerate_devices() == []
+        with pytest.raises(usb.core.USBError) as excinfo:
+            emulator.write(b"\x00")
+        assert excinfo.value.errno == 19
+
+    def test_environment_device_downloads_verify(self, tmp_path, monkeypatch):
+        """The device enabled by HIDOCK_EMULATOR lists signatures its downloads match."""
+        monkeypatch.setenv("HIDOCK_EMULATOR", "3")
+        monkeypatch.setenv("HIDOCK_EMULATOR_LATENCY_MS", "0")
+        jensen = HiDockJensen(backend_from_environment())
+        success, error = jensen.connect(auto_retry=False)
+        assert success, error
+        try:
+            entry = jensen.list_files()["files"][1]
+            downloader = ResumableDownloader(jensen)
+            status = downloader.download(
+                entry["name"], entry["length"], str(tmp_path / entry["name"]), signature=entry["signature"]
+            )
+        finally:
+            jensen.disconnect()
+
+        assert status == "OK" and downloader.last_stats["signature_verified"] is True
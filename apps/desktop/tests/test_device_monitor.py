@@ -0,0 +1,84 @@
+"""
+Tests for hotplug-driven device tracking and its use when connecting.
+"""
+
+import asyncio
+import threading
+
+from desktop_device_adapter import DesktopDeviceAdapter
+from device_emulator import EmulatedUSBBackend, JensenDeviceEmulator, LinkProfile, generate_catalog
+from device_monitor import EVENT_ARRIVED, EVENT_LEFT, MODE_HOTPLUG, MODE_POLLING, DeviceMonitor, LibusbHotplug
+
+
+def _emulator(serial="EMU0000000001"):
+    return JensenDeviceEmulator(generate_catalog(3), LinkProfile(latency_s=0.0), serial=serial)
+
+
+class TestDeviceMonitor:
+    """Registry updates from hotplug events and from polling."""
+
+    def test_hotplug_events_update_registry_without_bus_scans(self):
+        """Arrivals and removals are reported as they happen; nothing enumerates the bus."""
+        first, second = _emulator(), _emulator("EMU0000000002")
+        backend = EmulatedUSBBackend([first])
+        monitor = DeviceMonitor(backend)
+        events = []
+        try:
+            assert monitor.start() == MODE_HOTPLUG
+            monitor.add_listener(lambda event, device: events.append((event, device.address)))
+            backend.attach(second)
+            assert len(monitor.devices()) == 2
+            backend.detach(first)
+        finally:
+            monitor.stop()
+
+        assert events == [(EVENT_ARRIVED, 2), (EVENT_LEFT, 1)]
+        assert [device.address for device in monitor.devices()] == [2]
+        assert backend.enumerations == 0
+        assert monitor.get_stats()["scans"] == 0
+
+    def test_polling_fallback_sees_new_devices(self):
+        """Without hotplug support the bus is polled and diffed."""
+        backend = EmulatedUSBBackend([])
+        backend.register_hotplug_callback = None  # Backend without hotplug support
+        monitor = DeviceMonitor(backend, poll_interval_s=0.02)
+        arrived = threading.Event()
+        monitor.add_listener(lambda event, device: arrived.set())
+        try:
+            assert monitor.start() == MODE_POLLING
+            assert monitor.devices() == []
+            backend.attach(_emulator())
+            assert arrived.wait(2.0)
+            assert monitor.wait_for_device(1.0) is not None
+        finally:
+            monitor.stop()
+        assert monitor.get_stats()["scans"] >= 2
+
+    def test_libusb_hotplug_requires_libusb_backend(self):
+        """Non-libusb backends are not mistaken for hotplug-capable libusb."""
+        assert LibusbHotplug.is_supported(EmulatedUSBBackend([])) is False
+        assert LibusbHotplug.is_supported(None) is False
+
+
+class TestAutoconnectWithMonitor:
+    """Discovery and connect use the registry instead of the bus."""
+
+    def test_discover_and_connect_make_no_bus_scans(self):
+        """After the monitor starts, discovery and connect do not enumerate again."""
+        emulator = _emulator()
+        backend = EmulatedUSBBackend([emulator])
+        adapter = DesktopDeviceAdapter(backend)
+        adapter.start_device_monitor()
+        try:
+            devices = asyncio.run(adapter.discover_devices())
+            info = asyncio.run(adapter.connect(device_id=devices[0].id, auto_retry=False))
+
+            assert devices[0].id.endswith("@1-1")
+            assert info.serial_number == emulator.serial
+            assert backend.enumerations == 0
+            assert adapter.jensen_device.get_connection_stats()["operation_stats"]["bus_scans"] == 0
+            assert adapter.jensen_device.get_connection_stats()["operation_stats"]["last_connect_ms"] > 0
+            assert adapter.last_connect_latency_ms is not None
+        finally:
+            asyncio.run(adapter.disconnect())
+            adapter.stop_device_monitor()
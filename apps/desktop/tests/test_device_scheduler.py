@@ -0,0 +1,179 @@
+"""
+Tests for the priority-based device command scheduler.
+"""
+
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from device_scheduler import CommandPriority, DeviceCommandScheduler, command_priority, current_priority
+from file_operations_manager import FileOperation, FileOperationsManager, FileOperationStatus, FileOperationType
+
+
+def _start_waiter(scheduler, priority, order, started):
+    """Start a thread that records its priority in ``order`` once it gets the device."""
+
+    def run():
+        started.release()
+        with scheduler.slot(priority):
+            order.append(priority)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    started.acquire()
+    return thread
+
+
+def _wait_for_queue(scheduler, depth, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while scheduler.queue_depth < depth and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert scheduler.queue_depth == depth
+
+
+class TestDeviceCommandScheduler:
+    """Test lock semantics, priority ordering and metrics."""
+
+    def test_reentrant_acquire_and_release(self):
+        """The owner can nest acquisitions; the device is free after the last release."""
+        scheduler = DeviceCommandScheduler()
+
+        with scheduler:
+            with scheduler:
+                assert scheduler.is_owned()
+            assert scheduler.get_stats()["busy"] is True
+
+        assert scheduler.get_stats()["busy"] is False
+        with pytest.raises(RuntimeError):
+            scheduler.release()
+
+    def test_command_priority_is_thread_local_and_restored(self):
+        """command_priority() sets the class for the block only."""
+        assert current_priority() == CommandPriority.USER_QUERY
+        with command_priority(CommandPriority.POLLING):
+            assert current_priority() == CommandPriority.POLLING
+        assert current_priority() == CommandPriority.USER_QUERY
+
+    def test_waiters_are_served_by_priority(self):
+        """More urgent waiters run first regardless of arrival order."""
+        scheduler = DeviceCommandScheduler(aging_s=60)
+        order = []
+        started = threading.Semaphore(0)
+
+        scheduler.acquire()
+        threads = [
+            _start_waiter(scheduler, priority, order, started)
+            for priority in (CommandPriority.POLLING, CommandPriority.BATCH_DOWNLOAD, CommandPriority.PLAYBACK)
+        ]
+        _wait_for_queue(scheduler, 3)
+        scheduler.release()
+        for thread in threads:
+            thread.join(2)
+
+        assert order == [CommandPriority.PLAYBACK, CommandPriority.BATCH_DOWNLOAD, CommandPriority.POLLING]
+
+    def test_aged_waiter_is_not_starved(self):
+        """A long-waiting low priority request moves ahead of newer urgent ones."""
+        scheduler = DeviceCommandScheduler(aging_s=0.05)
+        order = []
+        started = threading.Semaphore(0)
+
+        scheduler.acquire()
+        polling = _start_waiter(scheduler, CommandPriority.POLLING, order, started)
+        _wait_for_queue(scheduler, 1)
+        time.sleep(0.2)  # Ages past every class
+        query = _start_waiter(scheduler, CommandPriority.USER_QUERY, order, started)
+        _wait_for_queue(scheduler, 2)
+        scheduler.release()
+        polling.join(2)
+        query.join(2)
+
+        assert order == [CommandPriority.POLLING, CommandPriority.USER_QUERY]
+
+    def test_slot_timeout_is_counted(self):
+        """slot() raises TimeoutError and the timeout shows up in the class stats."""
+        scheduler = DeviceCommandScheduler()
+        holder_ready = threading.Event()
+        done = threading.Event()
+
+        def hold():
+            with scheduler:
+                holder_ready.set()
+                done.wait(2)
+
+        holder = threading.Thread(target=hold, daemon=True)
+        holder.start()
+        holder_ready.wait(2)
+        with pytest.raises(TimeoutError):
+            with scheduler.slot(CommandPriority.POLLING, timeout=0.05):
+                pass
+        done.set()
+        holder.join(2)
+
+        stats = scheduler.get_stats()
+        assert stats["classes"]["polling"]["timeouts"] == 1
+        assert stats["classes"]["user_query"]["granted"] == 1
+        assert stats["queue_depth"] == 0
+
+    def test_yield_point_hands_device_to_urgent_waiter(self):
+        """A batch owner yields to playback between blocks and keeps its nesting depth."""
+        scheduler = DeviceCommandScheduler(aging_s=60)
+        order = []
+        started = threading.Semaphore(0)
+
+        with scheduler.slot(CommandPriority.BATCH_DOWNLOAD):
+            with scheduler:
+                assert scheduler.yield_point() is False  # Nobody waiting
+                playback = _start_waiter(scheduler, CommandPriority.PLAYBACK, order, started)
+                _wait_for_queue(scheduler, 1)
+
+                assert scheduler.yield_point() is True
+                assert order == [CommandPriority.PLAYBACK]
+                assert scheduler.is_owned()
+            assert scheduler.is_owned()
+        playback.join(2)
+
+        stats = scheduler.get_stats()
+        assert stats["yields"] == 1
+        assert stats["busy"] is False
+        assert stats["max_queue_depth"] == 2  # The yielding owner queues behind playback
+
+    def test_owner_does_not_yield_to_less_urgent_waiter(self):
+        """Polling waiters do not interrupt a user query."""
+        scheduler = DeviceCommandScheduler(aging_s=60)
+        order = []
+        started = threading.Semaphore(0)
+
+        with scheduler.slot(CommandPriority.USER_QUERY):
+            polling = _start_waiter(scheduler, CommandPriority.POLLING, order, started)
+            _wait_for_queue(scheduler, 1)
+            assert scheduler.should_yield() is False
+            assert scheduler.yield_point() is False
+        polling.join(2)
+
+        assert order == [CommandPriority.POLLING]
+
+
+class TestOperationPriority:
+    """Test how FileOperationsManager maps operations to priority classes."""
+
+    @pytest.fixture
+    def manager(self, tmp_path):
+        manager = FileOperationsManager(Mock(), str(tmp_path / "downloads"), cache_dir=str(tmp_path / "cache"))
+        yield manager
+        manager.shutdown()
+
+    def test_download_priority_comes_from_metadata(self, manager):
+        """Downloads default to BATCH_DOWNLOAD unless queued for playback."""
+        pending = FileOperationStatus.PENDING
+        batch = FileOperation("op1", FileOperationType.DOWNLOAD, "a.hda", pending)
+        playback = FileOperation(
+            "op2", FileOperationType.DOWNLOAD, "b.hda", pending, metadata={"priority": CommandPriority.PLAYBACK}
+        )
+        delete = FileOperation("op3", FileOperationType.DELETE, "c.hda", pending)
+
+        assert manager._operation_priority(batch) == CommandPriority.BATCH_DOWNLOAD
+        assert manager._operation_priority(playback) == CommandPriority.PLAYBACK
+        assert manager._operation_priority(delete) == CommandPriority.USER_QUERY
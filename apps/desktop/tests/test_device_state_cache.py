@@ -0,0 +1,120 @@
+"""
+Tests for the device state cache and its use by HiDockJensen.
+"""
+
+import pytest
+
+from constants import CMD_GET_CARD_INFO, CMD_GET_DEVICE_INFO, CMD_GET_FILE_COUNT, CMD_GET_RECORDING_FILE
+from device_emulator import EmulatedUSBBackend, JensenDeviceEmulator, LinkProfile, generate_catalog
+from device_state_cache import (
+    CARD_INFO,
+    EVENT_DELETE,
+    EVENT_RECORDING_CHANGED,
+    FILE_COUNT,
+    RECORDING_FILE,
+    SETTINGS,
+    DeviceStateCache,
+)
+from hidock_device import HiDockJensen
+
+
+class TestDeviceStateCache:
+    """Test lookup, invalidation and listeners."""
+
+    def test_lookup_returns_copies_and_caches_none(self):
+        """Stored values are copied; a stored None counts as a hit."""
+        cache = DeviceStateCache()
+        card = {"used": 10, "capacity": 100, "status_raw": 0}
+        cache.store(CARD_INFO, card)
+        cache.store(RECORDING_FILE, None)
+
+        hit, value = cache.lookup(CARD_INFO)
+        value["used"] = 99
+        assert hit and cache.lookup(CARD_INFO)[1]["used"] == 10
+        assert cache.lookup(RECORDING_FILE) == (True, None)
+        assert cache.lookup(SETTINGS) == (False, None)
+
+    def test_event_invalidates_only_affected_keys_and_notifies(self):
+        """delete drops card info and file count but keeps settings."""
+        cache = DeviceStateCache()
+        for key in (CARD_INFO, FILE_COUNT, SETTINGS):
+            cache.store(key, {"k": key})
+        events = []
+        cache.add_listener(lambda event, keys: events.append((event, keys)))
+        cache.add_listener(lambda event, keys: 1 / 0)  # A failing listener does not stop others
+
+        cache.publish(EVENT_DELETE)
+
+        assert cache.get_stats()["cached"] == [SETTINGS]
+        assert events[0][0] == EVENT_DELETE and CARD_INFO in events[0][1]
+
+    def test_recording_change_is_published_only_when_name_changes(self):
+        """The first answer and repeated answers do not count as changes."""
+        cache = DeviceStateCache()
+        events = []
+        cache.add_listener(lambda event, keys: events.append(event))
+
+        assert cache.update_recording_file({"name": "a.hda"}) is False
+        assert cache.update_recording_file({"name": "a.hda"}) is False
+        assert cache.update_recording_file(None) is True
+        assert events == [EVENT_RECORDING_CHANGED]
+
+
+class TestJensenStateCache:
+    """Test that HiDockJensen answers queries from the cache until an event invalidates them."""
+
+    @pytest.fixture
+    def device(self):
+        emulator = JensenDeviceEmulator(generate_catalog(5), LinkProfile(latency_s=0.0))
+        jensen = HiDockJensen(EmulatedUSBBackend([emulator]))
+        success, error = jensen.connect(auto_retry=False)
+        assert success, error
+        yield jensen, emulator
+        jensen.disconnect()
+
+    def test_repeated_queries_use_one_command(self, device):
+        """Device info, card info and file count are fetched once while nothing changes."""
+        jensen, emulator = device
+        for _ in range(3):
+            assert jensen.get_device_info()["sn"] == emulator.serial
+            assert jensen.get_card_info()["capacity"] == emulator.card_capacity_mb
+            assert jensen.get_file_count() == {"count": 5}
+
+        assert emulator.commands[CMD_GET_DEVICE_INFO] == 1
+        assert emulator.commands[CMD_GET_CARD_INFO] == 1
+        assert emulator.commands[CMD_GET_FILE_COUNT] == 1
+        assert jensen.get_connection_stats()["state_cache"]["hits"] >= 6
+
+    def test_delete_invalidates_card_state(self, device):
+        """A successful delete makes the next count and card queries ask the device."""
+        jensen, emulator = device
+        jensen.get_file_count()
+        jensen.get_card_info()
+
+        assert jensen.delete_file(emulator.recordings[0].name)["result"] == "success"
+        assert jensen.get_file_count() == {"count": 4}
+        jensen.get_card_info()
+
+        assert emulator.commands[CMD_GET_FILE_COUNT] == 2
+        assert emulator.commands[CMD_GET_CARD_INFO] == 2
+
+    def test_polled_recording_change_invalidates_card_state(self, device):
+        """A new recording reported to a fresh poll refreshes the file count."""
+        jensen, emulator = device
+        jensen.get_recording_file(use_cache=False)
+        assert jensen.get_file_count() == {"count": 5}
+
+        emulator.start_recording("2026Oct17-090000-Rec01.hda")
+        recording = jensen.get_recording_file(use_cache=False)
+
+        assert recording["name"] == "2026Oct17-090000-Rec01.hda"
+        assert jensen.get_file_count() == {"count": 6}
+        assert emulator.commands[CMD_GET_RECORDING_FILE] == 2
+
+    def test_disconnect_clears_cache(self, device):
+        """Nothing cached survives a disconnect."""
+        jensen, emulator = device
+        jensen.get_card_info()
+        jensen.disconnect()
+
+        assert jensen.state_cache.get_stats()["cached"] == []
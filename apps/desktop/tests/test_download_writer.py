@@ -0,0 +1,122 @@
+"""
+Tests for the double-buffered download writer.
+"""
+
+import os
+import threading
+import zlib
+
+import pytest
+
+from download_writer import DoubleBufferedFileWriter
+
+
+class TestDoubleBufferedFileWriter:
+    """Test staging, flushing and error propagation of DoubleBufferedFileWriter."""
+
+    def test_writes_all_chunks_in_order(self, tmp_path):
+        """Chunks spanning several buffers are written intact and in order."""
+        path = tmp_path / "out.bin"
+        payload = bytes(range(256)) * 50
+
+        with DoubleBufferedFileWriter(str(path), len(payload), buffer_size=1000) as writer:
+            for i in range(0, len(payload), 333):
+                writer.write(memoryview(payload)[i : i + 333])
+
+        assert path.read_bytes() == payload
+        assert writer.bytes_received == len(payload)
+        stats = writer.get_stats()
+        assert stats["bytes_written"] == len(payload)
+        assert stats["mb_per_s"] >= 0.0
+
+    def test_chunk_is_copied_before_write_returns(self, tmp_path):
+        """Callers may reuse or release the chunk buffer after write()."""
+        path = tmp_path / "out.bin"
+        chunk = bytearray(b"abcd")
+
+        with DoubleBufferedFileWriter(str(path), buffer_size=3) as writer:
+            view = memoryview(chunk)
+            writer.write(view)
+            view.release()
+            chunk[:] = b"zzzz"
+
+        assert path.read_bytes() == b"abcd"
+
+    def test_preallocation_is_truncated_on_short_transfer(self, tmp_path):
+        """A transfer that ends early must not leave a full-size file behind."""
+        path = tmp_path / "out.bin"
+
+        writer = DoubleBufferedFileWriter(str(path), 10000, buffer_size=64, preallocate=True)
+        writer.write(b"x" * 100)
+        writer.close()
+
+        assert os.path.getsize(path) == 100
+
+    def test_start_offset_appends_and_tracks_committed_crc(self, tmp_path):
+        """Resuming keeps the existing prefix and committed() covers the whole file."""
+        path = tmp_path / "out.bin"
+        path.write_bytes(b"hello" + b"garbage")
+
+        writer = DoubleBufferedFileWriter(str(path), buffer_size=4, start_offset=5, start_crc=zlib.crc32(b"hello"))
+        writer.write(b" world")
+        writer.close()
+
+        assert path.read_bytes() == b"hello world"
+        assert writer.committed() == (11, zlib.crc32(b"hello world"))
+
+    def test_abort_discards_staged_data(self, tmp_path):
+        """abort() stops the writer without flushing the partially filled buffer."""
+        path = tmp_path / "out.bin"
+
+        writer = DoubleBufferedFileWriter(str(path), buffer_size=1024)
+        writer.write(b"partial")
+        writer.abort()
+
+        assert path.read_bytes() == b""
+        with pytest.raises(ValueError):
+            writer.write(b"more")
+
+    def test_disk_error_is_raised_to_reader(self):
+        """A failed disk write surfaces as OSError on the reader's next write or close."""
+
+        class FailingFile:
+            def write(self, data):
+                raise OSError("disk full")
+
+            def close(self):
+                pass
+
+        writer = DoubleBufferedFileWriter("ignored", buffer_size=4, opener=lambda *_: FailingFile())
+        with pytest.raises(OSError, match="disk full"):
+            for _ in range(10):
+                writer.write(b"1234")
+        with pytest.raises(OSError):
+            writer.close()
+
+    def test_slow_disk_applies_back_pressure(self):
+        """With all buffers in flight the reader blocks until the writer frees one."""
+        release = threading.Event()
+        written = []
+
+        class SlowFile:
+            def write(self, data):
+                release.wait(5)
+                written.append(bytes(data))
+
+            def close(self):
+                pass
+
+        writer = DoubleBufferedFileWriter("ignored", buffer_size=2, buffer_count=2, opener=lambda *_: SlowFile())
+        writer.write(b"ab")  # Handed to the writer, which blocks on the slow disk
+
+        reader = threading.Thread(target=writer.write, args=(b"cdef",))
+        reader.start()
+        reader.join(0.2)
+        assert reader.is_alive()
+
+        release.set()
+        reader.join(5)
+        writer.close()
+
+        assert b"".join(written) == b"abcdef"
+        assert writer.get_stats()["reader_wait_s"] > 0
@@ -0,0 +1,283 @@
+"""
+Tests for persistent file list snapshots, snapshot-validated listing and deltas.
+"""
+
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+import pytest
+
+from file_list_snapshot import FileListSnapshotStore, compute_file_list_delta, index_entries
+from hidock_device import HiDockJensen
+
+
+def _entry(name, length, time_obj=None):
+    return {
+        "name": name,
+        "createDate": "2025/05/01",
+        "createTime": "10:00:00",
+        "time": time_obj,
+        "duration": 1.5,
+        "version": 1,
+        "length": length,
+        "signature": "00" * 16,
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    return FileListSnapshotStore(str(tmp_path / "file_lists"))
+
+
+class TestFileListSnapshotStore:
+    """Test saving, loading and invalidating snapshots."""
+
+    def test_round_trip_restores_entries(self, store):
+        """Saved entries come back unchanged, including datetime fields."""
+        files = [_entry("a.hda", 100, datetime(2025, 5, 1, 10, 0, 0)), _entry("b.hda", 200)]
+
+        store.save("SN/001", files, tail="abcd", card_used=12)
+        snapshot = store.load("SN/001")
+
+        assert snapshot.files == files
+        assert snapshot.count == 2
+        assert snapshot.last_name == "b.hda"
+        assert snapshot.last_length == 200
+        assert snapshot.tail == "abcd"
+        assert snapshot.card_used == 12
+
+    def test_missing_or_corrupt_snapshot_is_ignored(self, store, tmp_path):
+        """An unknown serial or unreadable file yields no snapshot."""
+        assert store.load("SN001") is None
+        store.save("SN001", [_entry("a.hda", 1)])
+        with open(store._path("SN001"), "w", encoding="utf-8") as f:
+            f.write("{not json")
+
+        assert store.load("SN001") is None
+
+    def test_invalidate_removes_snapshot(self, store):
+        """invalidate() forces the next listing to be a full transfer."""
+        store.save("SN001", [_entry("a.hda", 1)])
+        store.invalidate("SN001")
+        store.invalidate("SN001")  # Missing snapshot is not an error
+
+        assert store.load("SN001") is None
+
+
+class TestListFilesWithSnapshot:
+    """Test HiDockJensen.list_files_with_snapshot validation and fallback."""
+
+    @pytest.fixture
+    def jensen_device(self):
+        device = HiDockJensen(Mock())
+        device.device_info = {"sn": "SN001", "versionNumber": 12345}
+        return device
+
+    @pytest.fixture
+    def files(self):
+        return [_entry("a.hda", 100), _entry("b.hda", 200)]
+
+    def _full_listing(self, files):
+        return {"files": list(files), "totalFiles": len(files), "totalSize": sum(f["length"] for f in files)}
+
+    def test_full_listing_saves_snapshot(self, jensen_device, store, files):
+        """Without a snapshot the list is fetched and stored with its tail bytes."""
+        with patch.object(jensen_device, "list_files_with_retry", return_value=self._full_listing(files)), patch.object(
+            jensen_device, "get_file_block", return_value=b"\x01" * 16
+        ) as get_block, patch.object(jensen_device, "get_card_info", return_value={"used": 5}):
+            result = jensen_device.list_files_with_snapshot(store)
+
+        assert result["snapshot"] is False
+        get_block.assert_called_once_with("b.hda", 184, 16, timeout_s=5)
+        snapshot = store.load("SN001")
+        assert snapshot.count == 2
+        assert snapshot.tail == "01" * 16
+        assert snapshot.card_used == 5
+
+    def test_valid_snapshot_skips_file_list_transfer(self, jensen_device, store, files):
+        """Matching count, card usage and tail bytes return the stored list."""
+        store.save("SN001", files, tail="01" * 16, card_used=5)
+        callback = Mock()
+
+        with patch.object(jensen_device, "list_files_with_retry") as full_listing, patch.object(
+            jensen_device, "get_file_count", return_value={"count": 2}
+        ), patch.object(jensen_device, "get_card_info", return_value={"used": 5}), patch.object(
+            jensen_device, "get_file_block", return_value=b"\x01" * 16
+        ):
+            result = jensen_device.list_files_with_snapshot(store, entries_callback=callback)
+
+        full_listing.assert_not_called()
+        assert result["snapshot"] is True
+        assert result["files"] == files
+        assert result["totalSize"] == 300
+        callback.assert_called_once_with(files, 2, 2)
+
+    @pytest.mark.parametrize(
+        "count, used, tail",
+        [
+            ({"count": 3}, {"used": 5}, b"\x01" * 16),
+            ({"count": 2}, {"used": 6}, b"\x01" * 16),
+            ({"count": 2}, {"used": 5}, b"\x02" * 16),
+            ({"count": 2}, {"used": 5}, None),
+            (None, {"used": 5}, b"\x01" * 16),
+        ],
+    )
+    def test_stale_snapshot_falls_back_to_full_listing(self, jensen_device, store, files, count, used, tail):
+        """Any mismatch or failed validation query triggers a full listing."""
+        store.save("SN001", files, tail="01" * 16, card_used=5)
+        fresh = [_entry("c.hda", 300)]
+
+        with patch.object(
+            jensen_device, "list_files_with_retry", return_value=self._full_listing(fresh)
+        ) as full_listing, patch.object(jensen_device, "get_file_count", return_value=count), patch.object(
+            jensen_device, "get_card_info", return_value=used
+        ), patch.object(
+            jensen_device, "get_file_block", return_value=tail
+        ):
+            result = jensen_device.list_files_with_snapshot(store)
+
+        full_listing.assert_called_once()
+        assert result["snapshot"] is False
+        assert result["files"] == fresh
+
+    def test_incomplete_listing_is_not_saved(self, jensen_device, store, files):
+        """A partial transfer must never become the stored snapshot."""
+        partial = dict(self._full_listing(files), incomplete=True)
+
+        with patch.object(jensen_device, "list_files_with_retry", return_value=partial):
+            jensen_device.list_files_with_snapshot(store)
+
+        assert store.load("SN001") is None
+
+
+class TestFileListDelta:
+    """Test delta computation and delta-mode listing against a snapshot."""
+
+    def test_compute_delta_reports_added_removed_and_changed(self):
+        """Entries are matched by name and compared by length and signature."""
+        previous = [_entry("a.hda", 100), _entry("b.hda", 200), _entry("c.hda", 300)]
+        grown = dict(_entry("b.hda", 250))
+        current = [previous[0], grown, _entry("d.hda", 400)]
+
+        delta = compute_file_list_delta(previous, current)
+
+        assert [f["name"] for f in delta.added] == ["d.hda"]
+        assert [f["name"] for f in delta.removed] == ["c.hda"]
+        assert delta.changed == [grown]
+        assert delta.unchanged == 1
+        assert delta.updated_names == {"b.hda", "d.hda"}
+        assert not delta.is_empty
+        assert compute_file_list_delta(previous, previous).is_empty
+
+    def test_stale_snapshot_lists_in_delta_mode(self, store):
+        """A full listing after a stale snapshot passes the stored entries as known_entries."""
+        jensen_device = HiDockJensen(Mock())
+        jensen_device.device_info = {"sn": "SN001"}
+        old = [_entry("a.hda", 100)]
+        new = old + [_entry("b.hda", 200)]
+        store.save("SN001", old, tail="01" * 16)
+
+        with patch.object(
+            jensen_device, "list_files_with_retry", return_value={"files": new, "totalFiles": 2, "totalSize": 300}
+        ) as full_listing, patch.object(jensen_device, "get_file_count", return_value={"count": 2}), patch.object(
+            jensen_device, "get_card_info", return_value=None
+        ), patch.object(
+            jensen_device, "get_file_block", return_value=None
+        ):
+            result = jensen_device.list_files_with_snapshot(store)
+
+        assert full_listing.call_args.kwargs["known_entries"] == index_entries(old)
+        assert [f["name"] for f in result["delta"].added] == ["b.hda"]
+        assert result["delta"].unchanged == 1
+
+    def test_listing_without_snapshot_has_no_delta(self, store):
+        """Without a stored list every entry is new, reported as delta None."""
+        jensen_device = HiDockJensen(Mock())
+        jensen_device.device_info = {"sn": "SN001"}
+
+        with patch.object(
+            jensen_device, "list_files_with_retry", return_value={"files": [], "totalFiles": 0, "totalSize": 0}
+        ) as full_listing:
+            result = jensen_device.list_files_with_snapshot(store)
+
+        assert full_listing.call_args.kwargs["known_entries"] is None
+        assert result["delta"] is None
+
+
+class TestListFilesWithRetry:
+    """Test that retries of an incomplete list keep the entries already received."""
+
+    @pytest.fixture
+    def jensen_device(self):
+        device = HiDockJensen(Mock())
+        device.device_info = {"sn": "SN001", "versionNumber": 12345}
+        return device
+
+    @pytest.fixture
+    def files(self):
+        return [_entry("a.hda", 100), _entry("b.hda", 200), _entry("c.hda", 300)]
+
+    def _attempts(self, *listings):
+        """list_files stand-in streaming each listing to entries_callback in turn."""
+        calls = []
+
+        def list_files(timeout_s, entries_callback=None, known_entries=None):
+            calls.append(known_entries)
+            listing = listings[len(calls) - 1]
+            if entries_callback and listing["files"]:
+                entries_callback(listing["files"], len(listing["files"]), listing.get("expected"))
+            return listing
+
+        return list_files, calls
+
+    @staticmethod
+    def _partial(files, expected):
+        return {"files": files, "complete": False, "incomplete": True, "expected": expected}
+
+    def test_retry_reports_only_the_missing_tail(self, jensen_device, files):
+        """Entries of the first attempt are passed as known and not reported again."""
+        full = {"files": files, "totalFiles": 3, "totalSize": 600, "complete": True}
+        list_files, calls = self._attempts(self._partial(files[:1], 3), full)
+        reported = []
+
+        with patch.object(jensen_device, "list_files", side_effect=list_files), patch.object(
+            jensen_device, "get_file_count", return_value={"count": 3}
+        ), patch("hidock_device.time.sleep"):
+            result = jensen_device.list_files_with_retry(
+                entries_callback=lambda new, parsed, expected: reported.append(([f["name"] for f in new], parsed))
+            )
+
+        assert result["complete"] is True and result["retries_attempted"] == 2
+        assert calls == [None, index_entries(files[:1])]
+        assert reported == [(["a.hda"], 1), (["b.hda", "c.hda"], 3)]
+
+    def test_file_count_settles_list_without_retry(self, jensen_device, files):
+        """A list cut off after its last entry is complete once the file count agrees."""
+        list_files, calls = self._attempts({"files": files, "complete": False, "incomplete": True, "expected": None})
+
+        with patch.object(jensen_device, "list_files", side_effect=list_files), patch.object(
+            jensen_device, "get_file_count", return_value={"count": 3}
+        ) as get_file_count:
+            result = jensen_device.list_files_with_retry()
+
+        assert len(calls) == 1
+        get_file_count.assert_called_once_with(use_cache=False)
+        assert result["complete"] is True and "incomplete" not in result
+        assert result["totalSize"] == 600
+
+    def test_partial_attempts_are_merged(self, jensen_device, files):
+        """When every attempt falls short, the union of their entries is returned as incomplete."""
+        grown = _entry("a.hda", 150)
+        list_files, _ = self._attempts(
+            self._partial(files[:2], 4), self._partial([grown] + files[1:], 4), self._partial(files[:1], 4)
+        )
+
+        with patch.object(jensen_device, "list_files", side_effect=list_files), patch.object(
+            jensen_device, "get_file_count", return_value=None
+        ), patch("hidock_device.time.sleep"):
+            result = jensen_device.list_files_with_retry(max_retries=2)
+
+        assert result["complete"] is False and result["incomplete"] is True
+        assert [f["name"] for f in result["files"]] == ["a.hda", "b.hda", "c.hda"]
+        assert result["files"][0]["length"] == 100  # The last attempt's entry wins
+        assert result["expected"] == 4 and result["missing"] == 1
@@ -1890,6 +1890,65 @@ class TestFileValidation:
         result = mock_manager._validate_downloaded_file("test.wav", test_file)
         assert result is True
 
+    def test_validate_downloaded_file_against_device_signature(self, mock_manager):
+        """Test that the download digest is checked against the MD5 signature and persisted."""
+        test_file = mock_manager.download_dir / "test.wav"
+        test_content = b"test audio content"
+        test_file.write_bytes(test_content)
+        digest = hashlib.md5(test_content).hexdigest()
+
+        metadata = FileMetadata(
+            filename="test.wav",
+            size=len(test_content),
+            duration=30.0,
+            date_created=datetime.now(),
+            device_path="/device/test.wav",
+            checksum=digest,
+        )
+        mock_manager.metadata_cache.set_metadata(metadata)
+
+        assert mock_manager._validate_downloaded_file("test.wav", test_file, "ff" * 16) is True  # Only logged
+        with patch("file_integrity.STRICT_SIGNATURE_CHECK", True):
+            assert mock_manager._validate_downloaded_file("test.wav", test_file, "ff" * 16) is False
+        assert mock_manager._validate_downloaded_file("test.wav", test_file, digest) is True
+        mock_manager._record_download("test.wav", test_file, {"md5": "ff" * 16, "signature_verified": False})
+        assert mock_manager.metadata_cache.get_metadata("test.wav").verified_digest is None
+        mock_manager._record_download("test.wav", test_file, {"md5": digest, "signature_verified": True})
+        assert mock_manager.metadata_cache.get_metadata("test.wav").verified_digest == digest
+
+        # A changed device signature is detected from the stored digest, without re-hashing
+        metadata = mock_manager.metadata_cache.get_metadata("test.wav")
+        metadata.checksum = "ee" * 16
+        mock_manager.metadata_cache.set_metadata(metadata)
+        with patch.object(mock_manager, "_calculate_file_checksum") as checksum, patch(
+            "file_integrity.STRICT_SIGNATURE_CHECK", True
+        ):
+            assert mock_manager._validate_downloaded_file("test.wav", test_file) is False
+            checksum.assert_not_called()
+
+    def test_execute_download_uses_stats_of_its_own_transfer(self, mock_manager):
+        """Validation uses the stats download_recording returned, not whatever the adapter saw last."""
+        operation = FileOperation(
+            operation_id="own_stats",
+            operation_type=FileOperationType.DOWNLOAD,
+            filename="test.wav",
+            status=FileOperationStatus.PENDING,
+        )
+        stats = {"md5": "ab" * 16, "signature_verified": True}
+
+        async def mock_download_recording(recording_id, output_path, progress_callback, file_size=None):
+            output_path.write_text("mock audio data")
+            return stats
+
+        mock_manager.device_interface.device_interface.download_recording = mock_download_recording
+        with patch.object(mock_manager, "_validate_downloaded_file", return_value=True) as validate, patch.object(
+            mock_manager, "_record_download"
+        ) as record:
+            mock_manager._execute_download(operation)
+
+        assert validate.call_args[0][2] == stats["md5"]
+        assert record.call_args[0][2] is stats
+
     def test_validate_downloaded_file_empty_file(self, mock_manager):
         """Test validation with empty file."""
         test_file = mock_manager.download_dir / "test.wav"
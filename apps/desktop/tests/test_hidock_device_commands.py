@@ -610,6 +610,54 @@ class TestHiDockJensenSendReceiveOperations:
             with pytest.raises(usb.core.USBError):
                 jensen_device._send_and_receive(CMD_GET_DEVICE_INFO)
 
+    def test_receive_response_consumes_buffered_packets_in_order(self, jensen_device):
+        """Multiple buffered packets are parsed by advancing the read cursor."""
+        first = self._create_test_packet(CMD_TRANSFER_FILE, 1, b"first")
+        second = self._create_test_packet(CMD_TRANSFER_FILE, 2, b"second")
+        jensen_device.receive_buffer.extend(first + second)
+
+        response1 = jensen_device._receive_response(1, streaming_cmd_id=CMD_TRANSFER_FILE)
+        response2 = jensen_device._receive_response(1, streaming_cmd_id=CMD_TRANSFER_FILE)
+
+        assert response1["body"] == b"first"
+        assert response2["body"] == b"second"
+        assert jensen_device._rx_pos == len(first) + len(second)
+        jensen_device.device.read.assert_not_called()
+
+    def test_receive_response_zero_copy_returns_memoryview(self, jensen_device):
+        """zero_copy hands out a view into the receive buffer instead of a copy."""
+        jensen_device.receive_buffer.extend(self._create_test_packet(CMD_TRANSFER_FILE, 1, b"payload"))
+
+        response = jensen_device._receive_response(1, streaming_cmd_id=CMD_TRANSFER_FILE, zero_copy=True)
+
+        assert isinstance(response["body"], memoryview)
+        assert response["body"] == b"payload"
+
+    def test_receive_response_zero_copy_view_released_on_next_receive(self, jensen_device):
+        """Views from a zero-copy receive are released before the buffer is compacted."""
+        jensen_device.ep_in.wMaxPacketSize = 64
+        jensen_device.receive_buffer.extend(self._create_test_packet(CMD_TRANSFER_FILE, 1, b"one"))
+        first = jensen_device._receive_response(1, streaming_cmd_id=CMD_TRANSFER_FILE, zero_copy=True)["body"]
+
+        jensen_device.device.read.return_value = self._create_test_packet(CMD_TRANSFER_FILE, 2, b"two")
+        second = jensen_device._receive_response(1, streaming_cmd_id=CMD_TRANSFER_FILE, zero_copy=True)["body"]
+
+        assert second == b"two"
+        with pytest.raises(ValueError):
+            bytes(first)
+
+    def test_receive_response_packet_split_across_reads(self, jensen_device):
+        """A packet split over several USB reads is assembled after compaction."""
+        jensen_device.ep_in.wMaxPacketSize = 64
+        packet = self._create_test_packet(CMD_GET_DEVICE_INFO, 7, b"0123456789")
+        jensen_device.receive_buffer.extend(b"\xaa\xbb")  # Garbage before the packet
+        jensen_device.device.read.side_effect = [packet[:5], packet[5:]]
+
+        response = jensen_device._receive_response(7, timeout_ms=1000)
+
+        assert response["body"] == b"0123456789"
+        assert len(jensen_device.receive_buffer) - jensen_device._rx_pos == 0
+
     def _create_test_packet(self, command_id, sequence_id, body):
         """Helper method to create a test packet."""
         header = bytearray([0x12, 0x34])  # Sync bytes
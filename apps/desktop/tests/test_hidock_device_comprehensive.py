@@ -427,3 +427,34 @@ class TestHiDockJensenHealthCheck:
         assert jensen_device._last_health_check == 100.0
         assert jensen_device._error_counts["connection_lost"] == 1
         assert jensen_device._is_in_health_check is False
+
+    def test_successful_io_counts_as_heartbeat(self, jensen_device):
+        """A successful write refreshes liveness, so the next command sends no probe."""
+        jensen_device.ep_out = Mock()
+        jensen_device.ep_out.write.side_effect = lambda packet, timeout: len(packet)
+
+        with patch.object(jensen_device, "is_connected", return_value=True), patch.object(
+            jensen_device, "get_device_info"
+        ) as probe:
+            jensen_device._last_health_check = time.time()
+            jensen_device._send_command(CMD_GET_FILE_COUNT)
+            jensen_device._send_command(CMD_GET_FILE_COUNT)
+
+        probe.assert_not_called()
+        assert jensen_device.get_health_stats()["probes"] == 0
+
+    def test_probe_latency_is_reported_in_connection_stats(self, jensen_device):
+        """Idle probes are recorded separately from command statistics."""
+        jensen_device._last_health_check = 0
+
+        with patch.object(jensen_device, "is_connected", return_value=True), patch.object(
+            jensen_device, "get_device_info", return_value={"version": "1.0"}
+        ):
+            assert jensen_device._perform_health_check() is True
+
+        health = jensen_device.get_connection_stats()["health"]
+        assert health["probes"] == 1
+        assert health["probe_failures"] == 0
+        assert health["last_probe_ms"] is not None
+        assert health["max_probe_ms"] >= health["last_probe_ms"]
+        assert jensen_device._operation_stats["commands_sent"] == 0
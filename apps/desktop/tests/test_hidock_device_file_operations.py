@@ -6,6 +6,7 @@ targeting uncovered lines in file handling logic.
 """
 
 import struct
+import sys
 import threading
 import time
 from unittest.mock import MagicMock, Mock, call, patch
@@ -14,7 +15,7 @@ import pytest
 import usb.core
 
 from constants import CMD_DELETE_FILE, CMD_GET_FILE_BLOCK, CMD_GET_FILE_COUNT, CMD_GET_FILE_LIST, CMD_TRANSFER_FILE
-from hidock_device import HiDockJensen
+from hidock_device import FileListStreamParser, HiDockJensen
 
 
 class TestHiDockJensenFileListOperations:
@@ -200,6 +201,108 @@ class TestHiDockJensenFileListOperations:
         # Should return empty list due to parsing error
         assert result == []
 
+    @staticmethod
+    def _file_list_entry(filename, length, version=1):
+        entry = bytearray([version])
+        entry.extend(struct.pack(">I", len(filename))[1:])
+        entry.extend(filename.encode())
+        entry.extend(struct.pack(">I", length))
+        entry.extend(b"\x00" * 6)
+        entry.extend(bytes(range(16)))
+        return bytes(entry)
+
+    def test_file_list_stream_parser_carries_split_entries(self, jensen_device):
+        """Entries split across chunks are emitted once their remaining bytes arrive."""
+        data = b"\xff\xff" + struct.pack(">I", 3)
+        data += b"".join(self._file_list_entry(f"2025May01-10000{i}-Rec0{i}.hda", 1000 * (i + 1)) for i in range(3))
+        parser = FileListStreamParser(jensen_device._build_file_entry)
+
+        emitted = []
+        for pos in range(0, len(data), 7):
+            emitted.append(len(parser.feed(data[pos : pos + 7])))
+
+        assert parser.expected_count == 3
+        assert parser.parsed_count == 3
+        assert parser.is_complete
+        assert sum(emitted) == 3
+        # Entries appear as soon as they are complete, not all at the end
+        assert emitted.index(1) < len(emitted) - 1
+
+    def test_list_files_reports_entries_as_chunks_arrive(self, jensen_device):
+        """list_files calls entries_callback per chunk with the header's expected count."""
+        chunks = [
+            b"\xff\xff" + struct.pack(">I", 2) + self._file_list_entry("a.hda", 10)[:5],
+            self._file_list_entry("a.hda", 10)[5:] + self._file_list_entry("b.hda", 20),
+        ]
+        responses = [{"id": CMD_GET_FILE_LIST, "sequence": 1, "body": body} for body in chunks]
+        progress = []
+
+        with patch.object(jensen_device, "_send_command", return_value=1):
+            with patch.object(jensen_device, "_receive_response", side_effect=responses + [None]):
+                result = jensen_device.list_files(
+                    entries_callback=lambda new, parsed, expected: progress.append(
+                        ([f["name"] for f in new], parsed, expected)
+                    )
+                )
+
+        assert [f["name"] for f in result["files"]] == ["a.hda", "b.hda"]
+        assert progress == [(["a.hda", "b.hda"], 2, 2)]
+        assert result["files"][0]["signature"] == bytes(range(16)).hex()
+
+    def test_list_files_reuses_known_entries(self, jensen_device):
+        """Entries matching known_entries by (name, length, signature) are not decoded again."""
+        data = b"\xff\xff" + struct.pack(">I", 2)
+        data += self._file_list_entry("2025May01-100000-Rec01.hda", 10) + self._file_list_entry("b.hda", 20)
+        signature = bytes(range(16)).hex()
+        known = {"name": "2025May01-100000-Rec01.hda", "length": 10, "signature": signature, "duration": 99}
+        responses = [{"id": CMD_GET_FILE_LIST, "sequence": 1, "body": data}, None]
+
+        with patch.object(jensen_device, "_send_command", return_value=1):
+            with patch.object(jensen_device, "_receive_response", side_effect=responses):
+                with patch.object(jensen_device, "_build_file_entry", wraps=jensen_device._build_file_entry) as build:
+                    result = jensen_device.list_files(
+                        known_entries={("2025May01-100000-Rec01.hda", 10, signature): known}
+                    )
+
+        assert result["files"][0] == known
+        assert result["files"][0] is not known
+        assert result["reusedEntries"] == 1
+        assert [c.args[1] for c in build.call_args_list] == ["b.hda"]
+
+    def test_parse_file_list_chunks_parallel_matches_serial(self, jensen_device):
+        """The parallel parser returns exactly what the serial parser does, across chunk splits."""
+        names = [f"2025May{day:02d}-1{day:02d}015-Rec{day:02d}.hda" for day in range(1, 29)] + ["notes.wav"]
+        data = b"\xff\xff" + struct.pack(">I", len(names))
+        data += b"".join(self._file_list_entry(name, 5000 + i, version=1 + i % 3) for i, name in enumerate(names))
+        chunks = [data[pos : pos + 100] for pos in range(0, len(data), 100)]
+
+        parallel_files = jensen_device._parse_file_list_chunks_parallel(chunks)
+
+        assert parallel_files == jensen_device._parse_file_list_chunks(chunks)
+        assert len(parallel_files) == len(names)
+
+    def test_scan_entry_offsets_stops_at_incomplete_entry(self):
+        """The boundary pre-scan only reports entries whose bytes are all present."""
+        from file_list_parallel import scan_entry_offsets
+
+        first = self._file_list_entry("a.hda", 1)
+        second = self._file_list_entry("bb.hda", 2)
+        offsets, name_lengths = scan_entry_offsets(first + second[:-1])
+
+        assert offsets.tolist() == [0]
+        assert name_lengths.tolist() == [5]
+
+    def test_shutdown_pool_on_python_38(self):
+        """The exit hook does not pass cancel_futures where shutdown() does not accept it."""
+        import file_list_parallel
+
+        pool = Mock(spec=["shutdown"])
+        pool.shutdown.side_effect = lambda wait=True: None  # The Python 3.8 signature
+        with patch.object(file_list_parallel, "_pool", pool), patch.object(sys, "version_info", (3, 8, 18)):
+            file_list_parallel.shutdown_pool()
+            assert file_list_parallel._pool is None
+        pool.shutdown.assert_called_once_with(wait=False)
+
     def test_calculate_file_duration_version_1(self, jensen_device):
         """Test _calculate_file_duration for version 1 files."""
         duration = jensen_device._calculate_file_duration(1000, 1)
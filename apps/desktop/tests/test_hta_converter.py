@@ -313,6 +313,38 @@ class TestMPEGFormatParsing:
             assert result[1] == 16000
             assert result[2] == 1
 
+    @patch("hta_converter.find_ffmpeg", return_value="/usr/bin/ffmpeg")
+    @patch("hta_converter.decode_mpeg_to_pcm")
+    def test_parse_hta_file_prefers_pcm_pipe(self, mock_decode, mock_find_ffmpeg, tmp_path):
+        """An H1E stream is decoded through the pipe at its own rate without pydub."""
+        frame = bytes([0xFF, 0xF5, 0x88, 0xC0]) + bytes(572)
+        path = tmp_path / "rec.hda"
+        path.write_bytes(frame * 5)
+        mock_decode.return_value = bytearray(5 * 1152 * 2)
+
+        with patch.object(self.converter, "_parse_hta_format_1") as mock_pydub_route:
+            result = self.converter._parse_hta_file(str(path))
+
+        assert result == (bytearray(5 * 1152 * 2), 16000, 1)
+        assert mock_decode.call_args[0][1].frame_count == 5 and mock_decode.call_args[0][2] == 16000
+        mock_pydub_route.assert_not_called()
+
+    @patch("hta_converter.scan_mpeg_frames")
+    @patch("hta_converter.find_ffmpeg", return_value=None)
+    @patch("hta_converter.decode_mpeg_to_pcm", return_value=None)
+    def test_parse_hta_file_falls_back_to_pydub(self, mock_decode, mock_find_ffmpeg, mock_scan, tmp_path):
+        """Without ffmpeg the pydub route decodes the file and the frames are not scanned."""
+        path = tmp_path / "rec.hda"
+        path.write_bytes((bytes([0xFF, 0xF5, 0x88, 0xC0]) + bytes(572)) * 5)
+
+        with patch.object(self.converter, "_parse_hta_format_1", return_value=(b"pcm", 16000, 1)) as mock_pydub_route:
+            result = self.converter._parse_hta_file(str(path))
+
+        assert result == (b"pcm", 16000, 1)
+        mock_pydub_route.assert_called_once()
+        mock_scan.assert_not_called()
+        mock_decode.assert_not_called()
+
 
 class TestRawPCMConversion:
     """Test raw PCM data conversion."""
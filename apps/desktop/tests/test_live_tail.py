@@ -0,0 +1,121 @@
+"""
+Tests for live tailing of the recording in progress and the download that follows it.
+"""
+
+import time
+
+import pytest
+
+from device_emulator import EmulatedUSBBackend, JensenDeviceEmulator, LinkProfile
+from hidock_device import HiDockJensen
+from live_tail import LiveRecordingTail
+from resumable_download import ResumableDownloader, has_checkpoint
+
+
+@pytest.fixture
+def device():
+    emulator = JensenDeviceEmulator([], LinkProfile(latency_s=0.0), md5_signatures=True)
+    jensen = HiDockJensen(EmulatedUSBBackend([emulator]))
+    success, error = jensen.connect(auto_retry=False)
+    assert success, error
+    yield jensen, emulator
+    jensen.disconnect()
+
+
+def _wait_for(condition, timeout_s=5.0):
+    deadline = time.monotonic() + timeout_s
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+class TestLiveRecordingTail:
+    """Test copying a growing recording and finishing it with a short download."""
+
+    def test_final_download_fetches_only_the_rest(self, device, tmp_path):
+        """After the recording stops, the download resumes after the bytes the tail already copied."""
+        jensen, emulator = device
+        recording = emulator.start_recording("2025May01-100000-Rec01.hda", bytes_per_s=400_000)
+        out = tmp_path / recording.name
+        received = []
+        tail = LiveRecordingTail(
+            jensen,
+            recording.name,
+            out,
+            data_callback=lambda chunk, offset: received.append((offset, len(chunk))),
+            poll_interval_s=0.02,
+        )
+        tail.start()
+        _wait_for(lambda: tail.bytes_tailed > 100_000)
+        emulator.stop_recording()
+        tailed = tail.stop()
+
+        assert tail.status == "stopped" and has_checkpoint(out)
+        offsets = [offset for offset, _ in received]
+        assert offsets == [sum(size for _, size in received[:i]) for i in range(len(received))]
+        assert sum(size for _, size in received) == tailed
+
+        listed = next(f for f in jensen.list_files()["files"] if f["name"] == recording.name)
+        downloader = ResumableDownloader(jensen)
+        status = downloader.download(recording.name, listed["length"], out, signature=listed["signature"])
+
+        assert status == "OK" and not has_checkpoint(out)
+        assert downloader.last_stats["resumed_from"] == tailed
+        assert downloader.last_stats["bytes_transferred"] == listed["length"] - tailed
+        assert downloader.last_stats["signature_verified"] is True
+        assert out.read_bytes() == recording.read(0, recording.length)
+
+    def test_idle_recording_ends_tail_and_restart_resumes(self, device, tmp_path):
+        """A tail stops itself when no bytes arrive, and a new tail continues from its checkpoint."""
+        jensen, emulator = device
+        recording = emulator.start_recording("2025May01-110000-Rec02.hda", bytes_per_s=200_000)
+        out = tmp_path / recording.name
+        first = LiveRecordingTail(jensen, recording.name, out, poll_interval_s=0.02)
+        first.start()
+        _wait_for(lambda: first.bytes_tailed > 20_000)
+        first.stop()
+
+        offsets = []
+        second = LiveRecordingTail(
+            jensen,
+            recording.name,
+            out,
+            data_callback=lambda chunk, offset: offsets.append(offset),
+            poll_interval_s=0.02,
+            idle_stop_s=0.2,
+        )
+        second.start()
+        emulator.stop_recording()
+        _wait_for(lambda: not second.is_running())
+
+        assert second.status == "idle"
+        assert offsets[0] == first.bytes_tailed
+        assert out.read_bytes() == recording.read(0, recording.length)
+
+    def test_truncated_partial_file_restarts_from_zero(self, device, tmp_path):
+        """A local file shorter than its checkpoint is not resumed; the tail copies the recording again."""
+        jensen, emulator = device
+        recording = emulator.start_recording("2025May01-120000-Rec03.hda", bytes_per_s=200_000)
+        out = tmp_path / recording.name
+        first = LiveRecordingTail(jensen, recording.name, out, poll_interval_s=0.02)
+        first.start()
+        _wait_for(lambda: first.bytes_tailed > 20_000)
+        first.stop()
+        with open(out, "r+b") as f:
+            f.truncate(first.bytes_tailed // 2)
+
+        offsets = []
+        second = LiveRecordingTail(
+            jensen,
+            recording.name,
+            out,
+            data_callback=lambda chunk, offset: offsets.append(offset),
+            poll_interval_s=0.02,
+            idle_stop_s=0.2,
+        )
+        second.start()
+        emulator.stop_recording()
+        _wait_for(lambda: not second.is_running())
+
+        assert offsets[0] == 0
+        assert out.read_bytes() == recording.read(0, recording.length)
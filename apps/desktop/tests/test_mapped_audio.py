@@ -0,0 +1,63 @@
+"""
+Tests for memory-mapped WAV access used by the spectrum view.
+"""
+
+import struct
+import wave
+
+import numpy as np
+import pytest
+
+from mapped_audio import open_mapped_wav
+from waveform_peaks import pcm_to_mono
+
+
+def _write_wav(path, frames, sample_width, channels, sample_rate=16000):
+    with wave.open(str(path), "wb") as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(sample_width)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(frames)
+
+
+class TestMappedWavAudio:
+    """Test slicing mapped WAV files."""
+
+    @pytest.mark.parametrize("sample_width,channels", [(1, 1), (2, 2), (3, 1), (4, 2)])
+    def test_slices_match_decoded_samples(self, tmp_path, sample_width, channels):
+        """Any slice equals the same frames decoded from the whole file."""
+        raw = np.random.default_rng(5).integers(0, 256, 9_000 * sample_width * channels, dtype=np.uint8).tobytes()
+        path = tmp_path / "take.wav"
+        _write_wav(path, raw, sample_width, channels)
+        expected = pcm_to_mono(raw, sample_width, channels)
+
+        mapped = open_mapped_wav(str(path))
+
+        assert len(mapped) == 9_000 and mapped.sample_rate == 16000 and mapped.duration == pytest.approx(0.5625)
+        np.testing.assert_array_equal(mapped[1234:2258], expected[1234:2258])
+        np.testing.assert_array_equal(mapped[8_500:20_000], expected[8_500:])
+        assert len(mapped[20_000:21_024]) == 0
+        mapped.close()
+        assert len(mapped[0:10]) == 0
+
+    def test_float_wav_with_extra_chunks_and_short_data(self, tmp_path):
+        """Chunks before the data are skipped and a data size past the end of the file is clamped."""
+        samples = np.linspace(-1.0, 1.0, 4_000, dtype="<f4")
+        fmt = struct.pack("<HHIIHH", 3, 1, 8000, 8000 * 4, 4, 32)
+        body = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"LIST" + struct.pack("<I", 3) + b"abc\x00"
+        body += b"data" + struct.pack("<I", 0xFFFFFFFF) + samples.tobytes()
+        path = tmp_path / "interrupted.wav"
+        path.write_bytes(b"RIFF" + struct.pack("<I", 0xFFFFFFFF) + body)
+
+        mapped = open_mapped_wav(str(path))
+
+        assert len(mapped) == 4_000
+        np.testing.assert_array_equal(mapped[100:1124], samples[100:1124])
+
+    def test_unmappable_files(self, tmp_path):
+        """Other formats and broken headers are left to the decoding path."""
+        not_wav = tmp_path / "take.wav"
+        not_wav.write_bytes(b"ID3" + bytes(100))
+        assert open_mapped_wav(str(not_wav)) is None
+        assert open_mapped_wav(str(tmp_path / "missing.wav")) is None
+        assert open_mapped_wav(str(tmp_path / "take.hda")) is None
@@ -0,0 +1,65 @@
+"""
+Tests for MPEG frame scanning and the ffmpeg PCM pipe used for .hda recordings.
+"""
+
+import subprocess
+
+import pytest
+
+from mpeg_audio import decode_mpeg_to_pcm, find_ffmpeg, scan_mpeg_frames
+
+# MPEG-2 Layer II, no CRC, 64 kb/s, 16 kHz, mono: the H1E recording format
+H1E_HEADER = bytes([0xFF, 0xF5, 0x88, 0xC0])
+H1E_FRAME_LENGTH = 144 * 64000 // 16000
+
+
+def _frames(count, header=H1E_HEADER, length=H1E_FRAME_LENGTH):
+    return (header + bytes(length - len(header))) * count
+
+
+class TestScanMpegFrames:
+    """Test walking frame headers."""
+
+    def test_h1e_stream(self):
+        """Frames are counted across a tag, a gap of other bytes and a cut-off last frame."""
+        id3 = b"ID3\x04\x00\x00\x00\x00\x00\x05" + b"\x00" * 5
+        data = id3 + _frames(6) + b"\x00" * 37 + _frames(4) + H1E_HEADER + bytes(100)
+
+        info = scan_mpeg_frames(data)
+
+        assert (info.layer, info.sample_rate, info.channels, info.bitrate_kbps) == (2, 16000, 1, 64)
+        assert info.frame_count == 10 and info.sample_count == 11520 and info.data_offset == len(id3)
+        assert info.duration == pytest.approx(0.72)
+
+    def test_layer1_stereo_and_unsupported_streams(self):
+        """Layer I frame lengths are computed in slots; Layer III, free format and other data are refused."""
+        layer1 = bytes([0xFF, 0xFF, 0x42, 0x00])  # MPEG-1 Layer I, 128 kb/s, 44.1 kHz with padding, stereo
+        info = scan_mpeg_frames(_frames(3, layer1, (12 * 128000 // 44100 + 1) * 4))
+        assert (info.layer, info.channels, info.frame_count, info.sample_count) == (1, 2, 3, 1152)
+
+        assert scan_mpeg_frames(_frames(3, bytes([0xFF, 0xFB, 0x90, 0xC0]), 417)) is None  # Layer III
+        assert scan_mpeg_frames(_frames(3, bytes([0xFF, 0xF5, 0x08, 0xC0]), 576)) is None  # Free format
+        assert scan_mpeg_frames(b"\xff\xe0\x00\x00" + bytes(100)) is None
+        assert scan_mpeg_frames(b"RIFF" + bytes(100)) is None
+
+
+@pytest.mark.skipif(find_ffmpeg() is None, reason="ffmpeg not installed")
+class TestDecodeMpegToPcm:
+    """Test decoding through the ffmpeg pipe."""
+
+    def test_decoded_length_matches_scan(self, tmp_path):
+        """The pipe fills the buffer sized from the frame count, also when resampling."""
+        path = tmp_path / "2025May01-100000-Rec01.hda"
+        subprocess.run(
+            [find_ffmpeg(), "-v", "error", "-f", "lavfi", "-i", "sine=frequency=440:sample_rate=16000:duration=3"]
+            + ["-c:a", "mp2", "-b:a", "64k", "-f", "mp2", str(path)],
+            check=True,
+        )
+        info = scan_mpeg_frames(path.read_bytes())
+
+        pcm = decode_mpeg_to_pcm(str(path), info)
+        resampled = decode_mpeg_to_pcm(str(path), info, sample_rate=8000)
+
+        assert len(pcm) == info.sample_count * 2
+        assert abs(len(resampled) - info.sample_count) <= 64
+        assert decode_mpeg_to_pcm(str(tmp_path / "missing.hda"), info) is None
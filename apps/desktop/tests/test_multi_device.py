@@ -0,0 +1,124 @@
+"""
+Tests for concurrent multi-device access and the batch download planner.
+"""
+
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from device_emulator import EmulatedUSBBackend, JensenDeviceEmulator, LinkProfile, generate_catalog
+from hidock_device import HiDockJensen
+from multi_device import BatchDownloadPlanner, DevicePool, find_hidock_devices
+
+
+def _emulators(count, files=3, bandwidth=None):
+    return [
+        JensenDeviceEmulator(
+            generate_catalog(files, min_size=150_000, max_size=250_000, seed=index),
+            LinkProfile(latency_s=0.0, bandwidth_bytes_per_s=bandwidth),
+            serial=f"EMU000000000{index}",
+            md5_signatures=True,
+        )
+        for index in range(count)
+    ]
+
+
+@pytest.fixture
+def pool_of_three():
+    emulators = _emulators(3, bandwidth=2_000_000)
+    pool = DevicePool(EmulatedUSBBackend(emulators))
+    assert pool.connect_all() == {}
+    yield pool, emulators
+    pool.close_all()
+
+
+class TestDevicePool:
+    """Discovery, per-unit connection and per-device workers."""
+
+    def test_jensen_connects_to_the_unit_at_a_location(self):
+        """Two identical units are told apart by bus and address."""
+        emulators = _emulators(2)
+        backend = EmulatedUSBBackend(emulators)
+        second = find_hidock_devices(backend)[1]
+        jensen = HiDockJensen(backend)
+        try:
+            success, error = jensen.connect(auto_retry=False, location=(second["bus"], second["address"]))
+            assert success, error
+            assert jensen.get_device_info()["sn"] == emulators[1].serial
+        finally:
+            jensen.disconnect()
+
+    def test_connect_all_uses_one_worker_thread_per_device(self, pool_of_three):
+        """Each unit gets its own HiDockJensen and I/O thread, labelled by serial."""
+        pool, emulators = pool_of_three
+        threads = pool.run_on_all(lambda jensen: threading.current_thread().name)
+        serials = pool.run_on_all(lambda jensen: jensen.get_device_info()["sn"])
+
+        assert sorted(serials) == sorted(emulator.serial for emulator in emulators)
+        assert all(label == serial for label, serial in serials.items())
+        assert len(set(threads.values())) == 3
+        assert pool.connect_all() == {}  # Already connected units are not connected twice
+        assert len(pool.workers) == 3
+
+    def test_connect_all_logs_serial_and_location(self):
+        """The connect message names the unit's serial and the USB location it was found at."""
+        emulators = _emulators(1)
+        pool = DevicePool(EmulatedUSBBackend(emulators))
+        location = "%d-%d" % tuple(find_hidock_devices(pool.usb_backend)[0][key] for key in ("bus", "address"))
+        try:
+            with patch("multi_device.logger") as logger:
+                assert pool.connect_all() == {}
+        finally:
+            pool.close_all()
+
+        logger.info.assert_called_once_with(
+            "DevicePool", "connect_all", "Connected %s at %s", emulators[0].serial, location
+        )
+
+
+class TestBatchDownloadPlanner:
+    """Planning and parallel execution of offloads."""
+
+    def test_parallel_offload_takes_about_the_slowest_device(self, pool_of_three, tmp_path):
+        """Three bandwidth-limited devices download concurrently into per-serial folders."""
+        pool, emulators = pool_of_three
+        file_lists = {label: result["files"] for label, result in pool.run_on_all(lambda j: j.list_files()).items()}
+        planner = BatchDownloadPlanner(pool, tmp_path)
+
+        report = planner.run(planner.plan(file_lists))
+
+        for emulator in emulators:
+            device = report["devices"][emulator.serial]
+            assert device["files_done"] == 3 and device["failed"] == []
+            for recording in emulator.recordings:
+                path = tmp_path / emulator.serial / recording.name
+                assert path.read_bytes() == recording.read(0, recording.length)
+        slowest = max(device["elapsed_s"] for device in report["devices"].values())
+        assert report["elapsed_s"] < slowest * 1.5
+        assert report["parallelism"] > 2.0
+        assert report["bytes"] == sum(rec.length for emulator in emulators for rec in emulator.recordings)
+
+    def test_plan_skips_files_already_downloaded(self, tmp_path):
+        """Files on disk with the expected size are left out of the plan."""
+        pool = DevicePool(EmulatedUSBBackend([]))
+        planner = BatchDownloadPlanner(pool, tmp_path)
+        (tmp_path / "EMU1").mkdir()
+        (tmp_path / "EMU1" / "a.hda").write_bytes(b"x" * 10)
+        (tmp_path / "EMU1" / "b.hda").write_bytes(b"x" * 5)
+
+        plan = planner.plan({"EMU1": [{"name": "a.hda", "length": 10}, {"name": "b.hda", "length": 10}]})
+
+        assert [job.file_info["name"] for job in plan["EMU1"]] == ["b.hda"]
+
+    def test_unknown_device_fails_before_any_download(self, pool_of_three, tmp_path):
+        """A plan naming a device outside the pool is rejected before any queue starts."""
+        pool, emulators = pool_of_three
+        recording = emulators[0].recordings[0]
+        planner = BatchDownloadPlanner(pool, tmp_path)
+        plan = planner.plan({emulators[0].serial: [{"name": recording.name, "length": recording.length}]})
+        plan.update(planner.plan({"EMU-UNPLUGGED": [{"name": "a.hda", "length": 10}]}))
+
+        with pytest.raises(KeyError, match="EMU-UNPLUGGED"):
+            planner.run(plan)
+        assert not (tmp_path / emulators[0].serial).exists()
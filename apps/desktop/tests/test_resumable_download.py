@@ -0,0 +1,186 @@
+"""
+Tests for resumable downloads built on CMD_GET_FILE_BLOCK.
+"""
+
+import hashlib
+import json
+import os
+
+import pytest
+
+import file_integrity
+import resumable_download
+from resumable_download import ResumableDownloader, checkpoint_path
+
+
+class FakeJensen:
+    """Minimal stand-in for HiDockJensen serving one file."""
+
+    def __init__(self, data, fail_stream_at=None, stream_status="fail_timeout", ranged=True):
+        self.data = data
+        self.fail_stream_at = fail_stream_at
+        self.stream_status = stream_status
+        self.ranged = ranged
+        self.stream_calls = 0
+        self.block_offsets = []
+
+    def is_connected(self):
+        return True
+
+    def stream_file(self, filename, file_length, data_callback, progress_callback=None, timeout_s=180):
+        self.stream_calls += 1
+        end = self.fail_stream_at if self.fail_stream_at is not None else file_length
+        for pos in range(0, end, 1000):
+            chunk = self.data[pos : min(pos + 1000, end)]
+            data_callback(memoryview(chunk))
+            if progress_callback:
+                progress_callback(pos + len(chunk), file_length)
+        if self.fail_stream_at is not None:
+            self.fail_stream_at = None  # Only fail once
+            return self.stream_status
+        return "OK"
+
+    def get_file_block(self, filename, offset, length):
+        self.block_offsets.append(offset)
+        if not self.ranged:
+            return None
+        return self.data[offset : offset + length]
+
+
+@pytest.fixture(autouse=True)
+def no_retry_delay(monkeypatch):
+    monkeypatch.setattr(resumable_download, "BLOCK_RETRY_DELAY_S", 0)
+
+
+@pytest.fixture
+def payload():
+    return os.urandom(10_000)
+
+
+class TestResumableDownloader:
+    """Test streaming, checkpointing and ranged resume."""
+
+    def test_fresh_download_streams_whole_file(self, tmp_path, payload):
+        """A download without a checkpoint uses a single full stream."""
+        out = tmp_path / "rec.hda"
+        jensen = FakeJensen(payload)
+
+        status = ResumableDownloader(jensen).download("rec.hda", len(payload), str(out))
+
+        assert status == "OK"
+        assert out.read_bytes() == payload
+        assert jensen.block_offsets == []
+        assert not os.path.exists(checkpoint_path(out))
+
+    def test_failed_stream_continues_with_ranged_reads(self, tmp_path, payload):
+        """A stream that times out part way is finished from the last good offset."""
+        out = tmp_path / "rec.hda"
+        jensen = FakeJensen(payload, fail_stream_at=4000)
+        downloader = ResumableDownloader(jensen, block_size=1500)
+
+        status = downloader.download("rec.hda", len(payload), str(out))
+
+        assert status == "OK"
+        assert out.read_bytes() == payload
+        assert jensen.stream_calls == 1
+        assert jensen.block_offsets[0] == 4000
+        assert downloader.last_stats["mode"] == "ranged"
+
+    def test_checkpoint_resumes_next_attempt(self, tmp_path, payload):
+        """A disconnect leaves a checkpoint that the next call resumes from."""
+        out = tmp_path / "rec.hda"
+        jensen = FakeJensen(payload, fail_stream_at=6000, stream_status="fail_disconnected")
+        downloader = ResumableDownloader(jensen, block_size=4096)
+
+        assert downloader.download("rec.hda", len(payload), str(out)) == "fail_disconnected"
+        with open(checkpoint_path(out), encoding="utf-8") as f:
+            assert json.load(f)["committed"] == 6000
+
+        assert downloader.download("rec.hda", len(payload), str(out)) == "OK"
+        assert out.read_bytes() == payload
+        assert jensen.stream_calls == 1
+        assert jensen.block_offsets[0] == 6000
+        assert downloader.last_stats["resumed_from"] == 6000
+        assert not os.path.exists(checkpoint_path(out))
+
+    def test_corrupt_partial_file_restarts_from_zero(self, tmp_path, payload):
+        """A partial file that no longer matches its checkpoint hash is re-downloaded."""
+        out = tmp_path / "rec.hda"
+        jensen = FakeJensen(payload, fail_stream_at=6000, stream_status="fail_disconnected")
+        downloader = ResumableDownloader(jensen)
+        downloader.download("rec.hda", len(payload), str(out))
+
+        with open(out, "r+b") as f:
+            f.write(b"\x00" * 10)
+
+        assert downloader.download("rec.hda", len(payload), str(out)) == "OK"
+        assert out.read_bytes() == payload
+        assert jensen.stream_calls == 2
+        assert jensen.block_offsets == []
+
+    def test_unsupported_ranged_reads_fall_back_to_full_stream(self, tmp_path, payload):
+        """When the device never answers CMD_GET_FILE_BLOCK the file is streamed again."""
+        out = tmp_path / "rec.hda"
+        jensen = FakeJensen(payload, fail_stream_at=6000, stream_status="fail_disconnected", ranged=False)
+        downloader = ResumableDownloader(jensen, block_retries=1)
+        downloader.download("rec.hda", len(payload), str(out))
+
+        assert downloader.download("rec.hda", len(payload), str(out)) == "OK"
+        assert out.read_bytes() == payload
+        assert downloader.ranged_reads_supported is False
+        assert downloader.last_stats["mode"] == "stream"
+        assert jensen.stream_calls == 2
+
+
+class TestSignatureVerification:
+    """Test verification against the device's MD5 file signature."""
+
+    def test_streamed_download_is_verified(self, tmp_path, payload):
+        """The digest computed while writing matches the listed signature."""
+        out = tmp_path / "rec.hda"
+        downloader = ResumableDownloader(FakeJensen(payload))
+        signature = hashlib.md5(payload).hexdigest()
+
+        assert downloader.download("rec.hda", len(payload), str(out), signature=signature) == "OK"
+        assert downloader.last_stats["md5"] == signature
+        assert downloader.last_stats["signature_verified"] is True
+
+    def test_resumed_download_is_verified(self, tmp_path, payload):
+        """The prefix hashed while validating the checkpoint seeds the digest."""
+        out = tmp_path / "rec.hda"
+        jensen = FakeJensen(payload, fail_stream_at=6000, stream_status="fail_disconnected")
+        downloader = ResumableDownloader(jensen, block_size=4096)
+        signature = hashlib.md5(payload).hexdigest()
+        downloader.download("rec.hda", len(payload), str(out), signature=signature)
+
+        assert downloader.download("rec.hda", len(payload), str(out), signature=signature) == "OK"
+        assert downloader.last_stats["resumed_from"] == 6000
+        assert downloader.last_stats["signature_verified"] is True
+
+    def test_mismatch_is_flagged(self, tmp_path, payload):
+        """A mismatch is only flagged by default."""
+        downloader = ResumableDownloader(FakeJensen(payload))
+
+        assert downloader.download("rec.hda", len(payload), str(tmp_path / "rec.hda"), signature="11" * 16) == "OK"
+        assert downloader.last_stats["signature_verified"] is False
+        assert downloader.last_stats["md5"] == hashlib.md5(payload).hexdigest()
+
+    def test_strict_mismatch_fails_and_keeps_checkpoint(self, tmp_path, payload, monkeypatch):
+        """With strict checks a mismatch fails the download but leaves the received bytes and checkpoint alone."""
+        monkeypatch.setattr(file_integrity, "STRICT_SIGNATURE_CHECK", True)
+        out = tmp_path / "rec.hda"
+        downloader = ResumableDownloader(FakeJensen(payload, fail_stream_at=6000, stream_status="fail_disconnected"))
+        downloader.download("rec.hda", len(payload), str(out), signature="11" * 16)
+
+        status = downloader.download("rec.hda", len(payload), str(out), signature="11" * 16)
+
+        assert status == "fail_signature_mismatch"
+        assert downloader.last_stats["signature_verified"] is False
+        assert out.read_bytes() == payload and os.path.exists(checkpoint_path(out))
+
+    def test_unsigned_files_are_not_hashed(self, tmp_path, payload):
+        """Missing or all-zero signatures skip verification."""
+        downloader = ResumableDownloader(FakeJensen(payload))
+
+        assert downloader.download("rec.hda", len(payload), str(tmp_path / "a"), signature="00" * 16) == "OK"
+        assert downloader.last_stats["md5"] is None and downloader.last_stats["signature_verified"] is None
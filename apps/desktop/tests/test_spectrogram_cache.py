@@ -0,0 +1,107 @@
+"""
+Tests for the precomputed spectrum frames behind the spectrum view.
+"""
+
+import wave
+
+import numpy as np
+import pytest
+from scipy import signal
+
+import spectrogram_cache
+from mapped_audio import open_mapped_wav
+from spectrogram_cache import Spectrogram, compute_spectrum_frames, get_spectrogram, spectrogram_file_path
+
+
+def _live_spectrum(audio, sample_rate, position, fft_size=1024):
+    """The per-frame computation of SpectrumAnalyzer._update_spectrum."""
+    chunk = audio[int(position * sample_rate) : int(position * sample_rate) + fft_size]
+    chunk = np.pad(chunk, (0, fft_size - len(chunk)))
+    magnitude = np.maximum(np.abs(np.fft.fft(chunk * np.hanning(fft_size))[: fft_size // 2]), 1e-10)
+    spectrum_db = 20 * np.log10(magnitude)
+    freqs = np.fft.fftfreq(fft_size, 1 / sample_rate)[: fft_size // 2]
+    log_freqs = np.logspace(1, np.log10(sample_rate / 2), 50)
+    spectrum = np.interp(log_freqs, freqs[1:], spectrum_db[1:])
+    spectrum = np.maximum(spectrum - np.max(spectrum), -80)
+    return log_freqs, signal.savgol_filter(spectrum, 5, 2)
+
+
+def _wait_complete(spectrogram, timeout_s=10.0):
+    spectrogram._thread.join(timeout_s)
+    assert spectrogram.complete
+
+
+@pytest.fixture(autouse=True)
+def clear_memory_cache():
+    spectrogram_cache._memory_cache.clear()
+    yield
+    spectrogram_cache._memory_cache.clear()
+
+
+@pytest.fixture
+def tone_file(tmp_path):
+    """Three seconds of a rising tone in noise, 16 kHz mono."""
+    sample_rate = 16000
+    t = np.arange(3 * sample_rate) / sample_rate
+    samples = 0.5 * np.sin(2 * np.pi * (300 + 400 * t) * t) + np.random.default_rng(2).normal(0, 0.01, len(t))
+    path = tmp_path / "tone.wav"
+    with wave.open(str(path), "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes((samples * 32767).astype("<i2").tobytes())
+    return path
+
+
+class TestSpectrumFrames:
+    """Test the batched computation against the live one."""
+
+    def test_batch_matches_live_spectrum(self, tone_file):
+        """Every precomputed frame equals the live spectrum at its position, including the padded tail."""
+        audio = open_mapped_wav(str(tone_file))
+        hop = 800
+        count = spectrogram_cache.spectrum_frame_count(len(audio), 1024, hop)
+
+        frames = compute_spectrum_frames(audio, audio.sample_rate, 1024, hop, 0, count)
+
+        assert frames.shape == (count, spectrogram_cache.SPECTRUM_BANDS)
+        full = np.asarray(audio[0 : len(audio)])
+        for index in (0, 17, count - 1):
+            log_freqs, expected = _live_spectrum(full, audio.sample_rate, index * hop / audio.sample_rate)
+            np.testing.assert_allclose(frames[index], expected, atol=1e-3)
+        np.testing.assert_allclose(get_spectrogram(full, 16000, 1024).log_freqs, log_freqs)
+
+
+class TestSpectrogram:
+    """Test the background pass and its caches."""
+
+    def test_lookup_and_memory_cache(self, tone_file):
+        """Frames are looked up by position and a finished spectrogram is reused for the same file."""
+        audio = open_mapped_wav(str(tone_file))
+        spectrogram = get_spectrogram(audio, audio.sample_rate, source_path=str(tone_file))
+        _wait_complete(spectrogram)
+
+        np.testing.assert_array_equal(spectrogram.lookup(1.23), spectrogram.frames[int(1.23 * 16000) // 800])
+        assert spectrogram.lookup(3.5) is None
+        assert get_spectrogram(audio, audio.sample_rate, source_path=str(tone_file)) is spectrogram
+        assert get_spectrogram(audio, audio.sample_rate, hop_s=0.025, source_path=str(tone_file)) is not spectrogram
+
+    def test_disk_cache_and_cancel(self, tone_file, monkeypatch):
+        """A saved spectrogram is loaded without a pass, and a cancelled pass stops early."""
+        audio = open_mapped_wav(str(tone_file))
+        first = get_spectrogram(audio, audio.sample_rate, source_path=str(tone_file), use_disk_cache=True)
+        _wait_complete(first)
+        spectrogram_cache._memory_cache.clear()
+        monkeypatch.setattr(Spectrogram, "_compute", lambda *args: pytest.fail("computed again"))
+
+        loaded = get_spectrogram(audio, audio.sample_rate, source_path=str(tone_file), use_disk_cache=True)
+
+        assert loaded.complete
+        np.testing.assert_array_equal(loaded.frames, first.frames)
+        monkeypatch.undo()
+        monkeypatch.setattr(spectrogram_cache, "BATCH_FRAMES", 1)
+        (tone_file.parent / "other.wav").write_bytes(tone_file.read_bytes())
+        other = get_spectrogram(audio, audio.sample_rate, source_path=str(tone_file.parent / "other.wav"))
+        other.cancel()
+        assert not other.complete and not other._thread.is_alive()
+        assert spectrogram_file_path(str(tone_file)).endswith(".wav.spectrum")
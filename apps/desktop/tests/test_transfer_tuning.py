@@ -0,0 +1,105 @@
+"""
+Tests for the transfer auto-tuner, its profile store and their use by HiDockJensen.
+"""
+
+from device_emulator import EmulatedUSBBackend, JensenDeviceEmulator, LinkProfile, generate_catalog
+from device_interface import DeviceModel
+from hidock_device import HiDockJensen
+from transfer_tuning import MIN_TUNING_BYTES, READ_TIMEOUT_RANGE, TransferAutoTuner, TransferProfileStore
+
+
+class TestTransferAutoTuner:
+    """Test profile adjustments from measurements."""
+
+    def test_read_size_settles_on_fastest_step(self):
+        """Neighbouring read sizes are tried and the fastest one is kept."""
+        tuner = TransferAutoTuner(DeviceModel.H1E, "6.2.4")
+        speeds = {16: 1.0, 32: 2.0, 64: 3.0, 128: 4.0, 256: 3.5}
+
+        for _ in range(8):
+            packets = tuner.profile.read_packets
+            tuner.record_stream(MIN_TUNING_BYTES * 4, 4 / speeds[packets], max_gap_ms=20)
+
+        assert tuner.profile.read_packets == 128
+        assert set(tuner.get_stats()["read_rates"]) == {64, 128, 256}  # 32 is never a neighbour of the best
+
+    def test_short_transfers_do_not_move_read_size(self):
+        """Transfers below MIN_TUNING_BYTES only count towards the timeouts."""
+        tuner = TransferAutoTuner()
+        assert tuner.record_stream(1000, 0.01, max_gap_ms=5) is False
+        assert tuner.get_stats()["mb_per_s"] is None
+
+    def test_read_timeout_follows_command_latency(self):
+        """The read timeout is a multiple of the p95 round trip, within bounds."""
+        tuner = TransferAutoTuner()
+        for _ in range(20):
+            tuner.record_command(10.0)
+        assert tuner.profile.read_timeout_ms == 50 == READ_TIMEOUT_RANGE[0]
+        for _ in range(64):
+            tuner.record_command(80.0)
+        assert tuner.profile.read_timeout_ms == 320
+
+
+class TestTransferProfileStore:
+    """Test persistence per serial and reuse across units of one model."""
+
+    def test_round_trip_and_model_fallback(self, tmp_path):
+        """A saved profile comes back for its serial and seeds new units of the same model and firmware."""
+        store = TransferProfileStore(str(tmp_path / "profiles.json"))
+        tuner = TransferAutoTuner(DeviceModel.P1, "1.0.0")
+        tuner.profile.read_packets = 128
+        assert store.save("SN1", tuner)
+
+        assert store.tuner_for("SN1", DeviceModel.P1, "1.0.0").source == "stored"
+        other = store.tuner_for("SN2", DeviceModel.P1, "1.0.0")
+        assert other.source == "model" and other.profile.read_packets == 128
+
+    def test_firmware_change_starts_from_defaults(self, tmp_path):
+        """Profiles measured under another firmware are not reused."""
+        store = TransferProfileStore(str(tmp_path / "profiles.json"))
+        tuner = TransferAutoTuner(DeviceModel.P1, "1.0.0")
+        tuner.profile.read_packets = 128
+        store.save("SN1", tuner)
+
+        fresh = store.tuner_for("SN1", DeviceModel.P1, "1.1.0")
+        assert fresh.source == "default" and fresh.profile.read_packets == 64
+
+    def test_unreadable_file_is_ignored(self, tmp_path):
+        """A corrupt store yields default profiles."""
+        path = tmp_path / "profiles.json"
+        path.write_text("{not json")
+        assert TransferProfileStore(str(path)).tuner_for("SN1", DeviceModel.P1, None).source == "default"
+
+
+class TestJensenTransferTuning:
+    """Test tuning against the device emulator."""
+
+    def test_streams_are_measured_and_profile_persisted(self, tmp_path):
+        """Large downloads report MB/s in the connection stats and save the profile under the serial."""
+        emulator = JensenDeviceEmulator(
+            generate_catalog(3, min_size=MIN_TUNING_BYTES, max_size=MIN_TUNING_BYTES + 200_000),
+            LinkProfile(latency_s=0.0),
+        )
+        store = TransferProfileStore(str(tmp_path / "profiles.json"))
+        jensen = HiDockJensen(EmulatedUSBBackend([emulator]))
+        jensen.transfer_profile_store = store
+        success, error = jensen.connect(auto_retry=False)
+        assert success, error
+        try:
+            jensen.get_device_info()
+            for recording in emulator.recordings:
+                received = []  # Chunks are views into the receive buffer; keep only their sizes
+                status = jensen.stream_file(recording.name, recording.length, lambda chunk: received.append(len(chunk)))
+                assert status == "OK"
+                assert sum(received) == recording.length
+
+            stats = jensen.get_connection_stats()["transfer_profile"]
+            assert stats["mb_per_s"] > 0
+            assert stats["bytes_measured"] >= 3 * MIN_TUNING_BYTES
+            assert stats["profile"]["read_packets"] != 64 or len(stats["read_rates"]) > 1
+        finally:
+            jensen.disconnect()
+
+        restored = store.tuner_for(emulator.serial, DeviceModel(stats["model"]), stats["firmware"])
+        assert restored.source == "stored"
+        assert restored.profile.read_packets == stats["profile"]["read_packets"]
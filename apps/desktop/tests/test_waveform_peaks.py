@@ -0,0 +1,158 @@
+"""
+Tests for the min/max/RMS peak pyramid behind the waveform display.
+"""
+
+import os
+import wave
+
+import numpy as np
+import pytest
+
+import waveform_peaks
+from waveform_peaks import (
+    BASE_BUCKET_FRAMES,
+    PeakPyramid,
+    WaveformReducer,
+    build_peak_pyramid,
+    discard_peak_file,
+    get_peak_pyramid,
+    peak_file_path,
+    reduce_waveform,
+)
+
+
+def _write_wav(path, samples, sample_rate=8000, channels=1):
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+    with wave.open(str(path), "wb") as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(pcm.tobytes())
+    return pcm.astype(np.float32) / 32768.0
+
+
+@pytest.fixture(autouse=True)
+def clear_memory_cache():
+    waveform_peaks._memory_cache.clear()
+    yield
+    waveform_peaks._memory_cache.clear()
+
+
+@pytest.fixture
+def recording(tmp_path):
+    """Ten minutes of quiet noise at 8 kHz with two single-sample clicks."""
+    rng = np.random.default_rng(7)
+    samples = rng.normal(0.0, 0.02, 8000 * 600)
+    samples[1_234_567] = 0.95
+    samples[3_000_001] = -0.9
+    path = tmp_path / "meeting.wav"
+    return path, _write_wav(path, samples)
+
+
+class TestPeakPyramid:
+    """Test building and reading the pyramid."""
+
+    def test_buckets_match_reference_and_keep_clicks(self, recording):
+        """Level 0 equals a direct reduction and no click is lost at any level or window size."""
+        path, samples = recording
+        pyramid = build_peak_pyramid(str(path))
+
+        assert pyramid.frame_count == len(samples) and pyramid.duration == pytest.approx(600.0)
+        full = len(samples) // BASE_BUCKET_FRAMES * BASE_BUCKET_FRAMES
+        reference = samples[:full].reshape(-1, BASE_BUCKET_FRAMES)
+        base = pyramid.levels[0]
+        np.testing.assert_allclose(base[: len(reference), 0], reference.min(axis=1))
+        np.testing.assert_allclose(base[: len(reference), 1], reference.max(axis=1))
+        np.testing.assert_allclose(base[: len(reference), 2], np.sqrt((reference**2).mean(axis=1)), rtol=1e-5)
+        assert len(pyramid.levels) > 1 and len(pyramid.levels[-1]) <= waveform_peaks.TOP_LEVEL_MAX_BUCKETS
+        for level in pyramid.levels:
+            assert level[:, 1].max() == pytest.approx(samples.max())
+            assert level[:, 0].min() == pytest.approx(samples.min())
+        for max_points in (50, 800, 2000):
+            _, mins, maxs, _ = pyramid.window(max_points=max_points)
+            assert len(maxs) <= max_points
+            assert maxs.max() == pytest.approx(samples.max()) and mins.min() == pytest.approx(samples.min())
+
+    def test_zoomed_window_uses_finer_buckets(self, recording):
+        """A short window is served from a finer level and stays inside the requested range."""
+        path, _ = recording
+        pyramid = build_peak_pyramid(str(path))
+
+        full_times, _, _, _ = pyramid.window(max_points=1000)
+        times, _, maxs, _ = pyramid.window(150.0, 160.0, max_points=1000)
+
+        assert 0 < len(times) <= 1000
+        assert times[0] >= 150.0 - pyramid.level_bucket_seconds(0) and times[-1] <= 160.0 + 1.0
+        assert np.diff(times).mean() < np.diff(full_times).mean() / 10
+        assert maxs.max() == pytest.approx(0.95, abs=1e-3)  # The click at 154.3 s
+
+
+class TestPeakFileCache:
+    """Test the peak file next to the recording."""
+
+    def test_peak_file_is_reused_until_audio_changes(self, recording, monkeypatch):
+        """A saved pyramid is loaded instead of decoding, and a changed recording is decoded again."""
+        path, _ = recording
+        first = get_peak_pyramid(str(path))
+        assert os.path.exists(peak_file_path(str(path)))
+
+        waveform_peaks._memory_cache.clear()
+        monkeypatch.setattr(waveform_peaks, "build_peak_pyramid", lambda _: pytest.fail("decoded again"))
+        loaded = get_peak_pyramid(str(path))
+        for ours, theirs in zip(first.levels, loaded.levels):
+            np.testing.assert_array_equal(ours, theirs)
+
+        monkeypatch.undo()
+        _write_wav(path, np.zeros(8000))
+        changed = get_peak_pyramid(str(path))
+        assert changed.frame_count == 8000 and changed.peak == 0.0
+
+    def test_stale_or_missing_peak_file(self, recording):
+        """A peak file made from another version of the audio is ignored and can be discarded."""
+        path, _ = recording
+        pyramid = build_peak_pyramid(str(path))
+        stat = os.stat(path)
+        pyramid.save(peak_file_path(str(path)), stat.st_size, stat.st_mtime_ns)
+
+        assert PeakPyramid.load(peak_file_path(str(path)), stat.st_size + 1, stat.st_mtime_ns) is None
+        discard_peak_file(str(path))
+        discard_peak_file(str(path))  # Already gone
+        assert PeakPyramid.load(peak_file_path(str(path)), stat.st_size, stat.st_mtime_ns) is None
+
+
+class TestStreamingReduction:
+    """Test reducing a recording to a bounded envelope block by block."""
+
+    def test_unknown_length_matches_reference_buckets(self):
+        """Buckets grown while streaming cover the same frames as a direct reduction would."""
+        samples = np.random.default_rng(3).normal(0.0, 0.3, 123_457).astype(np.float32)
+        reducer = WaveformReducer(max_points=100)
+        for start in range(0, len(samples), 777):  # Odd block size, so buckets straddle blocks
+            reducer.add(samples[start : start + 777])
+        mins, maxs, bucket_frames = reducer.finish()
+
+        assert len(mins) <= 100 and reducer.frame_count == len(samples)
+        padded = np.append(samples, np.full(-len(samples) % bucket_frames, np.nan, dtype=np.float32))
+        buckets = padded.reshape(-1, bucket_frames)
+        np.testing.assert_array_equal(mins, np.nanmin(buckets, axis=1))
+        np.testing.assert_array_equal(maxs, np.nanmax(buckets, axis=1))
+
+    def test_large_file_is_streamed(self, recording, monkeypatch):
+        """Above the size threshold the waveform is reduced in blocks and keeps the clicks."""
+        import audio_player_enhanced
+        from audio_player_enhanced import AudioProcessor
+
+        path, samples = recording
+        monkeypatch.setattr(audio_player_enhanced, "STREAMING_WAVEFORM_MIN_BYTES", 1024)
+        reductions = []
+        monkeypatch.setattr(
+            audio_player_enhanced,
+            "reduce_waveform",
+            lambda *args: reductions.append(reduce_waveform(*args)) or reductions[-1],
+        )
+
+        waveform, sample_rate = AudioProcessor.extract_waveform_data(str(path), max_points=1000)
+
+        assert len(reductions) == 1 and sample_rate == 8000 and len(waveform) <= 1000
+        assert waveform.max() == pytest.approx(samples.max()) and waveform.min() == pytest.approx(samples.min())
+        assert reductions[0][2] * len(waveform) >= len(samples)